@@ -20,12 +20,13 @@ from timelinelib.calendar.gregorian.time import GregorianDelta
 from timelinelib.calendar.gregorian.time import GregorianTime
 
 
-class BosparanianTime(GregorianTime):
+class BosparanianDelta(GregorianDelta):
 
-    @property
-    def DeltaClass(self):
-        return BosparanianDelta
+    __slots__ = ()
 
 
-class BosparanianDelta(GregorianDelta):
-    pass
+class BosparanianTime(GregorianTime):
+
+    __slots__ = ()
+
+    DeltaClass = BosparanianDelta
@@ -21,14 +21,15 @@ from timelinelib.calendar.gregorian.time import GregorianDelta
 
 SECONDS_IN_DAY = 24 * 60 * 60
 
+class CopticDelta(GregorianDelta):
+
+    __slots__ = ()
+
+
 class CopticTime(GregorianTime):
-    
-    MIN_JULIAN_DAY = -124
-    
-    @property
-    def DeltaClass(self):
-        return CopticDelta
 
+    __slots__ = ()
 
-class CopticDelta(GregorianDelta):
-    pass
+    MIN_JULIAN_DAY = -124
+
+    DeltaClass = CopticDelta
@@ -0,0 +1,1135 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Arithmetic, navigation, and strips shared by the calendars whose dates are
+made up of years, months, and days.
+
+The Gregorian, Coptic, and Pharaonic calendars only differ in how dates are
+converted and named, how long months and weeks are, and which days are
+weekends. A :class:`CalendarEngine` is created from those differences and
+everything else is implemented once in terms of it. That way all calendars
+get the same behavior and the same caching.
+
+:doc:`Tests are found here <unit_calendar_engine>`.
+"""
+
+from datetime import datetime
+import re
+
+from timelinelib.calendar.gregorian.gregorian import gregorian_ymd_to_julian_day
+from timelinelib.calendar.timetype import TimeType
+from timelinelib.canvas.data import TimeOutOfRangeLeftError
+from timelinelib.canvas.data import TimeOutOfRangeRightError
+from timelinelib.canvas.data import TimePeriod
+from timelinelib.canvas.data import time_period_center
+from timelinelib.canvas.drawing.interface import Strip
+
+
+BC = _("BC")
+CACHE_SIZE = 10000
+MAX_JULIAN_DAY = 5369833
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+class CalendarEngine(object):
+    """
+    Arithmetic, navigation, and period moving for one calendar.
+
+    The calendar is described by its date time, time, and delta classes, a
+    days_in_month(year, month) rule, the number of months in a year and days
+    in a week, the appearance week start for which week numbers are shown,
+    and the functions that give abbreviated month and weekday names.
+
+    Conversions from times to date times and the starts, increments, labels,
+    and boundaries of strips are remembered in caches that live as long as
+    the engine. Since strips are created anew for every redraw, this lets all
+    strips of the calendar share the work done for earlier redraws.
+    """
+
+    def __init__(self, date_time_class, time_class, delta_class,
+                 days_in_month, months_in_year, days_in_week, week_start,
+                 abbreviated_name_of_month, abbreviated_name_of_weekday):
+        self.date_time_class = date_time_class
+        self.time_class = time_class
+        self.delta_class = delta_class
+        self.days_in_month = days_in_month
+        self.months_in_year = months_in_year
+        self.days_in_week = days_in_week
+        self.week_start = week_start
+        self.abbreviated_name_of_month = abbreviated_name_of_month
+        self.abbreviated_name_of_weekday = abbreviated_name_of_weekday
+        self.strip_starts = {}
+        self.strip_increments = {}
+        self.strip_labels = {}
+        self.strip_boundaries = {}
+        self._date_times = {}
+
+    def get_min_time(self):
+        return self.time_class.min()
+
+    def get_max_time(self):
+        return self.time_class(MAX_JULIAN_DAY, 0)
+
+    def now(self):
+        py = datetime.now()
+        return self.time_class(
+            gregorian_ymd_to_julian_day(py.year, py.month, py.day),
+            py.hour * 60 * 60 + py.minute * 60 + py.second
+        )
+
+    def from_time(self, time):
+        return memoize(
+            self._date_times, time, self.date_time_class.from_time, time
+        )
+
+    def from_ymd(self, year, month, day):
+        return self.date_time_class.from_ymd(year, month, day)
+
+    def get_day_of_week(self, time):
+        return time.julian_day % self.days_in_week
+
+    def format_date(self, time):
+        date_time = self.from_time(time)
+        return u"%s %s %s" % (
+            date_time.day,
+            self.abbreviated_name_of_month(date_time.month),
+            format_year(date_time.year)
+        )
+
+    def backward_fn(self, main_frame, current_period, navigation_fn):
+        self._move_page_smart(current_period, navigation_fn, -1)
+
+    def forward_fn(self, main_frame, current_period, navigation_fn):
+        self._move_page_smart(current_period, navigation_fn, 1)
+
+    def forward_one_week_fn(self, main_frame, current_period, navigation_fn):
+        wk = self.delta_class.from_days(self.days_in_week)
+        navigation_fn(lambda tp: tp.move_delta(wk))
+
+    def backward_one_week_fn(self, main_frame, current_period, navigation_fn):
+        wk = self.delta_class.from_days(self.days_in_week)
+        navigation_fn(lambda tp: tp.move_delta(-1 * wk))
+
+    def forward_one_month_fn(self, main_frame, current_period, navigation_fn):
+        self._navigate_month_step(current_period, navigation_fn, 1)
+
+    def backward_one_month_fn(self, main_frame, current_period, navigation_fn):
+        self._navigate_month_step(current_period, navigation_fn, -1)
+
+    def forward_one_year_fn(self, main_frame, current_period, navigation_fn):
+        yr = self.delta_class.from_days(365)
+        navigation_fn(lambda tp: tp.move_delta(yr))
+
+    def backward_one_year_fn(self, main_frame, current_period, navigation_fn):
+        yr = self.delta_class.from_days(365)
+        navigation_fn(lambda tp: tp.move_delta(-1 * yr))
+
+    def fit_millennium_fn(self, main_frame, current_period, navigation_fn):
+        mean = self.from_time(current_period.mean_time())
+        if mean.year > self._get_millenium_max_year():
+            year = self._get_millenium_max_year()
+        else:
+            year = max(self._get_min_year_containing_jan_1(),
+                       int(mean.year / 1000) * 1000)
+        start = self.from_ymd(year, 1, 1).to_time()
+        end = self.from_ymd(year + 1000, 1, 1).to_time()
+        navigation_fn(lambda tp: tp.update(start, end))
+
+    def fit_week_fn(self, main_frame, current_period, navigation_fn):
+        mean = self.from_time(current_period.mean_time())
+        start = self.from_ymd(mean.year, mean.month, mean.day).to_time()
+        weekday = self.get_day_of_week(start)
+        start = start - self.delta_class.from_days(weekday)
+        if not main_frame.week_starts_on_monday():
+            start = start - self.delta_class.from_days(1)
+        end = start + self.delta_class.from_days(self.days_in_week)
+        navigation_fn(lambda tp: tp.update(start, end))
+
+    def create_strip_fitter(self, strip_cls):
+        def fit(main_frame, current_period, navigation_fn):
+            def navigate(time_period):
+                strip = strip_cls(self)
+                start = strip.start(current_period.mean_time())
+                end = strip.increment(start)
+                return time_period.update(start, end)
+            navigation_fn(navigate)
+        return fit
+
+    def move_period_num_days(self, period, num):
+        delta = self.delta_class.from_days(1) * num
+        return TimePeriod(period.start_time + delta, period.end_time + delta)
+
+    def move_period_num_weeks(self, period, num):
+        delta = self.delta_class.from_days(self.days_in_week) * num
+        return TimePeriod(period.start_time + delta, period.end_time + delta)
+
+    def move_period_num_months(self, period, num):
+        def move_time(time):
+            date_time = self.from_time(time)
+            new_year, new_month = self._months_to_year_and_month(
+                self._months(date_time) + num
+            )
+            return date_time.replace(year=new_year, month=new_month).to_time()
+        try:
+            return TimePeriod(
+                move_time(period.start_time),
+                move_time(period.end_time)
+            )
+        except ValueError:
+            return None
+
+    def move_period_num_years(self, period, num):
+        try:
+            start_time = self.from_time(period.start_time)
+            end_time = self.from_time(period.end_time)
+            return TimePeriod(
+                start_time.replace(year=start_time.year + num).to_time(),
+                end_time.replace(year=end_time.year + num).to_time()
+            )
+        except ValueError:
+            return None
+
+    def _move_page_smart(self, current_period, navigation_fn, direction):
+        if self._whole_number_of_years(current_period):
+            self._move_page_years(current_period, navigation_fn, direction)
+        elif self._whole_number_of_months(current_period):
+            self._move_page_months(current_period, navigation_fn, direction)
+        else:
+            navigation_fn(lambda tp: tp.move_delta(direction * current_period.delta()))
+
+    def _whole_number_of_years(self, period):
+        """
+        >>> from timelinelib.calendar.gregorian.timetype import GREGORIAN
+        >>> from timelinelib.test.utils import gregorian_period
+
+        >>> GREGORIAN._whole_number_of_years(gregorian_period("1 Jan 2013", "1 Jan 2014"))
+        True
+
+        >>> GREGORIAN._whole_number_of_years(gregorian_period("1 Jan 2013", "1 Jan 2015"))
+        True
+
+        >>> GREGORIAN._whole_number_of_years(gregorian_period("1 Feb 2013", "1 Feb 2014"))
+        False
+
+        >>> GREGORIAN._whole_number_of_years(gregorian_period("1 Jan 2013", "1 Feb 2014"))
+        False
+        """
+        return (self.from_time(period.start_time).is_first_day_in_year() and
+                self.from_time(period.end_time).is_first_day_in_year() and
+                self._calculate_year_diff(period) > 0)
+
+    def _move_page_years(self, current_period, navigation_fn, direction):
+        def navigate(tp):
+            year_delta = direction * self._calculate_year_diff(current_period)
+            start = self.from_time(current_period.start_time)
+            end = self.from_time(current_period.end_time)
+            try:
+                new_start = start.replace(year=start.year + year_delta).to_time()
+                new_end = end.replace(year=end.year + year_delta).to_time()
+                self._check_inside_range(new_start, new_end)
+            except ValueError:
+                self._raise_out_of_range(direction)
+            return tp.update(new_start, new_end)
+        navigation_fn(navigate)
+
+    def _calculate_year_diff(self, period):
+        return (self.from_time(period.end_time).year -
+                self.from_time(period.start_time).year)
+
+    def _whole_number_of_months(self, period):
+        """
+        >>> from timelinelib.calendar.gregorian.timetype import GREGORIAN
+        >>> from timelinelib.test.utils import gregorian_period
+
+        >>> GREGORIAN._whole_number_of_months(gregorian_period("1 Jan 2013", "1 Jan 2014"))
+        True
+
+        >>> GREGORIAN._whole_number_of_months(gregorian_period("1 Jan 2013", "1 Mar 2014"))
+        True
+
+        >>> GREGORIAN._whole_number_of_months(gregorian_period("2 Jan 2013", "2 Mar 2014"))
+        False
+
+        >>> GREGORIAN._whole_number_of_months(gregorian_period("1 Jan 2013 12:00", "1 Mar 2014"))
+        False
+        """
+        start = self.from_time(period.start_time)
+        end = self.from_time(period.end_time)
+        return (start.is_first_of_month() and
+                end.is_first_of_month() and
+                self._months(end) - self._months(start) > 0)
+
+    def _move_page_months(self, current_period, navigation_fn, direction):
+        def navigate(tp):
+            start = self.from_time(current_period.start_time)
+            end = self.from_time(current_period.end_time)
+            start_months = self._months(start)
+            end_months = self._months(end)
+            month_delta = (end_months - start_months) * direction
+            new_start_year, new_start_month = self._months_to_year_and_month(start_months + month_delta)
+            new_end_year, new_end_month = self._months_to_year_and_month(end_months + month_delta)
+            try:
+                new_start = start.replace(year=new_start_year, month=new_start_month).to_time()
+                new_end = end.replace(year=new_end_year, month=new_end_month).to_time()
+                self._check_inside_range(new_start, new_end)
+            except ValueError:
+                self._raise_out_of_range(direction)
+            return tp.update(new_start, new_end)
+        navigation_fn(navigate)
+
+    def _check_inside_range(self, start, end):
+        if end > self.get_max_time():
+            raise ValueError()
+        if start < self.get_min_time():
+            raise ValueError()
+
+    def _raise_out_of_range(self, direction):
+        if direction < 0:
+            raise TimeOutOfRangeLeftError()
+        else:
+            raise TimeOutOfRangeRightError()
+
+    def _months(self, date_time):
+        return date_time.year * self.months_in_year + date_time.month
+
+    def _months_to_year_and_month(self, months):
+        years = int(months / self.months_in_year)
+        month = months - years * self.months_in_year
+        if month == 0:
+            month = self.months_in_year
+            years -= 1
+        return years, month
+
+    def _navigate_month_step(self, current_period, navigation_fn, direction):
+        """
+        Move by the length of the month of the mean time when moving forward
+        and by the length of the month before it when moving backward.
+        """
+        date_time = self.from_time(current_period.mean_time())
+        if direction > 0:
+            year, month = date_time.year, date_time.month
+        else:
+            year, month = self._months_to_year_and_month(self._months(date_time) - 1)
+        mv = self.delta_class.from_days(self.days_in_month(year, month))
+        navigation_fn(lambda tp: tp.move_delta(direction * mv))
+
+    def _get_min_year_containing_jan_1(self):
+        return self.from_time(self.get_min_time()).year + 1
+
+    def _get_millenium_max_year(self):
+        return self.from_time(self.get_max_time()).year - 1000
+
+
+class CalendarTimeType(TimeType):
+    """
+    A time type for a calendar implemented by a :class:`CalendarEngine`.
+
+    Subclasses set :attr:`calendar` and implement equality, the name, and the
+    time pickers.
+    """
+
+    calendar = None
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def time_string(self, time):
+        return "%d-%02d-%02d %02d:%02d:%02d" % self.calendar.from_time(time).to_tuple()
+
+    def parse_time(self, time_string):
+        match = re.search(r"^(-?\d+)-(\d+)-(\d+) (\d+):(\d+):(\d+)$", time_string)
+        if match:
+            year = int(match.group(1))
+            month = int(match.group(2))
+            day = int(match.group(3))
+            hour = int(match.group(4))
+            minute = int(match.group(5))
+            second = int(match.group(6))
+            try:
+                return self.calendar.date_time_class(
+                    year, month, day, hour, minute, second
+                ).to_time()
+            except ValueError:
+                raise ValueError("Invalid time, time string = '%s'" % time_string)
+        else:
+            raise ValueError("Time not on correct format = '%s'" % time_string)
+
+    def get_navigation_functions(self):
+        calendar = self.calendar
+        return [
+            (_("Go to &Today") + "\tCtrl+T", self._go_to_today_fn),
+            (_("Go to &Date...") + "\tCtrl+G", self._go_to_date_fn),
+            ("SEP", None),
+            (_("Backward") + "\tPgUp", calendar.backward_fn),
+            (_("Forward") + "\tPgDn", calendar.forward_fn),
+            (_("Forward One Wee&k") + "\tCtrl+K", calendar.forward_one_week_fn),
+            (_("Back One &Week") + "\tCtrl+W", calendar.backward_one_week_fn),
+            (_("Forward One Mont&h") + "\tCtrl+H", calendar.forward_one_month_fn),
+            (_("Back One &Month") + "\tCtrl+M", calendar.backward_one_month_fn),
+            (_("Forward One Yea&r") + "\tCtrl+R", calendar.forward_one_year_fn),
+            (_("Back One &Year") + "\tCtrl+Y", calendar.backward_one_year_fn),
+            ("SEP", None),
+            (_("Fit Millennium"), calendar.fit_millennium_fn),
+            (_("Fit Century"), calendar.create_strip_fitter(StripCentury)),
+            (_("Fit Decade"), calendar.create_strip_fitter(StripDecade)),
+            (_("Fit Year"), calendar.create_strip_fitter(StripYear)),
+            (_("Fit Month"), calendar.create_strip_fitter(StripMonth)),
+            (_("Fit Week"), calendar.fit_week_fn),
+            (_("Fit Day"), calendar.create_strip_fitter(StripDay)),
+        ]
+
+    def _go_to_today_fn(self, main_frame, current_period, navigation_fn):
+        navigation_fn(lambda tp: tp.center(self.now()))
+
+    def _go_to_date_fn(self, main_frame, current_period, navigation_fn):
+        def navigate_to(time):
+            navigation_fn(lambda tp: tp.center(time))
+        main_frame.display_time_editor_dialog(
+            self.__class__(), current_period.mean_time(), navigate_to, _("Go to Date"))
+
+    def format_period(self, time_period):
+        """Returns a unicode string describing the time period."""
+        def label_with_time(time):
+            return u"%s %s" % (label_without_time(time), time_label(time))
+
+        def label_without_time(time):
+            return self.calendar.format_date(time)
+
+        def time_label(time):
+            return "%02d:%02d" % time.get_time_of_day()[:-1]
+        if time_period.is_period():
+            if has_nonzero_time(time_period):
+                label = u"%s to %s" % (label_with_time(time_period.start_time),
+                                       label_with_time(time_period.end_time))
+            else:
+                label = u"%s to %s" % (label_without_time(time_period.start_time),
+                                       label_without_time(time_period.end_time))
+        else:
+            if has_nonzero_time(time_period):
+                label = u"%s" % label_with_time(time_period.start_time)
+            else:
+                label = u"%s" % label_without_time(time_period.start_time)
+        return label
+
+    def format_delta(self, delta):
+        days = abs(delta.get_days())
+        seconds = abs(delta.seconds) - days * SECONDS_IN_DAY
+        delta_format = (YEARS, DAYS, HOURS, MINUTES, SECONDS)
+        return DurationFormatter([days, seconds]).format(delta_format)
+
+    def get_min_time(self):
+        return self.calendar.get_min_time()
+
+    def get_max_time(self):
+        return self.calendar.get_max_time()
+
+    def choose_strip(self, metrics, appearance):
+        """
+        Return a tuple (major_strip, minor_strip) for current time period and
+        window size.
+        """
+        calendar = self.calendar
+        day_period = TimePeriod(calendar.time_class(0, 0), calendar.time_class(1, 0))
+        one_day_width = metrics.calc_exact_width(day_period)
+        if one_day_width > 20000:
+            return (StripHour(calendar), StripMinute(calendar))
+        elif one_day_width > 600:
+            return (StripDay(calendar), StripHour(calendar))
+        elif one_day_width > 45:
+            return (StripWeek(calendar, appearance), StripWeekday(calendar))
+        elif one_day_width > 25:
+            return (StripMonth(calendar), StripDay(calendar))
+        elif one_day_width > 1.5:
+            return (StripYear(calendar), StripMonth(calendar))
+        elif one_day_width > 0.12:
+            return (StripDecade(calendar), StripYear(calendar))
+        elif one_day_width > 0.012:
+            return (StripCentury(calendar), StripDecade(calendar))
+        else:
+            return (StripCentury(calendar), StripCentury(calendar))
+
+    def get_default_time_period(self):
+        return time_period_center(self.now(), self.calendar.delta_class.from_days(30))
+
+    def supports_saved_now(self):
+        return False
+
+    def set_saved_now(self, time):
+        ()
+
+    def now(self):
+        return self.calendar.now()
+
+    def get_min_zoom_delta(self):
+        return (self.calendar.delta_class.from_seconds(60), _("Can't zoom deeper than 1 minute"))
+
+    def get_duplicate_functions(self):
+        return [
+            (_("Day"), self.calendar.move_period_num_days),
+            (_("Week"), self.calendar.move_period_num_weeks),
+            (_("Month"), self.calendar.move_period_num_months),
+            (_("Year"), self.calendar.move_period_num_years),
+        ]
+
+    def is_special_day(self, time):
+        return False
+
+    def is_weekend_day(self, time):
+        return self.get_day_of_week(time) in (5, 6)
+
+    def get_day_of_week(self, time):
+        return self.calendar.get_day_of_week(time)
+
+
+class CalendarStrip(Strip):
+    """
+    A strip of a calendar whose start, increment, label, and boundaries are
+    remembered in the caches of the calendar engine.
+
+    Subclasses implement :meth:`_start`, :meth:`_increment`, and
+    :meth:`_label`. Strips with settings that affect the result include them
+    in :meth:`_cache_key`. Subclasses whose boundaries can be computed
+    directly override :meth:`_boundaries`.
+    """
+
+    KIND = None
+
+    def __init__(self, calendar):
+        Strip.__init__(self)
+        self.calendar = calendar
+
+    def label(self, time, major=False):
+        return memoize(
+            self.calendar.strip_labels, (self._cache_key(), time, major),
+            self._label, time, major
+        )
+
+    def start(self, time):
+        return memoize(
+            self.calendar.strip_starts, (self._cache_key(), time),
+            self._start, time
+        )
+
+    def increment(self, time):
+        return memoize(
+            self.calendar.strip_increments, (self._cache_key(), time),
+            self._increment, time
+        )
+
+    def boundaries(self, start_time, end_time):
+        return memoize(
+            self.calendar.strip_boundaries,
+            (self._cache_key(), start_time, end_time),
+            self._boundaries, start_time, end_time
+        )
+
+    def _cache_key(self):
+        return self.KIND
+
+    def _boundaries(self, start_time, end_time):
+        return Strip.boundaries(self, start_time, end_time)
+
+    def _fixed_length_boundaries(self, start_time, end_time, seconds):
+        try:
+            first = self.start(start_time).total_seconds
+        except ValueError:
+            return []
+        count = max(0, -((first - end_time.total_seconds) // seconds))
+        from_total_seconds = self.calendar.time_class.from_total_seconds
+        return [
+            from_total_seconds(first + index * seconds)
+            for index
+            in range(count + 1)
+        ]
+
+    def _label(self, time, major):
+        raise NotImplementedError()
+
+    def _start(self, time):
+        raise NotImplementedError()
+
+    def _increment(self, time):
+        raise NotImplementedError()
+
+
+class StripCentury(CalendarStrip):
+
+    """
+    Year Name | Year integer | Decade name
+    ----------+--------------+------------
+    ..        |  ..          |
+    200 BC    | -199         | 200s BC (100 years)
+    ----------+--------------+------------
+    199 BC    | -198         |
+    ...       | ...          | 100s BC (100 years)
+    100 BC    | -99          |
+    ----------+--------------+------------
+    99  BC    | -98          |
+    ...       |  ...         | 0s BC (only 99 years)
+    1   BC    |  0           |
+    ----------+--------------+------------
+    1         |  1           |
+    ...       |  ...         | 0s (only 99 years)
+    99        |  99          |
+    ----------+--------------+------------
+    100       |  100         |
+    ..        |  ..          | 100s (100 years)
+    199       |  199         |
+    ----------+--------------+------------
+    200       |  200         | 200s (100 years)
+    ..        |  ..          |
+    """
+
+    KIND = "century"
+
+    def _label(self, time, major):
+        if major:
+            date_time = self.calendar.from_time(time)
+            return self._format_century(
+                self._century_number(
+                    self._century_start_year(date_time.year)
+                ),
+                date_time.is_bc()
+            )
+        else:
+            return ""
+
+    def _start(self, time):
+        return self.calendar.from_ymd(
+            self._century_start_year(self.calendar.from_time(time).year),
+            1,
+            1
+        ).to_time()
+
+    def _increment(self, time):
+        date_time = self.calendar.from_time(time)
+        return date_time.replace(
+            year=self._next_century_start_year(date_time.year)
+        ).to_time()
+
+    def _century_number(self, century_start_year):
+        if century_start_year > 99:
+            return century_start_year
+        elif century_start_year >= -98:
+            return 0
+        else:  # century_start_year < -98:
+            return self._century_number(-century_start_year - 98)
+
+    def _next_century_start_year(self, start_year):
+        return start_year + self._century_year_len(start_year)
+
+    def _century_year_len(self, start_year):
+        if start_year in [-98, 1]:
+            return 99
+        else:
+            return 100
+
+    def _format_century(self, century_number, is_bc):
+        if is_bc:
+            return u"{century}s {bc}".format(century=century_number, bc=BC)
+        else:
+            return u"{century}s".format(century=century_number)
+
+    def _century_start_year(self, year):
+        if year > 99:
+            return year - int(year) % 100
+        elif year >= 1:
+            return 1
+        elif year >= -98:
+            return -98
+        else:  # year < -98
+            return -self._century_start_year(-year + 1) - 98
+
+
+class StripDecade(CalendarStrip):
+
+    """
+    Year Name | Year integer | Decade name
+    ----------+--------------+------------
+    ..        |  ..          |
+    20 BC     | -19          | 20s BC (10 years)
+    ----------+--------------+------------
+    19 BC     | -18          |
+    18 BC     | -17          |
+    17 BC     | -16          |
+    16 BC     | -15          |
+    15 BC     | -14          | 10s BC (10 years)
+    14 BC     | -13          |
+    13 BC     | -12          |
+    12 BC     | -11          |
+    11 BC     | -10          |
+    10 BC     | -9           |
+    ----------+--------------+------------
+    9  BC     | -8           |
+    8  BC     | -7           |
+    7  BC     | -6           |
+    6  BC     | -5           |
+    5  BC     | -4           | 0s BC (only 9 years)
+    4  BC     | -3           |
+    3  BC     | -2           |
+    2  BC     | -1           |
+    1  BC     |  0           |
+    ----------+--------------+------------
+    1         |  1           |
+    2         |  2           |
+    3         |  3           |
+    4         |  4           |
+    5         |  5           |  0s (only 9 years)
+    6         |  6           |
+    7         |  7           |
+    8         |  8           |
+    9         |  9           |
+    ----------+--------------+------------
+    10        |  10          |
+    11        |  11          |
+    12        |  12          |
+    13        |  13          |
+    14        |  14          |
+    15        |  15          |  10s (10 years)
+    16        |  16          |
+    17        |  17          |
+    18        |  18          |
+    19        |  19          |
+    ----------+--------------+------------
+    20        |  20          |  20s (10 years)
+    ..        |  ..          |
+    """
+
+    KIND = "decade"
+
+    def __init__(self, calendar):
+        CalendarStrip.__init__(self, calendar)
+        self.skip_s_in_decade_text = False
+
+    def _label(self, time, major):
+        date_time = self.calendar.from_time(time)
+        return self._format_decade(
+            self._decade_number(self._decade_start_year(date_time.year)),
+            date_time.is_bc()
+        )
+
+    def _start(self, time):
+        return self.calendar.from_ymd(
+            self._decade_start_year(self.calendar.from_time(time).year),
+            1,
+            1
+        ).to_time()
+
+    def _increment(self, time):
+        date_time = self.calendar.from_time(time)
+        return date_time.replace(
+            year=self._next_decacde_start_year(date_time.year)
+        ).to_time()
+
+    def _cache_key(self):
+        return (self.KIND, self.skip_s_in_decade_text)
+
+    def set_skip_s_in_decade_text(self, value):
+        self.skip_s_in_decade_text = value
+
+    def _format_decade(self, decade_number, is_bc):
+        parts = []
+        parts.append("{0}".format(decade_number))
+        if not self.skip_s_in_decade_text:
+            parts.append("s")
+        if is_bc:
+            parts.append(" ")
+            parts.append(BC)
+        return "".join(parts)
+
+    def _decade_start_year(self, year):
+        if year > 9:
+            return int(year) - (int(year) % 10)
+        elif year >= 1:
+            return 1
+        elif year >= -8:
+            return -8
+        else:  # year < -8
+            return -self._decade_start_year(-year + 1) - 8
+
+    def _next_decacde_start_year(self, start_year):
+        return start_year + self._decade_year_len(start_year)
+
+    def _decade_year_len(self, start_year):
+        if self._decade_number(start_year) == 0:
+            return 9
+        else:
+            return 10
+
+    def _decade_number(self, start_year):
+        if start_year > 9:
+            return start_year
+        elif start_year >= -8:
+            return 0
+        else:  # start_year < -8
+            return self._decade_number(-start_year - 8)
+
+
+class StripYear(CalendarStrip):
+
+    KIND = "year"
+
+    def _label(self, time, major):
+        return format_year(self.calendar.from_time(time).year)
+
+    def _start(self, time):
+        return self.calendar.from_ymd(
+            self.calendar.from_time(time).year, 1, 1
+        ).to_time()
+
+    def _increment(self, time):
+        date_time = self.calendar.from_time(time)
+        return date_time.replace(year=date_time.year + 1).to_time()
+
+    def _boundaries(self, start_time, end_time):
+        year = self.calendar.from_time(start_time).year
+        boundaries = []
+        try:
+            time = self.calendar.from_ymd(year, 1, 1).to_time()
+            boundaries.append(time)
+            while time < end_time:
+                year += 1
+                time = self.calendar.from_ymd(year, 1, 1).to_time()
+                boundaries.append(time)
+        except ValueError:
+            pass
+        return boundaries
+
+
+class StripMonth(CalendarStrip):
+
+    KIND = "month"
+
+    def _label(self, time, major):
+        date_time = self.calendar.from_time(time)
+        if major:
+            return "%s %s" % (self.calendar.abbreviated_name_of_month(date_time.month),
+                              format_year(date_time.year))
+        return self.calendar.abbreviated_name_of_month(date_time.month)
+
+    def _start(self, time):
+        date_time = self.calendar.from_time(time)
+        return self.calendar.from_ymd(
+            date_time.year,
+            date_time.month,
+            1
+        ).to_time()
+
+    def _increment(self, time):
+        date_time = self.calendar.from_time(time)
+        return self._month_start(date_time.year, date_time.month + 1)
+
+    def _boundaries(self, start_time, end_time):
+        date_time = self.calendar.from_time(start_time)
+        year, month = date_time.year, date_time.month
+        boundaries = []
+        try:
+            time = self._month_start(year, month)
+            boundaries.append(time)
+            while time < end_time:
+                month += 1
+                time = self._month_start(year, month)
+                boundaries.append(time)
+        except ValueError:
+            pass
+        return boundaries
+
+    def _month_start(self, year, month):
+        year += (month - 1) // self.calendar.months_in_year
+        month = (month - 1) % self.calendar.months_in_year + 1
+        return self.calendar.from_ymd(year, month, 1).to_time()
+
+
+class StripDay(CalendarStrip):
+
+    KIND = "day"
+
+    def _label(self, time, major):
+        if major:
+            return self.calendar.format_date(time)
+        return str(self.calendar.from_time(time).day)
+
+    def _start(self, time):
+        return self.calendar.time_class(time.julian_day, 0)
+
+    def _increment(self, time):
+        return time + self.calendar.delta_class.from_days(1)
+
+    def _boundaries(self, start_time, end_time):
+        return self._fixed_length_boundaries(start_time, end_time, SECONDS_IN_DAY)
+
+    def is_day(self):
+        return True
+
+
+class StripWeek(CalendarStrip):
+
+    KIND = "week"
+
+    def __init__(self, calendar, appearance):
+        CalendarStrip.__init__(self, calendar)
+        self.appearance = appearance
+
+    def _cache_key(self):
+        return (self.KIND, self.appearance.get_week_start())
+
+    def _label(self, time, major):
+        if major:
+            first_weekday = self.start(time)
+            next_first_weekday = self.increment(first_weekday)
+            last_weekday = next_first_weekday - self.calendar.delta_class.from_days(1)
+            range_string = self._time_range_string(first_weekday, last_weekday)
+            if self.appearance.get_week_start() == self.calendar.week_start:
+                return (_("Week") + " %s (%s)") % (
+                    self.calendar.from_time(time).week_number,
+                    range_string
+                )
+            else:
+                # It is the other week start (don't know what to do about
+                # week numbers here)
+                return range_string
+        # This strip should never be used as minor
+        return ""
+
+    def _time_range_string(self, start, end):
+        month_name = self.calendar.abbreviated_name_of_month
+        start = self.calendar.from_time(start)
+        end = self.calendar.from_time(end)
+        if start.year == end.year:
+            if start.month == end.month:
+                return "%s-%s %s %s" % (start.day, end.day,
+                                        month_name(start.month),
+                                        format_year(start.year))
+            return "%s %s-%s %s %s" % (start.day,
+                                       month_name(start.month),
+                                       end.day,
+                                       month_name(end.month),
+                                       format_year(start.year))
+        return "%s %s %s-%s %s %s" % (start.day,
+                                      month_name(start.month),
+                                      format_year(start.year),
+                                      end.day,
+                                      month_name(end.month),
+                                      format_year(end.year))
+
+    def _start(self, time):
+        day_of_week = self.calendar.get_day_of_week(time)
+        if self.appearance.get_week_start() == self.calendar.week_start:
+            days_to_subtract = day_of_week
+        else:
+            days_to_subtract = (day_of_week + 1) % self.calendar.days_in_week
+        return self.calendar.time_class(time.julian_day - days_to_subtract, 0)
+
+    def _increment(self, time):
+        return time + self.calendar.delta_class.from_days(self.calendar.days_in_week)
+
+    def _boundaries(self, start_time, end_time):
+        return self._fixed_length_boundaries(
+            start_time, end_time, self.calendar.days_in_week * SECONDS_IN_DAY
+        )
+
+
+class StripWeekday(CalendarStrip):
+
+    KIND = "weekday"
+
+    def _label(self, time, major):
+        weekday_name = self.calendar.abbreviated_name_of_weekday(
+            self.calendar.get_day_of_week(time)
+        )
+        if major:
+            return "%s %s" % (weekday_name, self.calendar.format_date(time))
+        return weekday_name + " %s" % self.calendar.from_time(time).day
+
+    def _start(self, time):
+        return self.calendar.time_class(time.julian_day, 0)
+
+    def _increment(self, time):
+        return time + self.calendar.delta_class.from_days(1)
+
+    def _boundaries(self, start_time, end_time):
+        return self._fixed_length_boundaries(start_time, end_time, SECONDS_IN_DAY)
+
+    def is_day(self):
+        return True
+
+
+class StripHour(CalendarStrip):
+
+    KIND = "hour"
+
+    def _label(self, time, major):
+        if major:
+            return "%s: %sh" % (self.calendar.format_date(time),
+                                self.calendar.from_time(time).hour)
+        return str(self.calendar.from_time(time).hour)
+
+    def _start(self, time):
+        (hours, _, _) = time.get_time_of_day()
+        return self.calendar.time_class(time.julian_day, hours * 60 * 60)
+
+    def _increment(self, time):
+        return time + self.calendar.delta_class.from_seconds(60 * 60)
+
+    def _boundaries(self, start_time, end_time):
+        return self._fixed_length_boundaries(start_time, end_time, 60 * 60)
+
+
+class StripMinute(CalendarStrip):
+
+    KIND = "minute"
+
+    def _label(self, time, major):
+        date_time = self.calendar.from_time(time)
+        if major:
+            return "%s: %s:%s" % (self.calendar.format_date(time),
+                                  date_time.hour, date_time.minute)
+        return str(date_time.minute)
+
+    def _start(self, time):
+        (hours, minutes, _) = time.get_time_of_day()
+        return self.calendar.time_class(time.julian_day, minutes * 60 + hours * 60 * 60)
+
+    def _increment(self, time):
+        return time + self.calendar.delta_class.from_seconds(60)
+
+    def _boundaries(self, start_time, end_time):
+        return self._fixed_length_boundaries(start_time, end_time, 60)
+
+
+def memoize(cache, key, fn, *args):
+    """
+    Return the value cached for key, or call fn with args and cache its
+    value. When the cache is full it is cleared before adding a new value.
+    """
+    try:
+        return cache[key]
+    except KeyError:
+        value = fn(*args)
+        if len(cache) >= CACHE_SIZE:
+            cache.clear()
+        cache[key] = value
+        return value
+
+
+def format_year(year):
+    if year <= 0:
+        return "%d %s" % ((1 - year), BC)
+    else:
+        return str(year)
+
+
+def has_nonzero_time(time_period):
+    return (time_period.start_time.seconds != 0 or
+            time_period.end_time.seconds != 0)
+
+
+class DurationType(object):
+
+    def __init__(self, name, single_name, value_fn, remainder_fn):
+        self._name = name
+        self._single_name = single_name
+        self._value_fn = value_fn
+        self._remainder_fn = remainder_fn
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def single_name(self):
+        return self._single_name
+
+    @property
+    def value_fn(self):
+        return self._value_fn
+
+    @property
+    def remainder_fn(self):
+        return self._remainder_fn
+
+
+YEARS = DurationType(_('years'), _('year'),
+                     lambda ds: ds[0] / 365,
+                     lambda ds: (ds[0] % 365, ds[1]))
+MONTHS = DurationType(_('months'), _('month'),
+                      lambda ds: ds[0] / 30,
+                      lambda ds: (ds[0] % 30, ds[1]))
+WEEKS = DurationType(_('weeks'), _('week'),
+                     lambda ds: ds[0] / 7,
+                     lambda ds: (ds[0] % 7, ds[1]))
+DAYS = DurationType(_('days'), _('day'),
+                    lambda ds: ds[0],
+                    lambda ds: (0, ds[1]))
+HOURS = DurationType(_('hours'), _('hour'),
+                     lambda ds: ds[0] * 24 + ds[1] / 3600,
+                     lambda ds: (0, ds[1] % 3600))
+MINUTES = DurationType(_('minutes'), _('minute'),
+                       lambda ds: ds[0] * 1440 + ds[1] / 60,
+                       lambda ds: (0, ds[1] % 60))
+SECONDS = DurationType(_('seconds'), _('second'),
+                       lambda ds: ds[0] * 86400 + ds[1],
+                       lambda ds: (0, 0))
+
+
+class DurationFormatter(object):
+
+    def __init__(self, duration):
+        """Duration is a list containing days and seconds."""
+        self._duration = duration
+
+    def format(self, duration_parts):
+        """
+        Return a string describing a time duration. Such a string
+        can look like::
+
+            2 years 1 month 3 weeks
+
+        The argument duration_parts is a tuple where each element
+        describes a duration type like YEARS, WEEKS etc.
+        """
+        values = self._calc_duration_values(self._duration, duration_parts)
+        return self._format_parts(zip(values, duration_parts))
+
+    def _calc_duration_values(self, duration, duration_parts):
+        values = []
+        for duration_part in duration_parts:
+            value = duration_part.value_fn(duration)
+            duration[0], duration[1] = duration_part.remainder_fn(duration)
+            values.append(value)
+        return values
+
+    def _format_parts(self, duration_parts):
+        durations = self._remov_zero_value_parts(duration_parts)
+        return " ". join(self._format_durations_parts(durations))
+
+    def _remov_zero_value_parts(self, duration_parts):
+        return [duration for duration in duration_parts
+                if duration[0] > 0]
+
+    def _format_durations_parts(self, durations):
+        return [self._format_part(duration_value, duration_type) for
+                duration_value, duration_type in durations]
+
+    def _format_part(self, value, duration_type):
+        if value == 1:
+            heading = duration_type.single_name
+        else:
+            heading = duration_type.name
+        return '%d %s' % (value, heading)
@@ -24,13 +24,65 @@ from timelinelib.calendar.time import GenericTimeMixin
 SECONDS_IN_DAY = 24 * 60 * 60
 
 
+class GregorianDelta(ComparableValue, GenericDeltaMixin):
+
+    __slots__ = ()
+
+    @classmethod
+    def from_seconds(cls, seconds):
+        return cls(seconds)
+
+    @classmethod
+    def from_days(cls, days):
+        return cls(SECONDS_IN_DAY * days)
+
+    @property
+    def seconds(self):
+        return self._value
+
+    def __div__(self, value):
+        if isinstance(value, self.__class__):
+            return float(self._value) / float(value._value)
+        else:
+            return self.__class__(self._value / value)
+
+    def __sub__(self, delta):
+        return self.__class__(self._value - delta.seconds)
+
+    def __mul__(self, value):
+        return self.__class__(int(self._value * value))
+
+    def get_days(self):
+        return self._value / SECONDS_IN_DAY
+
+    def get_hours(self):
+        return (self._value / (60 * 60)) % 24
+
+    def get_minutes(self):
+        return (self._value / 60) % 60
+
+    def __repr__(self):
+        return "{0}({1!r})".format(
+            self.__class__.__name__,
+            self._value
+        )
+
+
 class GregorianTime(GenericTimeMixin):
 
+    """
+    A point in time stored as the number of seconds since the start of
+    julian day 0.
+
+    All comparisons and arithmetic work directly on that number. The julian
+    day and the seconds into that day are calculated from it when asked for.
+    """
+
+    __slots__ = ("_total_seconds",)
+
     MIN_JULIAN_DAY = 0
 
-    @property
-    def DeltaClass(self):
-        return GregorianDelta
+    DeltaClass = GregorianDelta
 
     @classmethod
     def min(cls):
@@ -48,51 +100,65 @@ class GregorianTime(GenericTimeMixin):
             raise ValueError("julian_day must be >= %d" % self.MIN_JULIAN_DAY)
         if seconds < 0 or seconds >= SECONDS_IN_DAY:
             raise ValueError("seconds must be >= 0 and <= 24*60*60")
-        self.julian_day = julian_day
-        self.seconds = seconds
+        self._total_seconds = julian_day * SECONDS_IN_DAY + seconds
+
+    @classmethod
+    def from_total_seconds(cls, total_seconds):
+        if total_seconds < cls.MIN_JULIAN_DAY * SECONDS_IN_DAY:
+            raise ValueError("julian_day must be >= %d" % cls.MIN_JULIAN_DAY)
+        time = cls.__new__(cls)
+        time._total_seconds = total_seconds
+        return time
+
+    @property
+    def julian_day(self):
+        return self._total_seconds // SECONDS_IN_DAY
+
+    @property
+    def seconds(self):
+        return self._total_seconds % SECONDS_IN_DAY
+
+    @property
+    def total_seconds(self):
+        return self._total_seconds
 
     def __eq__(self, time):
         return (isinstance(time, self.__class__) and
-                self.julian_day == time.julian_day and
-                self.seconds == time.seconds)
+                self._total_seconds == time._total_seconds)
 
     def __ne__(self, time):
         return not (self == time)
 
+    def __hash__(self):
+        return hash(self._total_seconds)
+
     def __add__(self, delta):
         if isinstance(delta, self.DeltaClass):
-            seconds = self.seconds + delta.seconds
-            return self.__class__(self.julian_day + seconds / SECONDS_IN_DAY, seconds % SECONDS_IN_DAY)
+            return self.from_total_seconds(self._total_seconds + delta._value)
         raise TypeError(
             "%s + %s not supported" % (self.__class__.__name__, type(delta))
         )
 
     def __sub__(self, other):
         if isinstance(other, self.DeltaClass):
-            seconds = self.seconds - other.seconds
-            if seconds < 0:
-                if seconds % SECONDS_IN_DAY == 0:
-                    days = abs(seconds) / SECONDS_IN_DAY
-                    seconds = 0
-                else:
-                    days = abs(seconds) / SECONDS_IN_DAY + 1
-                    seconds = SECONDS_IN_DAY - abs(seconds) % SECONDS_IN_DAY
-                return self.__class__(self.julian_day - days, seconds)
-            else:
-                return self.__class__(self.julian_day, seconds)
+            return self.from_total_seconds(self._total_seconds - other._value)
         else:
-            days_diff = self.julian_day - other.julian_day
-            seconds_diff = self.seconds - other.seconds
-            return self.DeltaClass(days_diff * SECONDS_IN_DAY + seconds_diff)
+            return self.DeltaClass(self._total_seconds - other._total_seconds)
 
     def __gt__(self, dt):
-        return (self.julian_day, self.seconds) > (dt.julian_day, dt.seconds)
+        return self._total_seconds > dt._total_seconds
 
     def __ge__(self, dt):
-        return self == dt or self > dt
+        return self._total_seconds >= dt._total_seconds
 
     def __lt__(self, dt):
-        return (self.julian_day, self.seconds) < (dt.julian_day, dt.seconds)
+        return self._total_seconds < dt._total_seconds
+
+    def __le__(self, dt):
+        return self._total_seconds <= dt._total_seconds
+
+    def __reduce__(self):
+        return (self.__class__, (self.julian_day, self.seconds))
 
     def __repr__(self):
         return "{0}({1!r}, {2!r})".format(
@@ -106,49 +172,8 @@ class GregorianTime(GenericTimeMixin):
         return GregorianDateTime.from_time(self)
     
     def get_time_of_day(self):
-        hours = self.seconds / 3600
-        minutes = (self.seconds / 60) % 60
-        seconds = self.seconds % 60
+        seconds = self.seconds
+        hours = seconds / 3600
+        minutes = (seconds / 60) % 60
+        seconds = seconds % 60
         return (hours, minutes, seconds)
-
-
-class GregorianDelta(ComparableValue, GenericDeltaMixin):
-
-    @classmethod
-    def from_seconds(cls, seconds):
-        return cls(seconds)
-
-    @classmethod
-    def from_days(cls, days):
-        return cls(SECONDS_IN_DAY * days)
-
-    @property
-    def seconds(self):
-        return self.value
-
-    def __div__(self, value):
-        if isinstance(value, self.__class__):
-            return float(self.seconds) / float(value.seconds)
-        else:
-            return self.__class__(self.seconds / value)
-
-    def __sub__(self, delta):
-        return self.__class__(self.seconds - delta.seconds)
-
-    def __mul__(self, value):
-        return self.__class__(int(self.seconds * value))
-
-    def get_days(self):
-        return self.seconds / SECONDS_IN_DAY
-
-    def get_hours(self):
-        return (self.seconds / (60 * 60)) % 24
-
-    def get_minutes(self):
-        return (self.seconds / 60) % 60
-
-    def __repr__(self):
-        return "{0}({1!r})".format(
-            self.__class__.__name__,
-            self.seconds
-        )
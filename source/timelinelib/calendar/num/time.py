@@ -21,35 +21,10 @@ from timelinelib.calendar.time import GenericDeltaMixin
 from timelinelib.calendar.time import GenericTimeMixin
 
 
-class NumTime(ComparableValue, GenericTimeMixin):
-
-    @property
-    def DeltaClass(self):
-        return NumDelta
-
-    def __repr__(self):
-        return "{0}<{1!r}>".format(self.__class__.__name__, self.value)
-
-    def __add__(self, other):
-        if isinstance(other, self.DeltaClass):
-            # Time + Delta
-            return self.__class__(self.value + other.value)
-        else:
-            return NotImplemented
-
-    def __sub__(self, other):
-        if isinstance(other, self.DeltaClass):
-            # Time - Delta
-            return self.__class__(self.value - other.value)
-        elif isinstance(other, self.__class__):
-            # Time - Time
-            return self.DeltaClass(self.value - other.value)
-        else:
-            return NotImplemented
-
-
 class NumDelta(ComparableValue, GenericDeltaMixin):
 
+    __slots__ = ()
+
     def __repr__(self):
         return "{0}<{1!r}>".format(self.__class__.__name__, self.value)
 
@@ -71,3 +46,30 @@ class NumDelta(ComparableValue, GenericDeltaMixin):
         else:
             # Delta / number
             return self.__class__(self.value / other)
+
+
+class NumTime(ComparableValue, GenericTimeMixin):
+
+    __slots__ = ()
+
+    DeltaClass = NumDelta
+
+    def __repr__(self):
+        return "{0}<{1!r}>".format(self.__class__.__name__, self.value)
+
+    def __add__(self, other):
+        if isinstance(other, self.DeltaClass):
+            # Time + Delta
+            return self.__class__(self.value + other.value)
+        else:
+            return NotImplemented
+
+    def __sub__(self, other):
+        if isinstance(other, self.DeltaClass):
+            # Time - Delta
+            return self.__class__(self.value - other.value)
+        elif isinstance(other, self.__class__):
+            # Time - Time
+            return self.DeltaClass(self.value - other.value)
+        else:
+            return NotImplemented
@@ -21,14 +21,15 @@ from timelinelib.calendar.gregorian.time import GregorianDelta
 
 SECONDS_IN_DAY = 24 * 60 * 60
 
+class PharaonicDelta(GregorianDelta):
+
+    __slots__ = ()
+
+
 class PharaonicTime(GregorianTime):
-    
-    MIN_JULIAN_DAY = -47
-    
-    @property
-    def DeltaClass(self):
-        return PharaonicDelta
 
+    __slots__ = ()
 
-class PharaonicDelta(GregorianDelta):
-    pass
+    MIN_JULIAN_DAY = -47
+
+    DeltaClass = PharaonicDelta
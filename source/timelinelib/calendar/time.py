@@ -18,6 +18,8 @@
 
 class ComparableValue(object):
 
+    __slots__ = ("_value",)
+
     def __init__(self, value):
         self._value = value
 
@@ -27,43 +29,48 @@ class ComparableValue(object):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
-            return self.value == other.value
+            return self._value == other._value
         else:
             return NotImplemented
 
     def __ne__(self, other):
         if isinstance(other, self.__class__):
-            return self.value != other.value
+            return self._value != other._value
         else:
             return NotImplemented
 
     def __lt__(self, other):
         if isinstance(other, self.__class__):
-            return self.value < other.value
+            return self._value < other._value
         else:
             return NotImplemented
 
     def __le__(self, other):
         if isinstance(other, self.__class__):
-            return self.value <= other.value
+            return self._value <= other._value
         else:
             return NotImplemented
 
     def __gt__(self, other):
         if isinstance(other, self.__class__):
-            return self.value > other.value
+            return self._value > other._value
         else:
             return NotImplemented
 
     def __ge__(self, other):
         if isinstance(other, self.__class__):
-            return self.value >= other.value
+            return self._value >= other._value
         else:
             return NotImplemented
 
+    def __hash__(self):
+        return hash(self._value)
+
 
 class GenericTimeMixin(object):
 
+    __slots__ = ()
+
     def __radd__(self, other):
         return self + other
     
@@ -73,6 +80,8 @@ class GenericTimeMixin(object):
 
 class GenericDeltaMixin(object):
 
+    __slots__ = ()
+
     def __rmul__(self, other):
         return self * other
 
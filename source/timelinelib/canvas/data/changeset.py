@@ -0,0 +1,99 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+TABLES = ("categories", "containers", "events", "milestones", "eras")
+
+
+class Changeset(object):
+    """
+    The ids that were added, updated, and removed in each table when going
+    from one ImmutableDB to another.
+
+    Since ImmutableDB shares all records that are not changed, the difference
+    is found by comparing record identities. Tables that are shared as a
+    whole are not looked at at all.
+    """
+
+    def __init__(self):
+        self._added = {}
+        self._updated = {}
+        self._removed = {}
+        for table in TABLES:
+            self._added[table] = set()
+            self._updated[table] = set()
+            self._removed[table] = set()
+
+    @classmethod
+    def between(cls, old_immutable_db, new_immutable_db):
+        changeset = cls()
+        if old_immutable_db is new_immutable_db:
+            return changeset
+        for table in TABLES:
+            old_records = getattr(old_immutable_db, table)
+            new_records = getattr(new_immutable_db, table)
+            if old_records is not new_records:
+                changeset._diff_table(table, old_records, new_records)
+        return changeset
+
+    def _diff_table(self, table, old_records, new_records):
+        for id_, record in old_records:
+            if id_ not in new_records:
+                self._removed[table].add(id_)
+        for id_, record in new_records:
+            old_record = old_records.get(id_)
+            if old_record is None:
+                self._added[table].add(id_)
+            elif old_record is not record:
+                self._updated[table].add(id_)
+
+    def added(self, table):
+        return self._added[table]
+
+    def updated(self, table):
+        return self._updated[table]
+
+    def removed(self, table):
+        return self._removed[table]
+
+    def changed_ids(self, table):
+        return self._added[table] | self._updated[table] | self._removed[table]
+
+    def has_changes_in(self, table):
+        return bool(
+            self._added[table] or
+            self._updated[table] or
+            self._removed[table]
+        )
+
+    def is_empty(self):
+        return not any(self.has_changes_in(table) for table in TABLES)
+
+    def __repr__(self):
+        return "{0}({1})".format(
+            self.__class__.__name__,
+            ", ".join(
+                "{0}=(+{1!r}, ~{2!r}, -{3!r})".format(
+                    table,
+                    sorted(self._added[table]),
+                    sorted(self._updated[table]),
+                    sorted(self._removed[table])
+                )
+                for table in TABLES
+                if self.has_changes_in(table)
+            )
+        )
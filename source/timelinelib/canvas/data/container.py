@@ -30,6 +30,8 @@ class Container(Event):
         Event.__init__(self, db=db, id_=id_, immutable_value=immutable_value)
         self._subevents = []
         self._is_in_update = False
+        self._cached_time_period = None
+        self._cached_sort_order = None
         import timelinelib.db.strategies
         if EXTENDED_CONTAINER_STRATEGY.enabled():
             self.strategy = timelinelib.db.strategies.ExtendedContainerStrategy(self)
@@ -43,6 +45,16 @@ class Container(Event):
     @subevents.setter
     def subevents(self, value):
         self._subevents = value
+        self.clear_cached_values()
+
+    def clear_cached_values(self):
+        """
+        The time period and sort order of a container are calculated from
+        its subevents and cached. This must be called when a subevent has
+        changed in a way that might affect them.
+        """
+        self._cached_time_period = None
+        self._cached_sort_order = None
 
     def save(self):
         self._update_category_id()
@@ -58,11 +70,12 @@ class Container(Event):
     def get_time_period(self):
         if len(self.subevents) == 0:
             return self._immutable_value.time_period
-        else:
-            return TimePeriod(
-                min([event.get_start_time() for event in self.subevents]),
-                max([event.get_end_time() for event in self.subevents])
+        if self._cached_time_period is None:
+            self._cached_time_period = container_time_period(
+                self._immutable_value.time_period,
+                self.subevents
             )
+        return self._cached_time_period
 
     def set_time_period(self, value):
         self._immutable_value = self._immutable_value.update(time_period=value)
@@ -73,11 +86,9 @@ class Container(Event):
     def get_sort_order(self):
         if len(self.subevents) == 0:
             return 0
-        else:
-            return min(
-                self.subevents,
-                key=lambda event: event.sort_order
-            ).sort_order
+        if self._cached_sort_order is None:
+            self._cached_sort_order = (container_sort_order(self.subevents),)
+        return self._cached_sort_order[0]
 
     def set_sort_order(self, sort_order):
         # Don't save it
@@ -96,19 +107,33 @@ class Container(Event):
         return False
 
     def register_subevent(self, subevent):
-        self.strategy.register_subevent(subevent)
+        try:
+            self.strategy.register_subevent(subevent)
+        finally:
+            self.clear_cached_values()
 
     def unregister_subevent(self, subevent):
-        self.strategy.unregister_subevent(subevent)
+        try:
+            self.strategy.unregister_subevent(subevent)
+        finally:
+            self.clear_cached_values()
 
     def update_container(self, subevent):
         if self._is_in_update:
             return
         try:
             self._is_in_update = True
+            self.clear_cached_values()
             self.strategy.update(subevent)
         finally:
             self._is_in_update = False
+            self.clear_cached_values()
+
+    def subevent_sort_order_changed(self, subevent):
+        try:
+            self.strategy.sort_order_changed(subevent)
+        finally:
+            self.clear_cached_values()
 
     def update_properties(self, text, category=None):
         self.set_text(text)
@@ -118,6 +143,32 @@ class Container(Event):
         return self.strategy.allow_ends_today_on_subevents()
 
 
+def container_time_period(time_period, subevents):
+    """
+    Return the time period of a container: the period spanned by its
+    subevents, or time_period, the one stored on the container itself, if it
+    has none.
+
+    The subevents can be Subevent objects or immutable events.
+    """
+    if len(subevents) == 0:
+        return time_period
+    return TimePeriod(
+        min(subevent.time_period.start_time for subevent in subevents),
+        max(subevent.time_period.end_time for subevent in subevents)
+    )
+
+
+def container_sort_order(subevents):
+    """
+    Return the sort order of a container: the lowest sort order of its
+    subevents, or 0 if it has none.
+    """
+    if len(subevents) == 0:
+        return 0
+    return min(subevent.sort_order for subevent in subevents)
+
+
 create_noop_property(Container, "fuzzy", False)
 create_noop_property(Container, "locked", False)
 create_noop_property(Container, "ends_today", False)
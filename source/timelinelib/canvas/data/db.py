@@ -21,16 +21,26 @@ import contextlib
 
 from timelinelib.calendar.gregorian.timetype import GregorianTimeType
 from timelinelib.canvas.data.exceptions import TimelineIOError
+from timelinelib.canvas.data.changeset import Changeset
 from timelinelib.canvas.data.immutable import ImmutableDB
+from timelinelib.canvas.data.immutable import ImmutableDBBuilder
 from timelinelib.canvas.data import Category
 from timelinelib.canvas.data import Container
+from timelinelib.canvas.data.container import container_sort_order
+from timelinelib.canvas.data.container import container_time_period
 from timelinelib.canvas.data import Era
 from timelinelib.canvas.data import Eras
 from timelinelib.canvas.data import Event
 from timelinelib.canvas.data import Milestone
 from timelinelib.canvas.data import Subevent
 from timelinelib.canvas.data import TimePeriod
+from timelinelib.canvas.data.eventcolumns import EventColumns
+from timelinelib.canvas.data.searchindex import SearchIndex
+from timelinelib.canvas.data.searchindex import start_unindexed_search
 from timelinelib.canvas.data.transactions import Transactions
+from timelinelib.canvas.data.undohistory import approximate_size
+from timelinelib.canvas.data.undohistory import create_spill_store
+from timelinelib.features.experimental.experimentalfeatures import EXTENDED_CONTAINER_STRATEGY
 from timelinelib.general.observer import Observable
 
 
@@ -45,8 +55,12 @@ class MemoryDB(Observable):
     def __init__(self):
         Observable.__init__(self)
         self._id_counter = 0
-        self._transactions = Transactions(ImmutableDB())
-        self._transactions.listen_for_any(self._transaction_committed)
+        self._transactions = Transactions(
+            ImmutableDB(),
+            changes_fn=Changeset.between,
+            size_fn=approximate_size
+        )
+        self._transactions.listen_for_changes(self._transaction_committed)
         self.path = ""
         self.displayed_period = None
         self._hidden_category_ids = []
@@ -54,8 +68,12 @@ class MemoryDB(Observable):
         self.saved_now = self.time_type.now()
         self.readonly = False
         self._save_callback = None
+        self._refresh_callback = None
         self._should_lock = False
         self._current_query = None
+        self._all_periods_cache = (None, None, [])
+        self._search_index = SearchIndex()
+        self._event_columns = EventColumns()
 
     def new_category(self, **kwargs):
         return self._create_wrapper(Category, **kwargs)
@@ -94,15 +112,49 @@ class MemoryDB(Observable):
         self._id_counter += 1
         return self._id_counter
 
+    def reserve_ids(self, last_id):
+        """
+        Make next_id return ids greater than last_id, so that items can be
+        saved with ids that were given out before.
+        """
+        self._id_counter = max(self._id_counter, last_id)
+
     def transaction(self, name):
         return self._transactions.new(name)
 
+    def batch(self, name):
+        """
+        Like transaction, but meant for saving many items at once.
+
+        All changes are made to an ImmutableDBBuilder, and only one new
+        ImmutableDB is created when the batch is committed. References between
+        items are checked at that time. If they are broken, the batch is
+        rolled back and InvalidOperationError is raised.
+        """
+        return self._transactions.new_batch(name)
+
     def clear_transactions(self):
         self._transactions.clear()
 
     def transactions_status(self):
         return self._transactions.status
 
+    def transactions_memory_usage(self):
+        return self._transactions.memory_usage
+
+    def configure_undo_history(self, size, max_bytes=None, spill_size=0):
+        """
+        Keep at most size undo steps, and at most max_bytes of them, in
+        memory. Up to spill_size older steps are kept in a temporary file.
+
+        The undo history is cleared.
+        """
+        if spill_size > 0:
+            spill_store = create_spill_store(spill_size)
+        else:
+            spill_store = None
+        self._transactions.configure_history(size, max_bytes, spill_store)
+
     def display_in_canvas(self, canvas):
         canvas.SetTimeline(self)
 
@@ -118,6 +170,20 @@ class MemoryDB(Observable):
     def register_save_callback(self, callback):
         self._save_callback = callback
 
+    def register_refresh_callback(self, callback):
+        self._refresh_callback = callback
+
+    def can_refresh(self):
+        return self._refresh_callback is not None
+
+    def refresh(self, progress_fn=None):
+        """
+        Read the items again from where they came from, like the files of a
+        directory timeline.
+        """
+        if self._refresh_callback is not None:
+            return self._refresh_callback(progress_fn)
+
     def get_time_type(self):
         return self.time_type
 
@@ -133,28 +199,107 @@ class MemoryDB(Observable):
         self.readonly = True
         self._notify(STATE_CHANGE_ANY)
 
-    def search(self, search_string):
-        return _generic_event_search(self.get_all_events(), search_string)
+    def search(self, search_string, time_period=None):
+        return self.find_event_with_ids(
+            self.search_ids(search_string, time_period)
+        )
+
+    def search_ids(self, search_string, time_period=None):
+        return self.start_search(search_string, time_period).run()
+
+    def start_search(self, search_string, time_period=None):
+        """
+        Return a search that can be run a few candidates at a time with
+        step(count) until done(). get_result() gives the same ids as
+        search_ids.
+        """
+        if self._is_in_batch():
+            return start_unindexed_search(
+                self._transactions.value,
+                search_string,
+                time_period
+            )
+        self._search_index.update(self._get_immutable_db())
+        return self._search_index.start_search(search_string, time_period)
 
     def get_events(self, time_period):
-        return self._get_events(lambda immutable_event:
-            immutable_event.time_period.inside_period(time_period)
-        )
+        if self._is_in_batch():
+            event_ids = milestone_ids = None
+        else:
+            event_columns = self._get_event_columns()
+            event_ids = event_columns.ids_inside_period("events", time_period)
+            milestone_ids = event_columns.ids_inside_period("milestones", time_period)
+        if event_ids is None or milestone_ids is None:
+            return self._get_events(lambda immutable_event:
+                immutable_event.time_period.inside_period(time_period)
+            )
+        with self._query() as query:
+            return (
+                [query.get_milestone(id_) for id_ in milestone_ids] +
+                sort_events(self.get_containers() + [
+                    query.get_event(id_) for id_ in event_ids
+                ])
+            )
+
+    def get_event_x_positions(self, time_period, width):
+        """
+        Return a dictionary that maps the id of every event and milestone
+        inside time_period to the x positions of its start and end time on a
+        canvas of the given width showing time_period, or None if they can
+        not be calculated in one go.
+        """
+        if self._is_in_batch():
+            return None
+        return self._get_event_columns().calc_x_positions(time_period, width)
 
     def get_all_events(self):
         return self._get_events(lambda immutable_event: True)
 
+    def get_all_immutable_events(self):
+        """
+        Return the immutable values of all events in the same order as
+        get_all_events.
+
+        No Event objects are created, so this is much faster when every event
+        is only read once, like when exporting. The values are adjusted to
+        what the Event objects would return: a container gets the time period
+        of its subevents, and subevents are never locked unless the extended
+        container strategy is enabled.
+        """
+        value = self._transactions.value
+        subevents_by_container_id = collections.defaultdict(list)
+        unlock_subevents = not EXTENDED_CONTAINER_STRATEGY.enabled()
+        items = []
+        for id_, immutable_event in value.events:
+            if immutable_event.container_id is not None:
+                if unlock_subevents and immutable_event.locked:
+                    immutable_event = immutable_event.update(locked=False)
+                subevents_by_container_id[immutable_event.container_id].append(
+                    immutable_event
+                )
+            items.append((immutable_event.sort_order, immutable_event))
+        containers = []
+        for id_, immutable_container in value.containers:
+            subevents = subevents_by_container_id[id_]
+            if subevents:
+                immutable_container = immutable_container.update(
+                    time_period=container_time_period(
+                        immutable_container.time_period,
+                        subevents
+                    )
+                )
+            containers.append(
+                (container_sort_order(subevents), immutable_container)
+            )
+        items = containers + items
+        items.sort(key=lambda (sort_order, immutable_event): sort_order)
+        return (
+            [immutable_milestone for id_, immutable_milestone in value.milestones] +
+            [immutable_event for sort_order, immutable_event in items]
+        )
+
     def get_max_sort_order(self):
-        max = -1
-        for id_, immutable_value in self._transactions.value.milestones:
-            sort_order = immutable_value["sort_order"]
-            if sort_order > max:
-                max = sort_order
-        for id_, immutable_value in self._transactions.value.events:
-            sort_order = immutable_value["sort_order"]
-            if sort_order > max:
-                max = sort_order
-        return max
+        return self._transactions.value.get_max_sort_order()
 
     def _get_events(self, criteria_fn):
         with self._query() as query:
@@ -228,7 +373,25 @@ class MemoryDB(Observable):
         return self._get_eras().get_all()
 
     def get_all_periods(self):
-        return self._get_eras().get_all_periods()
+        """
+        The result only depends on the eras and, if some era ends today, on
+        the current time. It is therefore cached until one of those changes.
+        """
+        if self._is_in_batch():
+            return self._get_eras().get_all_periods()
+        immutable_eras = self._get_immutable_db().eras
+        now = self._get_now_if_some_era_ends_today(immutable_eras)
+        cached_eras, cached_now, periods = self._all_periods_cache
+        if cached_eras is not immutable_eras or cached_now != now:
+            periods = self._get_eras().get_all_periods()
+            self._all_periods_cache = (immutable_eras, now, periods)
+        return list(periods)
+
+    def _get_now_if_some_era_ends_today(self, immutable_eras):
+        for id_, immutable_era in immutable_eras:
+            if immutable_era.ends_today:
+                return self.time_type.now()
+        return None
 
     def _get_eras(self):
         with self._query() as query:
@@ -421,9 +584,27 @@ class MemoryDB(Observable):
             if query.milestone_exists(event_id):
                 return query.get_milestone(event_id)
 
-    def _transaction_committed(self):
+    def _get_event_columns(self):
+        self._event_columns.update(self._get_immutable_db())
+        return self._event_columns
+
+    def _get_immutable_db(self):
+        """
+        A batch is frozen to get its ImmutableDB, after which its next change
+        copies the changed table again. Reads during a batch should therefore
+        use self._transactions.value directly where they can.
+        """
+        value = self._transactions.value
+        if isinstance(value, ImmutableDBBuilder):
+            return value.freeze()
+        return value
+
+    def _is_in_batch(self):
+        return isinstance(self._transactions.value, ImmutableDBBuilder)
+
+    def _transaction_committed(self, changeset):
         self._save()
-        self._notify(STATE_CHANGE_ANY)
+        self._notify(STATE_CHANGE_ANY, changeset)
 
     def _save(self):
         if self._save_callback is not None:
@@ -461,7 +642,7 @@ class MemoryDB(Observable):
     def import_db(self, db):
         if self.get_time_type() != db.get_time_type():
             raise Exception("Import failed: time type does not match")
-        with self.transaction("Import events"):
+        with self.batch("Import events"):
             for event in db.get_all_events():
                 self._import_item(event)
 
@@ -497,7 +678,7 @@ class MemoryDB(Observable):
         return False
 
     def compress(self):
-        with self.transaction("Compress events"):
+        with self.batch("Compress events"):
             self._set_events_order_from_rows(self._place_events_on_rows())
 
     def _set_events_order_from_rows(self, rows):
@@ -680,19 +861,3 @@ class EventSorter(object):
 
 def sort_events(events):
     return sorted(events, key=lambda event: event.sort_order)
-
-
-def _generic_event_search(events, search_string):
-    def match(event):
-        target = search_string.lower()
-        description = event.get_data("description")
-        if description is None:
-            description = ""
-        else:
-            description = description.lower()
-        return target in event.get_text().lower() or target in description
-    def mean_time(event):
-        return event.mean_time()
-    matches = [event for event in events if match(event)]
-    matches.sort(key=mean_time)
-    return matches
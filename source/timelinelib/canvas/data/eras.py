@@ -38,115 +38,70 @@ class Eras(object):
         return sorted(self._eras)
 
     def get_all_periods(self):
-
-        def get_key(e):
-            return e.get_time_period().start_time
-
-        def merge_colors(c1, c2):
-            return ((c1[0] + c2[0]) / 2, (c1[1] + c2[1]) / 2, (c1[2] + c2[2]) / 2)
-
-        def create_overlapping_era(e0, e1, start, end):
-            era = e1.duplicate()
-            era.set_time_period(TimePeriod(start, end))
-            era.set_color(merge_colors(e0.get_color(), e1.get_color()))
-            era.set_name("%s + %s" % (e0.get_name(), e1.get_name()))
-            return era
-
-        def get_start_and_end_times(e0, e1):
-            e0start = e0.get_time_period().start_time
-            e0end = e0.get_time_period().end_time
-            e1start = e1.get_time_period().start_time
-            e1end = e1.get_time_period().end_time
-            return e0start, e0end, e1start, e1end
-
-        def return_era_for_overlapping_type_1(e0, e1):
-            e0start, e0end, e1start, e1end = get_start_and_end_times(e0, e1)
-            era = create_overlapping_era(e0, e1, e1start, e0end)
-            e0.set_time_period(TimePeriod(e0start, e1start))
-            e1.set_time_period(TimePeriod(e0end, e1end))
-            return era
-
-        def return_era_for_overlapping_type_2(e0, e1):
-            e0start, e0end, _, e1end = get_start_and_end_times(e0, e1)
-            era = create_overlapping_era(e0, e1, e0start, e0end)
-            self.all_eras.remove(e0)
-            e1.set_time_period(TimePeriod(e0end, e1end))
-            return era
-
-        def return_era_for_overlapping_type_3(e0, e1):
-            return return_era_for_overlapping_type_2(e1, e0)
-
-        def return_era_for_overlapping_type_4(e0, e1):
-            _, _, e1start, e1end = get_start_and_end_times(e0, e1)
-            era = create_overlapping_era(e0, e1, e1start, e1end)
-            self.all_eras.remove(e0)
-            self.all_eras.remove(e1)
-            return era
-
-        def return_era_for_overlapping_type_5(e0, e1):
-            e0start, _, e1start, e1end = get_start_and_end_times(e0, e1)
-            era = create_overlapping_era(e0, e1, e1start, e1end)
-            e0.set_time_period(TimePeriod(e0start, e1start))
-            self.all_eras.remove(e1)
-            return era
-
-        def return_era_for_overlapping_type_6(e0, e1):
-            e0start, e0end, e1start, e1end = get_start_and_end_times(e0, e1)
-            era = create_overlapping_era(e0, e1, e1start, e1end)
-            e0.set_time_period(TimePeriod(e0start, e1start))
-            e1.set_time_period(TimePeriod(e1end, e0end))
-            e1.set_name(e0.get_name())
-            e1.set_color(e0.get_color())
-            return era
-
-        def clone_all_eras():
-            return [e.duplicate() for e in self.get_all()]
-
-        overlap_func = (None,
-                        return_era_for_overlapping_type_1,
-                        return_era_for_overlapping_type_2,
-                        return_era_for_overlapping_type_3,
-                        return_era_for_overlapping_type_4,
-                        return_era_for_overlapping_type_5,
-                        return_era_for_overlapping_type_6)
-
-        def create_overlapping_era_and_remove_hidden_eras():
-            """
-            self.all_eras is always sorted by Era start time.
-            This method finds the first pair of Era's that overlaps.
-            If such a pair is found, a overlapping Era is created and added
-            to the the self.all_eras list. If any or both of the original
-            Era's are hidden by the overlapping Era, they are removed from
-            the self.all_eras list.
-            When one overlapping pair has been found and processed the
-            function returns False, after updating the self.all_eras list
-            If no overlapping pairs of Era's are found the function retuns
-            True.
-            """
-            e0 = self.all_eras[0]
-            for e1 in self.all_eras[1:]:
-                strategy = e0.overlapping(e1)
-                if strategy > 0:
-                    self.all_eras.append(overlap_func[strategy](e0, e1))
-                    self.all_eras = sorted(self.all_eras, key=get_key)
-                    return False
-                else:
-                    e0 = e1
-            return True
-
-        def adjust_all_eras_for_ends_today():
-            for era in self.all_eras:
-                if era.ends_today():
-                    era.set_time_period(TimePeriod(era.get_time_period().start_time, self.now_func()))
-
-        self.all_eras = clone_all_eras()
-        adjust_all_eras_for_ends_today()
-        if self.all_eras == []:
-            return []
-        while True:
-            if len(self.all_eras) > 0:
-                done = create_overlapping_era_and_remove_hidden_eras()
+        """
+        Return a list of eras where no two eras overlap.
+
+        The boundaries of all eras are swept once in time order. Between two
+        consecutive boundaries, the set of active eras is constant. If only
+        one era is active it is returned clipped to that segment. If several
+        eras are active, a new era is created for the segment with a blended
+        color and a name made up of all the active era names.
+        """
+        eras = self._clone_all_eras_adjusted_for_ends_today()
+        segments = []
+        boundaries = []
+        for index, era in enumerate(eras):
+            start = era.get_time_period().start_time
+            end = era.get_time_period().end_time
+            if start == end:
+                segments.append((start, index, era))
             else:
-                done = True
-            if done:
-                return self.all_eras
+                boundaries.append((start, True, index))
+                boundaries.append((end, False, index))
+        boundaries.sort(key=lambda (time, is_start, index): time)
+        active = []
+        segment_start = None
+        i = 0
+        while i < len(boundaries):
+            time = boundaries[i][0]
+            if active and segment_start < time:
+                segments.append((
+                    segment_start,
+                    active[0],
+                    self._create_segment_era(eras, active, segment_start, time)
+                ))
+            while i < len(boundaries) and boundaries[i][0] == time:
+                _, is_start, index = boundaries[i]
+                if is_start:
+                    active.append(index)
+                else:
+                    active.remove(index)
+                i += 1
+            active.sort()
+            segment_start = time
+        segments.sort(key=lambda (start, index, era): (start, index))
+        return [era for (_, _, era) in segments]
+
+    def _clone_all_eras_adjusted_for_ends_today(self):
+        eras = [e.duplicate() for e in self.get_all()]
+        for era in eras:
+            if era.ends_today():
+                era.set_time_period(TimePeriod(era.get_time_period().start_time, self.now_func()))
+        return eras
+
+    def _create_segment_era(self, eras, active, start, end):
+        if len(active) == 1:
+            era = eras[active[0]].duplicate()
+        else:
+            era = eras[active[-1]].duplicate()
+            color = eras[active[0]].get_color()
+            for index in active[1:]:
+                color = merge_colors(color, eras[index].get_color())
+            era.set_color(color)
+            era.set_name(" + ".join(eras[index].get_name() for index in active))
+        era.set_time_period(TimePeriod(start, end))
+        return era
+
+
+def merge_colors(c1, c2):
+    return ((c1[0] + c2[0]) / 2, (c1[1] + c2[1]) / 2, (c1[2] + c2[2]) / 2)
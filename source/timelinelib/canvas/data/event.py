@@ -20,6 +20,7 @@ from timelinelib.canvas.data.base import ItemBase
 from timelinelib.canvas.data.immutable import ImmutableEvent
 from timelinelib.canvas.data.item import TimelineItem
 from timelinelib.canvas.drawing.drawers import get_progress_color
+from timelinelib.general.lazyvalue import resolve
 
 
 DEFAULT_COLOR = (200, 200, 200)
@@ -197,7 +198,7 @@ class Event(ItemBase, TimelineItem):
     ends_today = property(get_ends_today, set_ends_today)
 
     def get_description(self):
-        return self._immutable_value.description
+        return resolve(self._immutable_value.description)
 
     def set_description(self, description):
         self._immutable_value = self._immutable_value.update(description=description)
@@ -206,7 +207,7 @@ class Event(ItemBase, TimelineItem):
     description = property(get_description, set_description)
 
     def get_icon(self):
-        return self._immutable_value.icon
+        return resolve(self._immutable_value.icon)
 
     def set_icon(self, icon):
         self._immutable_value = self._immutable_value.update(icon=icon)
@@ -215,7 +216,7 @@ class Event(ItemBase, TimelineItem):
     icon = property(get_icon, set_icon)
 
     def get_hyperlink(self):
-        return self._immutable_value.hyperlink
+        return resolve(self._immutable_value.hyperlink)
 
     def set_hyperlink(self, hyperlink):
         self._immutable_value = self._immutable_value.update(hyperlink=hyperlink)
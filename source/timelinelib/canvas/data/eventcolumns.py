@@ -0,0 +1,233 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from timelinelib.calendar.gregorian.time import GregorianTime
+from timelinelib.calendar.num.time import NumTime
+from timelinelib.canvas.data.changeset import Changeset
+from timelinelib.canvas.data.immutable import ImmutableDB
+
+
+COLUMN_TABLES = ("events", "milestones")
+MAX_NUMPY_VALUE = 2 ** 53
+
+
+class EventColumns(object):
+    """
+    A columnar copy of the ids, start times, and end times of all events and
+    milestones in an ImmutableDB.
+
+    Times are stored as plain numbers: seconds for gregorian based times and
+    the value for numeric times. That way the items inside a period and their
+    x positions can be calculated for all items at once instead of with time
+    objects one item at a time. NumPy arrays are used if NumPy is installed,
+    otherwise lists.
+
+    Like :class:`SearchIndex`, the columns are brought up to date with
+    :meth:`update` from the changeset between the previous ImmutableDB and the
+    new one. If only existing items were updated, the columns are changed in
+    place, otherwise they are rebuilt the next time they are needed.
+
+    Queries return None if some time can not be stored as a number. Callers
+    then use the time objects instead.
+    """
+
+    def __init__(self, use_numpy=True):
+        self._use_numpy = use_numpy and numpy is not None
+        self._immutable_db = ImmutableDB()
+        self._rows = {}
+        self._unsupported_ids = set()
+        self._columns = None
+        self._row_indexes = None
+
+    def update(self, immutable_db):
+        if immutable_db is self._immutable_db:
+            return
+        changeset = Changeset.between(self._immutable_db, immutable_db)
+        only_updated = True
+        for table in COLUMN_TABLES:
+            if changeset.added(table) or changeset.removed(table):
+                only_updated = False
+            for id_ in changeset.removed(table):
+                del self._rows[id_]
+                self._unsupported_ids.discard(id_)
+            records = getattr(immutable_db, table)
+            for id_ in changeset.added(table) | changeset.updated(table):
+                self._set_row(table, id_, records.get(id_).time_period)
+        if only_updated and self._columns is not None:
+            for table in COLUMN_TABLES:
+                for id_ in changeset.updated(table):
+                    self._update_columns(id_)
+        else:
+            self._columns = None
+        self._immutable_db = immutable_db
+
+    def ids_inside_period(self, table, time_period):
+        """
+        Return the ids, in ascending order, of all items in table whose time
+        period is inside time_period in the sense of
+        :meth:`TimePeriod.inside_period`.
+        """
+        columns = self._get_columns(time_period)
+        if columns is None:
+            return None
+        (ids, tables, starts, ends) = columns
+        start = _to_number(time_period.start_time)
+        end = _to_number(time_period.end_time)
+        table_index = COLUMN_TABLES.index(table)
+        if self._use_numpy:
+            mask = (tables == table_index) & (ends >= start) & (starts <= end)
+            return ids[mask].tolist()
+        return [
+            id_
+            for (id_, item_table, item_start, item_end)
+            in zip(ids, tables, starts, ends)
+            if item_table == table_index and item_end >= start and item_start <= end
+        ]
+
+    def calc_x_positions(self, time_period, width):
+        """
+        Return a dictionary that maps the id of every item inside time_period
+        to the x positions of its start and end time, as calculated by
+        :meth:`Metrics.calc_x` for a canvas of the given width showing
+        time_period.
+        """
+        columns = self._get_columns(time_period)
+        if columns is None:
+            return None
+        (ids, tables, starts, ends) = columns
+        start = _to_number(time_period.start_time)
+        end = _to_number(time_period.end_time)
+        delta = float(end - start)
+        if delta == 0:
+            return None
+        if self._use_numpy:
+            mask = (ends >= start) & (starts <= end)
+            start_xs = _round(width * ((starts[mask] - start) / delta))
+            end_xs = _round(width * ((ends[mask] - start) / delta))
+            return dict(zip(
+                ids[mask].tolist(),
+                zip(start_xs.tolist(), end_xs.tolist())
+            ))
+        return dict(
+            (
+                id_,
+                (
+                    int(round(width * ((item_start - start) / delta))),
+                    int(round(width * ((item_end - start) / delta)))
+                )
+            )
+            for (id_, item_start, item_end)
+            in zip(ids, starts, ends)
+            if item_end >= start and item_start <= end
+        )
+
+    def _set_row(self, table, id_, time_period):
+        start = _to_number(time_period.start_time)
+        end = _to_number(time_period.end_time)
+        if (start is None or
+                end is None or
+                (self._use_numpy and not _fits_numpy(start, end))):
+            self._unsupported_ids.add(id_)
+        else:
+            self._unsupported_ids.discard(id_)
+        self._rows[id_] = (COLUMN_TABLES.index(table), start, end)
+
+    def _update_columns(self, id_):
+        (_, _, starts, ends) = self._columns
+        (_, start, end) = self._rows[id_]
+        if id_ in self._unsupported_ids:
+            self._columns = None
+            return
+        if self._use_numpy and starts.dtype.kind == "i" and (
+                isinstance(start, float) or isinstance(end, float)):
+            self._columns = None
+            return
+        index = self._row_indexes[id_]
+        starts[index] = start
+        ends[index] = end
+
+    def _get_columns(self, time_period):
+        if self._unsupported_ids:
+            return None
+        start = _to_number(time_period.start_time)
+        end = _to_number(time_period.end_time)
+        if start is None or end is None:
+            return None
+        if self._use_numpy and not _fits_numpy(start, end):
+            return None
+        if self._columns is None:
+            self._build_columns()
+        return self._columns
+
+    def _build_columns(self):
+        ids = sorted(self._rows)
+        if ids:
+            (tables, starts, ends) = zip(*[self._rows[id_] for id_ in ids])
+        else:
+            (tables, starts, ends) = ((), (), ())
+        if self._use_numpy:
+            self._columns = (
+                numpy.array(ids, dtype=numpy.int64),
+                numpy.array(tables, dtype=numpy.int8),
+                _to_array(starts),
+                _to_array(ends),
+            )
+        else:
+            self._columns = (ids, list(tables), list(starts), list(ends))
+        self._row_indexes = dict(
+            (id_, index)
+            for (index, id_)
+            in enumerate(ids)
+        )
+
+
+def _to_number(time):
+    if isinstance(time, GregorianTime):
+        return time.total_seconds
+    if isinstance(time, NumTime) and isinstance(time.value, (int, long, float)):
+        return time.value
+    return None
+
+
+def _fits_numpy(*numbers):
+    return all(
+        isinstance(number, float) or -MAX_NUMPY_VALUE <= number <= MAX_NUMPY_VALUE
+        for number
+        in numbers
+    )
+
+
+def _to_array(numbers):
+    if any(isinstance(number, float) for number in numbers):
+        return numpy.array(numbers, dtype=numpy.float64)
+    return numpy.array(numbers, dtype=numpy.int64)
+
+
+def _round(values):
+    """
+    Round half away from zero like the builtin round does and convert to
+    integers. Positions too far outside the canvas to be drawn anyway are
+    clipped so that they fit.
+    """
+    rounded = numpy.copysign(numpy.floor(numpy.abs(values) + 0.5), values)
+    return numpy.clip(rounded, -MAX_NUMPY_VALUE, MAX_NUMPY_VALUE).astype(numpy.int64)
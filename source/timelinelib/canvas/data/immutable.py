@@ -19,6 +19,7 @@
 from timelinelib.canvas.drawing.drawers import get_progress_color
 from timelinelib.general.immutable import Field
 from timelinelib.general.immutable import ImmutableDict
+from timelinelib.general.immutable import ImmutableDictBuilder
 from timelinelib.general.immutable import ImmutableRecord
 
 
@@ -84,6 +85,12 @@ class ImmutableDB(ImmutableRecord):
     milestones = Field(ImmutableDict())
     eras = Field(ImmutableDict())
 
+    def builder(self):
+        return ImmutableDBBuilder(self)
+
+    def get_max_sort_order(self):
+        return _max_sort_order(self.events, self.milestones)
+
     def save_event(self, event, id_):
         self._ensure_non_none_category_exists(event.category_id)
         self._ensure_non_none_container_exists(event.container_id)
@@ -200,6 +207,15 @@ class ImmutableDB(ImmutableRecord):
                     "Category name {0!r} is not unique".format(save_name)
                 )
 
+    def _ensure_category_names_are_unique(self):
+        names = set()
+        for id_, category in self.categories:
+            if category.name in names:
+                raise InvalidOperationError(
+                    "Category name {0!r} is not unique".format(category.name)
+                )
+            names.add(category.name)
+
     def _ensure_non_none_category_exists(self, id_):
         if id_ is not None:
             self._ensure_category_exists(id_)
@@ -230,5 +246,175 @@ class ImmutableDB(ImmutableRecord):
             )
 
 
+class ImmutableDBBuilder(object):
+
+    """
+    Makes many changes to an ImmutableDB without creating a new ImmutableDB
+    for every change.
+
+    It has the same methods for saving and deleting as ImmutableDB. Deleted
+    items must exist, but the checks that need other items (that categories
+    and containers that are referred to exist, that category names are
+    unique, and that category parents are not circular) are made once in
+    build, and only for the items that were saved.
+    """
+
+    def __init__(self, immutable_db):
+        self._immutable_db = immutable_db
+        self.categories = ImmutableDictBuilder(immutable_db.categories)
+        self.containers = ImmutableDictBuilder(immutable_db.containers)
+        self.events = ImmutableDictBuilder(immutable_db.events)
+        self.milestones = ImmutableDictBuilder(immutable_db.milestones)
+        self.eras = ImmutableDictBuilder(immutable_db.eras)
+        self._saved_category_ids = set()
+        self._saved_container_ids = set()
+        self._saved_event_ids = set()
+        self._saved_milestone_ids = set()
+        self._max_sort_order = None
+
+    def freeze(self):
+        """Return the content as an ImmutableDB without checking it."""
+        return self._immutable_db.update(
+            categories=self.categories.freeze(),
+            containers=self.containers.freeze(),
+            events=self.events.freeze(),
+            milestones=self.milestones.freeze(),
+            eras=self.eras.freeze()
+        )
+
+    def build(self):
+        immutable_db = self.freeze()
+        self._validate(immutable_db)
+        return immutable_db
+
+    def get_max_sort_order(self):
+        if self._max_sort_order is None:
+            self._max_sort_order = _max_sort_order(self.events, self.milestones)
+        return self._max_sort_order
+
+    def save_event(self, event, id_):
+        self.events.set(id_, event)
+        self._saved_event_ids.add(id_)
+        self._include_sort_order(event)
+        return self
+
+    def delete_event(self, id_):
+        self._ensure_exists(self.events, "Event", id_)
+        self.events.remove(id_)
+        self._max_sort_order = None
+        return self
+
+    def save_milestone(self, milestone, id_):
+        self.milestones.set(id_, milestone)
+        self._saved_milestone_ids.add(id_)
+        self._include_sort_order(milestone)
+        return self
+
+    def delete_milestone(self, id_):
+        self._ensure_exists(self.milestones, "Milestone", id_)
+        self.milestones.remove(id_)
+        self._max_sort_order = None
+        return self
+
+    def save_era(self, era, id_):
+        self.eras.set(id_, era)
+        return self
+
+    def delete_era(self, id_):
+        self._ensure_exists(self.eras, "Era", id_)
+        self.eras.remove(id_)
+        return self
+
+    def save_category(self, category, id_):
+        self.categories.set(id_, category)
+        self._saved_category_ids.add(id_)
+        return self
+
+    def delete_category(self, delete_id):
+        self._ensure_exists(self.categories, "Category", delete_id)
+        new_parent_id = self.categories.get(delete_id).parent_id
+
+        def update_parent_id(category):
+            if category.parent_id == delete_id:
+                return category.update(parent_id=new_parent_id)
+            else:
+                return category
+
+        def update_category_id(thing):
+            if thing.category_id == delete_id:
+                return thing.update(category_id=new_parent_id)
+            else:
+                return thing
+        self.categories.remove(delete_id)
+        self.categories.map(update_parent_id)
+        self.events.map(update_category_id)
+        self.milestones.map(update_category_id)
+        self.containers.map(update_category_id)
+        return self
+
+    def save_container(self, container, id_):
+        self.containers.set(id_, container)
+        self._saved_container_ids.add(id_)
+        return self
+
+    def delete_container(self, delete_id):
+        self._ensure_exists(self.containers, "Container", delete_id)
+
+        def update_container_id(event):
+            if event.container_id == delete_id:
+                return event.update(container_id=None)
+            else:
+                return event
+        self.containers.remove(delete_id)
+        self.events.map(update_container_id)
+        return self
+
+    def _include_sort_order(self, item):
+        if (self._max_sort_order is not None and
+                item.sort_order > self._max_sort_order):
+            self._max_sort_order = item.sort_order
+
+    def _ensure_exists(self, items, name, id_):
+        if id_ not in items:
+            raise InvalidOperationError(
+                "{0} with id {1!r} does not exist".format(name, id_)
+            )
+
+    def _validate(self, immutable_db):
+        for id_ in self._saved_event_ids:
+            event = immutable_db.events.get(id_)
+            if event is not None:
+                immutable_db._ensure_non_none_category_exists(event.category_id)
+                immutable_db._ensure_non_none_container_exists(event.container_id)
+        for id_ in self._saved_milestone_ids:
+            milestone = immutable_db.milestones.get(id_)
+            if milestone is not None:
+                immutable_db._ensure_non_none_category_exists(milestone.category_id)
+        for id_ in self._saved_container_ids:
+            container = immutable_db.containers.get(id_)
+            if container is not None:
+                immutable_db._ensure_non_none_category_exists(container.category_id)
+        saved_categories = [
+            (id_, immutable_db.categories.get(id_))
+            for id_
+            in self._saved_category_ids
+            if id_ in immutable_db.categories
+        ]
+        if saved_categories:
+            immutable_db._ensure_category_names_are_unique()
+        for id_, category in saved_categories:
+            immutable_db._ensure_non_none_category_exists(category.parent_id)
+            immutable_db._ensure_no_category_circular(id_, category.parent_id)
+
+
+def _max_sort_order(events, milestones):
+    max_sort_order = -1
+    for items in [milestones, events]:
+        for id_, item in items:
+            if item.sort_order > max_sort_order:
+                max_sort_order = item.sort_order
+    return max_sort_order
+
+
 class InvalidOperationError(Exception):
     pass
@@ -0,0 +1,301 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import collections
+
+from timelinelib.canvas.data.changeset import Changeset
+from timelinelib.canvas.data.container import container_time_period
+from timelinelib.canvas.data.immutable import ImmutableDB
+from timelinelib.general.lazyvalue import resolve
+
+
+SEARCHABLE_TABLES = ("events", "milestones", "containers")
+TRIGRAM_LENGTH = 3
+
+
+class SearchIndex(object):
+    """
+    A trigram index over the text and description of all searchable items in
+    an ImmutableDB.
+
+    The index is brought up to date with :meth:`update` from the changeset
+    between the previously indexed ImmutableDB and the new one, so only the
+    items that were changed by committed transactions are re-indexed.
+
+    A query is answered by intersecting the sets of ids for all trigrams in
+    the query. The few remaining candidates are then checked with a real
+    substring match.
+
+    A query shorter than a trigram is found inside the trigrams that contain
+    it, so its candidates are the union of their sets of ids, together with
+    the items whose text or description is too short to have any trigrams.
+    Finding those trigrams means looking at every distinct trigram, and a
+    one letter query can still have most items as candidates.
+
+    There is no index over time. The period given to a search is checked for
+    each item that matched the text, and the matches are ordered by mean
+    time, not ranked, since the search bar steps through them in time order.
+
+    Only the trigrams are kept. The text and description of a candidate are
+    read again from its record, so a lazy description is not kept in memory
+    longer than the cache of decoded values keeps it.
+
+    The ids of the subevents of each container are kept as well, since the
+    time period of a container is the one spanned by its subevents.
+    """
+
+    def __init__(self):
+        self._immutable_db = ImmutableDB()
+        self._trigrams = collections.defaultdict(set)
+        self._short_ids = set()
+        self._subevent_ids = collections.defaultdict(set)
+
+    def update(self, immutable_db):
+        if immutable_db is self._immutable_db:
+            return
+        changeset = Changeset.between(self._immutable_db, immutable_db)
+        for table in SEARCHABLE_TABLES:
+            old_records = getattr(self._immutable_db, table)
+            new_records = getattr(immutable_db, table)
+            for id_ in changeset.removed(table):
+                self._remove(id_, old_records.get(id_))
+            for id_ in changeset.updated(table):
+                self._replace(id_, old_records.get(id_), new_records.get(id_))
+            for id_ in changeset.added(table):
+                self._add(id_, new_records.get(id_))
+        self._update_subevent_ids(changeset, immutable_db)
+        self._immutable_db = immutable_db
+
+    def search(self, search_string, time_period=None):
+        """
+        Return ids of all items whose text or description contains
+        search_string (case insensitive), ordered by the mean time of the
+        items.
+
+        If time_period is given, only items overlapping it are returned.
+        """
+        return self.start_search(search_string, time_period).run()
+
+    def start_search(self, search_string, time_period=None):
+        """
+        Return a :class:`Search` for search_string that has not matched any
+        candidates yet.
+        """
+        target = search_string.lower()
+        # Copied since update changes the sets in place
+        subevent_ids = dict(
+            (id_, frozenset(ids))
+            for (id_, ids)
+            in self._subevent_ids.items()
+        )
+        return Search(
+            self._immutable_db,
+            subevent_ids,
+            self._get_candidates(target),
+            target,
+            time_period
+        )
+
+    def _update_subevent_ids(self, changeset, immutable_db):
+        old_events = self._immutable_db.events
+        new_events = immutable_db.events
+        for id_ in changeset.removed("events") | changeset.updated("events"):
+            container_id = old_events.get(id_).container_id
+            if container_id is not None:
+                self._subevent_ids[container_id].discard(id_)
+                if not self._subevent_ids[container_id]:
+                    del self._subevent_ids[container_id]
+        for id_ in changeset.added("events") | changeset.updated("events"):
+            container_id = new_events.get(id_).container_id
+            if container_id is not None:
+                self._subevent_ids[container_id].add(id_)
+
+    def _get_candidates(self, target):
+        if len(target) == 0:
+            return _all_ids(self._immutable_db)
+        if len(target) < TRIGRAM_LENGTH:
+            return self._get_short_candidates(target)
+        id_sets = []
+        for trigram in _trigrams(target):
+            if trigram not in self._trigrams:
+                return []
+            id_sets.append(self._trigrams[trigram])
+        id_sets.sort(key=len)
+        return id_sets[0].intersection(*id_sets[1:])
+
+    def _get_short_candidates(self, target):
+        candidates = set(self._short_ids)
+        for trigram, ids in self._trigrams.iteritems():
+            if target in trigram:
+                candidates.update(ids)
+        return candidates
+
+    def _add(self, id_, record):
+        text, description = _record_values(record)
+        if _is_short(text) or _is_short(description):
+            self._short_ids.add(id_)
+        for trigram in _trigrams(text) | _trigrams(description):
+            self._trigrams[trigram].add(id_)
+
+    def _remove(self, id_, record):
+        self._short_ids.discard(id_)
+        text, description = _record_values(record)
+        for trigram in _trigrams(text) | _trigrams(description):
+            ids = self._trigrams[trigram]
+            ids.discard(id_)
+            if not ids:
+                del self._trigrams[trigram]
+
+    def _replace(self, id_, old_record, new_record):
+        if (old_record.text == new_record.text and
+                old_record.description is new_record.description):
+            return
+        self._remove(id_, old_record)
+        self._add(id_, new_record)
+
+
+def start_unindexed_search(immutable_db, search_string, time_period=None):
+    """
+    Start a search like :meth:`SearchIndex.start_search`, but where every
+    item is a candidate.
+
+    immutable_db can be anything that is read like an ImmutableDB, like an
+    ImmutableDBBuilder, which can not be indexed without freezing it.
+    """
+    subevent_ids = collections.defaultdict(set)
+    for id_, immutable_event in immutable_db.events:
+        if immutable_event.container_id is not None:
+            subevent_ids[immutable_event.container_id].add(id_)
+    return Search(
+        immutable_db,
+        subevent_ids,
+        _all_ids(immutable_db),
+        search_string.lower(),
+        time_period
+    )
+
+
+class Search(object):
+    """
+    Matches the candidates of a search against the items a few at a time,
+    so that a gui can spread a search over several time slices.
+
+    The candidates and the ImmutableDB are fixed when the search starts, so
+    changes to the db made in between steps are not seen.
+    """
+
+    def __init__(self, immutable_db, subevent_ids, candidate_ids, target, time_period):
+        self._immutable_db = immutable_db
+        self._subevent_ids = subevent_ids
+        self._candidate_ids = list(candidate_ids)
+        self._target = target
+        self._time_period = time_period
+        self._position = 0
+        self._matches = []
+
+    def done(self):
+        return self._position >= len(self._candidate_ids)
+
+    def step(self, count):
+        """
+        Match the next count candidates.
+        """
+        end = self._position + count
+        for id_ in self._candidate_ids[self._position:end]:
+            self._match(id_)
+        self._position = end
+
+    def run(self):
+        """
+        Match all candidates that are left and return the result.
+        """
+        self.step(len(self._candidate_ids) - self._position)
+        return self.get_result()
+
+    def get_result(self):
+        """
+        Return the ids of the items matched so far, ordered by mean time.
+        """
+        return [id_ for (_, id_) in sorted(self._matches)]
+
+    def _match(self, id_):
+        record = _get_record(self._immutable_db, id_)
+        if (self._target not in _lower(record.text) and
+                self._target not in _lower(resolve(record.description))):
+            return
+        record_period = _get_time_period(
+            self._immutable_db,
+            self._subevent_ids,
+            id_,
+            record
+        )
+        if (self._time_period is not None and
+                not self._time_period.overlaps(record_period)):
+            return
+        self._matches.append((record_period.mean_time(), id_))
+
+
+def _get_record(immutable_db, id_):
+    for table in SEARCHABLE_TABLES:
+        records = getattr(immutable_db, table)
+        if id_ in records:
+            return records[id_]
+
+
+def _get_time_period(immutable_db, subevent_ids, id_, record):
+    if id_ not in immutable_db.containers:
+        return record.time_period
+    events = immutable_db.events
+    return container_time_period(
+        record.time_period,
+        [
+            events.get(subevent_id)
+            for subevent_id
+            in subevent_ids.get(id_, ())
+        ]
+    )
+
+
+def _all_ids(immutable_db):
+    return [
+        id_
+        for table in SEARCHABLE_TABLES
+        for id_, record in getattr(immutable_db, table)
+    ]
+
+
+def _record_values(record):
+    return (_lower(record.text), _lower(resolve(record.description)))
+
+
+def _is_short(value):
+    return 0 < len(value) < TRIGRAM_LENGTH
+
+
+def _lower(value):
+    if value is None:
+        return u""
+    return value.lower()
+
+
+def _trigrams(value):
+    return set(
+        value[index:index + TRIGRAM_LENGTH]
+        for index
+        in range(len(value) - TRIGRAM_LENGTH + 1)
+    )
@@ -67,3 +67,11 @@ class Subevent(Event):
         return self
 
     time_period = property(get_time_period, set_time_period)
+
+    def set_sort_order(self, sort_order):
+        Event.set_sort_order(self, sort_order)
+        if self.container is not None:
+            self.container.subevent_sort_order_changed(self)
+        return self
+
+    sort_order = property(Event.get_sort_order, set_sort_order)
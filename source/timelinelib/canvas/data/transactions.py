@@ -21,42 +21,99 @@ from timelinelib.general.observer import Observable
 
 class Transactions(Observable):
 
-    def __init__(self, initial_value, initial_name="", history_size=10):
+    def __init__(self, initial_value, initial_name="", history_size=10,
+                 changes_fn=None, size_fn=None):
+        """
+        If changes_fn is given, it is called with the old and the new value
+        whenever the value changes, and the result is passed to listeners
+        registered with listen_for_changes.
+
+        If size_fn is given, size_fn(previous_value, value) should return the
+        approximate number of bytes that value uses in addition to what it
+        shares with previous_value. It is only used if the history is limited
+        by bytes (see configure_history).
+        """
         Observable.__init__(self)
-        if history_size < 1:
-            raise ValueError("history_size is to small (must be at least 1)")
-        self._history_size = history_size
+        self._changes_fn = changes_fn
+        self._size_fn = size_fn
         self._history = [(initial_name, initial_value)]
+        self._sizes = [0]
         self._current_index = 0
         self._current_transaction = None
+        self._spill_store = None
+        self._spilled_value = (None, None)
+        self.configure_history(history_size)
+
+    def configure_history(self, history_size, history_bytes=None,
+                          spill_store=None):
+        """
+        At most history_size values are kept in memory. If history_bytes is
+        given, older values are also removed from memory until the
+        approximate size of the rest is within it.
+
+        Values that are removed from memory are forgotten, unless a
+        spill_store is given. They are then pushed to it and can still be
+        moved to.
+
+        The history is cleared.
+        """
+        if history_size < 1:
+            raise ValueError("history_size is to small (must be at least 1)")
+        self.ensure_not_in_transaction()
+        self._keep_only_current()
+        self._history_size = history_size
+        self._history_bytes = history_bytes
+        self._spill_store = spill_store
 
     @property
     def value(self):
         if self._current_transaction is not None:
             return self._current_transaction.value
         else:
-            return self._history[self._current_index][1]
+            return self._get_history_value(self._current_index)
 
     @property
     def status(self):
+        """
+        The history contains (name, value) pairs. The value is None for
+        entries that have been pushed to the spill store.
+        """
         return (
             self._current_index,
             self._current_transaction is not None,
+            [(name, None) for name in self._get_spilled_names()] +
             list(self._history)
         )
 
+    @property
+    def memory_usage(self):
+        """
+        Return the approximate number of bytes used by the history in memory
+        and in the spill store. The bytes in memory are only known if the
+        history is limited by bytes, and are otherwise None.
+        """
+        if self._history_bytes is None:
+            memory_bytes = None
+        else:
+            memory_bytes = sum(self._sizes)
+        if self._spill_store is None:
+            spilled_bytes = 0
+        else:
+            spilled_bytes = self._spill_store.size_in_bytes()
+        return (memory_bytes, spilled_bytes)
+
     def clear(self):
         self.ensure_not_in_transaction()
-        self._history = [self._history[self._current_index]]
-        self._current_index = 0
-        self._notify()
+        self._keep_only_current()
+        self._notify_changed(self.value)
 
     def move(self, index):
         self.ensure_not_in_transaction()
-        if index < 0 or index >= len(self._history):
+        if index < 0 or index >= self._get_history_length():
             raise ValueError("Index does not exist in history")
+        old_value = self.value
         self._current_index = index
-        self._notify()
+        self._notify_changed(old_value)
 
     def new(self, name):
         self._current_transaction = Transaction(
@@ -67,21 +124,151 @@ class Transactions(Observable):
         )
         return self._current_transaction
 
+    def new_batch(self, name):
+        """
+        Start a transaction where all changes, including the ones made in
+        nested transactions, are made to a builder.
+
+        The builder is created with value.builder() and turned back into a
+        value with build() when the batch is committed. If build() fails, or
+        if a nested transaction was rolled back, the whole batch is rolled
+        back.
+
+        Starting a batch inside a batch starts an ordinary transaction.
+        """
+        if self._find_batch(self._current_transaction) is not None:
+            return self.new(name)
+        self._current_transaction = BatchTransaction(
+            self,
+            name,
+            self.value.builder(),
+            self._current_transaction
+        )
+        return self._current_transaction
+
+    def _find_batch(self, transaction):
+        while transaction is not None:
+            if isinstance(transaction, BatchTransaction):
+                return transaction
+            transaction = transaction.parent
+        return None
+
     def commit(self, transaction):
         self.ensure_is_current(transaction)
         self._current_transaction = transaction.parent
         if self._current_transaction is None:
-            self._history = self._history[:self._current_index + 1]
+            old_value = self.value
+            self._discard_history_after_current()
             self._history.append((transaction.name, transaction.value))
-            self._history = self._history[-self._history_size:]
-            self._current_index = len(self._history) - 1
-            self._notify()
+            self._sizes.append(self._get_size(old_value, transaction.value))
+            self._current_index = self._get_history_length() - 1
+            self._apply_history_limits()
+            self._notify_changed(old_value)
         else:
             self._current_transaction.value = transaction.value
 
+    def _keep_only_current(self):
+        self._history = [self._get_history_entry(self._current_index)]
+        self._sizes = [0]
+        self._clear_spill_store()
+        self._current_index = 0
+
+    def _get_history_length(self):
+        return self._get_spilled_count() + len(self._history)
+
+    def _get_history_entry(self, index):
+        spilled_count = self._get_spilled_count()
+        if index >= spilled_count:
+            return self._history[index - spilled_count]
+        return (self._spill_store.names()[index], self._get_history_value(index))
+
+    def _get_history_value(self, index):
+        spilled_count = self._get_spilled_count()
+        if index >= spilled_count:
+            return self._history[index - spilled_count][1]
+        spilled_index, value = self._spilled_value
+        if spilled_index != index:
+            # Undoing step by step only applies one delta each time
+            value = self._spill_store.get_value(
+                index,
+                self._history[0][1],
+                self._spilled_value
+            )
+            self._spilled_value = (index, value)
+        return value
+
+    def _discard_history_after_current(self):
+        spilled_count = self._get_spilled_count()
+        if self._current_index < spilled_count:
+            self._history = [self._get_history_entry(self._current_index)]
+            self._sizes = [0]
+            self._spill_store.truncate(self._current_index)
+            self._spilled_value = (None, None)
+        else:
+            self._history = self._history[:self._current_index - spilled_count + 1]
+            self._sizes = self._sizes[:len(self._history)]
+
+    def _apply_history_limits(self):
+        while (self._exceeds_history_limits() and
+               self._get_spilled_count() < self._current_index):
+            self._remove_oldest_from_memory()
+
+    def _exceeds_history_limits(self):
+        if len(self._history) > self._history_size:
+            return True
+        return (
+            self._history_bytes is not None and
+            len(self._history) > 1 and
+            sum(self._sizes) > self._history_bytes
+        )
+
+    def _remove_oldest_from_memory(self):
+        (name, value) = self._history.pop(0)
+        self._sizes.pop(0)
+        self._sizes[0] = 0
+        if self._spill_store is None:
+            self._current_index -= 1
+        else:
+            self._current_index -= self._spill_store.push(
+                name,
+                value,
+                self._history[0][1]
+            )
+            self._spilled_value = (None, None)
+
+    def _get_size(self, old_value, new_value):
+        if self._size_fn is None or self._history_bytes is None:
+            return 0
+        return self._size_fn(old_value, new_value)
+
+    def _get_spilled_count(self):
+        if self._spill_store is None:
+            return 0
+        return len(self._spill_store)
+
+    def _get_spilled_names(self):
+        if self._spill_store is None:
+            return []
+        return self._spill_store.names()
+
+    def _clear_spill_store(self):
+        if self._spill_store is not None:
+            self._spill_store.clear()
+        self._spilled_value = (None, None)
+
+    def _notify_changed(self, old_value):
+        if self._changes_fn is None:
+            changes = None
+        else:
+            changes = self._changes_fn(old_value, self.value)
+        self._notify(changes=changes)
+
     def rollback(self, transaction):
         self.ensure_is_current(transaction)
         self._current_transaction = transaction.parent
+        batch = self._find_batch(transaction.parent)
+        if batch is not None:
+            batch.nested_transaction_rolled_back()
 
     def ensure_is_current(self, transaction):
         if transaction is not self._current_transaction:
@@ -157,6 +344,30 @@ class Transaction(object):
             self.rollback()
 
 
+class BatchTransaction(Transaction):
+
+    def __init__(self, transactions, name, builder, parent):
+        Transaction.__init__(self, transactions, name, builder, parent)
+        self._nested_transaction_rolled_back = False
+
+    def nested_transaction_rolled_back(self):
+        self._nested_transaction_rolled_back = True
+
+    def commit(self):
+        self._transactions.ensure_is_current(self)
+        try:
+            if self._nested_transaction_rolled_back:
+                raise TransactionError(
+                    "Can not commit {0!r} "
+                    "because a nested transaction was rolled back".format(self)
+                )
+            self._value = self._value.build()
+        except Exception:
+            self.rollback()
+            raise
+        Transaction.commit(self)
+
+
 class ValueUpdater(object):
 
     def __init__(self, transaction):
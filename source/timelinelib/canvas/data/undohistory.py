@@ -0,0 +1,105 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Functions that let Transactions keep a deep undo history of ImmutableDB
+values without keeping them all in memory.
+"""
+
+
+import sys
+
+from timelinelib.canvas.data.changeset import TABLES
+from timelinelib.general.deltastore import DeltaStore
+from timelinelib.general.immutable import ImmutableDictBuilder
+
+
+SPILL_SIZE = 500
+
+
+def create_spill_store(max_size=SPILL_SIZE):
+    return DeltaStore(create_delta, apply_delta, max_size=max_size)
+
+
+def create_delta(newer_immutable_db, older_immutable_db):
+    """
+    Return what must be changed in newer_immutable_db to get
+    older_immutable_db: for every table that differs, the records to save and
+    the ids to remove.
+    """
+    delta = {}
+    for table in TABLES:
+        newer_records = getattr(newer_immutable_db, table)
+        older_records = getattr(older_immutable_db, table)
+        if newer_records is not older_records:
+            delta[table] = (
+                dict(
+                    (id_, record)
+                    for id_, record
+                    in older_records
+                    if newer_records.get(id_) is not record
+                ),
+                [id_ for id_, record in newer_records if id_ not in older_records]
+            )
+    return delta
+
+
+def apply_delta(newer_immutable_db, delta):
+    """
+    Return older_immutable_db again. Only the records in delta are visited.
+    A changed table is still a new dictionary, but it is copied in one go.
+    """
+    tables = {}
+    for table, (saved_records, removed_ids) in delta.iteritems():
+        records = ImmutableDictBuilder(getattr(newer_immutable_db, table))
+        for id_, record in saved_records.iteritems():
+            records.set(id_, record)
+        for id_ in removed_ids:
+            records.remove(id_)
+        tables[table] = records.freeze()
+    return newer_immutable_db.update(**tables)
+
+
+def approximate_size(old_immutable_db, new_immutable_db):
+    """
+    Return the approximate number of bytes new_immutable_db uses that it
+    does not share with old_immutable_db.
+
+    Every changed table is a new dictionary, but only the records that have
+    changed are new.
+    """
+    if old_immutable_db is new_immutable_db:
+        return 0
+    size = sys.getsizeof(new_immutable_db)
+    for table in TABLES:
+        old_records = getattr(old_immutable_db, table)
+        new_records = getattr(new_immutable_db, table)
+        if old_records is not new_records:
+            size += sys.getsizeof(new_records)
+            for id_, record in new_records:
+                if old_records.get(id_) is not record:
+                    size += _record_size(record)
+    return size
+
+
+def _record_size(record):
+    size = sys.getsizeof(record)
+    for name, value in record:
+        if isinstance(value, basestring):
+            size += sys.getsizeof(value)
+    return size
@@ -120,5 +120,24 @@ class Strip(object):
         strip.
         """
 
+    def boundaries(self, start_time, end_time):
+        """
+        Return the start times of all strips that overlap the period between
+        start_time and end_time followed by the end time of the last one.
+
+        Strips that can not be represented because they are at the edge of the
+        calendar are left out.
+        """
+        boundaries = []
+        try:
+            current_start = self.start(start_time)
+            boundaries.append(current_start)
+            while current_start < end_time:
+                current_start = self.increment(current_start)
+                boundaries.append(current_start)
+        except ValueError:
+            pass
+        return boundaries
+
     def is_day(self):
         return False
@@ -44,6 +44,7 @@ class TimelineScene(object):
         self.width, self.height = size
         self.divider_y = self._metrics.half_height
         self.event_data = []
+        self._event_x_positions = {}
         self.major_strip = None
         self.minor_strip = None
         self.major_strip_data = []
@@ -179,6 +180,10 @@ class TimelineScene(object):
 
     def _calc_event_sizes_and_positions(self):
         self.events_from_db = self._db.get_events(self._view_properties.displayed_period)
+        self._event_x_positions = self._db.get_event_x_positions(
+            self._view_properties.displayed_period,
+            self.width
+        ) or {}
         visible_events = self._view_properties.filter_events(self.events_from_db)
         visible_events = self._place_subevents_after_container(visible_events)
         return self._calc_event_rects(visible_events)
@@ -241,7 +246,29 @@ class TimelineScene(object):
         return event.get_time_period().start_time > self._db.get_time_type().now()
 
     def _display_as_period(self, event):
-        return self._metrics.calc_width(event.get_time_period()) > self._period_threshold
+        return self._calc_event_width(event) > self._period_threshold
+
+    def _calc_event_width(self, event):
+        x_positions = self._get_event_x_positions(event)
+        if x_positions is None:
+            return self._metrics.calc_width(event.get_time_period())
+        (start_x, end_x) = x_positions
+        return end_x - start_x + 1
+
+    def _calc_event_start_x(self, event):
+        x_positions = self._get_event_x_positions(event)
+        if x_positions is None:
+            return self._metrics.calc_x(event.get_time_period().start_time)
+        return x_positions[0]
+
+    def _get_event_x_positions(self, event):
+        """
+        The x positions calculated by the db are for the stored time period.
+        Events that end today get a new end time when drawn.
+        """
+        if event.ends_today:
+            return None
+        return self._event_x_positions.get(event.get_id())
 
     def _calc_ideal_rect_for_period_event(self, event):
         rw, rh = self._calc_width_and_height_for_period_event(event)
@@ -251,14 +278,14 @@ class TimelineScene(object):
 
     def _calc_width_and_height_for_period_event(self, event):
         _, th = self._get_text_size(event.get_text())
-        ew = self._metrics.calc_width(event.get_time_period())
+        ew = self._calc_event_width(event)
         min_w = 5 * self._outer_padding
         rw = max(ew + 2 * self._outer_padding, min_w)
         rh = th + 2 * self._inner_padding + 2 * self._outer_padding
         return rw, rh
 
     def _calc_x_pos_for_period_event(self, event):
-        return self._metrics.calc_x(event.get_time_period().start_time) - self._outer_padding
+        return self._calc_event_start_x(event) - self._outer_padding
 
     def _calc_y_pos_for_period_event(self, event):
         if event.is_subevent():
@@ -284,7 +311,7 @@ class TimelineScene(object):
             ry = self._calc_y_pos_for_non_period_event(event, rh)
             if event.is_milestone():
                 rw = rh
-                rx = self._metrics.calc_x(event.get_time_period().start_time) - rw / 2
+                rx = self._calc_event_start_x(event) - rw / 2
                 return wx.Rect(rx, ry, rw, rh)
             return self._calc_ideal_wx_rect(rx, ry, rw, rh)
 
@@ -303,7 +330,7 @@ class TimelineScene(object):
 
     def _calc_x_pos_for_non_period_event(self, event, rw):
         if self._appearance.get_draw_period_events_to_right():
-            return self._metrics.calc_x(event.get_time_period().start_time) - self._outer_padding
+            return self._calc_event_start_x(event) - self._outer_padding
         else:
             return self._metrics.calc_x(event.mean_time()) - rw / 2
 
@@ -341,15 +368,12 @@ class TimelineScene(object):
 
         def fill(strip_list, strip):
             """Fill the given list with the given strip."""
-            try:
-                current_start = strip.start(self._view_properties.displayed_period.start_time)
-                while current_start < self._view_properties.displayed_period.end_time:
-                    next_start = strip.increment(current_start)
-                    strip_list.append(TimePeriod(current_start, next_start))
-                    current_start = next_start
-            except:
-                # Exception occurs when major=century and when we are at the end of the calendar
-                pass
+            boundaries = strip.boundaries(
+                self._view_properties.displayed_period.start_time,
+                self._view_properties.displayed_period.end_time
+            )
+            for (start, end) in zip(boundaries, boundaries[1:]):
+                strip_list.append(TimePeriod(start, end))
         major_strip_data = []  # List of time_period
         minor_strip_data = []  # List of time_period
         self.major_strip, self.minor_strip = self._db.get_time_type().choose_strip(self._metrics, self._appearance)
@@ -16,6 +16,8 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import collections
+
 from timelinelib.general.observer import Observable
 
 
@@ -29,15 +31,17 @@ class ViewProperties(Observable):
 
     def __init__(self):
         Observable.__init__(self)
-        self.sticky_balloon_event_ids = []
+        self._sticky_balloon_event_ids = set()
         self.hovered_event = None
-        self.selected_event_ids = []
-        self._hidden_category_ids = []
+        self._selected_event_ids = collections.OrderedDict()
+        self._hidden_category_ids = set()
+        self._effective_category_visibility = {}
+        self._category_visibility_version = 0
         self.period_selection = None
         self.divider_position = 0.5
         self.displayed_period = None
         self.hscroll_amount = 0
-        self.view_cats_individually = False
+        self._view_cats_individually = False
         self.fixed_event_vertical_pos = False
         self.fuzzy_icon = None
         self.locked_icon = None
@@ -72,6 +76,15 @@ class ViewProperties(Observable):
             if count < limit
         }
 
+    @property
+    def selected_event_ids(self):
+        """The ids of all selected events in the order they were selected."""
+        return list(self._selected_event_ids)
+
+    @property
+    def sticky_balloon_event_ids(self):
+        return list(self._sticky_balloon_event_ids)
+
     @property
     def legend_pos(self):
         return self._legend_pos
@@ -88,6 +101,23 @@ class ViewProperties(Observable):
     def time_scale_pos(self, pos):
         self._time_scale_pos = pos
 
+    @property
+    def view_cats_individually(self):
+        return self._view_cats_individually
+
+    @view_cats_individually.setter
+    def view_cats_individually(self, value):
+        self._view_cats_individually = value
+        self._category_visibility_changed()
+
+    @property
+    def category_visibility_version(self):
+        """
+        A number that changes whenever the visibility of events with a given
+        category might have changed.
+        """
+        return self._category_visibility_version
+
     @property
     def hide_events_done(self):
         return self._hide_events_done
@@ -133,10 +163,11 @@ class ViewProperties(Observable):
         return self.fixed_event_vertical_pos
 
     def clear_db_specific(self):
-        self.sticky_balloon_event_ids = []
+        self._sticky_balloon_event_ids = set()
         self.hovered_event = None
-        self.selected_event_ids = []
-        self._hidden_category_ids = []
+        self._selected_event_ids = collections.OrderedDict()
+        self._hidden_category_ids = set()
+        self._category_visibility_changed()
         self.period_selection = None
         self.displayed_period = None
         self._event_highlight_counters = {}
@@ -172,16 +203,19 @@ class ViewProperties(Observable):
             return self.is_event_with_category_visible(event.get_category())
 
     def is_selected(self, event):
-        return event.get_id() in self.selected_event_ids
+        return event.get_id() in self._selected_event_ids
 
     def clear_selected(self):
-        if self.selected_event_ids:
-            self.selected_event_ids = []
+        if self._selected_event_ids:
+            self._selected_event_ids = collections.OrderedDict()
             self._notify()
 
     def select_all_events(self):
-        self.selected_event_ids = [event.get_id() for event in self._all_events
-                                   if not event.is_container()]
+        self._selected_event_ids = collections.OrderedDict(
+            (event.get_id(), None)
+            for event in self._all_events
+            if not event.is_container()
+        )
         self._notify()
 
     def event_is_hovered(self, event):
@@ -189,33 +223,75 @@ class ViewProperties(Observable):
                 event.id == self.hovered_event.id)
 
     def event_has_sticky_balloon(self, event):
-        return event.id in self.sticky_balloon_event_ids
+        return event.id in self._sticky_balloon_event_ids
 
     def set_event_has_sticky_balloon(self, event, has_sticky=True):
-        if has_sticky is True and event.id not in self.sticky_balloon_event_ids:
-            self.sticky_balloon_event_ids.append(event.id)
-        elif has_sticky is False and event.id in self.sticky_balloon_event_ids:
-            self.sticky_balloon_event_ids.remove(event.id)
+        if has_sticky is True:
+            self._sticky_balloon_event_ids.add(event.id)
+        elif has_sticky is False:
+            self._sticky_balloon_event_ids.discard(event.id)
         self._notify()
 
     def set_selected(self, event, is_selected=True):
-        if is_selected is True and not event.get_id() in self.selected_event_ids:
-            self.selected_event_ids.append(event.get_id())
-            self._notify()
-        elif is_selected is False and event.get_id() in self.selected_event_ids:
-            self.selected_event_ids.remove(event.get_id())
-            self._notify()
+        self.set_events_selected([event], is_selected)
 
     def set_all_selected(self, events):
-        for event in events:
-            if not event.get_id() in self.selected_event_ids:
-                self.selected_event_ids.append(event.get_id())
+        self._select_events(events)
         self._notify()
 
+    def set_events_selected(self, events, is_selected=True):
+        """
+        Select or deselect all given events with at most one notification.
+        """
+        if is_selected is True:
+            self._notify_if(self._select_events(events))
+        elif is_selected is False:
+            self._notify_if(self._deselect_events(events))
+
+    def toggle_events_selected(self, events):
+        """
+        Select the given events that are not selected and deselect the ones
+        that are, with at most one notification.
+        """
+        selected = []
+        unselected = []
+        for event in events:
+            if event.get_id() in self._selected_event_ids:
+                selected.append(event)
+            else:
+                unselected.append(event)
+        deselected_changed = self._deselect_events(selected)
+        selected_changed = self._select_events(unselected)
+        self._notify_if(deselected_changed or selected_changed)
+
+    def _select_events(self, events):
+        changed = False
+        for event in events:
+            event_id = event.get_id()
+            if event_id not in self._selected_event_ids:
+                self._selected_event_ids[event_id] = None
+                changed = True
+        return changed
+
+    def _deselect_events(self, events):
+        changed = False
+        for event in events:
+            event_id = event.get_id()
+            if event_id in self._selected_event_ids:
+                del self._selected_event_ids[event_id]
+                changed = True
+        return changed
+
+    def _notify_if(self, changed):
+        if changed:
+            self._notify()
+
     def set_only_selected(self, event, is_selected):
         if is_selected:
             if self.selected_event_ids != [event.get_id()]:
-                self.selected_event_ids = [event.get_id()]
+                self._selected_event_ids = collections.OrderedDict(
+                    [(event.get_id(), None)]
+                )
                 self._notify()
         else:
             self.clear_selected()
@@ -226,7 +302,7 @@ class ViewProperties(Observable):
             self._notify()
 
     def get_selected_event_ids(self):
-        return self.selected_event_ids[:]
+        return self.selected_event_ids
 
     def toggle_category_visibility(self, category):
         self.set_category_visible(category,
@@ -238,7 +314,27 @@ class ViewProperties(Observable):
     def is_event_with_category_visible(self, category):
         if category is None:
             return True
-        elif self.view_cats_individually:
+        category_id = category.get_id()
+        if category_id is None:
+            return self._calc_is_event_with_category_visible(category)
+        if category_id not in self._effective_category_visibility:
+            self._effective_category_visibility[category_id] = \
+                self._calc_is_event_with_category_visible(category)
+        return self._effective_category_visibility[category_id]
+
+    def category_tree_changed(self):
+        """
+        Must be called when categories have been added, removed, or moved in
+        the category tree so that cached visibilities are recalculated.
+        """
+        self._category_visibility_changed()
+
+    def _category_visibility_changed(self):
+        self._effective_category_visibility = {}
+        self._category_visibility_version += 1
+
+    def _calc_is_event_with_category_visible(self, category):
+        if self.view_cats_individually:
             return self.is_category_visible(category)
         else:
             return self._is_category_recursively_visible(category)
@@ -266,7 +362,8 @@ class ViewProperties(Observable):
                 self._hidden_category_ids.remove(category_id)
                 need_notify = True
             elif is_visible is False and category_id not in self._hidden_category_ids:
-                self._hidden_category_ids.append(category_id)
+                self._hidden_category_ids.add(category_id)
                 need_notify = True
         if need_notify:
+            self._category_visibility_changed()
             self._notify()
@@ -118,6 +118,9 @@ class TimelineCanvas(wx.Panel):
     def SetEventSelected(self, event, is_selected):
         self._controller.set_selected(event, is_selected)
 
+    def ToggleEventsSelected(self, events):
+        self._controller.toggle_selected(events)
+
     def ClearSelectedEvents(self):
         self._controller.clear_selected()
 
@@ -210,8 +213,16 @@ class TimelineCanvas(wx.Panel):
                self._controller.get_view_properties(), self.GetAppearance())
 
     def GetFilteredEvents(self, search_target, search_period):
-        events = self.GetDb().search(search_target)
-        return self._controller.filter_events(events, search_period)
+        return self._controller.search_events(search_target, search_period)
+
+    def StartEventSearch(self, search_target, search_period):
+        return self._controller.start_event_search(search_target, search_period)
+
+    def GetSearchTimePeriod(self, search_period):
+        return self._controller.get_search_time_period(search_period)
+
+    def GetFilteredEventsWithIds(self, ids, search_period):
+        return self._controller.filter_events_with_ids(ids, search_period)
 
     def GetTimePeriod(self):
         return self._controller.get_time_period()
@@ -412,7 +423,7 @@ class TimelineCanvas(wx.Panel):
 
         event = self.GetEventAt(get_cursor(), evt.AltDown())
         if event:
-            self.SetEventSelected(event, not self.IsEventSelected(event))
+            self.ToggleEventsSelected([event])
 
     def InitDragScroll(self, direction=wx.HORIZONTAL):
         self._scrolling = False
@@ -118,7 +118,7 @@ class TimelineCanvasController(object):
     def _set_non_null_timeline(self, timeline):
         self.timeline = timeline
         self.time_type = timeline.get_time_type()
-        self.timeline.register(self._timeline_changed)
+        self.timeline.listen_for_changes(self._timeline_changed)
         self.view_properties.unlisten(self._redraw_timeline)
         properties_loaded = self._load_view_properties()
         if properties_loaded:
@@ -142,7 +142,7 @@ class TimelineCanvasController(object):
 
     def _unregister_timeline(self, timeline):
         if timeline is not None:
-            timeline.unregister(self._timeline_changed)
+            timeline.unlisten(self._timeline_changed)
 
     def get_time_period(self):
         """Return currently displayed time period."""
@@ -180,6 +180,9 @@ class TimelineCanvasController(object):
     def set_selected(self, event, is_selected):
         self.view_properties.set_selected(event, is_selected)
 
+    def toggle_selected(self, events):
+        self.view_properties.toggle_events_selected(events)
+
     def clear_selected(self):
         self.view_properties.clear_selected()
 
@@ -246,6 +249,27 @@ class TimelineCanvasController(object):
             CHOICE_VISIBLE_PERIOD: self._choose_visible_period 
         }
 
+    def search_events(self, search_target, search_period):
+        return self.filter_events_with_ids(
+            self.start_event_search(search_target, search_period).run(),
+            search_period
+        )
+
+    def start_event_search(self, search_target, search_period):
+        return self.timeline.start_search(
+            search_target,
+            self.get_search_time_period(search_period)
+        )
+
+    def get_search_time_period(self, search_period):
+        if search_period == CHOICE_VISIBLE_PERIOD:
+            return self.view_properties.displayed_period
+        else:
+            return None
+
+    def filter_events_with_ids(self, ids, search_period):
+        return self.filter_events(self.timeline.find_event_with_ids(ids), search_period)
+
     def filter_events(self, events, search_period):
         return self._search_choice_functions[search_period](events)
     
@@ -288,7 +312,9 @@ class TimelineCanvasController(object):
     def balloon_at(self, cursor):
         return self.drawing_algorithm.balloon_at(*cursor.pos)
 
-    def _timeline_changed(self, state_change):
+    def _timeline_changed(self, changeset):
+        if changeset is None or changeset.has_changes_in("categories"):
+            self.view_properties.category_tree_changed()
         self._redraw_timeline()
 
     def _set_initial_values_to_member_variables(self):
@@ -312,7 +338,10 @@ class TimelineCanvasController(object):
             dc.SetTextForeground((255, 0, 0))
             dc.SetFont(Font(12, weight=wx.FONTWEIGHT_BOLD))
             index, is_in_transaction, history = self.timeline.transactions_status()
-            dc.DrawText("Undo buffer size: %d" % len(history), width - 300, height - 100)
+            memory_bytes, spilled_bytes = self.timeline.transactions_memory_usage()
+            dc.DrawText("Undo buffer size: %d" % len(history), width - 300, height - 140)
+            dc.DrawText("Undo buffer memory: %s" % _format_bytes(memory_bytes), width - 300, height - 120)
+            dc.DrawText("Undo buffer on disk: %s" % _format_bytes(spilled_bytes), width - 300, height - 100)
             dc.DrawText("Undo buffer pos: %d" % index, width - 300, height - 80)
             dc.DrawText("Redraw count: %d" % self.monitoring._timeline_redraw_count, width - 300, height - 60)
             dc.DrawText("Last redraw time: %.3f ms" % redraw_time, width - 300, height - 40)
@@ -355,3 +384,9 @@ class TimelineCanvasController(object):
             self.drawing_algorithm = drawer
         else:
             self.drawing_algorithm = get_drawer()
+
+
+def _format_bytes(number_of_bytes):
+    if number_of_bytes is None:
+        return "-"
+    return "%.1f KB" % (number_of_bytes / 1024.0)
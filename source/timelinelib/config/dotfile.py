@@ -285,6 +285,9 @@ INT_CONFIGS = (
     {'name': 'vertical_space_between_events', 'default': '5'},
     {'name': 'legend_pos', 'default': '0'},
     {'name': 'time_scale_pos', 'default': '1'},
+    {'name': 'undo_history_size', 'default': '10'},
+    {'name': 'undo_history_kilobytes', 'default': '0'},
+    {'name': 'undo_history_spill_size', 'default': '500'},
 )
 STR_CONFIGS = (
     {'name': 'experimental_features', 'default': ''},
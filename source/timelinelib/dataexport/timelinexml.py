@@ -18,11 +18,19 @@
 
 from xml.sax.saxutils import escape as xmlescape
 import base64
+import hashlib
+import os
 import StringIO
 
 import wx
 
+from timelinelib.canvas.data.container import container_sort_order
+from timelinelib.canvas.data.container import container_time_period
+from timelinelib.db.utils import is_gzip_path
+from timelinelib.db.utils import open_for_reading
 from timelinelib.db.utils import safe_write
+from timelinelib.features.experimental.experimentalfeatures import EXTENDED_CONTAINER_STRATEGY
+from timelinelib.general.lazyvalue import LazyValue
 from timelinelib.meta.version import get_full_version
 
 
@@ -30,6 +38,8 @@ ENCODING = "utf-8"
 INDENT1 = "  "
 INDENT2 = "    "
 INDENT3 = "      "
+BUFFER_SIZE = 64 * 1024
+REWRITABLE_SECTIONS = ("view", "tail")
 
 
 def export_db_to_timeline_xml(db, path):
@@ -52,146 +62,452 @@ def wrap_in_tag(func, name, indent=""):
 
 
 class Exporter(object):
+    """
+    Writes the content of a db as a timeline xml document.
+
+    The items are read directly from the records in the db, so no event or
+    category objects are created. Times, colors, and category names are
+    repeated in many events, so their strings are only created once. The
+    document is collected in a :class:`WriteBuffer` that writes to the file in
+    large chunks.
+
+    The document is made up of the sections returned by :meth:`get_sections`.
+    """
 
     def __init__(self, db):
         self.db = db
+        self._immutable_db = db._get_immutable_db()
+        self._time_type = db.get_time_type()
+        self._time_strings = {}
+        self._color_strings = {}
+        self._category_names = dict(
+            (id_, xmlescape(immutable_category.name))
+            for id_, immutable_category
+            in self._immutable_db.categories
+        )
 
     def export(self, path):
         safe_write(path, ENCODING, self._write_xml_doc)
 
+    def get_sections(self):
+        """
+        Return a list of (name, key, write_fn) for the sections of the
+        document in order.
+
+        A section only has to be written again if its key has changed. The key
+        is a tuple of the values that the section is made from. The key of a
+        section that must always be written is None.
+        """
+        immutable_db = self._immutable_db
+        sections = [
+            ("head", (get_full_version(), self._time_type), self._write_head),
+        ]
+        if len(immutable_db.eras) > 0:
+            sections.append(
+                ("eras", (immutable_db.eras, self._time_type), self._write_eras)
+            )
+        sections.extend([
+            ("categories", (immutable_db.categories,), self._write_categories),
+            ("events", (immutable_db.events,
+                        immutable_db.containers,
+                        immutable_db.milestones,
+                        immutable_db.categories,
+                        self._time_type,
+                        EXTENDED_CONTAINER_STRATEGY.enabled()), self._write_events),
+            ("view", (self.db.get_displayed_period(),
+                      tuple(cat.id for cat in self.db.get_hidden_categories()),
+                      immutable_db.categories,
+                      self._time_type), self._write_view),
+            ("tail", None, self._write_tail),
+        ])
+        return sections
+
+    def render_section(self, write_fn):
+        """
+        Return the content written by the write_fn of a section encoded with
+        ENCODING.
+        """
+        output = StringIO.StringIO()
+        buf = WriteBuffer(output)
+        write_fn(buf)
+        buf.flush()
+        return output.getvalue().encode(ENCODING)
+
     def _time_string(self, time):
-        return self.db.get_time_type().time_string(time)
+        try:
+            return self._time_strings[time]
+        except KeyError:
+            text = self._time_type.time_string(time)
+            self._time_strings[time] = text
+            return text
+
+    def _color_string(self, color):
+        try:
+            return self._color_strings[color]
+        except KeyError:
+            text = color_string(color)
+            self._color_strings[color] = text
+            return text
 
     def _write_xml_doc(self, xmlfile):
-        xmlfile.write("<?xml version=\"1.0\" encoding=\"utf-8\"?>\n")
-        self._write_timeline(xmlfile)
-
-    def _write_timeline(self, xmlfile):
-        write_simple_tag(xmlfile, "version", get_full_version(), INDENT1)
-        write_simple_tag(xmlfile, "timetype", self.db.get_time_type().get_name(), INDENT1)
-        if len(self.db.get_all_eras()) > 0:
-            self._write_eras(xmlfile)
-        self._write_categories(xmlfile)
-        self._write_events(xmlfile)
-        self._write_view(xmlfile)
-        self._write_now_value(xmlfile)
-    _write_timeline = wrap_in_tag(_write_timeline, "timeline")
-
-    def _write_categories(self, xmlfile):
-        def write_with_parent(categories, parent):
-            for cat in categories:
-                if cat._get_parent() == parent:
-                    self._write_category(xmlfile, cat)
-                    write_with_parent(categories, cat)
-        write_with_parent(self.db.get_categories(), None)
+        buf = WriteBuffer(xmlfile)
+        for name, key, write_fn in self.get_sections():
+            write_fn(buf)
+        buf.flush()
+
+    def _write_head(self, buf):
+        buf.write("<?xml version=\"1.0\" encoding=\"utf-8\"?>\n")
+        buf.write("<timeline>\n")
+        buf.write_simple_tag("version", get_full_version(), INDENT1)
+        buf.write_simple_tag("timetype", self._time_type.get_name(), INDENT1)
+
+    def _write_tail(self, buf):
+        self._write_now_value(buf)
+        buf.write("</timeline>\n")
+
+    def _write_categories(self, buf):
+        children = {}
+        for id_, immutable_category in self._immutable_db.categories:
+            children.setdefault(immutable_category.parent_id, []).append(
+                (id_, immutable_category)
+            )
+
+        def write_with_parent(parent_id):
+            for id_, immutable_category in children.get(parent_id, []):
+                self._write_category(buf, id_, immutable_category)
+                write_with_parent(id_)
+        write_with_parent(None)
     _write_categories = wrap_in_tag(_write_categories, "categories", INDENT1)
 
-    def _write_category(self, xmlfile, cat):
-        write_simple_tag(xmlfile, "name", cat.get_name(), INDENT3)
-        write_simple_tag(xmlfile, "color", color_string(cat.get_color()), INDENT3)
-        write_simple_tag(xmlfile, "progress_color", color_string(cat.get_progress_color()), INDENT3)
-        write_simple_tag(xmlfile, "done_color", color_string(cat.get_done_color()), INDENT3)
-        write_simple_tag(xmlfile, "font_color", color_string(cat.get_font_color()), INDENT3)
-        if cat._get_parent():
-            write_simple_tag(xmlfile, "parent", cat._get_parent().get_name(), INDENT3)
+    def _write_category(self, buf, id_, immutable_category):
+        buf.write_escaped_tag("name", self._category_names[id_], INDENT3)
+        buf.write_simple_tag("color", self._color_string(immutable_category.color), INDENT3)
+        buf.write_simple_tag("progress_color", self._color_string(immutable_category.progress_color), INDENT3)
+        buf.write_simple_tag("done_color", self._color_string(immutable_category.done_color), INDENT3)
+        buf.write_simple_tag("font_color", self._color_string(immutable_category.font_color), INDENT3)
+        if immutable_category.parent_id is not None:
+            buf.write_escaped_tag("parent", self._category_names[immutable_category.parent_id], INDENT3)
     _write_category = wrap_in_tag(_write_category, "category", INDENT2)
 
-    def _write_events(self, xmlfile):
-        all_events = self.db.get_all_events()
-        containers = [event for event in all_events if event.is_container()]
-        rest = [event for event in all_events if not event.is_container()]
-        for evt in containers + rest:
-            self._write_event(xmlfile, evt)
+    def _write_events(self, buf):
+        """
+        Containers are written first since subevents refer to them. The rest
+        are written with milestones first, in the same order as
+        db.get_all_events returns them.
+        """
+        immutable_db = self._immutable_db
+        subevents = {}
+        events = []
+        for id_, immutable_event in immutable_db.events:
+            events.append((id_, immutable_event))
+            if immutable_event.container_id is not None:
+                subevents.setdefault(immutable_event.container_id, []).append(
+                    immutable_event
+                )
+        containers = [
+            (id_, immutable_container, subevents.get(id_, []))
+            for id_, immutable_container
+            in immutable_db.containers
+        ]
+        containers.sort(key=lambda (id_, immutable_container, subevents):
+            container_sort_order(subevents)
+        )
+        events.sort(key=lambda (id_, immutable_event): immutable_event.sort_order)
+        for id_, immutable_container, subevents in containers:
+            self._write_event(
+                buf,
+                immutable_container,
+                container_time_period(immutable_container.time_period, subevents),
+                "[%d]%s" % (id_, immutable_container.text)
+            )
+        for id_, immutable_milestone in immutable_db.milestones:
+            self._write_event(
+                buf,
+                immutable_milestone,
+                immutable_milestone.time_period,
+                _escape_container_tag(immutable_milestone.text),
+                milestone=True
+            )
+        subevents_can_be_locked = EXTENDED_CONTAINER_STRATEGY.enabled()
+        for id_, immutable_event in events:
+            if immutable_event.container_id is None:
+                self._write_event(
+                    buf,
+                    immutable_event,
+                    immutable_event.time_period,
+                    _escape_container_tag(immutable_event.text)
+                )
+            else:
+                self._write_event(
+                    buf,
+                    immutable_event,
+                    immutable_event.time_period,
+                    "(%d)%s" % (immutable_event.container_id, immutable_event.text),
+                    locked=immutable_event.locked and subevents_can_be_locked
+                )
     _write_events = wrap_in_tag(_write_events, "events", INDENT1)
 
-    def _write_event(self, xmlfile, evt):
-        write_simple_tag(xmlfile, "start",
-                         self._time_string(evt.get_time_period().start_time), INDENT3)
-        write_simple_tag(xmlfile, "end",
-                         self._time_string(evt.get_time_period().end_time), INDENT3)
-        if evt.is_container():
-            write_simple_tag(xmlfile, "text", "[%d]%s" % (evt.id, evt.get_text()), INDENT3)
-        elif evt.is_subevent():
-            write_simple_tag(xmlfile, "text", "(%d)%s" % (evt.container.id, evt.get_text()), INDENT3)
-        else:
-            text = evt.get_text()
-            if self._text_starts_with_container_tag(evt.get_text()):
-                text = self._add_leading_space_to_text(evt.get_text())
-            write_simple_tag(xmlfile, "text", text, INDENT3)
-        if evt.get_data("progress") is not None:
-            write_simple_tag(xmlfile, "progress", "%s" % evt.get_data("progress"), INDENT3)
-        write_simple_tag(xmlfile, "fuzzy", "%s" % evt.get_fuzzy(), INDENT3)
-        write_simple_tag(xmlfile, "locked", "%s" % evt.get_locked(), INDENT3)
-        write_simple_tag(xmlfile, "ends_today", "%s" % evt.get_ends_today(), INDENT3)
-        if evt.get_category() is not None:
-            write_simple_tag(xmlfile, "category", evt.get_category().get_name(), INDENT3)
-        if evt.get_data("description") is not None:
-            write_simple_tag(xmlfile, "description", evt.get_data("description"), INDENT3)
-        alert = evt.get_data("alert")
+    def _write_event(self, buf, record, time_period, text, locked=None, milestone=False):
+        """
+        Fields that a record does not have, like progress on a milestone, are
+        read as None.
+        """
+        if locked is None:
+            locked = record.get("locked", False)
+        buf.write(INDENT2)
+        buf.write("<event>\n")
+        buf.write_simple_tag("start", self._time_string(time_period.start_time), INDENT3)
+        buf.write_simple_tag("end", self._time_string(time_period.end_time), INDENT3)
+        buf.write_simple_tag("text", text, INDENT3)
+        progress = record.get("progress")
+        if progress is not None:
+            buf.write_simple_tag("progress", "%s" % progress, INDENT3)
+        buf.write_simple_tag("fuzzy", "%s" % record.get("fuzzy", False), INDENT3)
+        buf.write_simple_tag("locked", "%s" % locked, INDENT3)
+        buf.write_simple_tag("ends_today", "%s" % record.get("ends_today", False), INDENT3)
+        if record.category_id is not None:
+            buf.write_escaped_tag("category", self._category_names[record.category_id], INDENT3)
+        description = record.description
+        if description is not None:
+            self._write_text_tag(buf, "description", description)
+        alert = record.get("alert")
         if alert is not None:
-            write_simple_tag(xmlfile, "alert", alert_string(self.db.get_time_type(), alert),
-                             INDENT3)
-        hyperlink = evt.get_data("hyperlink")
+            time, alert_text = alert
+            buf.write_simple_tag("alert", "%s;%s" % (self._time_string(time), alert_text), INDENT3)
+        hyperlink = record.get("hyperlink")
         if hyperlink is not None:
-            write_simple_tag(xmlfile, "hyperlink", hyperlink, INDENT3)
-        if evt.get_data("icon") is not None:
-            icon_text = icon_string(evt.get_data("icon"))
-            write_simple_tag(xmlfile, "icon", icon_text, INDENT3)
-        default_color = evt.get_data("default_color")
+            self._write_text_tag(buf, "hyperlink", hyperlink)
+        icon = record.get("icon")
+        if isinstance(icon, LazyValue):
+            self._write_text_tag(buf, "icon", icon)
+        elif icon is not None:
+            buf.write_simple_tag("icon", icon_string(icon), INDENT3)
+        default_color = record.get("default_color")
         if default_color is not None:
-            write_simple_tag(xmlfile, "default_color", color_string(default_color), INDENT3)
-        if evt.is_milestone():
-            write_simple_tag(xmlfile, "milestone", "True", INDENT3)
-    _write_event = wrap_in_tag(_write_event, "event", INDENT2)
-
-    def _write_eras(self, xmlfile):
-        for era in self.db.get_all_eras():
-            self._write_era(xmlfile, era)
+            buf.write_simple_tag("default_color", self._color_string(default_color), INDENT3)
+        if milestone:
+            buf.write_simple_tag("milestone", "True", INDENT3)
+        buf.write(INDENT2)
+        buf.write("</event>\n")
+
+    def _write_text_tag(self, buf, name, value):
+        """
+        The text of a lazy value that has not been changed is copied as it is,
+        without parsing it or escaping it again.
+        """
+        if isinstance(value, LazyValue):
+            xml_text = value.get_xml_text()
+            if xml_text is not None:
+                buf.write_escaped_tag(name, xml_text, INDENT3)
+                return
+            value = value.get_text()
+        buf.write_simple_tag(name, value, INDENT3)
+
+    def _write_eras(self, buf):
+        for id_, immutable_era in self._immutable_db.eras:
+            self._write_era(buf, immutable_era)
     _write_eras = wrap_in_tag(_write_eras, "eras", INDENT1)
 
-    def _write_era(self, xmlfile, era):
-        write_simple_tag(xmlfile, "name", era.get_name(), INDENT3)
-        write_simple_tag(xmlfile, "start", self._time_string(era.get_time_period().start_time), INDENT3)
-        write_simple_tag(xmlfile, "end", self._time_string(era.get_time_period().end_time), INDENT3)
-        write_simple_tag(xmlfile, "color", color_string(era.get_color()), INDENT3)
-        write_simple_tag(xmlfile, "ends_today", "%s" % era.ends_today(), INDENT3)
+    def _write_era(self, buf, immutable_era):
+        buf.write_simple_tag("name", immutable_era.name, INDENT3)
+        buf.write_simple_tag("start", self._time_string(immutable_era.time_period.start_time), INDENT3)
+        buf.write_simple_tag("end", self._time_string(immutable_era.time_period.end_time), INDENT3)
+        buf.write_simple_tag("color", self._color_string(immutable_era.color), INDENT3)
+        buf.write_simple_tag("ends_today", "%s" % immutable_era.ends_today, INDENT3)
     _write_era = wrap_in_tag(_write_era, "era", INDENT2)
 
-    def _text_starts_with_container_tag(self, text):
-        if len(text) > 0:
-            return text[0] in ('(', '[')
-        else:
-            return False
-
-    def _add_leading_space_to_text(self, text):
-        return " %s" % text
-
-    def _write_view(self, xmlfile):
+    def _write_view(self, buf):
         if self.db.get_displayed_period() is not None:
-            self._write_displayed_period(xmlfile)
-        self._write_hidden_categories(xmlfile)
+            self._write_displayed_period(buf)
+        self._write_hidden_categories(buf)
     _write_view = wrap_in_tag(_write_view, "view", INDENT1)
 
-
-    def _write_displayed_period(self, xmlfile):
+    def _write_displayed_period(self, buf):
         period = self.db.get_displayed_period()
-        write_simple_tag(xmlfile, "start",
-                         self._time_string(period.start_time), INDENT3)
-        write_simple_tag(xmlfile, "end",
-                         self._time_string(period.end_time), INDENT3)
+        buf.write_simple_tag("start", self._time_string(period.start_time), INDENT3)
+        buf.write_simple_tag("end", self._time_string(period.end_time), INDENT3)
     _write_displayed_period = wrap_in_tag(_write_displayed_period,
                                           "displayed_period", INDENT2)
 
-    def _write_hidden_categories(self, xmlfile):
+    def _write_hidden_categories(self, buf):
         for cat in self.db.get_hidden_categories():
-            write_simple_tag(xmlfile, "name", cat.get_name(), INDENT3)
+            buf.write_escaped_tag("name", self._category_names[cat.id], INDENT3)
     _write_hidden_categories = wrap_in_tag(_write_hidden_categories,
                                            "hidden_categories", INDENT2)
 
-    def _write_now_value(self, xmlfile):
-        if self.db.get_time_type().supports_saved_now():
-            time = self.db.get_time_type().time_string(self.db.time_type.now())
-            write_simple_tag(xmlfile, "now", time, INDENT1)
+    def _write_now_value(self, buf):
+        if self._time_type.supports_saved_now():
+            time = self._time_type.time_string(self.db.time_type.now())
+            buf.write_simple_tag("now", time, INDENT1)
+
+
+class WriteBuffer(object):
+    """
+    Collects strings and writes them to a file in chunks of about BUFFER_SIZE
+    characters.
+
+    Call flush when done to write what is left.
+    """
+
+    def __init__(self, xmlfile, buffer_size=BUFFER_SIZE):
+        self._xmlfile = xmlfile
+        self._buffer_size = buffer_size
+        self._parts = []
+        self._size = 0
+
+    def write(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self._buffer_size:
+            self.flush()
+
+    def write_simple_tag(self, name, content, indent=""):
+        self.write_escaped_tag(name, xmlescape(content), indent)
+
+    def write_escaped_tag(self, name, escaped_content, indent=""):
+        self.write("%s<%s>%s</%s>\n" % (indent, name, escaped_content, name))
+
+    def flush(self):
+        if self._parts:
+            self._xmlfile.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+
+
+class TimelineFile(object):
+    """
+    Saves a db to the same timeline file over and over again.
+
+    Only the digest, offset, and length of each section of the document are
+    kept from the last save. A section is only exported again if its key from
+    :meth:`Exporter.get_sections` has changed, so saving after a change to
+    the view does not export any events. The content of an unchanged section
+    is copied from the file.
+
+    The file is not written at all if the new document is the same as the one
+    in the file. If only the sections from the view onward have changed, and
+    the file has not been modified by anyone else since the last save, only
+    that end of the file is rewritten in place. That rewrite does not keep a
+    backup of the file, so if it is interrupted the end of the file might be
+    incomplete. Otherwise the whole file is written with safe_write. A
+    compressed file is always written as a whole.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._sections = []
+        self._stat = None
+
+    def save(self, db):
+        if self._stat is not None and _stat(self.path) == self._stat:
+            sections = self._export_sections(Exporter(db), self._sections)
+            if self._has_changes(sections) and not self._rewrite_end(sections):
+                self._write_whole_file(sections)
+        else:
+            sections = self._export_sections(Exporter(db), [])
+            if self._get_digest(sections) != self._get_digest_on_disk():
+                self._write_whole_file(sections)
+        self._sections = _with_offsets(sections)
+        self._stat = _stat(self.path)
+
+    def _export_sections(self, exporter, previous_sections):
+        """
+        Return a list of (name, key, digest, length, data, old_offset) for
+        the sections of the new document.
+
+        The data of a section that is the same as in the file is None, and
+        old_offset is where it is found in the file.
+        """
+        previous = dict(
+            (name, (key, digest, offset, length))
+            for (name, key, digest, offset, length)
+            in previous_sections
+        )
+        sections = []
+        for name, key, write_fn in exporter.get_sections():
+            if (name in previous and
+                    name not in REWRITABLE_SECTIONS and
+                    _same_key(previous[name][0], key)):
+                old_key, digest, offset, length = previous[name]
+                sections.append((name, key, digest, length, None, offset))
+            else:
+                data = exporter.render_section(write_fn)
+                sections.append((
+                    name, key, hashlib.sha1(data).digest(), len(data), data, None
+                ))
+        return sections
+
+    def _has_changes(self, sections):
+        return (
+            [(name, digest) for (name, key, digest, length, data, old_offset) in sections] !=
+            [(name, digest) for (name, key, digest, offset, length) in self._sections]
+        )
+
+    def _get_digest(self, sections):
+        digest = hashlib.sha1()
+        for (name, key, section_digest, length, data, old_offset) in sections:
+            digest.update(data)
+        return digest.digest()
+
+    def _get_digest_on_disk(self):
+        if _stat(self.path) is None:
+            return None
+        digest = hashlib.sha1()
+        try:
+            with open_for_reading(self.path) as f:
+                while True:
+                    chunk = f.read(BUFFER_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+        except IOError:
+            return None
+        return digest.digest()
+
+    def _write_whole_file(self, sections):
+        def write_sections(dbfile):
+            old_file = None
+            try:
+                for (name, key, digest, length, data, old_offset) in sections:
+                    if data is not None:
+                        dbfile.write(data)
+                        continue
+                    if old_file is None:
+                        old_file = open_for_reading(self.path)
+                    old_file.seek(old_offset)
+                    _copy(old_file, dbfile, length)
+            finally:
+                if old_file is not None:
+                    old_file.close()
+        safe_write(self.path, None, write_sections)
+
+    def _rewrite_end(self, sections):
+        if is_gzip_path(self.path):
+            return False
+        offset = 0
+        for section, old_section in zip(sections, self._sections):
+            (name, key, digest, length, data, old_offset) = section
+            (old_name, old_key, old_digest, offset_in_file, old_length) = old_section
+            if name in REWRITABLE_SECTIONS:
+                break
+            if name != old_name or digest != old_digest:
+                return False
+            offset += length
+        else:
+            return False
+        try:
+            with open(self.path, "r+b") as f:
+                f.seek(offset)
+                f.write("".join(
+                    data
+                    for (name, key, digest, length, data, old_offset)
+                    in sections
+                    if name in REWRITABLE_SECTIONS
+                ))
+                f.truncate()
+        except IOError:
+            return False
+        return True
 
 
 def write_simple_tag(xmlfile, name, content, indent=""):
@@ -220,3 +536,49 @@ def alert_string(time_type, alert):
     time, text = alert
     time_string = time_type.time_string(time)
     return "%s;%s" % (time_string, text)
+
+
+def _escape_container_tag(text):
+    """
+    A leading space keeps the text of an event from being read back as the
+    container tag of a container or subevent.
+    """
+    if text[:1] in ("(", "["):
+        return " %s" % text
+    return text
+
+
+def _same_key(old_key, new_key):
+    if old_key is None or new_key is None:
+        return False
+    return all(
+        old is new or old == new
+        for (old, new)
+        in zip(old_key, new_key)
+    )
+
+
+def _with_offsets(sections):
+    result = []
+    offset = 0
+    for (name, key, digest, length, data, old_offset) in sections:
+        result.append((name, key, digest, offset, length))
+        offset += length
+    return result
+
+
+def _copy(source, target, length):
+    while length > 0:
+        chunk = source.read(min(length, BUFFER_SIZE))
+        if not chunk:
+            raise IOError("Unexpected end of file")
+        target.write(chunk)
+        length -= len(chunk)
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_size, stat.st_mtime)
@@ -0,0 +1,266 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Read the CSV files written by
+:class:`~timelinelib.plugin.plugins.exporters.timelineexporter.CsvExporter`.
+"""
+
+
+from os.path import abspath
+import csv
+import re
+
+from timelinelib.calendar.gregorian.timetype import GregorianTimeType
+from timelinelib.canvas.data.db import MemoryDB
+from timelinelib.canvas.data.event import DEFAULT_COLOR
+from timelinelib.canvas.data.exceptions import TimelineIOError
+from timelinelib.canvas.data.immutable import ImmutableEvent
+from timelinelib.canvas.data import Category
+from timelinelib.canvas.data import TimePeriod
+from timelinelib.utils import ex_msg
+
+
+DELIMITER = ";"
+COLOR_RE = re.compile(r"^\((\d+), *(\d+), *(\d+)\)$")
+NO_VALUE_TEXTS = (None, u"", u"None")
+EVENT_COLUMNS = {
+    _("Text"): "text",
+    _("Description"): "description",
+    _("Start"): "start",
+    _("End"): "end",
+    _("Category"): "category",
+    _("Fuzzy"): "fuzzy",
+    _("Locked"): "locked",
+    _("Ends Today"): "ends_today",
+    _("Hyperlink"): "hyperlink",
+    _("Progress"): "progress",
+    _("Alert"): "alert",
+    _("Is Container"): "is_container",
+}
+CATEGORY_COLUMNS = {
+    _("Name"): "name",
+    _("Color"): "color",
+    _("Progress Color"): "progress_color",
+    _("Done Color"): "done_color",
+    _("Parent"): "parent",
+}
+
+
+def import_db_from_csv(path, time_type=None, text_encoding="utf-8"):
+    db = MemoryDB()
+    if time_type is None:
+        time_type = GregorianTimeType()
+    db.set_time_type(time_type)
+    import_events_from_csv(db, path, text_encoding)
+    db.clear_transactions()
+    return db
+
+
+def import_events_from_csv(db, path, text_encoding="utf-8"):
+    """
+    Add the events and categories in the CSV file to db in one batch and
+    return the number of added events.
+
+    Categories are matched with the ones in db by name. Categories that are
+    already in db are not changed.
+
+    The file does not say which container a subevent belongs to, so
+    containers are skipped and subevents are added as plain events.
+    Containers are only recognized by the "Is Container" field. Files
+    exported without it give the containers as plain events too.
+
+    Alerts are quoted by the exporter. Files exported before that can not
+    be read if an alert text contains the delimiter, a quote or a line
+    break.
+    """
+    try:
+        with open(path, "rb") as csv_file:
+            with db.batch("Import CSV file"):
+                return CsvLoader(db, text_encoding).load(csv_file)
+    except Exception as e:
+        msg = _("Unable to read from file '%s'.")
+        whole_msg = (msg + "\n\n%s") % (abspath(path), ex_msg(e))
+        raise TimelineIOError(whole_msg)
+
+
+class CsvLoader(object):
+    """
+    Reads the file one row at a time with the csv module.
+
+    Every section starts with a label row, followed by a heading row with
+    the names of the exported fields. Events refer to categories by name and
+    come before the categories section, so categories are created when they
+    are first referred to and updated when the categories section is read.
+
+    Events are saved as immutable values in one transaction so that no
+    Event object has to be created for every row. Time strings repeat a lot
+    in large files, so parsed times are cached.
+
+    Rows of containers are skipped, since their subevents can not be
+    connected to them again. Only the "Is Container" field tells that a row
+    is a container.
+    """
+
+    def __init__(self, db, text_encoding):
+        self._db = db
+        self._time_type = db.get_time_type()
+        self._text_encoding = text_encoding
+        self._existing_categories = dict(
+            (category.get_name(), category)
+            for category
+            in db.get_categories()
+        )
+        self._new_categories = {}
+        self._parent_names = {}
+        self._times = {}
+        self._nbr_of_events = 0
+
+    def load(self, csv_file):
+        sections = {
+            _("Events"): (EVENT_COLUMNS, self._load_event),
+            _("Categories"): (CATEGORY_COLUMNS, self._load_category),
+        }
+        self._sort_order = self._db.get_max_sort_order()
+        rows = self._read_rows(csv_file)
+        with self._db.transaction("Import events") as updater:
+            self._save_event = updater.save_event
+            for row in rows:
+                if not row:
+                    continue
+                if row[0] not in sections:
+                    raise ValueError("Unknown section '%s'" % row[0])
+                columns, load_fn = sections[row[0]]
+                self._load_section(rows, columns, load_fn)
+        self._save_new_categories()
+        return self._nbr_of_events
+
+    def _load_section(self, rows, columns, load_fn):
+        keys = [columns.get(name) for name in next(rows, [])]
+        for row in rows:
+            if not row:
+                break
+            load_fn(dict(zip(keys, row)))
+
+    def _read_rows(self, csv_file):
+        encoding = self._text_encoding
+        for row in csv.reader(csv_file, delimiter=DELIMITER):
+            if row and row[-1] == "":
+                # Every row written by the exporter ends with a delimiter
+                del row[-1]
+            yield [field.decode(encoding) for field in row]
+
+    def _load_event(self, values):
+        if values.get("is_container") == u"True":
+            return
+        start = self._parse_time(values["start"])
+        end = values.get("end")
+        if end is None:
+            end = start
+        else:
+            end = self._parse_time(end)
+        category = self._get_category(values.get("category"))
+        progress = values.get("progress")
+        alert = values.get("alert")
+        self._sort_order += 1
+        self._save_event(ImmutableEvent(
+            text=values.get("text", u"").strip(),
+            time_period=TimePeriod(start, end),
+            category_id=None if category is None else category.id,
+            fuzzy=values.get("fuzzy") == u"True",
+            locked=values.get("locked") == u"True",
+            ends_today=values.get("ends_today") == u"True",
+            description=values.get("description") or None,
+            hyperlink=None if values.get("hyperlink") in NO_VALUE_TEXTS else values["hyperlink"],
+            progress=None if progress in NO_VALUE_TEXTS else int(progress),
+            alert=self._parse_alert(alert) if alert else None,
+            sort_order=self._sort_order
+        ), self._db.next_id())
+        self._nbr_of_events += 1
+
+    def _load_category(self, values):
+        name = values["name"]
+        if name in self._existing_categories:
+            return
+        category = self._get_category(name)
+        if "color" in values:
+            category.update(name, parse_color(values["color"]), None)
+        if "progress_color" in values:
+            category.progress_color = parse_color(values["progress_color"])
+        if "done_color" in values:
+            category.done_color = parse_color(values["done_color"])
+        self._parent_names[name] = values.get("parent")
+
+    def _get_category(self, name):
+        if name in NO_VALUE_TEXTS:
+            return None
+        elif name in self._existing_categories:
+            return self._existing_categories[name]
+        elif name not in self._new_categories:
+            category = Category().update(name, DEFAULT_COLOR, None)
+            self._db.save_category(category)
+            self._new_categories[name] = category
+        return self._new_categories[name]
+
+    def _save_new_categories(self):
+        for name, category in self._new_categories.iteritems():
+            category.parent = self._get_parent(self._parent_names.get(name))
+        for category in self._new_categories.values():
+            category.save()
+
+    def _get_parent(self, name):
+        if name in self._existing_categories:
+            return self._existing_categories[name]
+        else:
+            return self._new_categories.get(name)
+
+    def _parse_time(self, text):
+        try:
+            return self._times[text]
+        except KeyError:
+            time = self._times[text] = self._time_type.parse_time(text)
+            return time
+
+    def _parse_alert(self, text):
+        """
+        The alert is written as the time string followed by the alert text,
+        and time strings can contain spaces.
+        """
+        parts = text.split(u" ")
+        for index in range(1, len(parts) + 1):
+            try:
+                time = self._parse_time(u" ".join(parts[:index]))
+            except ValueError:
+                continue
+            return (time, u" ".join(parts[index:]))
+        raise ValueError("Could not parse alert from '%s'." % text)
+
+
+def parse_color(color_string):
+    """
+    Expected format '(r, g, b)'.
+
+    Return a tuple (r, g, b).
+
+    >>> parse_color("(255, 0, 10)")
+    (255, 0, 10)
+    """
+    match = COLOR_RE.search(color_string)
+    if match is None:
+        raise ValueError("Color not on correct format = '%s'" % color_string)
+    return tuple(int(number) for number in match.groups())
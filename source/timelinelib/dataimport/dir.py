@@ -17,27 +17,65 @@
 
 
 from datetime import datetime
+from multiprocessing.pool import ThreadPool
+import collections
 import colorsys
+import json
 import os.path
 
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
 from timelinelib.calendar.gregorian.gregorian import GregorianDateTime
 from timelinelib.canvas.data.db import MemoryDB
 from timelinelib.canvas.data.exceptions import TimelineIOError
 from timelinelib.canvas.data import Category
 from timelinelib.canvas.data import Event
+from timelinelib.db.utils import safe_write
+
+
+STAT_THREADS = 8
+STAT_CHUNK_SIZE = 256
+PROGRESS_INTERVAL = 1000
+MANIFEST_VERSION = 1
 
 
-def import_db_from_dir(path):
+class ImportCancelledError(Exception):
+    """Raised when the import is cancelled from the progress function."""
+    pass
+
+
+def import_db_from_dir(path, progress_fn=None, manifest_path=None):
+    """
+    progress_fn(done, total) is called now and then while the directory is
+    read. total is None while files are still being found. If it returns
+    False, the import is stopped and ImportCancelledError is raised.
+
+    The returned db can be refreshed with db.refresh(progress_fn). Only the
+    events of files that have been added, changed, or removed since the
+    directory was last read are changed then.
+
+    If manifest_path is given, what was read from the directory is stored
+    there. The next import of the same directory is then made from the
+    manifest alone, with the same ids, without reading the directory. The
+    changes made to the directory in between are read by the next refresh.
+    """
     db = MemoryDB()
     db.set_readonly()
-    _load(db, path)
-    db.clear_transactions()
+    scanner = DirectoryScanner(db, path, manifest_path)
+    scanner.load(progress_fn)
+    db.register_refresh_callback(scanner.rescan)
     return db
 
 
-def _load(db, dir_path):
+class DirectoryScanner(object):
     """
-    Load timeline data from the given directory.
+    Keeps the categories and events of a db in sync with a directory.
 
     Each filename inside the directory (at any level) becomes an event where
     the text is the filename name and the time is the modification time for
@@ -45,54 +83,346 @@ def _load(db, dir_path):
 
     For each sub-directory a category is created and all events (files)
     belong the category (directory) in which they are.
+
+    The scanner keeps a manifest with the modification time, size, and event
+    id of every file, so a rescan only has to change the events of files
+    that have changed. The modification times are read by a pool of threads,
+    and all changes are saved to the db in one batch.
+    """
+
+    def __init__(self, db, root_path, manifest_path=None):
+        self._db = db
+        self._root_path = os.path.normpath(root_path)
+        self._manifest_path = manifest_path
+        self._dir_paths = []
+        self._categories = {}
+        self._files = {}
+
+    def load(self, progress_fn=None):
+        """
+        Read the directory, or only the stored manifest if there is one.
+        """
+        manifest = read_manifest(self._manifest_path, self._root_path)
+        if manifest is None:
+            self.rescan(progress_fn)
+        else:
+            self._load_manifest(*manifest)
+
+    def _load_manifest(self, directories, files):
+        ids = dict(directories)
+        for (path, _, _, event_id) in files:
+            ids[path] = event_id
+        self._db.reserve_ids(max(ids.values() + [0]))
+        self._apply(
+            [dir_path for (dir_path, _) in directories],
+            [(path, mtime, size) for (path, mtime, size, _) in files],
+            ids
+        )
+        self._db.clear_transactions()
+
+    def rescan(self, progress_fn=None):
+        """
+        Bring the db up to date with the directory and return the number of
+        categories and events that were changed.
+        """
+        try:
+            if os.path.isdir(self._root_path):
+                (dir_paths, files) = _read_tree(self._root_path, Progress(progress_fn))
+            else:
+                (dir_paths, files) = ([], [])
+            changes = self._apply(dir_paths, files)
+        except ImportCancelledError:
+            raise
+        except Exception as e:
+            msg = _("Unable to read from filename '%s'.") % self._root_path
+            whole_msg = "%s\n\n%s" % (msg, e)
+            print(whole_msg)
+            raise TimelineIOError(whole_msg)
+        self._db.clear_transactions()
+        self._write_manifest()
+        return changes
+
+    def get_manifest(self):
+        """
+        Return (directories, files), where directories is a list of
+        (dir_path, category_id) and files a list of
+        (path, mtime, size, event_id).
+        """
+        return (
+            [
+                (dir_path, self._categories[dir_path].id)
+                for dir_path
+                in self._dir_paths
+            ],
+            [
+                (path, mtime, size, event_id)
+                for (path, (mtime, size, event_id))
+                in sorted(self._files.items())
+            ]
+        )
+
+    def _apply(self, dir_paths, files, ids=None):
+        """
+        Categories and events for new directories and files get the ids in
+        ids, if they are in there.
+        """
+        if ids is None:
+            ids = {}
+        db = self._db
+        changes = 0
+        with db.batch("Read directory"):
+            new_categories = self._add_categories(dir_paths, ids)
+            changes += len(new_categories)
+            changed_files = []
+            changed_events = []
+            times = {}
+            for (path, mtime, size) in files:
+                if path in self._files:
+                    (old_mtime, old_size, event_id) = self._files[path]
+                    if (mtime, size) == (old_mtime, old_size):
+                        continue
+                    self._files[path] = (mtime, size, event_id)
+                    if mtime == old_mtime:
+                        continue
+                if mtime not in times:
+                    times[mtime] = _time_from_mtime(mtime)
+                time = times[mtime]
+                if path in self._files:
+                    event = db.find_event_with_id(event_id)
+                    event.update_period(time, time)
+                else:
+                    event = Event().update(
+                        time,
+                        time,
+                        os.path.basename(path),
+                        self._categories[os.path.dirname(path)]
+                    ).set_id(ids.get(path))
+                changed_files.append((path, mtime, size))
+                changed_events.append(event)
+            db.save_events(changed_events)
+            for ((path, mtime, size), event) in zip(changed_files, changed_events):
+                self._files[path] = (mtime, size, event.id)
+            changes += len(changed_events)
+            changes += self._remove_files(set(path for (path, _, _) in files))
+            changes += self._remove_categories(set(dir_paths))
+        self._dir_paths = list(dir_paths)
+        if new_categories:
+            # Hide all categories but the first
+            db.set_hidden_categories(db.get_hidden_categories() + [
+                category
+                for category
+                in new_categories
+                if category is not self._categories[self._root_path]
+            ])
+        return changes
+
+    def _add_categories(self, dir_paths, ids):
+        new_dir_paths = [
+            dir_path
+            for dir_path
+            in dir_paths
+            if dir_path not in self._categories
+        ]
+        if not new_dir_paths:
+            return []
+        color_ranges = _color_ranges(dir_paths)
+        used_names = [category.get_name() for category in self._db.get_categories()]
+        new_categories = []
+        for dir_path in new_dir_paths:
+            category = Category().update(
+                get_unique_cat_name(os.path.basename(dir_path), used_names),
+                _color_from_range(color_ranges[dir_path]),
+                None,
+                parent=self._categories.get(os.path.dirname(dir_path))
+            ).set_id(ids.get(dir_path))
+            self._db.save_category(category)
+            self._categories[dir_path] = category
+            new_categories.append(category)
+        return new_categories
+
+    def _remove_files(self, paths):
+        removed_paths = [path for path in self._files if path not in paths]
+        for path in removed_paths:
+            (_, _, event_id) = self._files.pop(path)
+            self._db.delete_event(event_id)
+        return len(removed_paths)
+
+    def _remove_categories(self, dir_paths):
+        removed_dir_paths = [
+            dir_path
+            for dir_path
+            in self._dir_paths
+            if dir_path not in dir_paths
+        ]
+        # Sub-directories come after their parents
+        for dir_path in reversed(removed_dir_paths):
+            self._db.delete_category(self._categories.pop(dir_path))
+        return len(removed_dir_paths)
+
+    def _write_manifest(self):
+        if self._manifest_path is not None:
+            write_manifest(self._manifest_path, self._root_path,
+                           *self.get_manifest())
+
+
+def read_manifest(path, root_path):
+    """
+    Return (directories, files) stored in the manifest at path, as returned
+    by DirectoryScanner.get_manifest.
+
+    None is returned if there is no usable manifest for root_path at path.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            manifest = json.load(f)
+        if (manifest["version"] != MANIFEST_VERSION or
+                manifest["root"] != root_path):
+            return None
+        directories = [
+            (dir_path, int(category_id))
+            for (dir_path, category_id)
+            in manifest["directories"]
+        ]
+        files = [
+            (file_path, int(mtime), int(size), int(event_id))
+            for (file_path, mtime, size, event_id)
+            in manifest["files"]
+        ]
+    except (EnvironmentError, ValueError, KeyError, TypeError):
+        return None
+    dir_paths = set(dir_path for (dir_path, _) in directories)
+    for (file_path, _, _, _) in files:
+        if os.path.dirname(file_path) not in dir_paths:
+            return None
+    ids = (
+        [category_id for (_, category_id) in directories] +
+        [event_id for (_, _, _, event_id) in files]
+    )
+    if len(set(ids)) != len(ids):
+        return None
+    return (directories, files)
+
+
+def write_manifest(path, root_path, directories, files):
+    """
+    The manifest is only a way to read the directory faster, so failing to
+    write it is not an error.
     """
-    if not os.path.exists(dir_path):
-        # Nothing to load
-        return
-    if not os.path.isdir(dir_path):
-        # Nothing to load
-        return
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "root": root_path,
+        "directories": directories,
+        "files": files,
+    }
     try:
-        color_ranges = {}  # Used to color categories
-        color_ranges[dir_path] = (0.0, 1.0, 1.0)
-        all_cats = []
-        parents = {}
-        for (dirpath, dirnames, filenames) in os.walk(dir_path):
-            # Assign color ranges
-            (rstart, rend, b) = color_ranges[dirpath]
-            step = (rend - rstart) / (len(dirnames) + 1)
-            next_start = rstart + step
-            new_b = b - 0.2
-            if new_b < 0:
-                new_b = 0
-            for dirname in dirnames:
-                next_end = next_start + step
-                color_ranges[os.path.join(dirpath, dirname)] = (next_start, next_end, new_b)
-                next_start = next_end
-            # Create the stuff
-            p = parents.get(os.path.normpath(os.path.join(dirpath, "..")),
-                            None)
-            cat = Category().update(dirpath, (233, 233, 233), None, parent=p)
-            parents[os.path.normpath(dirpath)] = cat
-            all_cats.append(cat)
-            db.save_category(cat)
-            for filename in filenames:
-                path_inner = os.path.join(dirpath, filename)
-                evt = _event_from_path(db, path_inner)
-                db.save_event(evt)
-        # Hide all categories but the first
-        db.set_hidden_categories(all_cats[1:])
-        # Set colors and change names
-        used_names = []
-        for cat in db.get_categories():
-            cat.color = _color_from_range(color_ranges[cat.name])
-            cat.name = get_unique_cat_name(os.path.basename(cat.name), used_names)
-            db.save_category(cat)
-    except Exception as e:
-        msg = _("Unable to read from filename '%s'.") % dir_path
-        whole_msg = "%s\n\n%s" % (msg, e)
-        print(whole_msg)
-        raise TimelineIOError(whole_msg)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        safe_write(path, None, lambda f: json.dump(manifest, f))
+    except (EnvironmentError, TimelineIOError):
+        pass
+
+
+class Progress(object):
+
+    def __init__(self, progress_fn):
+        self._progress_fn = progress_fn
+        self._last_reported = 0
+
+    def report(self, done, total=None, force=False):
+        if self._progress_fn is None:
+            return
+        if not force and done - self._last_reported < PROGRESS_INTERVAL:
+            return
+        self._last_reported = done
+        if self._progress_fn(done, total) is False:
+            raise ImportCancelledError()
+
+
+def _read_tree(root_path, progress):
+    """
+    Return (dir_paths, files) for the directory at root_path, where files is
+    a list of (path, mtime, size).
+
+    Directories are listed with parents before their children, in the same
+    order as os.walk. Files that disappear or can not be read while the
+    directory is read are left out.
+    """
+    dir_paths = []
+    file_paths = []
+    for (dir_path, paths) in _walk(root_path, progress):
+        dir_paths.append(dir_path)
+        file_paths.extend(paths)
+    files = []
+    for (path, stat) in zip(file_paths, _read_stats(file_paths, progress)):
+        if stat is not None:
+            files.append((path,) + stat)
+    return (dir_paths, files)
+
+
+def _walk(root_path, progress):
+    found = 0
+    stack = [root_path]
+    while stack:
+        dir_path = stack.pop()
+        try:
+            (sub_dir_paths, file_paths) = _list_dir(dir_path)
+        except EnvironmentError:
+            # Unreadable directories are left out like os.walk does
+            continue
+        yield (dir_path, file_paths)
+        stack.extend(reversed(sub_dir_paths))
+        found += len(file_paths) + 1
+        progress.report(found)
+
+
+def _list_dir(dir_path):
+    """
+    Return (sub_dir_paths, file_paths) for the entries in dir_path.
+
+    Links to directories are neither followed nor seen as files.
+    """
+    sub_dir_paths = []
+    file_paths = []
+    if scandir is not None:
+        for entry in scandir(dir_path):
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    sub_dir_paths.append(entry.path)
+            else:
+                file_paths.append(entry.path)
+    else:
+        for name in os.listdir(dir_path):
+            path = os.path.join(dir_path, name)
+            if os.path.isdir(path):
+                if not os.path.islink(path):
+                    sub_dir_paths.append(path)
+            else:
+                file_paths.append(path)
+    return (sub_dir_paths, file_paths)
+
+
+def _read_stats(file_paths, progress):
+    stats = []
+    progress.report(0, len(file_paths), force=True)
+    pool = ThreadPool(STAT_THREADS)
+    try:
+        for stat in pool.imap(_read_stat, file_paths, STAT_CHUNK_SIZE):
+            progress.report(len(stats), len(file_paths))
+            stats.append(stat)
+        progress.report(len(file_paths), len(file_paths), force=True)
+    finally:
+        pool.terminate()
+    return stats
+
+
+def _read_stat(file_path):
+    try:
+        stat = os.stat(file_path)
+    except EnvironmentError:
+        return None
+    return (int(stat.st_mtime), stat.st_size)
 
 
 def get_unique_cat_name(name, used_names):
@@ -107,28 +437,35 @@ def get_unique_cat_name(name, used_names):
     return cat_name
 
 
-def _event_from_path(db, file_path):
-    stat = os.stat(file_path)
-    # st_atime (time of most recent access),
-    # st_mtime (time of most recent content modification),
-    # st_ctime (platform dependent; time of most recent metadata change on
-    #           Unix, or the time of creation on Windows):
-    dt = datetime.fromtimestamp(int(stat.st_mtime))
-    start_time = GregorianDateTime(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second).to_time()
-    end_time = start_time
-    if start_time > end_time:
-        start_time, end_time = end_time, start_time
-    text = os.path.basename(file_path)
-    category = _category_from_path(db, file_path)
-    evt = Event().update(start_time, end_time, text, category)
-    return evt
-
-
-def _category_from_path(db, file_path):
-    for cat in db.get_categories():
-        if cat.name == os.path.dirname(file_path):
-            return cat
-    return None
+def _time_from_mtime(mtime):
+    # st_mtime is the time of most recent content modification
+    dt = datetime.fromtimestamp(mtime)
+    return GregorianDateTime(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second).to_time()
+
+
+def _color_ranges(dir_paths):
+    """
+    Return a dict from each directory to the range of hues for its color.
+
+    The range of a directory is split between itself and its
+    sub-directories, and sub-directories get less saturated colors.
+    """
+    children = collections.defaultdict(list)
+    for dir_path in dir_paths[1:]:
+        children[os.path.dirname(dir_path)].append(dir_path)
+    ranges = {}
+    if dir_paths:
+        ranges[dir_paths[0]] = (0.0, 1.0, 1.0)
+    for dir_path in dir_paths:
+        (rstart, rend, b) = ranges[dir_path]
+        step = (rend - rstart) / (len(children[dir_path]) + 1)
+        next_start = rstart + step
+        new_b = max(b - 0.2, 0)
+        for sub_dir_path in children[dir_path]:
+            next_end = next_start + step
+            ranges[sub_dir_path] = (next_start, next_end, new_b)
+            next_start = next_end
+    return ranges
 
 
 def _color_from_range(color_range):
@@ -16,13 +16,9 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from datetime import date
-from datetime import datetime
-from datetime import timedelta
 from os.path import abspath
 import random
-
-from icalendar import Calendar
+import re
 
 from timelinelib.calendar.gregorian.gregorian import GregorianDateTime
 from timelinelib.calendar.gregorian.time import GregorianDelta
@@ -34,46 +30,94 @@ from timelinelib.utils import ex_msg
 from timelinelib.wxgui.utils import display_warning_message
 
 
+LOADED_COMPONENTS = ("VEVENT", "VTODO")
+USED_PROPERTIES = frozenset([
+    "CATEGORIES",
+    "DESCRIPTION",
+    "DTEND",
+    "DTSTART",
+    "DUE",
+    "DURATION",
+    "LOCATION",
+    "SUMMARY",
+    "TRIGGER",
+])
+PROPERTY_NAME_RE = re.compile(r"([A-Za-z0-9_-]+)[;:]")
+PARAMETER_VALUE = r'(?:"[^"]*"|[^";:,]*)'
+PROPERTY_RE = re.compile(
+    r'([A-Za-z0-9_-]+)((?:;[A-Za-z0-9_-]+=%s(?:,%s)*)*):(.*)$' % (
+        PARAMETER_VALUE, PARAMETER_VALUE
+    ),
+    re.DOTALL
+)
+PARAMETER_RE = re.compile(
+    r';([A-Za-z0-9_-]+)=(%s(?:,%s)*)' % (PARAMETER_VALUE, PARAMETER_VALUE)
+)
+TEXT_ESCAPE_RE = re.compile(r"\\([\\;,nN])")
+LIST_SEPARATOR_RE = re.compile(r"(?<!\\),")
+DATE_TIME_RE = re.compile(r"(\d{4})(\d{2})(\d{2})(?:T(\d{2})(\d{2})(\d{2})Z?)?$")
+DURATION_RE = re.compile(
+    r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+
+
 class IcsLoader(object):
+    """
+    Reads the VEVENTs and VTODOs of an ics file one at a time with
+    :func:`read_components` and saves them to the db in one batch.
+    """
 
     def load(self, db, path, options):
         self.vevents_not_loaded = []
         (self.add_location_to_description,
          self.use_trigger_as_start_date,
          self.use_trigger_as_alert) = options
-        self.events = []
-        self.categories = []
-        self.category_names = []
-        file_contents = self._read_file_content(path)
-        cal = self._read_calendar_object(file_contents)
-        self._load_events(cal, db)
-        self._load_todos(cal, db)
-        self._save_data_in_db(db)
+        self.categories = {}
+        ics_file = self._open_file(path)
+        try:
+            with db.batch("Import calendar"):
+                for component in self._read_components(ics_file):
+                    category = self._load_categories(db, component)
+                    if component.name == "VEVENT":
+                        self._load_vevent(db, component, category)
+                    else:
+                        self._load_vtodo(db, component, category)
+        finally:
+            ics_file.close()
         self._report_on_vevents_not_loaded()
 
-    def _load_events(self, cal, db):
-        for vevent in cal.walk("VEVENT"):
-            self._load_vevent(db, vevent)
-            self._load_categories(vevent)
+    def _open_file(self, path):
+        try:
+            return open(path, "rb")
+        except IOError as e:
+            msg = _("Unable to read from file '%s'.")
+            whole_msg = (msg + "\n\n%s") % (abspath(path), e)
+            raise TimelineIOError(whole_msg)
 
-    def _load_todos(self, cal, db):
-        for vtodo in cal.walk("VTODO"):
-            self._load_vtodo(db, vtodo)
-            self._load_categories(vtodo)
+    def _read_components(self, ics_file):
+        try:
+            for component in read_components(ics_file, LOADED_COMPONENTS):
+                yield component
+        except (ValueError, IOError) as pe:
+            msg1 = _("Unable to read calendar data.")
+            msg2 = "\n\n" + ex_msg(pe)
+            raise TimelineIOError(msg1 + msg2)
 
-    def _load_vtodo(self, db, vtodo):
+    def _load_vtodo(self, db, vtodo, category):
+        if "DUE" not in vtodo:
+            return
+        (txt, start, end) = (self._get_event_name(vtodo), None, None)
         try:
-            start, end = self._extract_todo_start_end(vtodo)
-            txt = self._get_event_name(vtodo)
-            event = Event().update(start, end, txt)
+            (start, end) = self._extract_todo_start_end(vtodo)
+            event = Event().update(start, end, txt, category)
             event.set_description(self._extract_todo_description(vtodo))
             event.set_alert(self._extract_todo_alert(vtodo))
-            self.events.append(event)
-        except KeyError:
-            pass
+            db.save_event(event)
+        except Exception:
+            self.vevents_not_loaded.append((txt, start, end))
 
     def _extract_todo_start_end(self, vtodo):
-        end = self._extract_todo_end(vtodo)
+        end = parse_date_time(vtodo.get_value("DUE"))
         if self.use_trigger_as_start_date:
             start = self._extract_todo_start(vtodo)
             if start is None:
@@ -82,26 +126,20 @@ class IcsLoader(object):
             start = end
         return start, end
 
-    def _extract_todo_end(self, vtodo):
-        end = self._get_value(vtodo, "due")
-        if end:
-            return self._convert_to_datetime(end)
-        else:
-            raise KeyError("Start time not found")
-
     def _extract_todo_start(self, vtodo):
-        valarm = self._get_first_subelement(vtodo, "VALARM")
-        if valarm:
-            start = self._get_value(valarm, "trigger")
-            if start:
-                return self._convert_to_datetime(start)
+        """
+        Only triggers at a given time are used. Triggers relative to the
+        start or end of the todo are ignored.
+        """
+        valarm = vtodo.get_first_subcomponent("VALARM")
+        if valarm is not None and "TRIGGER" in valarm:
+            trigger = valarm.get_value("TRIGGER")
+            if DATE_TIME_RE.match(trigger):
+                return parse_date_time(trigger)
 
     def _extract_todo_description(self, vtodo):
-        if self.add_location_to_description:
-            if "location" in vtodo:
-                return "%s: %s" % (_("Location"), vtodo["location"])
-            else:
-                return None
+        if self.add_location_to_description and "LOCATION" in vtodo:
+            return "%s: %s" % (_("Location"), vtodo.get_text("LOCATION"))
         else:
             return None
 
@@ -111,54 +149,36 @@ class IcsLoader(object):
             if start is not None:
                 return (start, "")
 
-    def _read_calendar_object(self, file_contents):
-        try:
-            return Calendar.from_ical(file_contents)
-        except Exception as pe:
-            msg1 = _("Unable to read calendar data.")
-            msg2 = "\n\n" + ex_msg(pe)
-            raise TimelineIOError(msg1 + msg2)
-
-    def _read_file_content(self, path):
-        ics_file = None
-        try:
-            ics_file = open(path, "rb")
-            return ics_file.read()
-        except IOError as e:
-            msg = _("Unable to read from file '%s'.")
-            whole_msg = (msg + "\n\n%s") % (abspath(path), e)
-            raise TimelineIOError(whole_msg)
-        finally:
-            if ics_file is not None:
-                ics_file.close()
-
-    def _save_data_in_db(self, db):
-        for event in self.events:
-            db.save_event(event)
-        for category in self.categories:
-            db.save_category(category)
-
-    def _load_vevent(self, db, vevent):
+    def _load_vevent(self, db, vevent, category):
+        (txt, start, end) = (self._get_event_name(vevent), None, None)
         try:
-            start, end = self._extract_start_end(vevent)
-            txt = self._get_event_name(vevent)
-            event = Event().update(start, end, txt)
+            (start, end) = self._extract_start_end(vevent)
+            event = Event().update(start, end, txt, category)
             event.set_description(self._get_description(vevent))
-            self.events.append(event)
-        except:
+            db.save_event(event)
+        except Exception:
             self.vevents_not_loaded.append((txt, start, end))
 
-    def _load_categories(self, vevent):
-        if "categories" in vevent:
-            categories_names = [cat.strip() for cat in vevent["categories"].split(",") if len(cat.strip()) > 0]
-            for category_name in categories_names:
-                if category_name not in self.category_names:
-                    self.categories.append(Category().update(
-                        category_name,
-                        self._get_random_color(),
-                        None
-                    ))
-                    self.category_names.append(category_name)
+    def _load_categories(self, db, component):
+        """
+        Save categories that have not been seen before and return the
+        first category of the component.
+        """
+        if "CATEGORIES" not in component:
+            return None
+        first_category = None
+        for category_name in component.get_list("CATEGORIES"):
+            if category_name not in self.categories:
+                category = Category().update(
+                    category_name,
+                    self._get_random_color(),
+                    None
+                )
+                db.save_category(category)
+                self.categories[category_name] = category
+            if first_category is None:
+                first_category = self.categories[category_name]
+        return first_category
 
     def _get_random_color(self):
         return (random.randint(0, 255),
@@ -166,66 +186,33 @@ class IcsLoader(object):
                 random.randint(0, 255))
 
     def _get_event_name(self, vevent):
-        return self._get_first_value(vevent, ["summary", "description"], "")
+        for name in ("SUMMARY", "DESCRIPTION"):
+            if name in vevent:
+                return vevent.get_text(name)
+        return ""
 
     def _get_description(self, vevent):
-        if self.add_location_to_description:
-            if "location" in vevent:
-                sep = ""
-                if "description" in vevent:
-                    sep = "\n\n"
-                return "%s%s%s: %s" % (self._get_value(vevent, "description", ""),
-                                      sep,
-                                      _("Location"),
-                                      self._get_value(vevent, "location", ""))
-            else:
-                return self._get_value(vevent, "description", None)
+        if self.add_location_to_description and "LOCATION" in vevent:
+            sep = ""
+            if "DESCRIPTION" in vevent:
+                sep = "\n\n"
+            return "%s%s%s: %s" % (vevent.get_text("DESCRIPTION", ""),
+                                  sep,
+                                  _("Location"),
+                                  vevent.get_text("LOCATION"))
         else:
-            return self._get_value(vevent, "description", None)
-
-    def _get_first_value(self, element, key_list, not_found_value=None):
-        for key in key_list:
-            if key in element:
-                return element[key]
-        return not_found_value
-
-    def _get_value(self, element, key, not_found_value=None):
-        if key in element:
-            return element.decoded(key)
-        return not_found_value
+            return vevent.get_text("DESCRIPTION", None)
 
     def _extract_start_end(self, vevent):
-        start = self._convert_to_datetime(vevent.decoded("dtstart"))
-        if "dtend" in vevent:
-            end = self._convert_to_datetime(vevent.decoded("dtend"))
-        elif "duration" in vevent:
-            end = start + self._convert_to_timedelta(vevent.decoded("duration"))
+        start = parse_date_time(vevent.get_value("DTSTART"))
+        if "DTEND" in vevent:
+            end = parse_date_time(vevent.get_value("DTEND"))
+        elif "DURATION" in vevent:
+            end = start + parse_duration(vevent.get_value("DURATION"))
         else:
-            end = self._convert_to_datetime(vevent.decoded("dtstart"))
+            end = start
         return (start, end)
 
-    def _convert_to_timedelta(self, t):
-        if isinstance(t, timedelta):
-            return GregorianDelta(t.seconds)
-        else:
-            return GregorianDelta(0)
-
-    def _convert_to_datetime(self, d):
-        if isinstance(d, datetime):
-            return GregorianDateTime(d.year, d.month, d.day, d.hour, d.minute, d.second).to_time()
-        elif isinstance(d, date):
-            return GregorianDateTime.from_ymd(d.year, d.month, d.day).to_time()
-        else:
-            raise TimelineIOError("Unknown date.")
-
-    def _get_first_subelement(self, parent, subelement_name):
-        subelements = self._get_subelements(parent, subelement_name)
-        if len(subelements) > 0:
-            return subelements[0]
-
-    def _get_subelements(self, parent, subelement_name):
-        return parent.walk(subelement_name)
-
     def _report_on_vevents_not_loaded(self):
         if len(self.vevents_not_loaded) > 0:
             message = ("Some events couldn't be loaded!\n" +
@@ -239,14 +226,216 @@ class IcsLoader(object):
                                           self._time_to_text(end)) for txt, start, end in self.vevents_not_loaded][:10])
 
     def _time_to_text(self, time):
+        if time is None:
+            return "?"
         d = "%d-%02d-%02d " % GregorianDateTime.from_time(time).to_date_tuple()
         t = "%02d.%02d.%02d" % GregorianDateTime.from_time(time).to_time_tuple()
         return d + t
 
 
+class IcsComponent(object):
+    """
+    The properties and sub-components of a component in an ics file.
+
+    Values are kept as they are written in the file and are converted when
+    they are read.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.subcomponents = []
+        self._properties = {}
+
+    def __contains__(self, name):
+        return name in self._properties
+
+    def add_property(self, name, parameters, value):
+        if name in self._properties:
+            if name == "CATEGORIES":
+                (parameters, old_value) = self._properties[name]
+                self._properties[name] = (parameters, old_value + "," + value)
+        else:
+            self._properties[name] = (parameters, value)
+
+    def get_value(self, name):
+        return self._properties[name][1]
+
+    def get_text(self, name, not_found_value=None):
+        if name not in self._properties:
+            return not_found_value
+        return unescape_text(self.get_value(name))
+
+    def get_list(self, name):
+        return [
+            item
+            for item
+            in (
+                unescape_text(value).strip()
+                for value
+                in LIST_SEPARATOR_RE.split(self.get_value(name))
+            )
+            if len(item) > 0
+        ]
+
+    def get_first_subcomponent(self, name):
+        for subcomponent in self.subcomponents:
+            if subcomponent.name == name:
+                return subcomponent
+        return None
+
+
+def read_components(lines, component_names):
+    """
+    Yield an IcsComponent for each component named in component_names as
+    soon as its END line has been read from lines.
+
+    Only those components and their sub-components are kept in memory, and
+    only with the properties in USED_PROPERTIES, so files of any size can be
+    read. Other lines are not parsed further than to their name. ValueError
+    is raised if the components are not properly nested.
+    """
+    stack = []
+    for line in unfold_lines(lines):
+        match = PROPERTY_NAME_RE.match(line)
+        if match is None:
+            if len(line.strip()) == 0:
+                continue
+            raise ValueError("Unable to parse line '%s'." % line)
+        name = match.group(1).upper()
+        if name == "BEGIN":
+            value = _component_name(line)
+            stack.append(_begin_component(stack, value, component_names))
+        elif name == "END":
+            value = _component_name(line)
+            if len(stack) == 0 or stack[-1][0] != value:
+                raise ValueError("Did not expect END:%s." % value)
+            (_, component) = stack.pop()
+            if component is not None and (len(stack) == 0 or stack[-1][1] is None):
+                yield component
+        elif len(stack) == 0:
+            raise ValueError("Did not expect %s outside of a component." % name)
+        elif stack[-1][1] is not None and name in USED_PROPERTIES:
+            (_, parameters, value) = parse_property(line)
+            stack[-1][1].add_property(name, parameters, value)
+    if len(stack) > 0:
+        raise ValueError("END:%s is missing." % stack[-1][0])
+
+
+def _component_name(line):
+    return line.split(":", 1)[1].strip().upper()
+
+
+def _begin_component(stack, name, component_names):
+    if len(stack) > 0 and stack[-1][1] is not None:
+        component = IcsComponent(name)
+        stack[-1][1].subcomponents.append(component)
+        return (name, component)
+    if name in component_names:
+        return (name, IcsComponent(name))
+    return (name, None)
+
+
+def unfold_lines(lines):
+    r"""
+    Yield the logical lines in lines, where a line that starts with a space or
+    a tab continues the line before it:
+
+        >>> list(unfold_lines(["A:b\r\n", " c\r\n", "D:\xc3\r\n", "\t\xa4\r\n"]))
+        [u'A:bc', u'D:\xe4']
+    """
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+        else:
+            if current is not None:
+                yield current.decode("utf-8")
+            current = line
+    if current is not None:
+        yield current.decode("utf-8")
+
+
+def parse_property(line):
+    """
+    Return (name, parameters, value) for a content line:
+
+        >>> parse_property(u'DTSTART;TZID="Europe/Stockholm":20180101T120000')
+        (u'DTSTART', {u'TZID': u'"Europe/Stockholm"'}, u'20180101T120000')
+    """
+    match = PROPERTY_RE.match(line)
+    if match is None:
+        raise ValueError("Unable to parse line '%s'." % line)
+    (name, parameters, value) = match.groups()
+    return (
+        name.upper(),
+        dict(
+            (parameter_name.upper(), parameter_value)
+            for (parameter_name, parameter_value)
+            in PARAMETER_RE.findall(parameters)
+        ),
+        value
+    )
+
+
+def unescape_text(value):
+    r"""
+    >>> unescape_text(u"a\\, b\; c\\nd\\\\")
+    u'a, b; c\nd\\'
+    """
+    if "\\" not in value:
+        return value
+    return TEXT_ESCAPE_RE.sub(_unescape_character, value)
+
+
+def _unescape_character(match):
+    if match.group(1) in "nN":
+        return "\n"
+    return match.group(1)
+
+
+def parse_date_time(value):
+    """
+    Return the time of a DATE or DATE-TIME value.
+
+    Times are used as they are written, so UTC times and times in other
+    time zones are not converted to local time.
+    """
+    match = DATE_TIME_RE.match(value)
+    if match is None:
+        raise ValueError("Unknown date '%s'." % value)
+    (year, month, day, hour, minute, second) = match.groups()
+    if hour is None:
+        return GregorianDateTime.from_ymd(int(year), int(month), int(day)).to_time()
+    return GregorianDateTime(int(year), int(month), int(day),
+                             int(hour), int(minute), int(second)).to_time()
+
+
+def parse_duration(value):
+    """
+    Return a GregorianDelta for a DURATION value:
+
+        >>> parse_duration("P1DT2H") == GregorianDelta(26 * 60 * 60)
+        True
+    """
+    match = DURATION_RE.match(value)
+    if match is None:
+        raise ValueError("Unknown duration '%s'." % value)
+    (sign, weeks, days, hours, minutes, seconds) = match.groups()
+    total = 0
+    for (amount, unit_seconds) in ((weeks, 7 * 24 * 60 * 60),
+                                   (days, 24 * 60 * 60),
+                                   (hours, 60 * 60),
+                                   (minutes, 60),
+                                   (seconds, 1)):
+        if amount is not None:
+            total += int(amount) * unit_seconds
+    if sign == "-":
+        total = -total
+    return GregorianDelta(total)
+
+
 def import_db_from_ics(path, options_dialog=None, options=None):
-    global events
-    events = []
     if options is None:
         options = [False, False, False]
     db = MemoryDB()
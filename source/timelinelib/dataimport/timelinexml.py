@@ -18,6 +18,7 @@
 
 from os.path import abspath
 import base64
+import os
 import re
 import shutil
 import StringIO
@@ -39,6 +40,12 @@ from timelinelib.canvas.data import Subevent
 from timelinelib.canvas.data import TimePeriod
 from timelinelib.canvas.data.milestone import Milestone
 from timelinelib.db.utils import create_non_exising_path
+from timelinelib.db.utils import is_gzip_path
+from timelinelib.db.utils import open_for_reading
+from timelinelib.general.lazyvalue import CompressedText
+from timelinelib.general.lazyvalue import LazyValue
+from timelinelib.general.mappedxmlparser import parse_mapped
+from timelinelib.general.mappedxmlparser import UnsupportedXmlError
 from timelinelib.general.xmlparser import ANY
 from timelinelib.general.xmlparser import OPTIONAL
 from timelinelib.general.xmlparser import parse
@@ -48,11 +55,40 @@ from timelinelib.general.xmlparser import Tag
 from timelinelib.utils import ex_msg
 
 
+MAPPED_PARSE_MIN_SIZE = 4 * 1024 * 1024
+LAZY_TAG_NAMES = ("description", "hyperlink", "icon")
+COMPRESSED_DESCRIPTION_MIN_LENGTH = 1024
+
+
 def import_db_from_timeline_xml(path):
+    if can_parse_mapped(path):
+        try:
+            return _import_db(path, mapped=True)
+        except UnsupportedXmlError:
+            pass
+    return _import_db(path, mapped=False)
+
+
+def can_parse_mapped(path):
+    """
+    Large files are memory mapped so that descriptions, hyperlinks, and icons
+    can be read from the file when they are needed.
+
+    Windows does not allow a mapped file to be renamed, and that would make
+    it impossible to save the timeline, so files are never mapped there.
+    """
+    return (
+        os.name != "nt" and
+        not is_gzip_path(path) and
+        os.path.getsize(path) >= MAPPED_PARSE_MIN_SIZE
+    )
+
+
+def _import_db(path, mapped):
     db = MemoryDB()
     db.path = path
     db.set_time_type(GregorianTimeType())
-    Parser(db, path).parse()
+    Parser(db, path, mapped).parse()
     db.clear_transactions()
     return db
 
@@ -64,9 +100,10 @@ class ParseException(Exception):
 
 class Parser(object):
 
-    def __init__(self, db, path):
+    def __init__(self, db, path, mapped=False):
         self.db = db
         self.path = path
+        self.mapped = mapped
         self._containers_by_cid = {}
 
     def parse(self):
@@ -83,7 +120,16 @@ class Parser(object):
                 "category_map": {},
                 "hidden_categories": [],
             }
-            parse(self.path, partial_schema, tmp_dict)
+            with self.db.batch("Read timeline"):
+                if self.mapped:
+                    parse_mapped(self.path, partial_schema, tmp_dict, LAZY_TAG_NAMES)
+                elif is_gzip_path(self.path):
+                    with open_for_reading(self.path) as xml:
+                        parse(xml, partial_schema, tmp_dict)
+                else:
+                    parse(self.path, partial_schema, tmp_dict)
+        except UnsupportedXmlError:
+            raise
         except Exception as e:
             msg = _("Unable to read timeline data from '%s'.")
             whole_msg = (msg + "\n\n%s") % (abspath(self.path), ex_msg(e))
@@ -217,12 +263,14 @@ class Parser(object):
             category = tmp_dict["category_map"].get(category_text, None)
             if category is None:
                 raise ParseException("Category '%s' not found." % category_text)
-        description = tmp_dict.pop("tmp_description", None)
+        description = compress_long_description(tmp_dict.pop("tmp_description", None))
         alert_string = tmp_dict.pop("tmp_alert", None)
         alert = parse_alert_string(self.db.get_time_type(), alert_string)
         icon_text = tmp_dict.pop("tmp_icon", None)
         if icon_text is None:
             icon = None
+        elif isinstance(icon_text, LazyValue):
+            icon = icon_text.parsed_with(parse_lazy_icon)
         else:
             icon = parse_icon(icon_text)
         hyperlink = tmp_dict.pop("tmp_hyperlink", None)
@@ -373,6 +421,30 @@ def parse_icon(string):
         raise ParseException("Could not parse icon from '%s'." % string)
 
 
+def compress_long_description(description):
+    """
+    Long descriptions that are not read lazily from a mapped file are kept
+    compressed in memory until they are needed.
+    """
+    if (isinstance(description, basestring) and
+            len(description) >= COMPRESSED_DESCRIPTION_MIN_LENGTH):
+        return LazyValue(CompressedText(description))
+    return description
+
+
+def parse_lazy_icon(string):
+    """
+    Like parse_icon, but return None if the icon can not be parsed.
+
+    A lazy icon is parsed long after the file has been read, when there is no
+    longer a way to report errors in the file.
+    """
+    try:
+        return parse_icon(string)
+    except ParseException:
+        return None
+
+
 def parse_alert_string(time_type, alert_string):
     if alert_string is not None:
         try:
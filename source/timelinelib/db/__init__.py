@@ -16,6 +16,7 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import hashlib
 import os.path
 import tempfile
 
@@ -38,6 +39,7 @@ def db_open(path, timetype=None):
       - special string ":tutorial:"
       - special string ":numtutorial:
       - string with suffix .timeline
+      - string with suffix .timeline.gz
       - string with suffix .ics
       - string denoting a directory
     """
@@ -47,7 +49,7 @@ def db_open(path, timetype=None):
         return open_numeric_tutorial_timeline(path)
     elif os.path.isdir(path):
         return open_directory_timeline(path)
-    elif path.endswith(".timeline"):
+    elif path.endswith(".timeline") or path.endswith(".timeline.gz"):
         return db_open_timeline(path, timetype)
     elif path.endswith(".ics"):
         return db_open_ics(path)
@@ -73,11 +75,37 @@ def open_numeric_tutorial_timeline(path):
 
 def open_directory_timeline(path):
     from timelinelib.dataimport.dir import import_db_from_dir
-    db = import_db_from_dir(path)
+    from timelinelib.dataimport.dir import ImportCancelledError
+    from timelinelib.wxgui.utils import ProgressDialog
+    progress_dialog = ProgressDialog(_("Reading directory"), path)
+    try:
+        db = import_db_from_dir(path, progress_dialog,
+                                get_directory_manifest_path(path))
+    except ImportCancelledError:
+        raise TimelineIOError(_("Reading of directory '%s' was cancelled.") % path)
+    finally:
+        progress_dialog.close()
     db.path = path
     return db
 
 
+def get_directory_manifest_path(path):
+    """
+    Manifests of directory timelines are kept among the user's data, with
+    names made from the path of the directory.
+    """
+    import wx
+    abspath = os.path.abspath(path)
+    if isinstance(abspath, unicode):
+        abspath = abspath.encode("utf-8")
+    digest = hashlib.sha1(abspath).hexdigest()
+    return os.path.join(
+        wx.StandardPaths.Get().GetUserDataDir(),
+        "directories",
+        "%s.json" % digest
+    )
+
+
 def db_open_timeline(path, timetype=None):
     if (os.path.exists(path) and file_starts_with(path, "# Written by Timeline ")):
         raise TimelineIOError(_("You are trying to open an old file with a new version of timeline. Please install version 0.21.1 of timeline to convert it to the new format."))
@@ -103,9 +131,11 @@ def db_open_newtype_timeline(path, timetype=None):
         else:
             db.set_time_type(timetype)
 
+    from timelinelib.dataexport.timelinexml import TimelineFile
+    timeline_file = TimelineFile(path)
+
     def save_callback():
-        from timelinelib.dataexport.timelinexml import export_db_to_timeline_xml
-        export_db_to_timeline_xml(db, path)
+        timeline_file.save(db)
     db.register_save_callback(save_callback)
     db.set_should_lock(True)
     return db
@@ -122,14 +152,9 @@ def dir_is_read_only(path):
 
 
 def db_open_ics(path):
-    try:
-        import icalendar
-        from timelinelib.wxgui.dialogs.importics.view import ImportIcsDialog
-    except ImportError:
-        raise TimelineIOError(_("Could not find iCalendar Python package. It is required for working with ICS files."))
-    else:
-        from timelinelib.dataimport.ics import import_db_from_ics
-        return import_db_from_ics(path, ImportIcsDialog)
+    from timelinelib.dataimport.ics import import_db_from_ics
+    from timelinelib.wxgui.dialogs.importics.view import ImportIcsDialog
+    return import_db_from_ics(path, ImportIcsDialog)
 
 
 def file_starts_with(path, start):
@@ -137,8 +162,9 @@ def file_starts_with(path, start):
 
 
 def read_first_line(path):
+    from timelinelib.db.utils import open_for_reading
     try:
-        f = open(path)
+        f = open_for_reading(path)
         try:
             line = f.readline()
             return line
@@ -33,6 +33,10 @@ class ContainerStrategy(object):
         """Update container properties when adding a new sub-event."""
         raise NotImplementedError()
 
+    def sort_order_changed(self, subevent):
+        """Called when the sort order of a registered sub-event has changed."""
+        raise NotImplementedError()
+
     def allow_ends_today_on_subevents(self):
         """Allow to set the ends-today attribute on container subevents"""
         raise NotImplementedError()
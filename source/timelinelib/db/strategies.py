@@ -17,6 +17,7 @@
 
 
 from timelinelib.db.interface import ContainerStrategy
+from timelinelib.db.subeventindex import SubeventIndex
 from timelinelib.canvas.data.subevent import Subevent
 
 
@@ -24,6 +25,8 @@ class DefaultContainerStrategy(ContainerStrategy):
 
     def __init__(self, container):
         ContainerStrategy.__init__(self, container)
+        self._index = None
+        self._update_count = 0
 
     def register_subevent(self, subevent):
         if not isinstance(subevent, Subevent):
@@ -34,31 +37,28 @@ class DefaultContainerStrategy(ContainerStrategy):
                 self._adjust_time_period(subevent)
 
     def _append_subevent(self, subevent):
-        self.container.subevents.append(subevent)
-        self._sort_subevents()
-
-    def _sort_subevents(self):
-        without_sort_order = []
-        with_sort_order = []
-        for subevent in self.container.subevents:
-            if subevent.sort_order is None:
-                without_sort_order.append(subevent)
-            else:
-                with_sort_order.append(subevent)
-        self.container.subevents = sorted(
-            with_sort_order,
-            key=lambda subevent: subevent.sort_order
-        ) + without_sort_order
+        self._get_index().add(subevent)
+        self.container.clear_cached_values()
 
     def unregister_subevent(self, subevent):
         if self._is_subevent_missing(subevent):
             return
-        self.container.subevents.remove(subevent)
+        self._get_index().remove(subevent)
+        self.container.clear_cached_values()
 
     def update(self, subevent):
+        self._update_count += 1
         self.unregister_subevent(subevent)
         self.register_subevent(subevent)
 
+    def sort_order_changed(self, subevent):
+        self._get_index().sort_order_changed()
+
+    def _get_index(self):
+        if self._index is None or not self._index.indexes(self.container.subevents):
+            self._index = SubeventIndex(self.container.subevents)
+        return self._index
+
     def allow_ends_today_on_subevents(self):
         return False
 
@@ -168,7 +168,7 @@ class DefaultContainerStrategy(ContainerStrategy):
         self._move_late_events_right(new_event, earliest_start, delta)
 
     def _event_totally_overlapping_new_event(self, new_event):
-        for event in self.container.subevents:
+        for event in self._events_near(new_event):
             if event is new_event:
                 continue
             if (self._event_totally_overlaps_new_event(new_event, event)):
@@ -181,7 +181,7 @@ class DefaultContainerStrategy(ContainerStrategy):
 
     def _events_overlapped_by_new_event(self, new_event):
         overlapping_events = []
-        for event in self.container.subevents:
+        for event in self._events_near(new_event):
             if event is not new_event:
                 if (self._starts_within(event, new_event) or self._ends_within(event, new_event)):
                     overlapping_events.append(event)
@@ -197,26 +197,58 @@ class DefaultContainerStrategy(ContainerStrategy):
         s2 = event.get_time_period().end_time <= new_event.get_time_period().end_time
         return (s1 and s2)
 
+    def _events_near(self, new_event):
+        return self._get_index().possibly_overlapping(new_event.get_time_period())
+
     def _move_early_events_left(self, new_event, latest_start_time, delta):
-        delta = -delta
-        for event in self.container.subevents:
-            if event is new_event:
-                continue
-            if event.get_time_period().start_time <= latest_start_time:
-                event.move_delta(delta)
+        self._move_events(
+            new_event,
+            -delta,
+            lambda event: event.get_time_period().start_time <= latest_start_time
+        )
 
     def _move_late_events_right(self, new_event, earliest_start_time, delta):
-        for event in self.container.subevents:
-            if event is new_event:
-                continue
-            if event.get_time_period().start_time >= earliest_start_time:
+        self._move_events(
+            new_event,
+            delta,
+            lambda event: event.get_time_period().start_time >= earliest_start_time
+        )
+
+    def _move_events(self, new_event, delta, should_move):
+        """
+        Move the subevents, visited in sort order, for which should_move
+        returns True.
+
+        Unless the container is already being updated, a moved subevent is
+        registered again, which can move other subevents. So should_move is
+        called when a subevent is visited. The first subevent registered
+        again is removed from the subevents left to visit, which skips the
+        one after it, just like when the list of subevents itself was
+        iterated.
+        """
+        events = list(self.container.subevents)
+        moved_events = []
+        is_first_update = True
+        index = 0
+        try:
+            while index < len(events):
+                event = events[index]
+                index += 1
+                if event is new_event or not should_move(event):
+                    continue
+                update_count = self._update_count
                 event.move_delta(delta)
+                moved_events.append(event)
+                if is_first_update and self._update_count != update_count:
+                    is_first_update = False
+                    events.remove(event)
+                    events.append(event)
+        finally:
+            self._get_index().start_times_changed(moved_events)
+            self.container.clear_cached_values()
 
     def _is_subevent_missing(self, subevent):
-        for x in self.container.subevents:
-            if x is subevent:
-                return False
-        return True
+        return subevent not in self._get_index()
 
 
 class ExtendedContainerStrategy(DefaultContainerStrategy):
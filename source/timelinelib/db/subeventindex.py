@@ -0,0 +1,188 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import bisect
+from operator import itemgetter
+
+
+class SubeventIndex(object):
+    """
+    Keeps the subevents of a container ordered by sort order and indexed by
+    start time.
+
+    The list ordered by sort order is the list that the container exposes as
+    its subevents. It is updated in place. Subevents without a sort order come
+    last and subevents with equal sort order keep the order they were added
+    in. Subevents are identified by identity.
+
+    All subevents overlapping a period start at most the longest subevent
+    duration before the period starts, so the start time index can answer
+    overlap queries by looking only at the subevents starting in that range.
+    The longest duration is not lowered when subevents are removed, which
+    only makes that range wider than needed.
+
+    Sort orders are read when a subevent is added. When the sort order of an
+    indexed subevent changes, :meth:`sort_order_changed` must be called, and
+    the list is sorted again the next time a subevent is added.
+
+    Positions are found by bisection, but the lists are plain lists, so
+    adding or removing a subevent still shifts the entries after it and
+    costs O(m) for m subevents. The subevents list is the one the container
+    exposes, so it has to stay a list.
+    """
+
+    def __init__(self, subevents):
+        self.subevents = subevents
+        self._keys = {}
+        self._sort_keys = []
+        self._start_entries = []
+        self._start_keys = []
+        self._next_seq = 0
+        self._max_duration = None
+        self._sort_order_changed = False
+        self._rebuild()
+
+    def indexes(self, subevents):
+        return subevents is self.subevents
+
+    def __contains__(self, subevent):
+        return id(subevent) in self._keys
+
+    def __len__(self):
+        return len(self.subevents)
+
+    def add(self, subevent):
+        if self._sort_order_changed:
+            self._rebuild()
+        sort_key = self._create_sort_key(subevent, self._next_seq)
+        self._next_seq += 1
+        index = bisect.bisect_left(self._sort_keys, sort_key)
+        self._sort_keys.insert(index, sort_key)
+        self.subevents.insert(index, subevent)
+        start_key = self._create_start_key(subevent, sort_key)
+        index = bisect.bisect_left(self._start_keys, start_key)
+        self._start_keys.insert(index, start_key)
+        self._start_entries.insert(index, (start_key, subevent))
+        self._keys[id(subevent)] = (sort_key, start_key)
+        self._include_duration(subevent)
+
+    def remove(self, subevent):
+        sort_key, start_key = self._keys.pop(id(subevent))
+        index = bisect.bisect_left(self._sort_keys, sort_key)
+        del self._sort_keys[index]
+        del self.subevents[index]
+        index = bisect.bisect_left(self._start_keys, start_key)
+        del self._start_keys[index]
+        del self._start_entries[index]
+
+    def sort_order_changed(self):
+        self._sort_order_changed = True
+
+    def start_times_changed(self, subevents):
+        """
+        Re-index the given subevents after their start times have changed.
+        """
+        if len(subevents) == 0:
+            return
+        moved = set(id(subevent) for subevent in subevents)
+        entries = [
+            entry
+            for entry in self._start_entries
+            if id(entry[1]) not in moved
+        ]
+        for subevent in subevents:
+            sort_key, _ = self._keys[id(subevent)]
+            start_key = self._create_start_key(subevent, sort_key)
+            self._keys[id(subevent)] = (sort_key, start_key)
+            entries.append((start_key, subevent))
+        self._set_start_entries(entries)
+
+    def starting_at_or_before(self, time):
+        index = bisect.bisect_right(self._start_keys, (time, float("inf")))
+        return [subevent for (_, subevent) in self._start_entries[:index]]
+
+    def starting_at_or_after(self, time):
+        index = bisect.bisect_left(self._start_keys, (time,))
+        return [subevent for (_, subevent) in self._start_entries[index:]]
+
+    def possibly_overlapping(self, time_period):
+        """
+        Return, in sort order, a superset of the subevents overlapping
+        time_period.
+        """
+        if self._max_duration is None:
+            return []
+        start = self._earliest_start_of_overlapping(time_period.start_time)
+        if start is None:
+            first = 0
+        else:
+            first = bisect.bisect_left(self._start_keys, (start,))
+        last = bisect.bisect_right(
+            self._start_keys,
+            (time_period.end_time, float("inf"))
+        )
+        return self.in_sort_order(
+            subevent for (_, subevent) in self._start_entries[first:last]
+        )
+
+    def in_sort_order(self, subevents):
+        return sorted(subevents, key=lambda subevent: self._keys[id(subevent)][0])
+
+    def _earliest_start_of_overlapping(self, time):
+        try:
+            return time - self._max_duration
+        except (ValueError, OverflowError):
+            return None
+
+    def _rebuild(self):
+        entries = []
+        for seq, subevent in enumerate(self.subevents):
+            entries.append((self._create_sort_key(subevent, seq), subevent))
+        entries.sort(key=itemgetter(0))
+        self._next_seq = len(entries)
+        self._sort_keys = [sort_key for (sort_key, _) in entries]
+        self.subevents[:] = [subevent for (_, subevent) in entries]
+        self._keys = {}
+        self._max_duration = None
+        start_entries = []
+        for sort_key, subevent in entries:
+            start_key = self._create_start_key(subevent, sort_key)
+            self._keys[id(subevent)] = (sort_key, start_key)
+            start_entries.append((start_key, subevent))
+            self._include_duration(subevent)
+        self._set_start_entries(start_entries)
+        self._sort_order_changed = False
+
+    def _set_start_entries(self, entries):
+        entries.sort(key=itemgetter(0))
+        self._start_entries = entries
+        self._start_keys = [start_key for (start_key, _) in entries]
+
+    def _include_duration(self, subevent):
+        duration = subevent.get_time_period().delta()
+        if self._max_duration is None or duration > self._max_duration:
+            self._max_duration = duration
+
+    def _create_sort_key(self, subevent, seq):
+        if subevent.sort_order is None:
+            return (1, seq)
+        else:
+            return (0, subevent.sort_order, seq)
+
+    def _create_start_key(self, subevent, sort_key):
+        return (subevent.get_time_period().start_time, sort_key[-1])
@@ -17,6 +17,7 @@
 
 
 import codecs
+import gzip
 import os.path
 
 from timelinelib.canvas.data.exceptions import TimelineIOError
@@ -24,6 +25,10 @@ from timelinelib.wxgui.utils import register_unlock_function
 from timelinelib.general.encodings import to_unicode
 
 
+GZIP_SUFFIX = ".gz"
+GZIP_COMPRESSLEVEL = 6
+
+
 def safe_write(path, encoding, write_fn):
     """
     Write to path in such a way that the contents of path is only modified
@@ -31,6 +36,9 @@ def safe_write(path, encoding, write_fn):
 
     In some extremely rare cases the contents of path might be incorrect, but
     in those cases the correct content is always present in another dbfile.
+
+    If path ends with GZIP_SUFFIX, the data is compressed with gzip on its way
+    to the file.
     """
     def raise_error(specific_msg, cause_exception):
         err_general = _("Unable to save timeline data to '%s'. File left unmodified.") % path
@@ -40,7 +48,11 @@ def safe_write(path, encoding, write_fn):
     backup_path = create_non_exising_path(path, "bak")
     # Write data to tmp dbfile
     try:
-        if encoding is None:
+        if is_gzip_path(path):
+            dbfile = gzip.open(tmp_path, "wb", GZIP_COMPRESSLEVEL)
+            if encoding is not None:
+                dbfile = codecs.getwriter(encoding)(dbfile)
+        elif encoding is None:
             dbfile = open(tmp_path, "wb")
         else:
             dbfile = codecs.open(tmp_path, "w", encoding)
@@ -72,6 +84,21 @@ def safe_write(path, encoding, write_fn):
             raise_error(_("Unable to delete backup dbfile '%s'.") % backup_path, e)
 
 
+def is_gzip_path(path):
+    return path.endswith(GZIP_SUFFIX)
+
+
+def open_for_reading(path):
+    """
+    Open path for reading bytes, decompressing them with gzip if path ends
+    with GZIP_SUFFIX.
+    """
+    if is_gzip_path(path):
+        return gzip.open(path, "rb")
+    else:
+        return open(path, "rb")
+
+
 def create_non_exising_path(base, suffix):
     i = 1
     while True:
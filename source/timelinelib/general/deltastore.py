@@ -0,0 +1,179 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from cStringIO import StringIO
+import cPickle
+import tempfile
+import zlib
+
+
+class DeltaStore(object):
+    """
+    Stores a chain of values on disk as deltas.
+
+    Entries are ordered from oldest to newest. Each entry is stored as the
+    delta from the value after it to its own value, and the newest entry is
+    stored relative to a value that is kept elsewhere. A value is therefore
+    recreated by applying deltas backwards from that value.
+
+    create_delta_fn(newer, older) returns a delta, and
+    apply_delta_fn(newer, delta) returns the older value again.
+
+    Deltas are pickled and compressed into a temporary file. Objects of
+    classes that are not from this program or built in (images for example)
+    might not be possible to pickle, so they are kept in memory and only
+    referred to from the file.
+
+    At most max_size entries are stored. The oldest are dropped to make room
+    for new ones.
+    """
+
+    def __init__(self, create_delta_fn, apply_delta_fn, max_size=500):
+        self._create_delta_fn = create_delta_fn
+        self._apply_delta_fn = apply_delta_fn
+        self._max_size = max_size
+        self._entries = []
+        self._file = None
+        self._unused_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def names(self):
+        return [entry.name for entry in self._entries]
+
+    def size_in_bytes(self):
+        return sum(entry.length for entry in self._entries)
+
+    def push(self, name, older, newer):
+        """
+        Store older as the newest entry, and return the number of entries
+        that were dropped.
+        """
+        self._entries.append(self._write(
+            name,
+            self._create_delta_fn(newer, older)
+        ))
+        dropped = max(0, len(self._entries) - self._max_size)
+        if dropped > 0:
+            removed = self._entries[:dropped]
+            self._entries = self._entries[dropped:]
+            self._entries_removed(removed)
+        return dropped
+
+    def get_value(self, index, newer, later=(None, None)):
+        """
+        Return the value of the entry at index. newer is the value that the
+        newest entry is stored relative to.
+
+        If the value of an entry after index is already known, it can be
+        given as later=(later_index, later_value). Only the deltas between the
+        two entries are then applied.
+        """
+        (end, value) = later
+        if end is None or end < index or end > len(self._entries):
+            (end, value) = (len(self._entries), newer)
+        for entry in reversed(self._entries[index:end]):
+            value = self._apply_delta_fn(value, self._read(entry))
+        return value
+
+    def truncate(self, length):
+        removed = self._entries[length:]
+        self._entries = self._entries[:length]
+        self._entries_removed(removed)
+
+    def clear(self):
+        self.truncate(0)
+
+    def _write(self, name, delta):
+        references = []
+
+        def persistent_id(obj):
+            if _can_be_pickled(obj):
+                return None
+            references.append(obj)
+            return str(len(references) - 1)
+        data = _pickle(delta, persistent_id)
+        self._ensure_file()
+        self._file.seek(0, 2)
+        offset = self._file.tell()
+        self._file.write(data)
+        return _Entry(name, offset, len(data), references)
+
+    def _read(self, entry):
+        return _unpickle(
+            self._read_data(entry),
+            lambda key: entry.references[int(key)]
+        )
+
+    def _read_data(self, entry):
+        self._file.seek(entry.offset)
+        return self._file.read(entry.length)
+
+    def _ensure_file(self):
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="timeline-undo")
+
+    def _entries_removed(self, entries):
+        self._unused_bytes += sum(entry.length for entry in entries)
+        if len(self._entries) == 0:
+            self._close_file()
+        elif self._unused_bytes > self.size_in_bytes():
+            self._compact()
+
+    def _compact(self):
+        data = [self._read_data(entry) for entry in self._entries]
+        self._close_file()
+        self._ensure_file()
+        for entry, entry_data in zip(self._entries, data):
+            entry.offset = self._file.tell()
+            self._file.write(entry_data)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._unused_bytes = 0
+
+
+class _Entry(object):
+
+    def __init__(self, name, offset, length, references):
+        self.name = name
+        self.offset = offset
+        self.length = length
+        self.references = references
+
+
+def _can_be_pickled(obj):
+    module = type(obj).__module__
+    return module == "__builtin__" or module.startswith("timelinelib.")
+
+
+def _pickle(value, persistent_id):
+    data = StringIO()
+    pickler = cPickle.Pickler(data, cPickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = persistent_id
+    pickler.dump(value)
+    return zlib.compress(data.getvalue())
+
+
+def _unpickle(data, persistent_load):
+    unpickler = cPickle.Unpickler(StringIO(zlib.decompress(data)))
+    unpickler.persistent_load = persistent_load
+    return unpickler.load()
@@ -66,6 +66,12 @@ class ImmutableDict(tuple):
     def __iter__(self):
         return self._internal.iteritems()
 
+    def __reduce__(self):
+        return (self.__class__, (self._internal,))
+
+    def __sizeof__(self):
+        return tuple.__sizeof__(self) + self._internal.__sizeof__()
+
     def __eq__(self, other):
         return (
             isinstance(other, self.__class__) and
@@ -76,28 +82,75 @@ class ImmutableDict(tuple):
         return not self == other
 
     def __repr__(self):
-        items = []
-        items.append(self.__class__.__name__)
-        items.append("({\n")
-        for key, value in self:
-            items.append("  ")
-            items.append(repr(key))
-            items.append(": ")
-            for index, line in enumerate(repr(value).split("\n")):
-                if index > 0:
-                    items.append("\n  ")
-                items.append(line)
-            items.append(",\n")
-        items.append("})")
-        return "".join(items)
+        return _format_repr(self)
+
+
+class ImmutableDictBuilder(object):
+
+    """
+    A mutable dictionary that starts out with the content of an ImmutableDict
+    and can be turned back into one with freeze.
+
+    The content is only copied when the builder is first changed after being
+    created or frozen, so freezing a builder that has not changed returns the
+    ImmutableDict it was created from.
+    """
+
+    def __init__(self, immutable_dict):
+        self._frozen_class = immutable_dict.__class__
+        self._frozen = immutable_dict
+        self._items = None
+
+    def set(self, key, value):
+        self._ensure_copied()[key] = value
+
+    def remove(self, key):
+        del self._ensure_copied()[key]
+
+    def map(self, fn):
+        items = self._ensure_copied()
+        for key, value in items.iteritems():
+            items[key] = fn(value)
+
+    def freeze(self):
+        if self._frozen is None:
+            self._frozen = self._frozen_class(_AlreadyCopiedDict(self._items))
+            self._items = None
+        return self._frozen
+
+    def get(self, name, default=None):
+        return self._get_items().get(name, default)
+
+    def __len__(self):
+        return len(self._get_items())
+
+    def __contains__(self, item):
+        return item in self._get_items()
+
+    def __getitem__(self, name):
+        return self._get_items()[name]
+
+    def __iter__(self):
+        return self._get_items().iteritems()
+
+    def _get_items(self):
+        if self._items is None:
+            return self._frozen._internal
+        return self._items
+
+    def _ensure_copied(self):
+        if self._items is None:
+            self._items = dict(self._frozen._internal)
+            self._frozen = None
+        return self._items
 
 
 class ImmutableRecordMeta(type):
 
     def __new__(cls, name, bases, attrs):
-        def create_property(name):
+        def create_property(index):
             return property(
-                lambda self: self.get(name)
+                lambda self: tuple.__getitem__(self, index)
             )
         base_attributes = []
         for base in bases:
@@ -110,8 +163,22 @@ class ImmutableRecordMeta(type):
                         "{0!r} is a reserved field name".format(key)
                     )
                 fields[key] = value
-                attrs[key] = create_property(key)
+        field_names = tuple(sorted(fields))
+        for index, key in enumerate(field_names):
+            attrs[key] = create_property(index)
+        attrs.setdefault("__slots__", ())
         attrs["_immutable_record_fields"] = fields
+        attrs["_field_names"] = field_names
+        attrs["_field_indexes"] = {
+            key: index
+            for index, key
+            in enumerate(field_names)
+        }
+        attrs["_defaults"] = tuple(
+            fields[key].default
+            for key
+            in field_names
+        )
         return super(ImmutableRecordMeta, cls).__new__(cls, name, bases, attrs)
 
 
@@ -121,24 +188,105 @@ class Field(object):
         self.default = default
 
 
-class ImmutableRecord(ImmutableDict):
+class ImmutableRecord(tuple):
+
+    """
+    An immutable value with a fixed set of fields.
+
+    The values of the fields are stored in a tuple in the order given by
+    _field_names, and _field_indexes maps a field name to its position. Fields
+    are read as attributes. Apart from that, a record can be read like an
+    ImmutableDict with the field names as keys.
+    """
 
     __metaclass__ = ImmutableRecordMeta
 
     def __new__(cls, *args, **kwargs):
-        defaults = {
-            key: value.default
-            for key, value
-            in cls._immutable_record_fields.iteritems()
-        }
-        d = ImmutableDict.__new__(cls, defaults, *args, **kwargs)
-        for key, value in d:
-            if key not in cls._immutable_record_fields:
-                raise ValueError("{0!r} is not a valid field of {1}".format(
-                    key,
-                    cls.__name__
-                ))
-        return d
+        if not args and not kwargs:
+            return tuple.__new__(cls, cls._defaults)
+        values = list(cls._defaults)
+        cls._set_values(values, args, kwargs)
+        return tuple.__new__(cls, values)
+
+    @classmethod
+    def _set_values(cls, values, args, kwargs):
+        field_indexes = cls._field_indexes
+        for arg in args:
+            if isinstance(arg, dict):
+                arg = arg.iteritems()
+            for key, value in arg:
+                values[cls._get_index(field_indexes, key)] = value
+        for key, value in kwargs.iteritems():
+            values[cls._get_index(field_indexes, key)] = value
+
+    @classmethod
+    def _get_index(cls, field_indexes, key):
+        try:
+            return field_indexes[key]
+        except KeyError:
+            raise ValueError("{0!r} is not a valid field of {1}".format(
+                key,
+                cls.__name__
+            ))
+
+    def update(self, *args, **kwargs):
+        values = list(tuple.__iter__(self))
+        self._set_values(values, args, kwargs)
+        return tuple.__new__(self.__class__, values)
+
+    def get(self, name, default=None):
+        index = self._field_indexes.get(name)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def __contains__(self, item):
+        return item in self._field_indexes
+
+    def __getitem__(self, name):
+        return tuple.__getitem__(self, self._field_indexes[name])
+
+    def __iter__(self):
+        return iter(zip(self._field_names, tuple.__iter__(self)))
+
+    def __reduce__(self):
+        return (_create_record, (self.__class__, tuple(tuple.__iter__(self))))
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, self.__class__) and
+            tuple.__eq__(self, other)
+        )
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return tuple.__hash__(self)
+
+    def __repr__(self):
+        return _format_repr(self)
+
+
+def _format_repr(value):
+    items = []
+    items.append(value.__class__.__name__)
+    items.append("({\n")
+    for key, item in value:
+        items.append("  ")
+        items.append(repr(key))
+        items.append(": ")
+        for index, line in enumerate(repr(item).split("\n")):
+            if index > 0:
+                items.append("\n  ")
+            items.append(line)
+        items.append(",\n")
+    items.append("})")
+    return "".join(items)
+
+
+def _create_record(cls, values):
+    return tuple.__new__(cls, values)
 
 
 class _AlreadyCopiedDict(object):
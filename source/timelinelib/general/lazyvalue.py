@@ -0,0 +1,125 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import zlib
+
+from timelinelib.general.lrucache import LruCache
+
+
+DECODED_VALUES_SIZE = 256
+COMPRESS_LEVEL = 1
+
+
+class LazyValue(object):
+    """
+    A value that is parsed from its text the first time it is needed.
+
+    The text is read from a TextSource, so it does not have to be kept in
+    memory before then either:
+
+        >>> value = LazyValue(CompressedText(u"42"), int)
+        >>> value.get()
+        42
+
+    Only the most recently used values are kept once they have been parsed.
+    Others are parsed again from their source the next time they are needed.
+
+    Code that only needs the text, like an exporter writing it back, can get
+    it without parsing it:
+
+        >>> value.get_text()
+        u'42'
+
+    Use resolve to read a value that might be lazy:
+
+        >>> resolve(value)
+        42
+        >>> resolve(u"not lazy")
+        u'not lazy'
+    """
+
+    __slots__ = ("_source", "_parse_fn")
+
+    def __init__(self, source, parse_fn=None):
+        self._source = source
+        self._parse_fn = parse_fn
+
+    def parsed_with(self, parse_fn):
+        """
+        Return a new LazyValue with the same text that is parsed with
+        parse_fn.
+        """
+        return LazyValue(self._source, parse_fn)
+
+    def get_text(self):
+        return self._source.read_text()
+
+    def get_xml_text(self):
+        """
+        Return the text escaped for xml if the source has it in that form,
+        otherwise None.
+        """
+        return self._source.read_xml_text()
+
+    def get(self):
+        if self in DECODED_VALUES:
+            return DECODED_VALUES[self]
+        text = self.get_text()
+        if self._parse_fn is None:
+            value = text
+        else:
+            value = self._parse_fn(text)
+        DECODED_VALUES[self] = value
+        return value
+
+
+class TextSource(object):
+    """
+    Where the text of a LazyValue is read from.
+    """
+
+    __slots__ = ()
+
+    def read_text(self):
+        raise NotImplementedError()
+
+    def read_xml_text(self):
+        return None
+
+
+class CompressedText(TextSource):
+    """
+    Keeps a text compressed in memory until it is read.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, text):
+        self._data = zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL)
+
+    def read_text(self):
+        return zlib.decompress(self._data).decode("utf-8")
+
+
+def resolve(value):
+    if isinstance(value, LazyValue):
+        return value.get()
+    return value
+
+
+DECODED_VALUES = LruCache(DECODED_VALUES_SIZE)
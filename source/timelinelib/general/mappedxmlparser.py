@@ -0,0 +1,206 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+An alternative to the parse function in xmlparser for large files.
+
+The file is memory mapped and the tags are found by searching the mapped
+bytes directly, so the whole file never has to be read into strings. The same
+Tag schema as in xmlparser is used, so parse functions and validation work in
+the same way.
+
+The text of tags whose names are given in lazy_tag_names is not decoded.
+Parse functions get a LazyValue for them instead that reads the text from the
+mapped file when it is needed. Only lazy text containing references is decoded
+during the scan, so that unsupported references are found before parse_mapped
+returns instead of when the value is used.
+
+Only the subset of xml that Timeline writes is understood: utf-8 encoded
+elements without attributes containing text with character references. If
+anything else is found, UnsupportedXmlError is raised, and parse in xmlparser
+can be used instead.
+"""
+
+
+import mmap
+import re
+import sys
+
+from timelinelib.general.lazyvalue import LazyValue
+from timelinelib.general.lazyvalue import TextSource
+from timelinelib.general.xmlparser import ValidationError
+
+
+BOM = "\xef\xbb\xbf"
+DECLARATION_RE = re.compile(r"<\?xml\s[^>]*\?>")
+ENCODING_RE = re.compile(r"encoding\s*=\s*[\"']([^\"']*)[\"']")
+TAG_RE = re.compile(r"<(/?)([A-Za-z_][\w.-]*)\s*(/?)>")
+REFERENCE_RE = re.compile(u"&(#x[0-9a-fA-F]+|#[0-9]+|amp|lt|gt|quot|apos);")
+NAMED_REFERENCES = {
+    u"amp": u"&",
+    u"lt": u"<",
+    u"gt": u">",
+    u"quot": u"\"",
+    u"apos": u"'",
+}
+
+
+class UnsupportedXmlError(Exception):
+    """Raised when the xml uses something that parse_mapped can not read."""
+    pass
+
+
+def parse_mapped(path, schema, tmp_dict, lazy_tag_names=()):
+    """
+    Parse the xml file at path in the same way as parse in xmlparser.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError) as e:
+            raise UnsupportedXmlError("Could not map file: %s" % e)
+    MappedXmlScanner(mapped, schema, tmp_dict, lazy_tag_names).scan()
+
+
+class MappedXmlScanner(object):
+
+    def __init__(self, mapped, root_tag, tmp_dict, lazy_tag_names):
+        self._mapped = mapped
+        self._root_tag = root_tag
+        self._tmp_dict = tmp_dict
+        self._lazy_tag_names = frozenset(lazy_tag_names)
+
+    def scan(self):
+        mapped = self._mapped
+        tmp_dict = self._tmp_dict
+        lazy_tag_names = self._lazy_tag_names
+        tag_to_parse = self._root_tag
+        root_read = False
+        pos = self._skip_prolog()
+        while True:
+            start = mapped.find("<", pos)
+            if start == -1:
+                self._ensure_whitespace(pos, len(mapped))
+                break
+            match = TAG_RE.match(mapped, start)
+            if match is None:
+                raise UnsupportedXmlError(
+                    "Unsupported markup at byte %d." % start
+                )
+            is_end_tag, name, is_empty = match.groups()
+            if is_end_tag:
+                if is_empty or tag_to_parse is None:
+                    raise ValidationError("Did not expect </%s>." % name)
+                if name in lazy_tag_names:
+                    if mapped.find("&", pos, start) != -1:
+                        decode_text(mapped[pos:start])
+                    text = LazyValue(MappedText(mapped, pos, start))
+                else:
+                    text = decode_text(mapped[pos:start])
+                tag_to_parse = tag_to_parse.handle_end_tag(name, text, tmp_dict)
+            else:
+                if root_read and tag_to_parse is None:
+                    raise ValidationError("Did not expect <%s>." % name)
+                self._ensure_whitespace(pos, start)
+                tag_to_parse = tag_to_parse.handle_start_tag(name, tmp_dict)
+                root_read = True
+                if is_empty:
+                    tag_to_parse = tag_to_parse.handle_end_tag(name, u"", tmp_dict)
+            pos = match.end()
+        if not root_read or tag_to_parse is not None:
+            raise ValidationError("Document ended before all tags were closed.")
+
+    def _skip_prolog(self):
+        pos = 0
+        if self._mapped[:len(BOM)] == BOM:
+            pos = len(BOM)
+        match = DECLARATION_RE.match(self._mapped, pos)
+        if match is not None:
+            encoding = ENCODING_RE.search(match.group(0))
+            if encoding is not None and encoding.group(1).lower() not in ("utf-8", "utf8"):
+                raise UnsupportedXmlError(
+                    "Unsupported encoding '%s'." % encoding.group(1)
+                )
+            pos = match.end()
+        return pos
+
+    def _ensure_whitespace(self, start, end):
+        text = self._mapped[start:end]
+        if text.strip():
+            raise ValidationError("Did not expect text but got '%s'." % text)
+
+
+class MappedText(TextSource):
+    """
+    Reads the text between two byte offsets in a mapped file.
+
+    The bytes are already escaped for xml, so they can be written to another
+    xml document as they are.
+    """
+
+    __slots__ = ("_mapped", "_start", "_end")
+
+    def __init__(self, mapped, start, end):
+        self._mapped = mapped
+        self._start = start
+        self._end = end
+
+    def read_text(self):
+        return decode_text(self._mapped[self._start:self._end])
+
+    def read_xml_text(self):
+        return self._mapped[self._start:self._end].decode("utf-8")
+
+
+def decode_text(data):
+    """
+    Return the text that the raw utf-8 encoded xml text in data represents.
+
+    Line breaks are normalized like an xml parser does:
+
+        >>> decode_text("a\\r\\nb\\rc")
+        u'a\\nb\\nc'
+
+    And character references are replaced:
+
+        >>> decode_text("&lt;b&gt; &amp; &#228;&#xE4;")
+        u'<b> & \\xe4\\xe4'
+    """
+    text = data.decode("utf-8")
+    if u"\r" in text:
+        text = text.replace(u"\r\n", u"\n").replace(u"\r", u"\n")
+    if u"&" in text:
+        if len(REFERENCE_RE.findall(text)) != text.count(u"&"):
+            raise UnsupportedXmlError("Unsupported reference in '%s'." % text)
+        text = REFERENCE_RE.sub(_replace_reference, text)
+    return text
+
+
+def _replace_reference(match):
+    reference = match.group(1)
+    if reference in NAMED_REFERENCES:
+        return NAMED_REFERENCES[reference]
+    if reference.startswith(u"#x"):
+        code_point = int(reference[2:], 16)
+    else:
+        code_point = int(reference[1:])
+    if code_point > sys.maxunicode:
+        raise UnsupportedXmlError(
+            "Unsupported character reference '&%s;'." % reference
+        )
+    return unichr(code_point)
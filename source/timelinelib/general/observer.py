@@ -21,6 +21,7 @@ class Observable(object):
     def __init__(self):
         self._observers = []
         self._listeners = []
+        self._change_listeners = []
 
     def listen_for(self, event, function):
         self._listeners.append((True, event, function))
@@ -28,8 +29,16 @@ class Observable(object):
     def listen_for_any(self, function):
         self._listeners.append((False, None, function))
 
+    def listen_for_changes(self, function):
+        """
+        Like listen_for_any but function is called with a description of what
+        changed, or None if that is unknown.
+        """
+        self._change_listeners.append(function)
+
     def unlisten(self, function):
         self._listeners = [x for x in self._listeners if x[2] != function]
+        self._change_listeners = [x for x in self._change_listeners if x != function]
 
     def register(self, fn):
         self._observers.append(fn)
@@ -38,13 +47,15 @@ class Observable(object):
         if fn in self._observers:
             self._observers.remove(fn)
 
-    def _notify(self, state_change=None):
+    def _notify(self, state_change=None, changes=None):
         for (listen_for_specific, event, function) in self._listeners:
             if listen_for_specific:
                 if state_change == event:
                     function()
             else:
                 function()
+        for function in self._change_listeners:
+            function(changes)
         for fn in self._observers:
             fn(state_change)
 
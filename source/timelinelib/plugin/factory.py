@@ -23,8 +23,9 @@ from inspect import isclass
 
 EVENTBOX_DRAWER = "eventboxdrawer"
 EXPORTER = "exporter"
+IMPORTER = "importer"
 TEXT_TRANSFORMER = "texttransformer"
-VALID_SERVICES = [EVENTBOX_DRAWER, EXPORTER, TEXT_TRANSFORMER]
+VALID_SERVICES = [EVENTBOX_DRAWER, EXPORTER, IMPORTER, TEXT_TRANSFORMER]
 
 
 class PluginException(Exception):
@@ -23,6 +23,10 @@ import os.path
 
 import wx
 
+from timelinelib.canvas.data.event import DEFAULT_COLOR
+from timelinelib.canvas.data.immutable import ImmutableContainer
+from timelinelib.canvas.drawing.drawers import get_progress_color
+from timelinelib.general.lazyvalue import resolve
 from timelinelib.plugin.factory import EXPORTER
 from timelinelib.plugin.pluginbase import PluginBase
 from timelinelib.wxgui.dialogs.export.controller import CSV_FILE
@@ -31,6 +35,10 @@ from timelinelib.wxgui.utils import _ask_question
 from timelinelib.wxgui.utils import WildcardHelper
 
 
+ROWS_PER_WRITE = 1000
+TIME_STRINGS_CACHE_SIZE = 10000
+
+
 class TimelineExporter(PluginBase):
 
     def service(self):
@@ -58,6 +66,15 @@ class TimelineExporter(PluginBase):
 
 
 class CsvExporter(object):
+    """
+    Writes the selected event and category fields as rows separated by ';'.
+
+    The selected fields are compiled once into a tuple of functions that
+    format one cell each, and events are read as immutable values from the
+    db, so that writing a row does not depend on the number of selectable
+    fields or on creating Event objects. Rows are encoded and written in
+    chunks.
+    """
 
     def __init__(self, timeline, path, dlg):
         self.path = path
@@ -68,139 +85,153 @@ class CsvExporter(object):
         self.export_categories = dlg.GetExportCategories()
         self.event_fields = dlg.GetEventFields()
         self.category_fields = dlg.GetCategoryFields()
+        self._time_strings = {}
+        self._color_strings = {}
 
     def export(self):
         with open(self.path, "w") as f:
-            self._write_events(f, self.event_fields)
-            self._write_categories(f, self.category_fields)
+            writer = RowWriter(f, self.text_encoding, self.encoding_error_strategy)
+            self._write_events(writer, self.event_fields)
+            self._write_categories(writer, self.category_fields)
+            writer.flush()
 
-    def _write_events(self, f, event_fields):
+    def _write_events(self, writer, event_fields):
         if self.export_events:
-            self._write_label(f, _("Events"))
-            self._write_heading(f, event_fields)
-            self._write_events_fields(f, event_fields)
+            writer.write_row([_quote(_("Events"))])
+            writer.write_row([_quote(field) for field in event_fields])
+            self._write_events_fields(writer, event_fields)
 
-    def _write_categories(self, f, category_fields):
+    def _write_categories(self, writer, category_fields):
         if self.export_categories:
-            self._write_label(f, _("Categories"))
-            self._write_heading(f, category_fields)
-            self._write_categories_fields(f, category_fields)
-
-    def _write_label(self, f, text):
-        self._write_encoded_text(f, text)
-        f.write("\n")
+            writer.write_row([_quote(_("Categories"))])
+            writer.write_row([_quote(field) for field in category_fields])
+            self._write_categories_fields(writer, category_fields)
+
+    def _write_events_fields(self, writer, event_fields):
+        cell_fns = self._compile_event_cells(event_fields)
+        write_row = writer.write_row
+        for event in self.timeline.get_all_immutable_events():
+            write_row([cell_fn(event) for cell_fn in cell_fns])
+        writer.write_row([])
+
+    def _write_categories_fields(self, writer, category_fields):
+        cell_fns = self._compile_category_cells(category_fields)
+        for category in self.timeline.get_categories():
+            writer.write_row([cell_fn(category) for cell_fn in cell_fns])
 
-    def _write_heading(self, f, fields):
-        for field in fields:
-            self._write_encoded_text(f, field)
-        f.write("\n")
+    def _compile_event_cells(self, event_fields):
+        category_names = {}
+        progress_colors = {None: get_progress_color(DEFAULT_COLOR)}
+        done_colors = {None: get_progress_color(DEFAULT_COLOR)}
+        for category in self.timeline.get_categories():
+            category_names[category.id] = category.get_name()
+            progress_colors[category.id] = category.get_progress_color()
+            done_colors[category.id] = category.get_done_color()
+
+        def progress_color(event):
+            if event.category_id is not None and event.get("progress") == 100:
+                return done_colors[event.category_id]
+            return progress_colors[event.category_id]
+        return self._select_cells(event_fields, (
+            (_("Text"), lambda event: _quote(event.text)),
+            (_("Description"), lambda event: _quote(_get_description(event))),
+            (_("Start"), lambda event: self._format_time(event.time_period.start_time)),
+            (_("End"), lambda event: self._format_time(event.time_period.end_time)),
+            (_("Category"), lambda event: _quote(category_names.get(event.category_id, u""))),
+            (_("Fuzzy"), lambda event: u"%s" % event.get("fuzzy", False)),
+            (_("Locked"), lambda event: u"%s" % event.get("locked", False)),
+            (_("Ends Today"), lambda event: u"%s" % event.get("ends_today", False)),
+            (_("Hyperlink"), lambda event: u"%s" % resolve(event.get("hyperlink"))),
+            (_("Progress"), lambda event: u"%s" % event.get("progress")),
+            (_("Progress Color"), lambda event: self._format_color(progress_color(event))),
+            (_("Done Color"), lambda event: self._format_color(done_colors[event.category_id])),
+            (_("Alert"), lambda event: self._format_alert(event.get("alert"))),
+            (_("Is Container"), lambda event: u"%s" % isinstance(event, ImmutableContainer)),
+            (_("Is Subevent"), lambda event: u"%s" % (event.get("container_id") is not None)),
+        ))
+
+    def _compile_category_cells(self, category_fields):
+        return self._select_cells(category_fields, (
+            (_("Name"), lambda category: _quote(category.get_name())),
+            (_("Color"), lambda category: self._format_color(category.get_color())),
+            (_("Progress Color"), lambda category: self._format_color(category.get_progress_color())),
+            (_("Done Color"), lambda category: self._format_color(category.get_done_color())),
+            (_("Parent"), lambda category: _quote(_get_parent_name(category))),
+        ))
+
+    def _select_cells(self, fields, cells):
+        """
+        Cells are written in the order above, whatever the order of fields.
+        """
+        return tuple(cell_fn for field, cell_fn in cells if field in fields)
+
+    def _format_time(self, time):
+        try:
+            return self._time_strings[time]
+        except KeyError:
+            if len(self._time_strings) >= TIME_STRINGS_CACHE_SIZE:
+                self._time_strings.clear()
+            text = self._time_strings[time] = self.timeline.get_time_type().time_string(time)
+            return text
 
-    def _write_events_fields(self, f, event_fields):
-        for event in self.timeline.get_all_events():
-            self._write_event(f, event, event_fields)
-        f.write("\n")
+    def _format_color(self, color):
+        try:
+            return self._color_strings[color]
+        except KeyError:
+            text = self._color_strings[color] = u"(%d, %d, %d)" % color
+            return text
 
-    def _write_categories_fields(self, f, category_fields):
-        for category in self.timeline.get_categories():
-            self._write_category(f, category, category_fields)
-
-    def _write_event(self, f, event, event_fields):
-        if _("Text") in event_fields:
-            self._write_encoded_text(f, event.get_text())
-        if _("Description") in event_fields:
-            self._write_encoded_text(f, self._get_event_description(event))
-        if _("Start") in event_fields:
-            self._write_time_value(f, event.get_time_period().start_time)
-        if _("End") in event_fields:
-            self._write_time_value(f, event.get_time_period().end_time)
-        if _("Category") in event_fields:
-            self._write_encoded_text(f, self._get_event_category(event))
-        if _("Fuzzy") in event_fields:
-            self._write_boolean_value(f, event.get_fuzzy())
-        if _("Locked") in event_fields:
-            self._write_boolean_value(f, event.get_locked())
-        if _("Ends Today") in event_fields:
-            self._write_boolean_value(f, event.get_ends_today())
-        if _("Hyperlink") in event_fields:
-            f.write("%s;" % event.get_hyperlink())
-        if _("Progress") in event_fields:
-            f.write("%s;" % event.get_progress())
-        if _("Progress Color") in event_fields:
-            self._write_color_value(f, event.get_progress_color())
-        if _("Done Color") in event_fields:
-            self._write_color_value(f, event.get_done_color())
-        if _("Alert") in event_fields:
-            f.write("%s;" % self._get_alert_string(event.get_alert()))
-        if _("Is Container") in event_fields:
-            self._write_boolean_value(f, event.is_container())
-        if _("Is Subevent") in event_fields:
-            self._write_boolean_value(f, event.is_subevent())
-        f.write("\n")
-
-    def _write_category(self, f, category, category_fields):
-        if _("Name") in category_fields:
-            self._write_encoded_text(f, category.get_name())
-        if _("Color") in category_fields:
-            self._write_color_value(f, category.get_color())
-        if _("Progress Color") in category_fields:
-            self._write_color_value(f, category.get_progress_color())
-        if _("Done Color") in category_fields:
-            self._write_color_value(f, category.get_done_color())
-        if _("Parent") in category_fields:
-            self._write_encoded_text(f, self._get_parent(category))
-        f.write("\n")
-
-    def _get_event_description(self, event):
-        if event.get_description() is not None:
-            return event.get_description()
+    def _format_alert(self, alert):
+        if alert:
+            time, text = alert
+            return _quote(u"%s %s" % (self._format_time(time), text))
         else:
-            return ""
+            return u""
 
-    def _get_event_category(self, event):
-        if event.get_category() is not None:
-            return event.get_category().get_name()
-        else:
-            return ""
 
-    def _get_parent(self, category):
-        if category._get_parent():
-            return category._get_parent().get_name()
+class RowWriter(object):
+    """
+    Collects rows as text and writes them encoded every ROWS_PER_WRITE rows.
+    """
 
-    def _get_category_parent(self, cat):
-        if cat._get_parent() is not None:
-            return self._encode_text(cat._get_parent().get_name())
+    def __init__(self, f, text_encoding, encoding_error_strategy):
+        self._file = f
+        self._text_encoding = text_encoding
+        self._encoding_error_strategy = encoding_error_strategy
+        self._lines = []
+
+    def write_row(self, cells):
+        if cells:
+            self._lines.append(u";".join(cells) + u";\n")
         else:
-            return ""
+            self._lines.append(u"\n")
+        if len(self._lines) >= ROWS_PER_WRITE:
+            self.flush()
 
-    def _get_time_string(self, time_value):
-        return self.timeline.get_time_type().time_string(time_value)
+    def flush(self):
+        self._file.write(u"".join(self._lines).encode(
+            self._text_encoding,
+            self._encoding_error_strategy
+        ))
+        self._lines = []
 
-    def _get_alert_string(self, alert):
-        if alert:
-            time, text = alert
-            return "%s %s" % (self._get_time_string(time), self._encode_text(text))
-        else:
-            return ""
 
-    def _write_encoded_text(self, f, text):
-        if text is not None:
-            text = text.replace('"', '""')
-        f.write("\"%s\";" % self._encode_text(text))
+def _quote(text):
+    if text is None:
+        text = u"None"
+    return u"\"%s\"" % text.replace(u'"', u'""')
 
-    def _encode_text(self, text):
-        if text is not None:
-            return text.encode(self.text_encoding, self.encoding_error_strategy)
-        else:
-            return text
 
-    def _write_time_value(self, f, time_value):
-        f.write("%s;" % self.timeline.get_time_type().time_string(time_value))
+def _get_description(event):
+    description = resolve(event.get("description"))
+    if description is None:
+        return u""
+    return description
 
-    def _write_color_value(self, f, color):
-        f.write("(%d, %d, %d);" % color)
 
-    def _write_boolean_value(self, f, value):
-        f.write("%s;" % value)
+def _get_parent_name(category):
+    if category.parent:
+        return category.parent.get_name()
 
 
 def get_path(main_frame):
@@ -0,0 +1,85 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import wx
+
+from timelinelib.canvas.data.exceptions import TimelineIOError
+from timelinelib.dataimport.csvfile import import_events_from_csv
+from timelinelib.db.utils import safe_locking
+from timelinelib.plugin.factory import IMPORTER
+from timelinelib.plugin.pluginbase import PluginBase
+from timelinelib.utils import ex_msg
+from timelinelib.wxgui.dialogs.export.controller import TEXT_ENCODINGS
+from timelinelib.wxgui.utils import display_error_message
+from timelinelib.wxgui.utils import display_information_message
+from timelinelib.wxgui.utils import WildcardHelper
+
+
+class CsvImporter(PluginBase):
+
+    def service(self):
+        return IMPORTER
+
+    def display_name(self):
+        return _("Import Events from CSV File...")
+
+    def run(self, main_frame):
+        path = get_path(main_frame)
+        if path is None:
+            return
+        text_encoding = get_text_encoding(main_frame)
+        if text_encoding is None:
+            return
+
+        def import_events():
+            try:
+                nbr_of_events = import_events_from_csv(
+                    main_frame.timeline, path, text_encoding
+                )
+            except TimelineIOError as e:
+                display_error_message(ex_msg(e), main_frame)
+            else:
+                display_information_message(
+                    _("Import Events"),
+                    _("%d events were imported.") % nbr_of_events,
+                    main_frame
+                )
+        safe_locking(main_frame, import_events)
+
+
+def get_path(main_frame):
+    path = None
+    file_types = [("csv", "")]
+    wildcard_helper = WildcardHelper(_("CSV files"), file_types)
+    dialog = wx.FileDialog(main_frame, message=_("Import"),
+                           wildcard=wildcard_helper.wildcard_string(),
+                           style=wx.FD_OPEN)
+    if dialog.ShowModal() == wx.ID_OK:
+        path = dialog.GetPath()
+    dialog.Destroy()
+    return path
+
+
+def get_text_encoding(main_frame):
+    text_encoding = None
+    dialog = wx.SingleChoiceDialog(main_frame, _("Select Text Encoding"),
+                                   _("Import"), list(TEXT_ENCODINGS))
+    if dialog.ShowModal() == wx.ID_OK:
+        text_encoding = dialog.GetStringSelection()
+    dialog.Destroy()
+    return text_encoding
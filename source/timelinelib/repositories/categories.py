@@ -25,9 +25,14 @@ class CategoriesFacade(Observable):
         Observable.__init__(self)
         self.db = db
         self.view_properties = view_properties
-        self.db.listen_for_any(self._notify)
+        self.db.listen_for_changes(self._db_changed)
         self.view_properties.listen_for_any(self._notify)
 
+    def _db_changed(self, changeset):
+        if changeset is None or changeset.has_changes_in("categories"):
+            self.view_properties.category_tree_changed()
+        self._notify()
+
     def get_all(self):
         return self.db.get_categories()
 
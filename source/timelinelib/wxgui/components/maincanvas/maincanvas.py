@@ -134,10 +134,10 @@ class MainCanvas(TimelineCanvas):
     def toggle_event_selection(self, cursor, keyboard):
 
         def toggle_event_selection_when_event_is_hit(event):
-            selected = not self.IsEventSelected(event)
             if keyboard.ctrl:
-                self.SetEventSelected(event, selected)
+                self.ToggleEventsSelected([event])
             else:
+                selected = not self.IsEventSelected(event)
                 self.ClearSelectedEvents()
                 self.SetEventSelected(event, selected)
 
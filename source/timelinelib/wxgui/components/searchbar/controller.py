@@ -18,6 +18,7 @@
 
 import wx
 
+from timelinelib.wxgui.components.searchbar.livesearch import LiveSearch
 from timelinelib.wxgui.dialogs.eventlist.view import EventListDialog
 
 
@@ -27,8 +28,10 @@ class SearchBarController(object):
         self._view = view
         self._result = []
         self._result_index = 0
+        self._match_shown = False
         self._last_search = None
         self._last_period = None
+        self._live_search = None
 
     def set_timeline_canvas(self, timeline_canvas):
         self._timeline_canvas = timeline_canvas
@@ -37,6 +40,7 @@ class SearchBarController(object):
             self._view.SetPeriodChoices(self._timeline_canvas.GetPeriodChoices())
 
     def search(self):
+        self._cancel_live_search()
         new_search = self._view.GetValue()
         new_period = self._view.GetPeriod()
         if (
@@ -52,6 +56,51 @@ class SearchBarController(object):
             self._set_result_label()
             self._view.UpdateButtons()
 
+    def live_search(self):
+        previous_live_search = self._live_search
+        self._cancel_live_search()
+        self._last_search = None
+        new_search = self._view.GetValue()
+        new_period = self._view.GetPeriod()
+        if self._timeline_canvas is None or new_search == "":
+            self._live_search = None
+            self._result = []
+            self._view.UpdateNbrOfMatchesLabel("")
+            self._view.UpdateButtons()
+        elif (previous_live_search is not None and
+              previous_live_search.can_be_refined_by(
+                  new_search, new_period,
+                  self._timeline_canvas.GetSearchTimePeriod(new_period))):
+            self._live_search = LiveSearch.refining(
+                previous_live_search.result, new_search, new_period,
+                previous_live_search.time_period)
+            self._step_live_search(self._live_search)
+        else:
+            self._live_search = LiveSearch.from_scratch(
+                self._timeline_canvas, new_search, new_period)
+            self._step_live_search(self._live_search)
+
+    def _step_live_search(self, live_search):
+        if live_search.cancelled():
+            return
+        live_search.step()
+        self._result = live_search.result
+        self._set_result_label()
+        if live_search.done():
+            self._last_search = live_search.search_string
+            self._last_period = live_search.period
+            # The first match is shown when the search is confirmed
+            self._result_index = 0
+            self._match_shown = False
+            self._view.UpdateButtons()
+        else:
+            self._view.ScheduleLiveSearchStep(
+                lambda: self._step_live_search(live_search))
+
+    def _cancel_live_search(self):
+        if self._live_search is not None:
+            self._live_search.cancel()
+
     def _search_for_events(self, new_search, new_period):
         if self._timeline_canvas is not None:
             self._result = self._timeline_canvas.GetFilteredEvents(new_search, new_period)
@@ -68,7 +117,7 @@ class SearchBarController(object):
             self._view.UpdateNbrOfMatchesLabel(' ' * 4 + '%d ' % nbr_of_matches + _('matches found'))
 
     def next(self):
-        if self._on_last_match():
+        if not self._match_shown or self._on_last_match():
             self._result_index = 0
         else:
             self._result_index += 1
@@ -94,6 +143,7 @@ class SearchBarController(object):
             event = self._result[self._result_index]
             self._timeline_canvas.Navigate(lambda tp: tp.center(event.mean_time()))
             self._timeline_canvas.HighligtEvent(event, clear=True)
+            self._match_shown = True
 
     def enable_backward(self):
         return bool(self._result and self._result_index > 0)
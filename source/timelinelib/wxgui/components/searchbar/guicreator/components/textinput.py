@@ -26,6 +26,7 @@ class TextInput:
         self._search = wx.SearchCtrl(parent, size=(150, -1), style=wx.TE_PROCESS_ENTER)
         parent.Bind(wx.EVT_SEARCHCTRL_SEARCH_BTN, self._event_handler, self._search)
         parent.Bind(wx.EVT_TEXT_ENTER, self._event_handler, self._search)
+        parent.Bind(wx.EVT_TEXT, self._text_changed_handler, self._search)
         parent.AddControl(self._search)
         
     def SetFocus(self):
@@ -36,4 +37,7 @@ class TextInput:
         
     def _event_handler(self, evt):
         self._controller.search()        
+
+    def _text_changed_handler(self, evt):
+        self._controller.live_search()
         
\ No newline at end of file
@@ -0,0 +1,116 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import time
+
+
+CHUNK_SIZE = 200
+TIME_SLICE_IN_SECONDS = 0.03
+
+
+class LiveSearch(object):
+    """
+    A search that is carried out in small steps so that the gui stays
+    responsive while the user is typing.
+
+    A search is either started from scratch, in which case the items of the
+    timeline are matched a chunk at a time, and then the events with the
+    matching ids are created and filtered a chunk at a time, or it refines
+    the result of a previous search, in which case only the events in that
+    result are matched against the new search string.
+
+    Every call to :meth:`step` does work for at most one time slice. A search
+    that has been cancelled does nothing more.
+    """
+
+    def __init__(self, search_string, period, time_period, chunk_fn, items, search=None):
+        self.search_string = search_string
+        self.period = period
+        self.time_period = time_period
+        self.result = []
+        self._chunk_fn = chunk_fn
+        self._items = items
+        self._search = search
+        self._position = 0
+        self._cancelled = False
+
+    @classmethod
+    def from_scratch(cls, timeline_canvas, search_string, period):
+        return cls(
+            search_string,
+            period,
+            timeline_canvas.GetSearchTimePeriod(period),
+            lambda ids: timeline_canvas.GetFilteredEventsWithIds(ids, period),
+            [],
+            timeline_canvas.StartEventSearch(search_string, period)
+        )
+
+    @classmethod
+    def refining(cls, previous_result, search_string, period, time_period):
+        target = search_string.lower()
+        return cls(
+            search_string,
+            period,
+            time_period,
+            lambda events: [event for event in events if _matches(event, target)],
+            previous_result
+        )
+
+    def can_be_refined_by(self, search_string, period, time_period):
+        return (
+            self.done() and
+            self.period == period and
+            self.time_period == time_period and
+            search_string.startswith(self.search_string)
+        )
+
+    def cancel(self):
+        self._cancelled = True
+
+    def cancelled(self):
+        return self._cancelled
+
+    def done(self):
+        return self._search is None and self._position >= len(self._items)
+
+    def step(self):
+        end_time = time.time() + TIME_SLICE_IN_SECONDS
+        while not self._cancelled and not self.done():
+            if self._search is not None:
+                self._step_search()
+            else:
+                chunk = self._items[self._position:self._position + CHUNK_SIZE]
+                self._position += len(chunk)
+                self.result.extend(self._chunk_fn(chunk))
+            if time.time() > end_time:
+                break
+
+    def _step_search(self):
+        self._search.step(CHUNK_SIZE)
+        if self._search.done():
+            self._items = self._search.get_result()
+            self._search = None
+
+
+def _matches(event, target):
+    text = event.get_text()
+    description = event.get_data("description")
+    return (
+        (text is not None and target in text.lower()) or
+        (description is not None and target in description.lower())
+    )
@@ -32,6 +32,9 @@ The parent of the component is the TimelinePanel.
 As with all gui components all business logic is handles by a controller.
 Actions on the components are directly delegated to the controller.
 
+Matches are searched for while the user types. The search is done in small
+steps so that typing is not slowed down on large timelines (see LiveSearch).
+
 The component (or actually the controller) needs a Canvas object in order 
 to find events containing the given text. The Canvas object is injected 
 with the SetTimelineCanvas() function.
@@ -78,6 +81,9 @@ class SearchBar(wx.ToolBar, GuiCreator):
         self.EnableTool(wx.ID_FORWARD, self._controller.enable_forward())
         self.EnableTool(wx.ID_MORE, self._controller.enable_list())
 
+    def ScheduleLiveSearchStep(self, step_fn):
+        wx.CallAfter(step_fn)
+
     def SetPeriodChoices(self, choices):
         self._period.SetPeriodChoices(choices)
 
@@ -318,7 +318,7 @@ class TimelinePanelGuiCreator(wx.Panel):
 
         def edit_function():
             if user_ack():
-                with self.timeline_canvas.GetDb().transaction("Delete events"):
+                with self.timeline_canvas.GetDb().batch("Delete events"):
                     for event in selected_events:
                         event.delete()
             self.timeline_canvas.ClearSelectedEvents()
@@ -345,7 +345,7 @@ class TimelinePanelGuiCreator(wx.Panel):
     # @experimental_feature(EVENT_DONE)
     def _context_menu_on_done_event(self, evt):
         def edit_function():
-            with self.timeline_canvas.GetDb().transaction("Mark events done"):
+            with self.timeline_canvas.GetDb().batch("Mark events done"):
                 for event in self.timeline_canvas.GetSelectedEvents():
                     if not event.is_container():
                         event.set_progress(100)
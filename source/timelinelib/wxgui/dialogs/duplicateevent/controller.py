@@ -84,7 +84,7 @@ class DuplicateEventDialogController(Controller):
 class EventDuplicator(object):
 
     def duplicate(self, event, periods):
-        with event.db.transaction("Duplicate event"):
+        with event.db.batch("Duplicate event"):
             self._duplicate_events(event, periods)
 
     def _duplicate_events(self, event, periods):
@@ -51,7 +51,7 @@ class ImportEventsDialog(Dialog):
     def __init__(self, db, parent=None):
         Dialog.__init__(self, ImportEventsDialogController, parent, {
             "header_label": _("Select timeline to import from:"),
-            "dialog_wildcard": WildcardHelper(_("Timeline files"), ["timeline", "ics"]).wildcard_string(),
+            "dialog_wildcard": WildcardHelper(_("Timeline files"), ["timeline", "timeline.gz", "ics"]).wildcard_string(),
         }, title=_("Import events"))
         self.controller.on_init(db)
 
@@ -45,7 +45,7 @@ class SetCategoryDialogController(Controller):
         return category is not None
 
     def _save_category_in_events(self, category):
-        with self._db.transaction("Set category"):
+        with self._db.batch("Set category"):
             if self._selected_event_ids == []:
                 self._save_category_in_events_for_events_without_category(category)
             else:
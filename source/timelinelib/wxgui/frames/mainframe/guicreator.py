@@ -23,12 +23,16 @@ A base class for the mainframe window, responsible for creating the GUI.
 import collections
 import wx
 
+from timelinelib.canvas.data.exceptions import TimelineIOError
+from timelinelib.dataimport.dir import ImportCancelledError
 from timelinelib.db.utils import safe_locking
 from timelinelib.meta.about import display_about_dialog
 from timelinelib.plugin.factory import EVENTBOX_DRAWER
 from timelinelib.plugin.factory import EXPORTER
+from timelinelib.plugin.factory import IMPORTER
 from timelinelib.plugin import factory
 from timelinelib.proxies.drawingarea import DrawingAreaProxy
+from timelinelib.utils import ex_msg
 from timelinelib.wxgui.components.mainpanel import MainPanel
 from timelinelib.wxgui.components.statusbaradapter import StatusBarAdapter
 from timelinelib.wxgui.dialogs.duplicateevent.view import open_duplicate_event_dialog_for_event
@@ -40,6 +44,8 @@ from timelinelib.wxgui.dialogs.milestone.view import open_milestone_editor_for
 from timelinelib.wxgui.dialogs.preferences.view import PreferencesDialog
 from timelinelib.wxgui.dialogs.shortcutseditor.view import ShortcutsEditorDialog
 from timelinelib.wxgui.dialogs.systeminfo.view import show_system_info_dialog
+from timelinelib.wxgui.utils import display_error_message
+from timelinelib.wxgui.utils import ProgressDialog
 
 
 NONE = 0
@@ -75,6 +81,7 @@ ID_FEEDBACK = wx.NewId()
 ID_CONTACT = wx.NewId()
 ID_SYSTEM_INFO = wx.NewId()
 ID_IMPORT = wx.NewId()
+ID_REFRESH = wx.NewId()
 ID_EXPORT = wx.NewId()
 ID_EXPORT_ALL = wx.NewId()
 ID_EXPORT_SVG = wx.NewId()
@@ -139,10 +146,12 @@ class GuiCreator(object):
         self._create_file_new_menu_item(file_menu)
         self._create_file_open_menu_item(file_menu)
         self._create_file_open_recent_menu(file_menu)
+        self._create_file_refresh_menu_item(file_menu)
         file_menu.AppendSeparator()
         self._create_file_save_as_menu(file_menu)
         file_menu.AppendSeparator()
         self._create_import_menu_item(file_menu)
+        self._create_import_plugin_menu_items(file_menu)
         file_menu.AppendSeparator()
         self._create_export_menues(file_menu)
         file_menu.AppendSeparator()
@@ -187,6 +196,13 @@ class GuiCreator(object):
         file_menu.AppendMenu(wx.ID_ANY, _("Open &Recent"), self.mnu_file_open_recent_submenu)
         self.update_open_recent_submenu()
 
+    def _create_file_refresh_menu_item(self, file_menu):
+        mnu_file_refresh = file_menu.Append(
+            ID_REFRESH, _("&Refresh"), _("Read the timeline again from the directory"))
+        self.shortcut_items[ID_REFRESH] = mnu_file_refresh
+        self.Bind(wx.EVT_MENU, self._mnu_file_refresh_on_click, mnu_file_refresh)
+        self.menu_controller.add_menu_requiring_refreshable_timeline(mnu_file_refresh)
+
     def _create_file_save_as_menu(self, file_menu):
         menu = file_menu.Append(wx.ID_SAVEAS, "", _("Save As..."))
         self.shortcut_items[wx.ID_SAVEAS] = menu
@@ -199,6 +215,18 @@ class GuiCreator(object):
         self.Bind(wx.EVT_MENU, self._mnu_file_import_on_click, mnu_file_import)
         self.menu_controller.add_menu_requiring_writable_timeline(mnu_file_import)
 
+    def _create_import_plugin_menu_items(self, file_menu):
+
+        def create_click_handler(plugin, main_frame):
+            def event_handler(evt):
+                plugin.run(main_frame)
+            return event_handler
+
+        for plugin in factory.get_plugins(IMPORTER) or []:
+            mnu = file_menu.Append(wx.ID_ANY, plugin.display_name(), plugin.display_name())
+            self.menu_controller.add_menu_requiring_writable_timeline(mnu)
+            self.Bind(wx.EVT_MENU, create_click_handler(plugin, self), mnu)
+
     def _create_file_exit_menu_item(self, file_menu):
         file_menu.Append(wx.ID_EXIT, "", _("Exit the program"))
         self.shortcut_items[wx.ID_EXIT] = file_menu.FindItemById(wx.ID_EXIT)
@@ -679,6 +707,17 @@ class GuiCreator(object):
         if self.timeline is not None:
             self._save_as()
 
+    def _mnu_file_refresh_on_click(self, event):
+        progress_dialog = ProgressDialog(_("Refreshing"), self.timeline.path, self)
+        try:
+            self.timeline.refresh(progress_dialog)
+        except ImportCancelledError:
+            pass
+        except TimelineIOError as e:
+            display_error_message(ex_msg(e), self)
+        finally:
+            progress_dialog.close()
+
     def _mnu_file_import_on_click(self, menu):
         def open_import_dialog():
             dialog = ImportEventsDialog(self.timeline, self)
@@ -130,7 +130,7 @@ class MainFrame(wx.Frame, guic.GuiCreator, MainFrameApiUsedByController):
     def _set_initial_values_to_member_variables(self):
         self.timeline = None
         self.timeline_wildcard_helper = WildcardHelper(
-            _("Timeline files"), ["timeline", "ics"])
+            _("Timeline files"), ["timeline", "timeline.gz", "ics"])
         self.images_svg_wildcard_helper = WildcardHelper(
             _("SVG files"), ["svg"])
 
@@ -218,7 +218,7 @@ class MainFrame(wx.Frame, guic.GuiCreator, MainFrameApiUsedByController):
 
     def _get_new_timeline_path_from_user(self):
         defaultDir = os.path.dirname(self.timeline.path)
-        wildcard_helper = WildcardHelper(_("Timeline files"), ["timeline"])
+        wildcard_helper = WildcardHelper(_("Timeline files"), ["timeline", "timeline.gz"])
         wildcard = wildcard_helper.wildcard_string()
         style = wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT
         message = _("Save Timeline As")
@@ -233,7 +233,8 @@ class MainFrame(wx.Frame, guic.GuiCreator, MainFrameApiUsedByController):
 
     def _save_timeline_to_new_path(self, new_timeline_path):
         if new_timeline_path is not None:
-            assert new_timeline_path.endswith(".timeline")
+            assert (new_timeline_path.endswith(".timeline") or
+                    new_timeline_path.endswith(".timeline.gz"))
             export_db_to_timeline_xml(self.timeline, new_timeline_path)
             self.controller.open_timeline(new_timeline_path)
 
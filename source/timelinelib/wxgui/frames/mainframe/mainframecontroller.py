@@ -71,6 +71,7 @@ class MainFrameController(object):
             self._config.append_recently_opened(path)
             self._main_frame.update_open_recent_submenu()
             self._timeline.path = path
+            self._configure_undo_history()
             self._main_frame.display_timeline(self._timeline)
             self._timelinepath = path
             self._last_changed = self._get_modification_date()
@@ -81,6 +82,14 @@ class MainFrameController(object):
             if path == ":numtutorial:":
                 self._main_frame._fit_all_events()
 
+    def _configure_undo_history(self):
+        max_bytes = self._config.undo_history_kilobytes * 1024
+        self._timeline.configure_undo_history(
+            self._config.undo_history_size,
+            max_bytes if max_bytes > 0 else None,
+            self._config.undo_history_spill_size
+        )
+
     def set_timeline_in_readonly_mode(self):
         try:
             self._timeline.set_readonly()
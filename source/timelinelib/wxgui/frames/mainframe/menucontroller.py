@@ -24,6 +24,7 @@ class MenuController(object):
         self.menus_requiring_timeline = []
         self.menus_requiring_writable_timeline = []
         self.menus_requiring_visible_timeline_view = []
+        self.menus_requiring_refreshable_timeline = []
 
     def on_timeline_change(self, timeline):
         self.current_timeline = timeline
@@ -38,6 +39,9 @@ class MenuController(object):
     def add_menu_requiring_visible_timeline_view(self, menu):
         self.menus_requiring_visible_timeline_view.append(menu)
 
+    def add_menu_requiring_refreshable_timeline(self, menu):
+        self.menus_requiring_refreshable_timeline.append(menu)
+
     def enable_disable_menus(self, timeline_view_visible):
         for menu in self.menus_requiring_writable_timeline:
             self._enable_disable_menu_requiring_writable_timeline(menu)
@@ -45,6 +49,8 @@ class MenuController(object):
             self._enable_disable_menu_requiring_timeline(menu)
         for menu in self.menus_requiring_visible_timeline_view:
             self._enable_disable_menu_requiring_visible_timeline_view(menu, timeline_view_visible)
+        for menu in self.menus_requiring_refreshable_timeline:
+            self._enable_disable_menu_requiring_refreshable_timeline(menu)
 
     def _enable_disable_menu_requiring_writable_timeline(self, menu):
         if not self._has_timeline:
@@ -59,3 +65,6 @@ class MenuController(object):
 
     def _enable_disable_menu_requiring_visible_timeline_view(self, menu, timeline_view_visible):
         menu.Enable(self._has_timeline and timeline_view_visible)
+
+    def _enable_disable_menu_requiring_refreshable_timeline(self, menu):
+        menu.Enable(self._has_timeline and self.current_timeline.can_refresh())
@@ -150,6 +150,41 @@ def _ask_question(question, parent=None):
                          wx.YES_NO | wx.CENTRE | wx.NO_DEFAULT, parent)
 
 
+class ProgressDialog(object):
+    """
+    A progress function, called with (done, total), that shows a dialog with
+    the progress. total is None while it is not known yet.
+
+    It returns False when the user has pressed cancel.
+    """
+
+    def __init__(self, title, message, parent=None):
+        self._title = title
+        self._message = message
+        self._parent = parent
+        self._dialog = None
+
+    def __call__(self, done, total):
+        if self._dialog is None:
+            self._dialog = wx.ProgressDialog(
+                self._title,
+                self._message,
+                parent=self._parent,
+                style=wx.PD_APP_MODAL | wx.PD_CAN_ABORT | wx.PD_ELAPSED_TIME
+            )
+        if total is None or total == 0:
+            (keep_going, _) = self._dialog.Pulse()
+        else:
+            self._dialog.SetRange(total)
+            (keep_going, _) = self._dialog.Update(min(done, total))
+        return keep_going
+
+    def close(self):
+        if self._dialog is not None:
+            self._dialog.Destroy()
+            self._dialog = None
+
+
 def set_wait_cursor(parent):
     parent.SetCursor(wx.StockCursor(wx.CURSOR_WAIT))
 
@@ -0,0 +1,212 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from mock import Mock
+
+from timelinelib.calendar.coptic.coptic import CopticDateTime
+from timelinelib.calendar.coptic.timetype import COPTIC
+from timelinelib.calendar.engine import memoize
+from timelinelib.calendar.engine import StripDay
+from timelinelib.calendar.engine import StripDecade
+from timelinelib.calendar.engine import StripHour
+from timelinelib.calendar.engine import StripMonth
+from timelinelib.calendar.engine import StripWeek
+from timelinelib.calendar.engine import StripYear
+from timelinelib.calendar.gregorian.timetype import GREGORIAN
+from timelinelib.calendar.pharaonic.pharaonic import PharaonicDateTime
+from timelinelib.calendar.pharaonic.timetype import PHARAONIC
+from timelinelib.canvas.appearance import Appearance
+from timelinelib.canvas.data import TimePeriod
+from timelinelib.test.cases.unit import UnitTestCase
+from timelinelib.test.utils import gregorian_period
+from timelinelib.test.utils import human_time_to_gregorian
+
+
+class describe_memoize(UnitTestCase):
+
+    def test_calls_function_once_per_key(self):
+        fn = Mock(return_value="value")
+        cache = {}
+        self.assertEqual(memoize(cache, "key", fn, 1, 2), "value")
+        self.assertEqual(memoize(cache, "key", fn, 1, 2), "value")
+        fn.assert_called_with(1, 2)
+        self.assertEqual(fn.call_count, 1)
+
+    def test_does_not_cache_exceptions(self):
+        fn = Mock(side_effect=ValueError())
+        cache = {}
+        self.assertRaises(ValueError, memoize, cache, "key", fn)
+        self.assertEqual(cache, {})
+
+
+class describe_calendar_strips(UnitTestCase):
+
+    def test_share_cached_labels_between_strips_of_the_same_calendar(self):
+        time = human_time_to_gregorian("1 Jul 2013")
+        label = StripMonth(GREGORIAN).label(time, True)
+        self.assertTrue(("month", time, True) in GREGORIAN.strip_labels)
+        self.assertEqual(StripMonth(GREGORIAN).label(time, True), label)
+
+    def test_cache_labels_per_skip_s_setting(self):
+        time = human_time_to_gregorian("1 Jan 2010")
+        strip = StripDecade(GREGORIAN)
+        self.assertEqual(strip.label(time), "2010s")
+        strip.set_skip_s_in_decade_text(True)
+        self.assertEqual(strip.label(time), "2010")
+
+    def test_cache_starts_per_week_start(self):
+        time = human_time_to_gregorian("10 Jul 2013")
+        appearance = Appearance()
+        strip = StripWeek(GREGORIAN, appearance)
+        appearance.set_week_start("monday")
+        self.assertEqual(strip.start(time), human_time_to_gregorian("8 Jul 2013"))
+        appearance.set_week_start("sunday")
+        self.assertEqual(strip.start(time), human_time_to_gregorian("7 Jul 2013"))
+
+    def test_coptic_month_strip_increments_to_end_of_short_month(self):
+        start = CopticDateTime.from_ymd(1735, 13, 1).to_time()
+        self.assertEqual(
+            StripMonth(COPTIC).increment(start),
+            CopticDateTime.from_ymd(1736, 1, 1).to_time()
+        )
+
+    def test_pharaonic_week_strip_spans_ten_days(self):
+        appearance = Appearance()
+        strip = StripWeek(PHARAONIC, appearance)
+        start = strip.start(PharaonicDateTime.from_ymd(1710, 1, 15).to_time())
+        self.assertEqual(PHARAONIC.get_day_of_week(start), 9)
+        self.assertEqual(
+            strip.increment(start),
+            start + PHARAONIC.delta_class.from_days(10)
+        )
+
+    def test_day_boundaries_cover_period(self):
+        self.assertEqual(
+            StripDay(GREGORIAN).boundaries(
+                human_time_to_gregorian("1 Jul 2013 12:00"),
+                human_time_to_gregorian("3 Jul 2013 12:00")
+            ),
+            [
+                human_time_to_gregorian("1 Jul 2013"),
+                human_time_to_gregorian("2 Jul 2013"),
+                human_time_to_gregorian("3 Jul 2013"),
+                human_time_to_gregorian("4 Jul 2013"),
+            ]
+        )
+
+    def test_hour_boundaries_end_at_end_of_period(self):
+        boundaries = StripHour(GREGORIAN).boundaries(
+            human_time_to_gregorian("1 Jul 2013 10:00"),
+            human_time_to_gregorian("1 Jul 2013 12:00")
+        )
+        self.assertEqual(boundaries[0], human_time_to_gregorian("1 Jul 2013 10:00"))
+        self.assertEqual(boundaries[-1], human_time_to_gregorian("1 Jul 2013 12:00"))
+        self.assertEqual(len(boundaries), 3)
+
+    def test_month_boundaries_include_short_thirteenth_month(self):
+        self.assertEqual(
+            StripMonth(COPTIC).boundaries(
+                CopticDateTime.from_ymd(1735, 12, 10).to_time(),
+                CopticDateTime.from_ymd(1736, 1, 10).to_time()
+            ),
+            [
+                CopticDateTime.from_ymd(1735, 12, 1).to_time(),
+                CopticDateTime.from_ymd(1735, 13, 1).to_time(),
+                CopticDateTime.from_ymd(1736, 1, 1).to_time(),
+                CopticDateTime.from_ymd(1736, 2, 1).to_time(),
+            ]
+        )
+
+    def test_boundaries_are_cached_per_period(self):
+        period = gregorian_period("1 Jan 2010", "1 Jan 2012")
+        boundaries = StripYear(GREGORIAN).boundaries(period.start_time, period.end_time)
+        self.assertTrue(
+            StripYear(GREGORIAN).boundaries(period.start_time, period.end_time)
+            is boundaries
+        )
+
+    def test_boundaries_are_empty_when_first_strip_is_outside_calendar(self):
+        min_time = GREGORIAN.get_min_time()
+        self.assertEqual(
+            StripYear(GREGORIAN).boundaries(
+                min_time, min_time + GREGORIAN.delta_class.from_days(10)
+            ),
+            []
+        )
+
+
+class describe_calendar_engine(UnitTestCase):
+
+    def test_month_step_forward_uses_length_of_current_month(self):
+        self.when_navigating(
+            GREGORIAN.forward_one_month_fn,
+            gregorian_period("1 Feb 2012", "1 Feb 2012")
+        )
+        self.then_period_becomes(gregorian_period("1 Mar 2012", "1 Mar 2012"))
+
+    def test_month_step_backward_uses_length_of_previous_month(self):
+        self.when_navigating(
+            GREGORIAN.backward_one_month_fn,
+            gregorian_period("1 Mar 2012", "1 Mar 2012")
+        )
+        self.then_period_becomes(gregorian_period("1 Feb 2012", "1 Feb 2012"))
+
+    def test_coptic_month_step_backward_over_short_month(self):
+        self.when_navigating(
+            COPTIC.backward_one_month_fn,
+            TimePeriod(
+                CopticDateTime.from_ymd(1736, 1, 1).to_time(),
+                CopticDateTime.from_ymd(1736, 1, 2).to_time()
+            )
+        )
+        self.then_period_becomes(TimePeriod(
+            CopticDateTime.from_ymd(1735, 13, 1).to_time(),
+            CopticDateTime.from_ymd(1735, 13, 2).to_time()
+        ))
+
+    def test_coptic_moves_months_over_year_with_thirteen_months(self):
+        period = TimePeriod(
+            CopticDateTime.from_ymd(1735, 12, 1).to_time(),
+            CopticDateTime.from_ymd(1735, 12, 2).to_time()
+        )
+        self.assertEqual(
+            COPTIC.move_period_num_months(period, 2),
+            TimePeriod(
+                CopticDateTime.from_ymd(1736, 1, 1).to_time(),
+                CopticDateTime.from_ymd(1736, 1, 2).to_time()
+            )
+        )
+
+    def test_pharaonic_week_step_is_ten_days(self):
+        start = PharaonicDateTime.from_ymd(1710, 1, 1).to_time()
+        self.when_navigating(
+            PHARAONIC.backward_one_week_fn,
+            TimePeriod(start, start)
+        )
+        self.then_period_becomes(TimePeriod(
+            PharaonicDateTime.from_ymd(1709, 12, 26).to_time(),
+            PharaonicDateTime.from_ymd(1709, 12, 26).to_time()
+        ))
+
+    def when_navigating(self, fn, period):
+        def navigation_fn(fn):
+            self.new_period = fn(period)
+        fn(None, period, navigation_fn)
+
+    def then_period_becomes(self, period):
+        self.assertEqual(self.new_period, period)
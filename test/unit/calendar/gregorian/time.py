@@ -16,6 +16,8 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import pickle
+
 from timelinelib.calendar.gregorian.time import GregorianDelta
 from timelinelib.calendar.gregorian.time import GregorianTime
 from timelinelib.test.cases.unit import UnitTestCase
@@ -56,6 +58,32 @@ class describe_time_properties(UnitTestCase):
     def test_can_return_min_time(self):
         self.assertEqual(GregorianTime(GregorianTime.MIN_JULIAN_DAY, 0), GregorianTime.min())
 
+    def test_rejects_arithmetic_before_min_time(self):
+        self.assertRaises(ValueError, lambda: GregorianTime.min() - GregorianDelta.from_seconds(1))
+
+    def test_can_be_ordered(self):
+        times = [GregorianTime(5, 10), GregorianTime(4, 20), GregorianTime(5, 0)]
+        self.assertEqual(sorted(times), [GregorianTime(4, 20), GregorianTime(5, 0), GregorianTime(5, 10)])
+        self.assertTrue(GregorianTime(5, 0) <= GregorianTime(5, 0))
+        self.assertTrue(GregorianTime(5, 0) >= GregorianTime(4, 86399))
+
+    def test_can_be_used_as_key(self):
+        self.assertEqual(hash(GregorianTime(5, 10)), hash(GregorianTime(5, 10)))
+        self.assertEqual(len(set([GregorianTime(5, 10), GregorianTime(5, 10)])), 1)
+
+    def test_has_no_instance_dict(self):
+        self.assertFalse(hasattr(GregorianTime(5, 10), "__dict__"))
+        self.assertFalse(hasattr(GregorianDelta.from_seconds(5), "__dict__"))
+
+    def test_can_be_pickled(self):
+        time = GregorianTime(5, 10)
+        self.assertEqual(pickle.loads(pickle.dumps(time, 2)), time)
+        self.assertEqual(pickle.loads(pickle.dumps(time)), time)
+
+    def test_can_be_created_from_total_seconds(self):
+        self.assertEqual(GregorianTime.from_total_seconds(24 * 60 * 60 + 5), GregorianTime(1, 5))
+        self.assertEqual(GregorianTime(1, 5).total_seconds, 24 * 60 * 60 + 5)
+
 
 class describe_time_delta_properties(UnitTestCase):
 
@@ -0,0 +1,67 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from timelinelib.canvas.data.changeset import Changeset
+from timelinelib.canvas.data.immutable import ImmutableCategory
+from timelinelib.canvas.data.immutable import ImmutableDB
+from timelinelib.canvas.data.immutable import ImmutableEvent
+from timelinelib.test.cases.unit import UnitTestCase
+
+
+class describe_changeset(UnitTestCase):
+
+    def test_is_empty_between_same_dbs(self):
+        self.assertTrue(Changeset.between(self.db, self.db).is_empty())
+
+    def test_finds_added_ids(self):
+        new_db = self.db.save_event(ImmutableEvent(text="new"), 3)
+        changeset = Changeset.between(self.db, new_db)
+        self.assertEqual(changeset.added("events"), set([3]))
+        self.assertEqual(changeset.updated("events"), set())
+        self.assertEqual(changeset.removed("events"), set())
+
+    def test_finds_updated_ids(self):
+        new_db = self.db.save_event(ImmutableEvent(text="changed"), 2)
+        changeset = Changeset.between(self.db, new_db)
+        self.assertEqual(changeset.updated("events"), set([2]))
+        self.assertEqual(changeset.changed_ids("events"), set([2]))
+
+    def test_finds_removed_ids(self):
+        new_db = self.db.delete_event(2)
+        changeset = Changeset.between(self.db, new_db)
+        self.assertEqual(changeset.removed("events"), set([2]))
+
+    def test_records_changes_in_each_table(self):
+        new_db = self.db.save_category(ImmutableCategory(name="new"), 4)
+        changeset = Changeset.between(self.db, new_db)
+        self.assertTrue(changeset.has_changes_in("categories"))
+        self.assertFalse(changeset.has_changes_in("events"))
+        self.assertFalse(changeset.is_empty())
+
+    def test_deleting_category_updates_events_in_it(self):
+        new_db = self.db.delete_category(1)
+        changeset = Changeset.between(self.db, new_db)
+        self.assertEqual(changeset.removed("categories"), set([1]))
+        self.assertEqual(changeset.updated("events"), set([2]))
+
+    def setUp(self):
+        self.db = ImmutableDB().save_category(
+            ImmutableCategory(name="work"), 1
+        ).save_event(
+            ImmutableEvent(text="event", category_id=1), 2
+        )
@@ -21,6 +21,7 @@ from timelinelib.test.utils import a_category_with
 from timelinelib.test.utils import a_container_with
 from timelinelib.test.utils import a_subevent_with
 from timelinelib.test.utils import CONTAINER_MODIFIERS
+from timelinelib.test.utils import gregorian_period
 
 
 class describe_container(UnitTestCase):
@@ -58,6 +59,33 @@ class describe_container(UnitTestCase):
     def test_is_not_a_milestone(self):
         self.assertFalse(a_container_with(text="container").is_milestone())
 
+    def test_time_period_follows_changed_subevent(self):
+        container = a_container_with(text="container")
+        subevent = a_subevent_with(start="1 Jan 2000", end="1 Feb 2000")
+        subevent.container = container
+        self.assertEqual(container.get_time_period(), gregorian_period("1 Jan 2000", "1 Feb 2000"))
+        subevent.time_period = gregorian_period("1 Jan 2001", "1 Feb 2001")
+        self.assertEqual(container.get_time_period(), gregorian_period("1 Jan 2001", "1 Feb 2001"))
+
+    def test_time_period_follows_unregistered_subevent(self):
+        container = a_container_with(text="container")
+        early = a_subevent_with(start="1 Jan 2000", end="1 Feb 2000")
+        late = a_subevent_with(start="1 Jan 2001", end="1 Feb 2001")
+        early.container = container
+        late.container = container
+        self.assertEqual(container.get_time_period(), gregorian_period("1 Jan 2000", "1 Feb 2001"))
+        early.container = None
+        self.assertEqual(container.get_time_period(), gregorian_period("1 Jan 2001", "1 Feb 2001"))
+
+    def test_sort_order_follows_changed_subevent(self):
+        container = a_container_with(text="container")
+        subevent = a_subevent_with(start="1 Jan 2000", end="1 Feb 2000")
+        subevent.sort_order = 5
+        subevent.container = container
+        self.assertEqual(container.sort_order, 5)
+        subevent.sort_order = 3
+        self.assertEqual(container.sort_order, 3)
+
 
 class describe_container_construction(UnitTestCase):
 
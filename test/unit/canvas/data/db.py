@@ -17,9 +17,13 @@
 
 
 from mock import Mock
+from mock import patch
 
 from timelinelib.canvas.data.db import MemoryDB
 from timelinelib.canvas.data.exceptions import TimelineIOError
+from timelinelib.canvas.data.immutable import ImmutableDBBuilder
+from timelinelib.canvas.data.immutable import ImmutableEvent
+from timelinelib.canvas.data.immutable import InvalidOperationError
 from timelinelib.canvas.drawing.viewproperties import ViewProperties
 from timelinelib.test.cases.unit import UnitTestCase
 from timelinelib.test.utils import a_category_with
@@ -322,6 +326,18 @@ class describe_memory_db(UnitTestCase):
         # Assert save not called
         self.assertEqual(self.save_callback_mock.call_count, 0)
 
+    def testRefreshCallsRefreshCallbackWithProgressFunction(self):
+        refresh_callback = Mock()
+        refresh_callback.return_value = 3
+        self.db.register_refresh_callback(refresh_callback)
+        self.assertTrue(self.db.can_refresh())
+        self.assertEqual(self.db.refresh(self.db_listener), 3)
+        refresh_callback.assert_called_with(self.db_listener)
+
+    def testCanNotRefreshWithoutRefreshCallback(self):
+        self.assertFalse(self.db.can_refresh())
+        self.assertEqual(self.db.refresh(), None)
+
     def testEventShouldNotBeFuzzyByDefault(self):
         self.assertFalse(self.e1.get_fuzzy())
 
@@ -341,6 +357,103 @@ class describe_memory_db(UnitTestCase):
         self.db.register(self.db_listener)
 
 
+class describe_change_notifications(UnitTestCase):
+
+    def test_listeners_get_ids_of_saved_events(self):
+        event = an_event_with(text="holiday")
+        self.db.save_event(event)
+        changeset = self.last_changeset()
+        self.assertEqual(changeset.added("events"), set([event.id]))
+        self.assertFalse(changeset.has_changes_in("categories"))
+
+    def test_listeners_get_ids_of_updated_and_deleted_events(self):
+        event = an_event_with(text="holiday")
+        self.db.save_event(event)
+        event.set_text("vacation")
+        self.db.save_event(event)
+        event_id = event.id
+        self.assertEqual(self.last_changeset().updated("events"), set([event_id]))
+        self.db.delete_event(event)
+        self.assertEqual(self.last_changeset().removed("events"), set([event_id]))
+
+    def test_listeners_get_changes_on_undo(self):
+        category = a_category_with(name="work")
+        self.db.save_category(category)
+        self.db.undo()
+        self.assertEqual(self.last_changeset().removed("categories"), set([category.id]))
+
+    def last_changeset(self):
+        (changeset,), _ = self.listener.call_args
+        return changeset
+
+    def setUp(self):
+        self.db = MemoryDB()
+        self.listener = Mock()
+        self.db.listen_for_changes(self.listener)
+
+
+class describe_batch(UnitTestCase):
+
+    def test_saves_all_items_in_one_transaction(self):
+        events = [an_event_with(text="event %d" % n) for n in range(3)]
+        with self.db.batch("Save many"):
+            for event in events:
+                self.db.save_event(event)
+        self.assertEqual(self.listener.call_count, 1)
+        (changeset,), _ = self.listener.call_args
+        self.assertEqual(
+            changeset.added("events"),
+            set(event.id for event in events)
+        )
+        index, is_in_transaction, history = self.db.transactions_status()
+        self.assertEqual(len(history), 2)
+
+    def test_items_can_be_read_during_batch(self):
+        with self.db.batch("Save many"):
+            event = an_event_with(text="holiday")
+            self.db.save_event(event)
+            self.assertEqual(self.db.find_event_with_id(event.id), event)
+            self.assertEqual(self.db.search("holiday"), [event])
+            self.assertEqual(self.db.get_max_sort_order(), event.sort_order)
+
+    def test_reads_during_batch_do_not_freeze_it(self):
+        with self.db.batch("Save many"):
+            container = self.db.new_container(text="box").save()
+            self.db.new_subevent(
+                text="inside",
+                time_period=gregorian_period("1 Jan 2020", "1 Jan 2020"),
+                container=container
+            ).save()
+            with patch.object(ImmutableDBBuilder, "freeze") as freeze:
+                self.assertEqual(
+                    [event.text for event in self.db.search(
+                        "box", gregorian_period("1 Dec 2019", "1 Feb 2020")
+                    )],
+                    ["box"]
+                )
+                self.assertEqual(
+                    len(self.db.get_events(gregorian_period("1 Dec 2019", "1 Feb 2020"))),
+                    2
+                )
+                self.assertEqual(len(self.db.get_all_immutable_events()), 2)
+                self.assertEqual(self.db.get_all_periods(), [])
+            self.assertFalse(freeze.called)
+
+    def test_is_rolled_back_if_references_are_broken(self):
+        event = an_event_with(text="holiday")
+        with self.assertRaises(InvalidOperationError):
+            with self.db.batch("Save many") as t:
+                self.db.save_event(event)
+                t.save_event(ImmutableEvent(category_id=99), self.db.next_id())
+        self.assertEqual(self.db.get_all_events(), [])
+        self.assertEqual(self.listener.call_count, 0)
+
+    def setUp(self):
+        self.db = MemoryDB()
+        self.listener = Mock()
+        self.db.listen_for_changes(self.listener)
+
+
 class describe_querying(UnitTestCase):
 
     def test_can_get_first_event(self):
@@ -368,6 +481,33 @@ class describe_querying(UnitTestCase):
         subevents = [e.text for e in all_events if e.is_subevent()]
         self.assertEqual((containers, subevents), (["con"], ["sub1"]))
 
+    def test_immutable_events_are_in_the_same_order_as_events(self):
+        self.db.save_event(an_event_with(text="first"))
+        self.db.save_events(
+            a_container(name="con", category=None, sub_events=[
+                ("sub1", None),
+                ("sub2", None),
+            ])
+        )
+        self.db.save_event(an_event_with(text="last"))
+        self.assertEqual(
+            [immutable_event.text for immutable_event in self.db.get_all_immutable_events()],
+            [event.text for event in self.db.get_all_events()]
+        )
+
+    def test_immutable_container_gets_period_of_subevents(self):
+        container = a_container_with(text="con")
+        self.db.save_events([
+            container,
+            a_subevent_with(start="1 Jan 2010", end="5 Jan 2010", container=container),
+            a_subevent_with(start="3 Jan 2010", end="9 Jan 2010", container=container),
+        ])
+        immutable_container = self.db.get_all_immutable_events()[0]
+        self.assertEqual(
+            immutable_container.time_period,
+            self.db.get_all_events()[0].get_time_period()
+        )
+
     def setUp(self):
         self.db = MemoryDB()
 
@@ -381,6 +521,33 @@ class describe_searching(UnitTestCase):
         self.db.save_event(football_event)
         self.assertEqual(self.db.search("holiday"), [holiday_event])
 
+    def test_finds_events_with_matching_text_inside_period(self):
+        early_event = an_event_with(text="training", time="1 Jan 2016")
+        late_event = an_event_with(text="training", time="1 Jan 2018")
+        self.db.save_event(early_event)
+        self.db.save_event(late_event)
+        self.assertEqual(
+            self.db.search("training", gregorian_period("1 Dec 2017", "1 Feb 2018")),
+            [late_event]
+        )
+
+    def test_finds_containers_by_the_period_of_their_subevents(self):
+        container = self.db.new_container(
+            text="box",
+            time_period=gregorian_period("1 Jan 2000", "1 Jan 2000")
+        ).save()
+        self.db.new_subevent(
+            text="inside",
+            time_period=gregorian_period("1 Jan 2020", "1 Jan 2020"),
+            container=container
+        ).save()
+        self.assertEqual(
+            [event.text for event in self.db.search(
+                "box", gregorian_period("1 Dec 2019", "1 Feb 2020")
+            )],
+            ["box"]
+        )
+
     def setUp(self):
         self.db = MemoryDB()
 
@@ -416,6 +583,18 @@ class describe_undo(UnitTestCase):
         self.db.redo()
         self.assertHasEvents(["football"])
 
+    def test_can_undo_beyond_history_in_memory(self):
+        self.db.configure_undo_history(2, spill_size=10)
+        for text in ["a", "b", "c", "d"]:
+            self.db.save_event(an_event_with(text=text))
+        for _ in range(4):
+            self.db.undo()
+        self.assertHasEvents([])
+        self.assertFalse(self.db.undo_enabled())
+        self.db.redo()
+        self.assertHasEvents(["a"])
+        self.assertTrue(self.db.transactions_memory_usage()[1] > 0)
+
     def assertHasEvents(self, event_texts):
         actual_event_texts = [e.get_text() for e in self.db.get_all_events()]
         self.assertEqual(actual_event_texts, event_texts)
@@ -738,6 +917,14 @@ class describe_eras(UnitTestCase):
         self.db.save_era(a_gregorian_era_with(ends_today=True))
         self.assertEqual(self.db.get_all_eras()[0].ends_today(), True)
 
+    def test_all_periods_are_reused_until_eras_change(self):
+        self.db.save_era(a_gregorian_era_with(start="1 Jan 2016", end="1 Feb 2016"))
+        first = self.db.get_all_periods()
+        self.assertEqual(self.db.get_all_periods(), first)
+        self.assertTrue(self.db.get_all_periods()[0] is first[0])
+        self.db.save_era(a_gregorian_era_with(start="15 Jan 2016", end="1 Mar 2016"))
+        self.assertEqual(len(self.db.get_all_periods()), 3)
+
     def setUp(self):
         self.db = MemoryDB()
 
@@ -181,6 +181,21 @@ class describe_overlapping_eras(ErasTestCase):
                           self.mix_colors(self.color2, self.color3),
                           self.color2], [e.color for e in periods])
 
+    def test_eras_that_do_not_overlap_are_returned_unchanged(self):
+        self.era1 = a_gregorian_era_with(start="1 Dec 2015", end="1 Jan 2016", color=self.color1)
+        self.era2 = a_gregorian_era_with(start="1 Feb 2016", end="1 Mar 2016", color=self.color2)
+        self.eras = Eras(self.db, eras=[self.era2, self.era1])
+        periods = self.eras.get_all_periods()
+        self.assertEqual([self.era1.get_time_period(), self.era2.get_time_period()],
+                         [e.get_time_period() for e in periods])
+        self.assertEqual([self.color1, self.color2], [e.color for e in periods])
+
+    def test_overlapping_era_gets_names_of_all_overlapped_eras(self):
+        self.given_three_overlapping_eras()
+        periods = self.eras.get_all_periods()
+        self.assertEqual(["1", "1 + 3", "1 + 3 + 2", "3 + 2", "2"],
+                         [e.get_name() for e in periods])
+
     def mix_colors(self, c0, c1):
         return ((c0[0] + c1[0]) / 2, (c0[1] + c1[1]) / 2, (c0[2] + c1[2]) / 2)
 
@@ -236,9 +251,9 @@ class describe_overlapping_eras(ErasTestCase):
         ])
 
     def given_three_overlapping_eras(self):
-        self.era1 = a_gregorian_era_with(start="1 Jan 2016", end="30 Mar 2016", color=self.color1)
-        self.era2 = a_gregorian_era_with(start="1 Feb 2016", end="30 Apr 2016", color=self.color2)
-        self.era3 = a_gregorian_era_with(start="15 Jan 2016", end="15 Apr 2016", color=self.color3)
+        self.era1 = a_gregorian_era_with(start="1 Jan 2016", end="30 Mar 2016", color=self.color1, name="1")
+        self.era2 = a_gregorian_era_with(start="1 Feb 2016", end="30 Apr 2016", color=self.color2, name="2")
+        self.era3 = a_gregorian_era_with(start="15 Jan 2016", end="15 Apr 2016", color=self.color3, name="3")
         self.eras = Eras(self.db, eras=[
             self.era1,
             self.era2,
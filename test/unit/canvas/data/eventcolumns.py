@@ -0,0 +1,143 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import random
+
+from timelinelib.calendar.gregorian.time import GregorianDelta
+from timelinelib.calendar.gregorian.timetype import GregorianTimeType
+from timelinelib.calendar.num.time import NumTime
+from timelinelib.canvas.data.eventcolumns import EventColumns
+from timelinelib.canvas.data.immutable import ImmutableDB
+from timelinelib.canvas.data.immutable import ImmutableEvent
+from timelinelib.canvas.data.immutable import ImmutableMilestone
+from timelinelib.canvas.data.timeperiod import TimePeriod
+from timelinelib.canvas.drawing.utils import Metrics
+from timelinelib.test.cases.unit import UnitTestCase
+from timelinelib.test.utils import gregorian_period
+from timelinelib.test.utils import human_time_to_gregorian
+
+
+WIDTH = 800
+
+
+class describe_event_columns(UnitTestCase):
+
+    USE_NUMPY = True
+
+    def test_finds_same_items_inside_period_as_time_period(self):
+        self.given_random_items()
+        for table in ["events", "milestones"]:
+            self.assertEqual(
+                self.columns.ids_inside_period(table, self.period),
+                sorted(
+                    id_
+                    for id_, record
+                    in getattr(self.db, table)
+                    if record.time_period.inside_period(self.period)
+                )
+            )
+
+    def test_calculates_same_x_positions_as_metrics(self):
+        self.given_random_items()
+        metrics = Metrics((WIDTH, 100), GregorianTimeType(), self.period, 0.5)
+        expected = {}
+        for table in ["events", "milestones"]:
+            for id_, record in getattr(self.db, table):
+                if record.time_period.inside_period(self.period):
+                    expected[id_] = (
+                        metrics.calc_x(record.time_period.start_time),
+                        metrics.calc_x(record.time_period.end_time),
+                    )
+        self.assertEqual(
+            self.columns.calc_x_positions(self.period, WIDTH),
+            expected
+        )
+
+    def test_is_updated_when_items_change(self):
+        self.given_random_items()
+        self.db = self.db.save_event(
+            ImmutableEvent(time_period=self.period), 1
+        ).delete_event(2)
+        self.columns.update(self.db)
+        ids = self.columns.ids_inside_period("events", self.period)
+        self.assertTrue(1 in ids)
+        self.assertFalse(2 in ids)
+
+    def test_is_updated_in_place_when_items_are_moved(self):
+        self.given_random_items()
+        self.columns.ids_inside_period("events", self.period)
+        self.db = self.db.save_event(
+            ImmutableEvent(time_period=gregorian_period("1 Jan 1000", "1 Jan 1000")), 1
+        )
+        self.columns.update(self.db)
+        self.assertFalse(1 in self.columns.ids_inside_period("events", self.period))
+
+    def test_handles_numeric_times(self):
+        self.db = ImmutableDB().save_event(
+            ImmutableEvent(time_period=TimePeriod(NumTime(5), NumTime(15))), 1
+        )
+        self.columns.update(self.db)
+        period = TimePeriod(NumTime(10), NumTime(20))
+        self.assertEqual(self.columns.ids_inside_period("events", period), [1])
+        self.assertEqual(
+            self.columns.calc_x_positions(period, 100),
+            {1: (-50, 50)}
+        )
+
+    def test_gives_none_for_times_that_are_not_supported(self):
+        self.db = ImmutableDB().save_event(
+            ImmutableEvent(time_period=TimePeriod(5, 15)), 1
+        )
+        self.columns.update(self.db)
+        self.assertEqual(
+            self.columns.ids_inside_period("events", TimePeriod(10, 20)),
+            None
+        )
+
+    def given_random_items(self):
+        random.seed(7)
+        start = human_time_to_gregorian("1 Jan 2010")
+        for id_ in range(1, 500):
+            start_time = start + GregorianDelta.from_seconds(
+                random.randint(0, 400 * 24 * 60 * 60)
+            )
+            end_time = start_time + GregorianDelta.from_seconds(
+                random.choice([0, random.randint(0, 90 * 24 * 60 * 60)])
+            )
+            if id_ % 10 == 0:
+                self.db = self.db.save_milestone(
+                    ImmutableMilestone(time_period=TimePeriod(start_time, start_time)),
+                    id_
+                )
+            else:
+                self.db = self.db.save_event(
+                    ImmutableEvent(time_period=TimePeriod(start_time, end_time)),
+                    id_
+                )
+        self.columns.update(self.db)
+
+    def setUp(self):
+        UnitTestCase.setUp(self)
+        self.db = ImmutableDB()
+        self.columns = EventColumns(use_numpy=self.USE_NUMPY)
+        self.period = gregorian_period("1 Mar 2010", "1 Sep 2010")
+
+
+class describe_event_columns_without_numpy(describe_event_columns):
+
+    USE_NUMPY = False
@@ -468,3 +468,101 @@ class describe_deleting_container(DBTestCase):
             r"^Container with id 99 does not exist$",
             db.delete_container, 99
         )
+
+
+class describe_building_db(DBTestCase):
+
+    def test_db_is_not_mutated(self):
+        db1 = ImmutableDB()
+        builder = db1.builder()
+        builder.save_event(ImmutableEvent(), 1)
+        db2 = builder.build()
+        self.assertEqual(db1, ImmutableDB())
+        self.assertDifferentIdentity(db1, db2)
+
+    def test_unchanged_tables_are_shared(self):
+        db1 = ImmutableDB().save_era(ImmutableEra(name="one"), 1)
+        builder = db1.builder()
+        builder.save_event(ImmutableEvent(), 2)
+        db2 = builder.build()
+        self.assertTrue(db1.eras is db2.eras)
+
+    def test_gives_same_result_as_changing_db(self):
+        db = ImmutableDB()
+        db = db.save_category(ImmutableCategory(name="work"), 1)
+        db = db.save_container(ImmutableContainer(text="project"), 2)
+        builder = db.builder()
+        builder.save_category(ImmutableCategory(name="home", parent_id=1), 3)
+        builder.save_event(ImmutableEvent(text="meeting", category_id=3, container_id=2), 4)
+        builder.save_milestone(ImmutableMilestone(text="start", category_id=3), 5)
+        builder.delete_category(1)
+        builder.delete_container(2)
+        self.assertEqual(
+            builder.build(),
+            db.save_category(ImmutableCategory(name="home", parent_id=1), 3)
+              .save_event(ImmutableEvent(text="meeting", category_id=3, container_id=2), 4)
+              .save_milestone(ImmutableMilestone(text="start", category_id=3), 5)
+              .delete_category(1)
+              .delete_container(2)
+        )
+
+    def test_references_are_checked_when_built(self):
+        builder = ImmutableDB().builder()
+        builder.save_event(ImmutableEvent(category_id=1), 2)
+        builder.save_category(ImmutableCategory(name="work"), 1)
+        self.assertEqual(len(builder.build().events), 1)
+
+    def test_fails_if_category_does_not_exist(self):
+        builder = ImmutableDB().builder()
+        builder.save_event(ImmutableEvent(category_id=99), 1)
+        self.assertRaisesRegexp(
+            InvalidOperationError,
+            r"^Category with id 99 does not exist$",
+            builder.build
+        )
+
+    def test_fails_if_container_does_not_exist(self):
+        builder = ImmutableDB().builder()
+        builder.save_event(ImmutableEvent(container_id=99), 1)
+        self.assertRaisesRegexp(
+            InvalidOperationError,
+            r"^Container with id 99 does not exist$",
+            builder.build
+        )
+
+    def test_fails_if_category_name_exists(self):
+        builder = ImmutableDB().save_category(ImmutableCategory(name="foo"), 1).builder()
+        builder.save_category(ImmutableCategory(name="foo"), 2)
+        self.assertRaisesRegexp(
+            InvalidOperationError,
+            r"^Category name 'foo' is not unique$",
+            builder.build
+        )
+
+    def test_fails_if_category_parent_is_circular(self):
+        builder = ImmutableDB().builder()
+        builder.save_category(ImmutableCategory(name="a", parent_id=2), 1)
+        builder.save_category(ImmutableCategory(name="b", parent_id=1), 2)
+        self.assertRaisesRegexp(
+            InvalidOperationError,
+            r"^Circular category parent$",
+            builder.build
+        )
+
+    def test_fails_at_once_if_deleted_item_does_not_exist(self):
+        builder = ImmutableDB().builder()
+        self.assertRaisesRegexp(
+            InvalidOperationError,
+            r"^Event with id 99 does not exist$",
+            builder.delete_event, 99
+        )
+
+    def test_keeps_track_of_max_sort_order(self):
+        db = ImmutableDB().save_event(ImmutableEvent(sort_order=4), 1)
+        builder = db.builder()
+        self.assertEqual(builder.get_max_sort_order(), 4)
+        builder.save_milestone(ImmutableMilestone(sort_order=7), 2)
+        self.assertEqual(builder.get_max_sort_order(), 7)
+        builder.delete_milestone(2)
+        self.assertEqual(builder.get_max_sort_order(), 4)
+        self.assertEqual(db.get_max_sort_order(), 4)
@@ -0,0 +1,188 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from timelinelib.canvas.data.immutable import ImmutableContainer
+from timelinelib.canvas.data.immutable import ImmutableDB
+from timelinelib.canvas.data.immutable import ImmutableEvent
+from timelinelib.canvas.data.immutable import ImmutableMilestone
+from timelinelib.canvas.data.searchindex import SearchIndex
+from timelinelib.general.lazyvalue import CompressedText
+from timelinelib.general.lazyvalue import LazyValue
+import timelinelib.general.lazyvalue as lazyvalue
+from timelinelib.test.cases.unit import UnitTestCase
+from timelinelib.test.utils import gregorian_period
+
+
+class describe_search_index(UnitTestCase):
+
+    def test_finds_substring_in_text(self):
+        self.save_event(1, text="Holiday in the Alps")
+        self.save_event(2, text="Football training")
+        self.assertEqual(self.search("day in"), [1])
+
+    def test_finds_substring_in_description(self):
+        self.save_event(1, text="Holiday", description="Skiing in the Alps")
+        self.assertEqual(self.search("alps"), [1])
+
+    def test_reads_lazy_description_again_to_verify_match(self):
+        description = LazyValue(CompressedText(u"Skiing in the Alps"))
+        self.save_event(1, text="Holiday", description=description)
+        self.index.update(self.db)
+        lazyvalue.DECODED_VALUES.clear()
+        self.assertEqual(self.search("alps"), [1])
+        self.assertTrue(description in lazyvalue.DECODED_VALUES)
+
+    def test_changed_lazy_description_is_reindexed(self):
+        self.save_event(1, text="Holiday", description=LazyValue(CompressedText(u"Alps")))
+        self.assertEqual(self.search("alps"), [1])
+        self.save_event(1, text="Holiday", description=LazyValue(CompressedText(u"Beach")))
+        self.assertEqual(self.search("alps"), [])
+        self.assertEqual(self.search("beach"), [1])
+
+    def test_does_not_match_across_text_and_description(self):
+        self.save_event(1, text="Holi", description="day")
+        self.assertEqual(self.search("holiday"), [])
+
+    def test_finds_short_search_strings(self):
+        self.save_event(1, text="ab")
+        self.save_event(2, text="cd")
+        self.assertEqual(self.search("b"), [1])
+
+    def test_finds_short_search_strings_inside_longer_texts(self):
+        self.save_event(1, text="Holiday", description="x")
+        self.save_event(2, text="Alps", description="ay")
+        self.save_event(3, text="Beach")
+        self.assertEqual(sorted(self.search("ay")), [1, 2])
+        self.assertEqual(sorted(self.search("x")), [1])
+
+    def test_short_search_strings_do_not_find_changed_texts(self):
+        self.save_event(1, text="ab")
+        self.assertEqual(self.search("ab"), [1])
+        self.save_event(1, text="Holiday")
+        self.assertEqual(self.search("ab"), [])
+        self.assertEqual(self.search("ol"), [1])
+
+    def test_empty_search_string_matches_everything(self):
+        self.save_event(1, text="one")
+        self.save_event(2, text=None)
+        self.assertEqual(sorted(self.search("")), [1, 2])
+
+    def test_finds_milestones(self):
+        self.db = self.db.save_milestone(ImmutableMilestone(
+            text="release",
+            time_period=gregorian_period("1 Jan 2017", "1 Jan 2017"),
+        ), 1)
+        self.assertEqual(self.search("release"), [1])
+
+    def test_results_are_sorted_by_mean_time(self):
+        self.save_event(1, text="match", period=("1 Jan 2018", "1 Jan 2018"))
+        self.save_event(2, text="match", period=("1 Jan 2016", "1 Jan 2016"))
+        self.assertEqual(self.search("match"), [2, 1])
+
+    def test_search_can_be_run_a_few_candidates_at_a_time(self):
+        self.save_event(1, text="match", period=("1 Jan 2018", "1 Jan 2018"))
+        self.save_event(2, text="match", period=("1 Jan 2016", "1 Jan 2016"))
+        self.index.update(self.db)
+        search = self.index.start_search("match")
+        search.step(1)
+        self.assertFalse(search.done())
+        self.assertEqual(len(search.get_result()), 1)
+        search.step(1)
+        self.assertTrue(search.done())
+        self.assertEqual(search.get_result(), [2, 1])
+
+    def test_started_search_does_not_see_later_changes(self):
+        self.save_container(1, text="box", period=("1 Jan 2000", "1 Jan 2000"))
+        self.save_event(2, text="inside", period=("1 Jan 2020", "1 Jan 2020"), container_id=1)
+        self.index.update(self.db)
+        search = self.index.start_search("box", gregorian_period("1 Dec 2019", "1 Feb 2020"))
+        self.db = self.db.delete_event(2)
+        self.index.update(self.db)
+        self.assertEqual(search.run(), [1])
+
+    def test_can_limit_search_to_period(self):
+        self.save_event(1, text="match", period=("1 Jan 2018", "1 Jan 2018"))
+        self.save_event(2, text="match", period=("1 Jan 2016", "1 Jan 2016"))
+        self.assertEqual(
+            self.search("match", gregorian_period("1 Dec 2017", "1 Feb 2018")),
+            [1]
+        )
+
+    def test_container_has_period_of_its_subevents(self):
+        self.save_container(1, text="box", period=("1 Jan 2000", "1 Jan 2000"))
+        self.save_event(2, text="inside", period=("1 Jan 2020", "1 Jan 2020"), container_id=1)
+        self.assertEqual(
+            self.search("box", gregorian_period("1 Dec 2019", "1 Feb 2020")),
+            [1]
+        )
+        self.assertEqual(
+            self.search("box", gregorian_period("1 Dec 1999", "1 Feb 2000")),
+            []
+        )
+
+    def test_container_period_follows_moved_subevents(self):
+        self.save_container(1, text="box", period=("1 Jan 2000", "1 Jan 2000"))
+        self.save_event(2, text="inside", period=("1 Jan 2020", "1 Jan 2020"), container_id=1)
+        self.assertEqual(self.search("box", gregorian_period("1 Dec 2019", "1 Feb 2020")), [1])
+        self.save_event(2, text="inside", period=("1 Jan 2030", "1 Jan 2030"), container_id=1)
+        self.assertEqual(self.search("box", gregorian_period("1 Dec 2019", "1 Feb 2020")), [])
+        self.db = self.db.delete_event(2)
+        self.assertEqual(self.search("box", gregorian_period("1 Dec 1999", "1 Feb 2000")), [1])
+
+    def test_changed_text_is_reindexed(self):
+        self.save_event(1, text="old")
+        self.assertEqual(self.search("old"), [1])
+        self.save_event(1, text="new")
+        self.assertEqual(self.search("old"), [])
+        self.assertEqual(self.search("new"), [1])
+
+    def test_deleted_event_is_removed(self):
+        self.save_event(1, text="deleted")
+        self.assertEqual(self.search("deleted"), [1])
+        self.db = self.db.delete_event(1)
+        self.assertEqual(self.search("deleted"), [])
+
+    def test_going_back_to_old_db_restores_old_results(self):
+        self.save_event(1, text="first")
+        old_db = self.db
+        self.save_event(2, text="first again")
+        self.assertEqual(sorted(self.search("first")), [1, 2])
+        self.db = old_db
+        self.assertEqual(self.search("first"), [1])
+
+    def setUp(self):
+        self.db = ImmutableDB()
+        self.index = SearchIndex()
+
+    def save_event(self, id_, text, description=None, period=("1 Jan 2017", "1 Jan 2017"), container_id=None):
+        self.db = self.db.save_event(ImmutableEvent(
+            text=text,
+            description=description,
+            time_period=gregorian_period(*period),
+            container_id=container_id,
+        ), id_)
+
+    def save_container(self, id_, text, period):
+        self.db = self.db.save_container(ImmutableContainer(
+            text=text,
+            time_period=gregorian_period(*period),
+        ), id_)
+
+    def search(self, search_string, time_period=None):
+        self.index.update(self.db)
+        return self.index.search(search_string, time_period)
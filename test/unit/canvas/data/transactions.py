@@ -22,6 +22,7 @@ from mock import Mock
 
 from timelinelib.canvas.data.transactions import TransactionError
 from timelinelib.canvas.data.transactions import Transactions
+from timelinelib.general.deltastore import DeltaStore
 from timelinelib.test.cases.unit import UnitTestCase
 
 
@@ -214,6 +215,139 @@ class describe_transactions(UnitTestCase):
         self.transactions.clear()
         self.assertEqual(fn.call_count, 1)
 
+    def test_change_listeners_get_changes_from_changes_fn(self):
+        fn = Mock()
+        transactions = Transactions(
+            ImmutableText(""),
+            changes_fn=lambda old, new: (old, new)
+        )
+        transactions.listen_for_changes(fn)
+        with transactions.new("t1") as t:
+            t.append("1")
+        transactions.move(0)
+        self.assertEqual(
+            [args for (args, kwargs) in fn.call_args_list],
+            [
+                ((ImmutableText(""), ImmutableText("1")),),
+                ((ImmutableText("1"), ImmutableText("")),),
+            ]
+        )
+
+    def test_change_listeners_get_none_without_changes_fn(self):
+        fn = Mock()
+        self.transactions.listen_for_changes(fn)
+        self.transactions.clear()
+        fn.assert_called_with(None)
+
+    def test_batch_commits_built_value_once(self):
+        fn = Mock()
+        self.transactions.listen_for_any(fn)
+        with self.transactions.new_batch("Batch") as t:
+            t.append("1")
+            with self.transactions.new("Inner") as t1:
+                t1.append("2")
+            self.assertTrue(isinstance(self.transactions.value, TextBuilder))
+        self.assertHasValue(ImmutableText("12"))
+        self.assertEqual(len(self.transactions.status[2]), 2)
+        self.assertEqual(fn.call_count, 1)
+
+    def test_batch_is_rolled_back_if_build_fails(self):
+        with self.assertRaises(TestError):
+            with self.transactions.new_batch("Batch") as t:
+                t.append("!")
+        self.assertHasValue(ImmutableText(""))
+        self.assertEqual(self.transactions.status[1], False)
+
+    def test_batch_is_rolled_back_if_nested_transaction_was_rolled_back(self):
+        with self.assertRaisesRegexp(TransactionError, "nested transaction"):
+            with self.transactions.new_batch("Batch") as t:
+                t.append("1")
+                try:
+                    with self.transactions.new("Inner") as t1:
+                        t1.append("2")
+                        raise TestError()
+                except TestError:
+                    pass
+        self.assertHasValue(ImmutableText(""))
+
+    def test_batch_in_batch_is_ordinary_transaction(self):
+        with self.transactions.new_batch("Outer") as t:
+            t.append("1")
+            with self.transactions.new_batch("Inner") as t1:
+                t1.append("2")
+        self.assertHasValue(ImmutableText("12"))
+
+    def test_history_can_be_limited_by_bytes(self):
+        self.transactions = Transactions(
+            ImmutableText(""),
+            size_fn=lambda old, new: len(new) - len(old)
+        )
+        self.transactions.configure_history(10, history_bytes=2)
+        for text in ["123", "45", "6"]:
+            with self.transactions.new(text) as t:
+                t.append(text)
+        self.assertEqual(self.transactions.status, (1, False, [
+            ("45", ImmutableText("12345")),
+            ("6", ImmutableText("123456")),
+        ]))
+        self.assertEqual(self.transactions.memory_usage, (1, 0))
+
+    def test_can_move_to_spilled_history(self):
+        self.transactions.configure_history(2, spill_store=self.spill_store)
+        for number in range(4):
+            with self.transactions.new("t{0}".format(number)) as t:
+                t.append(str(number))
+        self.assertEqual(self.transactions.status, (4, False, [
+            (self.INITIAL, None),
+            ("t0", None),
+            ("t1", None),
+            ("t2", ImmutableText("012")),
+            ("t3", ImmutableText("0123")),
+        ]))
+        self.transactions.move(1)
+        self.assertHasValue(ImmutableText("0"))
+        self.transactions.move(0)
+        self.assertHasValue(ImmutableText(""))
+
+    def test_moving_back_in_spilled_history_applies_one_delta_per_step(self):
+        applied_deltas = []
+        self.transactions.configure_history(2, spill_store=DeltaStore(
+            lambda newer, older: older,
+            lambda newer, delta: applied_deltas.append(delta) or delta
+        ))
+        for number in range(4):
+            with self.transactions.new("t{0}".format(number)) as t:
+                t.append(str(number))
+        for index in [2, 1, 0]:
+            self.transactions.move(index)
+            self.transactions.value
+        self.assertEqual(applied_deltas, ["01", "0", ""])
+
+    def test_future_history_is_erased_when_new_transaction_in_spilled_history(self):
+        self.transactions.configure_history(2, spill_store=self.spill_store)
+        for number in range(4):
+            with self.transactions.new("t{0}".format(number)) as t:
+                t.append(str(number))
+        self.transactions.move(1)
+        with self.transactions.new("new") as t:
+            t.append("x")
+        self.assertEqual(self.transactions.status, (2, False, [
+            (self.INITIAL, None),
+            ("t0", ImmutableText("0")),
+            ("new", ImmutableText("0x")),
+        ]))
+
+    def test_configuring_history_clears_it(self):
+        with self.transactions.new("t1") as t:
+            t.append("1")
+        self.transactions.configure_history(3)
+        self.assertEqual(self.transactions.status, (0, False, [
+            ("t1", ImmutableText("1")),
+        ]))
+
+    def test_memory_usage_is_unknown_without_byte_limit(self):
+        self.assertEqual(self.transactions.memory_usage, (None, 0))
+
     def assertHasValue(self, value):
         self.assertEqual(self.transactions.value, value)
 
@@ -231,6 +365,10 @@ class describe_transactions(UnitTestCase):
             initial_name=self.INITIAL,
             history_size=self.MAX
         )
+        self.spill_store = DeltaStore(
+            lambda newer, older: older,
+            lambda newer, delta: delta
+        )
 
 
 class ImmutableText(str):
@@ -238,6 +376,25 @@ class ImmutableText(str):
     def append(self, text):
         return ImmutableText(self + text)
 
+    def builder(self):
+        return TextBuilder(self)
+
+
+class TextBuilder(object):
+
+    def __init__(self, text):
+        self._parts = [text]
+
+    def append(self, text):
+        self._parts.append(text)
+        return self
+
+    def build(self):
+        text = "".join(self._parts)
+        if "!" in text:
+            raise TestError()
+        return ImmutableText(text)
+
 
 class TestError(Exception):
     pass
@@ -0,0 +1,76 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from timelinelib.canvas.data.immutable import ImmutableCategory
+from timelinelib.canvas.data.immutable import ImmutableDB
+from timelinelib.canvas.data.immutable import ImmutableEvent
+from timelinelib.canvas.data.undohistory import apply_delta
+from timelinelib.canvas.data.undohistory import approximate_size
+from timelinelib.canvas.data.undohistory import create_delta
+from timelinelib.canvas.data.undohistory import create_spill_store
+from timelinelib.test.cases.unit import UnitTestCase
+from timelinelib.test.utils import gregorian_period
+
+
+class describe_undo_history(UnitTestCase):
+
+    def test_delta_recreates_older_db(self):
+        newer_db = self.db.save_event(
+            ImmutableEvent(text="changed", category_id=1), 2
+        ).save_event(
+            ImmutableEvent(text="new"), 3
+        ).delete_category(1)
+        older_db = apply_delta(newer_db, create_delta(newer_db, self.db))
+        self.assertEqual(older_db, self.db)
+
+    def test_delta_only_contains_changed_tables_and_records(self):
+        newer_db = self.db.save_event(ImmutableEvent(text="new"), 3)
+        delta = create_delta(newer_db, self.db)
+        self.assertEqual(delta, {"events": ({}, [3])})
+
+    def test_spill_store_recreates_older_db(self):
+        store = create_spill_store(5)
+        newer_db = self.db.save_event(
+            ImmutableEvent(
+                text="event",
+                time_period=gregorian_period("1 Jan 2010", "2 Jan 2010")
+            ),
+            2
+        )
+        store.push("change", self.db, newer_db)
+        self.assertEqual(store.get_value(0, newer_db), self.db)
+
+    def test_size_only_counts_changed_records(self):
+        many_db = ImmutableDB()
+        for id_ in range(100):
+            many_db = many_db.save_event(ImmutableEvent(text="event"), id_)
+        many_one_db = many_db.save_event(ImmutableEvent(text="new"), 3)
+        self.assertTrue(
+            approximate_size(many_db, many_one_db) <
+            approximate_size(ImmutableDB(), many_db)
+        )
+
+    def test_size_is_zero_for_same_db(self):
+        self.assertEqual(approximate_size(self.db, self.db), 0)
+
+    def setUp(self):
+        self.db = ImmutableDB().save_category(
+            ImmutableCategory(name="work"), 1
+        ).save_event(
+            ImmutableEvent(text="event", category_id=1), 2
+        )
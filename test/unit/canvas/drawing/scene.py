@@ -105,6 +105,19 @@ class describe_scene(UnitTestCase):
         except Exception:
             self.assertTrue(False)
 
+    def test_minor_strips_cover_displayed_period(self):
+        self.given_displayed_period("1 Jan 2010", "1 Jan 2011")
+        self.when_scene_is_created()
+        self.assertEqual(len(self.scene.minor_strip_data), 12)
+        self.assertEqual(
+            self.scene.minor_strip_data[0],
+            gregorian_period("1 Jan 2010", "1 Feb 2010")
+        )
+        self.assertEqual(
+            self.scene.minor_strip_data[-1],
+            gregorian_period("1 Dec 2010", "1 Jan 2011")
+        )
+
     def test_ends_today_is_reset_when_start_date_is_in_future(self):
         self.given_displayed_period("1 Jan 2010", "10 Jan 3018")
         self.given_visible_event_at("1 Jan 3017", "1 Feb 3017", ends_today=True)
@@ -16,6 +16,8 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from mock import Mock
+
 from timelinelib.canvas.drawing.viewproperties import ViewProperties
 from timelinelib.test.cases.unit import UnitTestCase
 from timelinelib.test.utils import an_event_with, a_container, a_category_with
@@ -85,6 +87,36 @@ class describe_event_visiblity(Base):
         self.view_properties.set_category_visible(self.work, False)
         self.assertEventWithCategoryVisible(self.boring_meetings)
 
+    def test_visibility_is_updated_when_switching_to_individual_view(self):
+        self.view_properties.set_category_visible(self.work, False)
+        self.assertEventWithCategoryHidden(self.boring_meetings)
+        self.view_properties.change_view_cats_individually(True)
+        self.assertEventWithCategoryVisible(self.boring_meetings)
+
+    def test_visibility_is_updated_when_parent_is_shown_again(self):
+        self.view_properties.set_category_visible(self.work, False)
+        self.assertEventWithCategoryHidden(self.boring_meetings)
+        self.view_properties.set_category_visible(self.work, True)
+        self.assertEventWithCategoryVisible(self.boring_meetings)
+
+    def test_visibility_is_updated_when_category_tree_changes(self):
+        self.view_properties.set_category_visible(self.work, False)
+        self.assertEventWithCategoryHidden(self.boring_meetings)
+        self.meetings.set_parent(None)
+        self.view_properties.category_tree_changed()
+        self.assertEventWithCategoryVisible(self.boring_meetings)
+
+    def test_version_changes_when_visibility_changes(self):
+        version = self.view_properties.category_visibility_version
+        self.view_properties.set_category_visible(self.work, False)
+        self.assertNotEqual(self.view_properties.category_visibility_version, version)
+
+    def test_version_does_not_change_when_visibility_is_unchanged(self):
+        self.view_properties.set_category_visible(self.work, False)
+        version = self.view_properties.category_visibility_version
+        self.view_properties.set_category_visible(self.work, False)
+        self.assertEqual(self.view_properties.category_visibility_version, version)
+
 
 class describe_event_filtering(Base):
 
@@ -129,6 +161,77 @@ class describe_event_filtering(Base):
         self.assertEqual(self.view_properties.filter_events(events), [])
 
 
+class describe_selection(Base):
+
+    def test_nothing_selected_by_default(self):
+        self.assertFalse(self.view_properties.is_selected(self.events[0]))
+        self.assertEqual(self.view_properties.get_selected_event_ids(), [])
+
+    def test_selected_ids_are_kept_in_selection_order(self):
+        self.view_properties.set_selected(self.events[2])
+        self.view_properties.set_selected(self.events[0])
+        self.assertEqual(
+            self.view_properties.get_selected_event_ids(),
+            [self.events[2].get_id(), self.events[0].get_id()]
+        )
+
+    def test_can_select_and_deselect_many_events_with_one_notification(self):
+        self.view_properties.set_events_selected(self.events)
+        self.assertTrue(all(self.view_properties.is_selected(e) for e in self.events))
+        self.view_properties.set_events_selected(self.events[:2], False)
+        self.assertEqual(
+            self.view_properties.get_selected_event_ids(),
+            [self.events[2].get_id()]
+        )
+        self.assertEqual(self.listener.call_count, 2)
+
+    def test_does_not_notify_if_selection_is_unchanged(self):
+        self.view_properties.set_events_selected(self.events)
+        self.view_properties.set_events_selected(self.events)
+        self.assertEqual(self.listener.call_count, 1)
+
+    def test_can_toggle_selection_of_many_events(self):
+        self.view_properties.set_selected(self.events[0])
+        self.view_properties.toggle_events_selected(self.events)
+        self.assertFalse(self.view_properties.is_selected(self.events[0]))
+        self.assertTrue(self.view_properties.is_selected(self.events[1]))
+        self.assertTrue(self.view_properties.is_selected(self.events[2]))
+        self.assertEqual(self.listener.call_count, 2)
+
+    def test_does_not_notify_when_toggling_no_events(self):
+        self.view_properties.toggle_events_selected([])
+        self.assertEqual(self.listener.call_count, 0)
+
+    def test_set_only_selected_replaces_selection(self):
+        self.view_properties.set_events_selected(self.events)
+        self.view_properties.set_only_selected(self.events[1], True)
+        self.assertEqual(
+            self.view_properties.get_selected_event_ids(),
+            [self.events[1].get_id()]
+        )
+
+    def test_returned_ids_can_not_change_selection(self):
+        self.view_properties.set_selected(self.events[0])
+        self.view_properties.get_selected_event_ids().append(99)
+        self.assertEqual(len(self.view_properties.get_selected_event_ids()), 1)
+
+    def test_can_give_events_sticky_balloons(self):
+        self.view_properties.set_event_has_sticky_balloon(self.events[0])
+        self.assertTrue(self.view_properties.event_has_sticky_balloon(self.events[0]))
+        self.view_properties.set_event_has_sticky_balloon(self.events[0], False)
+        self.assertFalse(self.view_properties.event_has_sticky_balloon(self.events[0]))
+
+    def setUp(self):
+        Base.setUp(self)
+        self.events = []
+        for text in ["1", "2", "3"]:
+            event = an_event_with(text=text)
+            event.set_id(self.new_id())
+            self.events.append(event)
+        self.listener = Mock()
+        self.view_properties.listen_for_any(self.listener)
+
+
 class describe_highlight(Base):
 
     def test_can_add_highlight_to_events(self):
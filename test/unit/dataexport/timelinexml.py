@@ -16,14 +16,146 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import gzip
+import os
+import StringIO
+
 from timelinelib.canvas.data.db import MemoryDB
+from timelinelib.canvas.data.milestone import Milestone
 from timelinelib.dataexport.timelinexml import export_db_to_timeline_xml
+from timelinelib.dataexport.timelinexml import TimelineFile
+from timelinelib.dataexport.timelinexml import WriteBuffer
 from timelinelib.dataimport.timelinexml import import_db_from_timeline_xml
+from timelinelib.general.lazyvalue import CompressedText
+from timelinelib.general.lazyvalue import LazyValue
+from timelinelib.general.lazyvalue import TextSource
+from timelinelib.meta.version import get_full_version
 from timelinelib.test.cases.tmpdir import TmpDirTestCase
+from timelinelib.test.cases.unit import UnitTestCase
+from timelinelib.test.utils import a_category_with
 from timelinelib.test.utils import a_container
+from timelinelib.test.utils import a_container_with
+from timelinelib.test.utils import a_gregorian_era_with
+from timelinelib.test.utils import a_subevent_with
+from timelinelib.test.utils import gregorian_period
+from timelinelib.test.utils import human_time_to_gregorian
 from timelinelib.test.utils import an_event_with
 
 
+EXPECTED_DOCUMENT = """\
+<?xml version="1.0" encoding="utf-8"?>
+<timeline>
+  <version>%s</version>
+  <timetype>gregoriantime</timetype>
+  <eras>
+    <era>
+      <name>spring</name>
+      <start>2018-01-01 00:00:00</start>
+      <end>2018-06-01 00:00:00</end>
+      <color>1,2,3</color>
+      <ends_today>False</ends_today>
+    </era>
+  </eras>
+  <categories>
+    <category>
+      <name>work</name>
+      <color>10,20,30</color>
+      <progress_color>50,102,153</progress_color>
+      <done_color>50,102,153</done_color>
+      <font_color>0,255,255</font_color>
+    </category>
+    <category>
+      <name>meeting</name>
+      <color>255,0,0</color>
+      <progress_color>255,153,153</progress_color>
+      <done_color>255,153,153</done_color>
+      <font_color>0,255,255</font_color>
+      <parent>work</parent>
+    </category>
+    <category>
+      <name>home &amp; garden</name>
+      <color>255,0,0</color>
+      <progress_color>255,153,153</progress_color>
+      <done_color>255,153,153</done_color>
+      <font_color>0,255,255</font_color>
+    </category>
+  </categories>
+  <events>
+    <event>
+      <start>2018-05-01 00:00:00</start>
+      <end>2018-05-09 00:00:00</end>
+      <text>[7]con</text>
+      <fuzzy>False</fuzzy>
+      <locked>False</locked>
+      <ends_today>False</ends_today>
+      <category>work</category>
+    </event>
+    <event>
+      <start>2018-04-07 00:00:00</start>
+      <end>2018-04-07 00:00:00</end>
+      <text> [mile]</text>
+      <fuzzy>False</fuzzy>
+      <locked>False</locked>
+      <ends_today>False</ends_today>
+      <category>home &amp; garden</category>
+      <description>milestone description</description>
+      <default_color>255,255,128</default_color>
+      <milestone>True</milestone>
+    </event>
+    <event>
+      <start>2018-02-03 00:00:00</start>
+      <end>2018-02-05 00:00:00</end>
+      <text> (not a subevent)</text>
+      <progress>40</progress>
+      <fuzzy>True</fuzzy>
+      <locked>True</locked>
+      <ends_today>False</ends_today>
+      <category>meeting</category>
+      <description>a &lt;b&gt; &amp; c</description>
+      <alert>2018-02-02 10:00:00;wake up</alert>
+      <hyperlink>http://example.com/?a=1&amp;b=2</hyperlink>
+      <default_color>100,110,120</default_color>
+    </event>
+    <event>
+      <start>2018-03-01 00:00:00</start>
+      <end>2018-03-01 00:00:00</end>
+      <text>plain</text>
+      <fuzzy>False</fuzzy>
+      <locked>False</locked>
+      <ends_today>False</ends_today>
+      <category>home &amp; garden</category>
+    </event>
+    <event>
+      <start>2018-05-01 00:00:00</start>
+      <end>2018-05-03 00:00:00</end>
+      <text>(7)sub1</text>
+      <fuzzy>False</fuzzy>
+      <locked>False</locked>
+      <ends_today>False</ends_today>
+      <category>meeting</category>
+    </event>
+    <event>
+      <start>2018-05-09 00:00:00</start>
+      <end>2018-05-09 00:00:00</end>
+      <text>(7)sub2</text>
+      <fuzzy>False</fuzzy>
+      <locked>False</locked>
+      <ends_today>False</ends_today>
+    </event>
+  </events>
+  <view>
+    <displayed_period>
+      <start>2018-01-01 00:00:00</start>
+      <end>2019-01-01 00:00:00</end>
+    </displayed_period>
+    <hidden_categories>
+      <name>home &amp; garden</name>
+    </hidden_categories>
+  </view>
+</timeline>
+"""
+
+
 class describe_export_db_to_timeline_xml(TmpDirTestCase):
 
     def test_can_export_events_with_empty_text(self):
@@ -50,6 +182,93 @@ class describe_export_db_to_timeline_xml(TmpDirTestCase):
         self.assertIn("[1]con", content)
         self.assertIn("(1)sub1", content)
 
+    def test_writes_same_document_as_wrapper_based_exporter(self):
+        self.fill_db_with_all_kinds_of_data()
+        self.assertEqual(
+            self.export_and_read(),
+            EXPECTED_DOCUMENT % get_full_version()
+        )
+
+    def fill_db_with_all_kinds_of_data(self):
+        work = a_category_with(name="work", color=(10, 20, 30))
+        self.empty_db.save_category(work)
+        meeting = a_category_with(name="meeting", parent=work)
+        self.empty_db.save_category(meeting)
+        home = a_category_with(name="home & garden")
+        self.empty_db.save_category(home)
+        self.empty_db.save_era(a_gregorian_era_with(
+            start="1 Jan 2018", end="1 Jun 2018", name="spring",
+            color=(1, 2, 3)
+        ))
+        event = an_event_with(
+            human_start_time="3 Feb 2018", human_end_time="5 Feb 2018",
+            text="(not a subevent)", fuzzy=True, locked=True,
+            category=meeting, default_color=(100, 110, 120)
+        )
+        event.set_data("progress", 40)
+        event.set_data("description", "a <b> & c")
+        event.set_data("hyperlink", "http://example.com/?a=1&b=2")
+        event.set_data(
+            "alert",
+            (human_time_to_gregorian("2 Feb 2018 10:00"), "wake up")
+        )
+        self.empty_db.save_event(event)
+        self.empty_db.save_event(an_event_with(
+            time="1 Mar 2018", text="plain", category=home
+        ))
+        container = a_container_with(text="con", category=work)
+        self.empty_db.save_events([
+            container,
+            a_subevent_with(
+                start="1 May 2018", end="3 May 2018", text="sub1",
+                category=meeting, container=container
+            ),
+            a_subevent_with(time="9 May 2018", text="sub2", container=container),
+        ])
+        milestone = Milestone().update(
+            human_time_to_gregorian("7 Apr 2018"),
+            human_time_to_gregorian("7 Apr 2018"),
+            "[mile]",
+            category=home
+        )
+        milestone.set_description("milestone description")
+        self.empty_db.save_event(milestone)
+        self.empty_db.set_displayed_period(
+            gregorian_period("1 Jan 2018", "1 Jan 2019")
+        )
+        self.empty_db.set_hidden_categories([home])
+
+    def test_writes_text_of_lazy_icons_without_parsing_them(self):
+        event = an_event_with(text="with icon")
+        event.set_data("icon", LazyValue(CompressedText(u"aWNvbg=="), self.fail))
+        self.empty_db.save_event(event)
+        self.assertIn("<icon>aWNvbg==</icon>", self.export_and_read())
+
+    def test_copies_xml_text_of_lazy_values_as_it_is(self):
+        event = an_event_with(text="with description")
+        event.set_data("description", LazyValue(XmlTextSource(u"a &#38; b")))
+        event.set_data("hyperlink", LazyValue(XmlTextSource(u"http://a?b&amp;c")))
+        self.empty_db.save_event(event)
+        content = self.export_and_read()
+        self.assertIn("<description>a &#38; b</description>", content)
+        self.assertIn("<hyperlink>http://a?b&amp;c</hyperlink>", content)
+
+    def test_escapes_text_of_lazy_values_without_xml_text(self):
+        event = an_event_with(text="with description")
+        event.set_data("description", LazyValue(CompressedText(u"a & b")))
+        self.empty_db.save_event(event)
+        self.assertIn("<description>a &amp; b</description>", self.export_and_read())
+
+    def test_can_export_compressed_timeline(self):
+        self.empty_db.save_event(an_event_with(text="compressed"))
+        export_db_to_timeline_xml(self.empty_db, self.export_path)
+        compressed_path = self.get_tmp_path("export.timeline.gz")
+        export_db_to_timeline_xml(self.empty_db, compressed_path)
+        with gzip.open(compressed_path, "rb") as f:
+            self.assertEqual(f.read(), self.read("export.timeline"))
+        db = import_db_from_timeline_xml(compressed_path)
+        self.assertEqual(db.get_all_events()[0].get_text(), "compressed")
+
     def export_and_read(self):
         export_db_to_timeline_xml(self.empty_db, self.export_path)
         return self.read("export.timeline")
@@ -58,3 +277,122 @@ class describe_export_db_to_timeline_xml(TmpDirTestCase):
         TmpDirTestCase.setUp(self)
         self.export_path = self.get_tmp_path("export.timeline")
         self.empty_db = MemoryDB()
+
+
+class describe_timeline_file(TmpDirTestCase):
+
+    def test_writes_same_document_as_exporter(self):
+        self.timeline_file.save(self.db)
+        self.assertEqual(self.read("file.timeline"), self.export())
+
+    def test_does_not_write_file_with_same_content(self):
+        self.timeline_file.save(self.db)
+        os.utime(self.path, (1, 1))
+        self.timeline_file.save(self.db)
+        self.assertEqual(os.stat(self.path).st_mtime, 1)
+
+    def test_rewrites_end_of_file_in_place_when_only_view_has_changed(self):
+        self.timeline_file.save(self.db)
+        inode = os.stat(self.path).st_ino
+        self.db.set_hidden_categories([])
+        self.timeline_file.save(self.db)
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+        self.assertEqual(self.read("file.timeline"), self.export())
+
+    def test_writes_whole_file_when_events_have_changed(self):
+        self.timeline_file.save(self.db)
+        self.db.save_event(an_event_with(text="new event"))
+        self.timeline_file.save(self.db)
+        self.assertEqual(self.read("file.timeline"), self.export())
+
+    def test_copies_unchanged_sections_from_file_when_sections_move(self):
+        self.timeline_file.save(self.db)
+        self.db.save_era(a_gregorian_era_with(name="era"))
+        self.db.save_event(an_event_with(text="new event"))
+        self.timeline_file.save(self.db)
+        self.assertEqual(self.read("file.timeline"), self.export())
+        self.db.set_hidden_categories([])
+        self.timeline_file.save(self.db)
+        self.assertEqual(self.read("file.timeline"), self.export())
+
+    def test_writes_whole_file_when_modified_by_someone_else(self):
+        self.timeline_file.save(self.db)
+        with open(self.path, "w") as f:
+            f.write("something else")
+        self.db.set_hidden_categories([])
+        self.timeline_file.save(self.db)
+        self.assertEqual(self.read("file.timeline"), self.export())
+
+    def test_does_not_write_compressed_file_with_same_content(self):
+        path = self.get_tmp_path("file.timeline.gz")
+        TimelineFile(path).save(self.db)
+        os.utime(path, (1, 1))
+        TimelineFile(path).save(self.db)
+        self.assertEqual(os.stat(path).st_mtime, 1)
+
+    def test_writes_whole_compressed_file_when_view_has_changed(self):
+        path = self.get_tmp_path("file.timeline.gz")
+        timeline_file = TimelineFile(path)
+        timeline_file.save(self.db)
+        self.db.set_hidden_categories([])
+        timeline_file.save(self.db)
+        with gzip.open(path, "rb") as f:
+            self.assertEqual(f.read(), self.export())
+
+    def test_copies_unchanged_sections_from_compressed_file(self):
+        path = self.get_tmp_path("file.timeline.gz")
+        timeline_file = TimelineFile(path)
+        timeline_file.save(self.db)
+        self.db.save_event(an_event_with(text="new event"))
+        timeline_file.save(self.db)
+        with gzip.open(path, "rb") as f:
+            self.assertEqual(f.read(), self.export())
+
+    def export(self):
+        export_db_to_timeline_xml(self.db, self.get_tmp_path("export.timeline"))
+        return self.read("export.timeline")
+
+    def setUp(self):
+        TmpDirTestCase.setUp(self)
+        self.path = self.get_tmp_path("file.timeline")
+        self.timeline_file = TimelineFile(self.path)
+        self.db = MemoryDB()
+        category = a_category_with(name="work")
+        self.db.save_category(category)
+        self.db.save_event(an_event_with(text="event", category=category))
+        self.db.set_hidden_categories([category])
+
+
+class describe_write_buffer(UnitTestCase):
+
+    def test_writes_nothing_until_buffer_is_full(self):
+        self.buf.write("abc")
+        self.assertEqual(self.xmlfile.getvalue(), "")
+        self.buf.write("defg")
+        self.assertEqual(self.xmlfile.getvalue(), "abcdefg")
+
+    def test_writes_the_rest_on_flush(self):
+        self.buf.write("abc")
+        self.buf.flush()
+        self.assertEqual(self.xmlfile.getvalue(), "abc")
+
+    def test_escapes_content_of_simple_tags(self):
+        self.buf.write_simple_tag("name", "a & b", "  ")
+        self.buf.flush()
+        self.assertEqual(self.xmlfile.getvalue(), "  <name>a &amp; b</name>\n")
+
+    def setUp(self):
+        self.xmlfile = StringIO.StringIO()
+        self.buf = WriteBuffer(self.xmlfile, buffer_size=5)
+
+
+class XmlTextSource(TextSource):
+
+    def __init__(self, xml_text):
+        self._xml_text = xml_text
+
+    def read_text(self):
+        raise AssertionError("text should not be read")
+
+    def read_xml_text(self):
+        return self._xml_text
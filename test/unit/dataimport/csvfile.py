@@ -0,0 +1,213 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from mock import Mock
+
+from timelinelib.calendar.gregorian.timetype import GregorianTimeType
+from timelinelib.canvas.data.db import MemoryDB
+from timelinelib.canvas.data.exceptions import TimelineIOError
+from timelinelib.dataimport.csvfile import import_db_from_csv
+from timelinelib.dataimport.csvfile import import_events_from_csv
+from timelinelib.plugin.plugins.exporters.timelineexporter import CsvExporter
+from timelinelib.test.cases.tmpdir import TmpDirTestCase
+from timelinelib.test.utils import a_category_with
+from timelinelib.test.utils import a_container
+from timelinelib.test.utils import an_event_with
+from timelinelib.test.utils import human_time_to_gregorian
+
+
+EVENT_FIELDS = [
+    _("Text"), _("Description"), _("Start"), _("End"), _("Category"),
+    _("Fuzzy"), _("Locked"), _("Ends Today"), _("Hyperlink"), _("Progress"),
+    _("Progress Color"), _("Done Color"), _("Alert"), _("Is Container"),
+    _("Is Subevent"),
+]
+CATEGORY_FIELDS = [
+    _("Name"), _("Color"), _("Progress Color"), _("Done Color"), _("Parent"),
+]
+
+
+class describe_import_db_from_csv(TmpDirTestCase):
+
+    def test_can_import_exported_events(self):
+        self.given_exported_timeline()
+        db = import_db_from_csv(self.csv_path)
+        event = db.get_first_event()
+        self.assertEqual(len(db.get_all_events()), 1)
+        self.assertEqual(event.get_text(), u"f\xf6o; \"bar\"")
+        self.assertEqual(event.get_description(), u"line 1\nline 2")
+        self.assertEqual(event.get_time_period().start_time, human_time_to_gregorian("11 Jul 2014 10:11"))
+        self.assertEqual(event.get_time_period().end_time, human_time_to_gregorian("12 Jul 2014 10:11"))
+        self.assertTrue(event.get_fuzzy())
+        self.assertFalse(event.get_locked())
+        self.assertEqual(event.get_hyperlink(), "http://example.com")
+        self.assertEqual(event.get_progress(), 40)
+        self.assertEqual(event.get_alert(), (human_time_to_gregorian("10 Jul 2014 10:00"), u"wake up"))
+        self.assertEqual(event.get_category().get_name(), "Child")
+
+    def test_can_import_exported_categories(self):
+        self.given_exported_timeline()
+        db = import_db_from_csv(self.csv_path)
+        child = db.get_category_by_name("Child")
+        self.assertEqual(child.get_color(), (0, 0, 255))
+        self.assertEqual(child.parent.get_name(), "Parent")
+        self.assertEqual(db.get_category_by_name("Parent").parent, None)
+
+    def test_empty_values_are_imported_as_missing(self):
+        self.given_exported_timeline(event=an_event_with(text="foo"))
+        event = import_db_from_csv(self.csv_path).get_first_event()
+        self.assertEqual(event.get_description(), None)
+        self.assertEqual(event.get_hyperlink(), None)
+        self.assertEqual(event.get_alert(), None)
+        self.assertEqual(event.get_category(), None)
+
+    def test_can_import_only_some_fields(self):
+        self.given_exported_timeline(event_fields=[_("Text"), _("Start")])
+        event = import_db_from_csv(self.csv_path).get_first_event()
+        self.assertEqual(event.get_text(), u"f\xf6o; \"bar\"")
+        self.assertFalse(event.get_time_period().is_period())
+
+    def test_skips_containers_and_imports_subevents_as_plain_events(self):
+        self.given_exported_timeline(
+            event=an_event_with(text="foo"),
+            extra_events=a_container("Container", None, [("Sub", None)])
+        )
+        events = import_db_from_csv(self.csv_path).get_all_events()
+        self.assertEqual(
+            sorted(event.get_text() for event in events),
+            ["Sub", "foo"]
+        )
+        self.assertFalse(any(event.is_subevent() for event in events))
+
+    def test_imports_containers_as_plain_events_without_is_container_field(self):
+        self.given_exported_timeline(
+            event=an_event_with(text="foo"),
+            event_fields=[_("Text"), _("Start")],
+            extra_events=a_container("Container", None, [("Sub", None)])
+        )
+        events = import_db_from_csv(self.csv_path).get_all_events()
+        self.assertEqual(
+            sorted(event.get_text() for event in events),
+            ["Container", "Sub", "foo"]
+        )
+
+    def test_can_import_alert_text_with_delimiters_and_quotes(self):
+        event = an_event_with(text="foo")
+        event.set_alert((human_time_to_gregorian("10 Jul 2014 10:00"), u"a; \"b\"\nc"))
+        self.given_exported_timeline(event=event)
+        event = import_db_from_csv(self.csv_path).get_first_event()
+        self.assertEqual(
+            event.get_alert(),
+            (human_time_to_gregorian("10 Jul 2014 10:00"), u"a; \"b\"\nc")
+        )
+
+    def test_invalid_file_raises_exception(self):
+        self.assertRaises(TimelineIOError, import_db_from_csv, "...")
+
+    def test_invalid_time_raises_exception(self):
+        with open(self.csv_path, "w") as f:
+            f.write("\"%s\";\n\"%s\";\n1 Jul 2014;\n" % (
+                _("Events").encode("utf-8"), _("Start").encode("utf-8")
+            ))
+        self.assertRaises(TimelineIOError, import_db_from_csv, self.csv_path)
+
+    def given_exported_timeline(self, event=None, event_fields=EVENT_FIELDS, extra_events=()):
+        db = MemoryDB()
+        db.set_time_type(GregorianTimeType())
+        if event is None:
+            parent = a_category_with("Parent", color=(0, 255, 0))
+            db.save_category(parent)
+            child = a_category_with("Child", color=(0, 0, 255), parent=parent)
+            db.save_category(child)
+            event = an_event_with(
+                text=u"f\xf6o; \"bar\"",
+                human_start_time="11 Jul 2014 10:11",
+                human_end_time="12 Jul 2014 10:11",
+                fuzzy=True,
+                category=child
+            )
+            event.set_description(u"line 1\nline 2")
+            event.set_hyperlink("http://example.com")
+            event.set_progress(40)
+            event.set_alert((human_time_to_gregorian("10 Jul 2014 10:00"), u"wake up"))
+        db.save_event(event)
+        for extra_event in extra_events:
+            db.save_event(extra_event)
+        dlg = Mock()
+        dlg.GetExportEvents.return_value = True
+        dlg.GetExportCategories.return_value = True
+        dlg.GetEventFields.return_value = event_fields
+        dlg.GetCategoryFields.return_value = CATEGORY_FIELDS
+        dlg.GetTextEncoding.return_value = "utf-8"
+        dlg.GetTextEncodingErrorStrategy.return_value = "strict"
+        CsvExporter(db, self.csv_path, dlg).export()
+
+    def setUp(self):
+        TmpDirTestCase.setUp(self)
+        self.csv_path = self.get_tmp_path("test.csv")
+
+
+class describe_import_events_from_csv(TmpDirTestCase):
+
+    def test_adds_events_to_existing_timeline(self):
+        self.given_csv_file([u"Event 1;2014-07-11 10:11:00;\"Existing\";",
+                             u"Event 2;2014-07-12 10:11:00;\"New\";"])
+        self.assertEqual(import_events_from_csv(self.db, self.csv_path), 2)
+        self.assertEqual(len(self.db.get_all_events()), 3)
+
+    def test_reuses_existing_categories(self):
+        self.given_csv_file([u"Event 1;2014-07-11 10:11:00;\"Existing\";"])
+        import_events_from_csv(self.db, self.csv_path)
+        self.assertEqual(
+            sorted(category.get_name() for category in self.db.get_categories()),
+            ["Existing"]
+        )
+        self.assertEqual(self.db.get_category_by_name("Existing").get_color(), (1, 2, 3))
+
+    def test_new_events_are_sorted_after_existing_ones(self):
+        self.given_csv_file([u"Event 1;2014-07-11 10:11:00;\"Existing\";"])
+        import_events_from_csv(self.db, self.csv_path)
+        sort_orders = dict(
+            (event.get_text(), event.get_sort_order())
+            for event
+            in self.db.get_all_events()
+        )
+        self.assertTrue(sort_orders["Event 1"] > sort_orders["foo"])
+
+    def test_failed_import_leaves_timeline_unchanged(self):
+        self.given_csv_file([u"Event 1;2014-07-11 10:11:00;\"Existing\";",
+                             u"Event 2;not a time;\"New\";"])
+        self.assertRaises(TimelineIOError, import_events_from_csv, self.db, self.csv_path)
+        self.assertEqual(len(self.db.get_all_events()), 1)
+        self.assertEqual(len(self.db.get_categories()), 1)
+
+    def given_csv_file(self, rows):
+        header = u"\"%s\";\n\"%s\";\"%s\";\"%s\";\n" % (
+            _("Events"), _("Text"), _("Start"), _("Category")
+        )
+        with open(self.csv_path, "w") as f:
+            f.write((header + u"\n".join(rows) + u"\n\n").encode("utf-8"))
+
+    def setUp(self):
+        TmpDirTestCase.setUp(self)
+        self.csv_path = self.get_tmp_path("test.csv")
+        self.db = MemoryDB()
+        self.db.set_time_type(GregorianTimeType())
+        category = a_category_with("Existing", color=(1, 2, 3))
+        self.db.save_category(category)
+        self.db.save_event(an_event_with(category=category))
@@ -16,10 +16,18 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
+from datetime import datetime
 import os.path
 
-from timelinelib.dataimport.dir import import_db_from_dir
+from timelinelib.calendar.gregorian.gregorian import GregorianDateTime
+from timelinelib.dataimport.dir import DirectoryScanner
 from timelinelib.dataimport.dir import get_unique_cat_name
+from timelinelib.dataimport.dir import import_db_from_dir
+from timelinelib.dataimport.dir import ImportCancelledError
+from timelinelib.dataimport.dir import read_manifest
+import timelinelib.dataimport.dir as dir_import
+from timelinelib.canvas.data.db import MemoryDB
+from timelinelib.test.cases.tmpdir import TmpDirTestCase
 from timelinelib.test.cases.unit import UnitTestCase
 
 
@@ -33,6 +41,224 @@ class describe_import_dir(UnitTestCase):
         self.assertTrue(this_name in event_names, "Events: %s" % event_names)
 
 
+class describe_import_dir_tree(TmpDirTestCase):
+
+    def test_creates_event_for_each_file_in_category_of_its_directory(self):
+        db = import_db_from_dir(self.root)
+        self.assertEqual(
+            sorted(
+                (event.get_text(), event.get_category().get_name())
+                for event
+                in db.get_all_events()
+            ),
+            [("a.txt", "root"), ("b.txt", "sub"), ("c.txt", "sub(1)")]
+        )
+
+    def test_creates_category_for_each_directory(self):
+        db = import_db_from_dir(self.root)
+        self.assertEqual(
+            sorted(
+                (category.get_name(), self.get_parent_name(category))
+                for category
+                in db.get_categories()
+            ),
+            [("root", None), ("sub", "root"), ("sub(1)", "sub")]
+        )
+
+    def test_hides_all_categories_but_the_root(self):
+        db = import_db_from_dir(self.root)
+        self.assertEqual(
+            sorted(category.get_name() for category in db.get_hidden_categories()),
+            ["sub", "sub(1)"]
+        )
+
+    def test_events_get_modification_time_of_files(self):
+        os.utime(os.path.join(self.root, "a.txt"), (0, 1500000000))
+        db = import_db_from_dir(self.root)
+        [event] = [event for event in db.get_all_events() if event.get_text() == "a.txt"]
+        self.assertEqual(
+            GregorianDateTime.from_time(event.get_time_period().start_time).to_tuple(),
+            datetime.fromtimestamp(1500000000).timetuple()[:6]
+        )
+
+    def test_can_be_undone_in_one_step_or_not_at_all(self):
+        db = import_db_from_dir(self.root)
+        self.assertFalse(db.undo_enabled())
+
+    def test_skips_files_that_can_not_be_read(self):
+        if not hasattr(os, "symlink"):
+            return
+        os.symlink(os.path.join(self.root, "missing"), os.path.join(self.root, "broken"))
+        db = import_db_from_dir(self.root)
+        self.assertEqual(len(db.get_all_events()), 3)
+
+    def test_reports_progress(self):
+        dir_import.PROGRESS_INTERVAL = 1
+        import_db_from_dir(self.root, self.progress_fn)
+        self.assertEqual(self.reports[0], (2, None))
+        self.assertEqual(self.reports[-1], (3, 3))
+
+    def test_can_be_cancelled(self):
+        self.assertRaises(
+            ImportCancelledError,
+            import_db_from_dir, self.root, lambda done, total: False
+        )
+
+    def test_reads_tree_without_scandir(self):
+        dir_import.scandir = None
+        db = import_db_from_dir(self.root)
+        self.assertEqual(len(db.get_all_events()), 3)
+
+    def get_parent_name(self, category):
+        if category.parent is None:
+            return None
+        return category.parent.get_name()
+
+    def progress_fn(self, done, total):
+        self.reports.append((done, total))
+
+    def setUp(self):
+        TmpDirTestCase.setUp(self)
+        self.original_scandir = dir_import.scandir
+        self.original_progress_interval = dir_import.PROGRESS_INTERVAL
+        self.reports = []
+        self.root = self.get_tmp_path("root")
+        os.makedirs(os.path.join(self.root, "sub", "sub"))
+        for path in ["a.txt", "sub/b.txt", "sub/sub/c.txt"]:
+            with open(os.path.join(self.root, path), "w") as f:
+                f.write("content")
+
+    def tearDown(self):
+        dir_import.scandir = self.original_scandir
+        dir_import.PROGRESS_INTERVAL = self.original_progress_interval
+        TmpDirTestCase.tearDown(self)
+
+
+class describe_directory_rescan(TmpDirTestCase):
+
+    def test_does_nothing_when_nothing_has_changed(self):
+        self.assertEqual(self.db.refresh(), 0)
+        self.assertEqual(self.get_event_texts(), ["a.txt", "b.txt"])
+
+    def test_keeps_events_of_unchanged_files(self):
+        [event_id] = self.get_event_ids("b.txt")
+        self.write_file("a.txt", "changed", mtime=1600000000)
+        self.db.refresh()
+        self.assertEqual(self.get_event_ids("b.txt"), [event_id])
+
+    def test_adds_events_for_new_files(self):
+        self.write_file("sub/c.txt")
+        self.assertEqual(self.db.refresh(), 1)
+        self.assertEqual(self.get_event_texts(), ["a.txt", "b.txt", "c.txt"])
+
+    def test_updates_events_of_changed_files(self):
+        [event_id] = self.get_event_ids("a.txt")
+        self.write_file("a.txt", "changed", mtime=1600000000)
+        self.assertEqual(self.db.refresh(), 1)
+        event = self.db.find_event_with_id(event_id)
+        self.assertEqual(
+            GregorianDateTime.from_time(event.get_time_period().start_time).to_tuple(),
+            datetime.fromtimestamp(1600000000).timetuple()[:6]
+        )
+
+    def test_removes_events_of_removed_files(self):
+        os.remove(os.path.join(self.root, "a.txt"))
+        self.assertEqual(self.db.refresh(), 1)
+        self.assertEqual(self.get_event_texts(), ["b.txt"])
+
+    def test_adds_hidden_categories_for_new_directories(self):
+        self.write_file("new/c.txt")
+        self.db.refresh()
+        self.assertEqual(
+            sorted(category.get_name() for category in self.db.get_hidden_categories()),
+            ["new", "sub"]
+        )
+
+    def test_removes_categories_of_removed_directories(self):
+        os.remove(os.path.join(self.root, "sub", "b.txt"))
+        os.rmdir(os.path.join(self.root, "sub"))
+        self.assertEqual(self.db.refresh(), 2)
+        self.assertEqual(
+            [category.get_name() for category in self.db.get_categories()],
+            ["root"]
+        )
+
+    def test_refresh_can_not_be_undone(self):
+        self.write_file("c.txt")
+        self.db.refresh()
+        self.assertFalse(self.db.undo_enabled())
+
+    def test_writes_manifest(self):
+        self.assertEqual(
+            read_manifest(self.manifest_path, self.root),
+            (
+                [
+                    (self.root, self.get_category_id("root")),
+                    (os.path.join(self.root, "sub"), self.get_category_id("sub")),
+                ],
+                [
+                    (os.path.join(self.root, "a.txt"), 1500000000, 7, self.get_event_ids("a.txt")[0]),
+                    (os.path.join(self.root, "sub", "b.txt"), 1500000000, 7, self.get_event_ids("b.txt")[0]),
+                ]
+            )
+        )
+
+    def test_reopens_from_manifest_with_same_ids_without_reading_directory(self):
+        ids = self.get_ids()
+        self.write_file("c.txt")
+        self.db = import_db_from_dir(self.root, manifest_path=self.manifest_path)
+        self.assertEqual(self.get_event_texts(), ["a.txt", "b.txt"])
+        self.assertEqual(self.get_ids(), ids)
+
+    def test_refresh_after_reopening_reads_changes_with_new_ids(self):
+        ids = self.get_ids()
+        self.write_file("c.txt")
+        self.db = import_db_from_dir(self.root, manifest_path=self.manifest_path)
+        self.assertEqual(self.db.refresh(), 1)
+        self.assertEqual(self.get_event_texts(), ["a.txt", "b.txt", "c.txt"])
+        [c_id] = self.get_event_ids("c.txt")
+        self.assertTrue(c_id not in [id_ for (_, id_) in ids])
+
+    def test_ignores_manifest_of_other_directory(self):
+        self.assertEqual(read_manifest(self.manifest_path, self.tmp_dir), None)
+
+    def get_ids(self):
+        return sorted(
+            [(category.get_name(), category.get_id()) for category in self.db.get_categories()] +
+            [(event.get_text(), event.get_id()) for event in self.db.get_all_events()]
+        )
+
+    def get_category_id(self, name):
+        return self.db.get_category_by_name(name).get_id()
+
+    def get_event_texts(self):
+        return sorted(event.get_text() for event in self.db.get_all_events())
+
+    def get_event_ids(self, text):
+        return [
+            event.get_id()
+            for event
+            in self.db.get_all_events()
+            if event.get_text() == text
+        ]
+
+    def write_file(self, path, content="content", mtime=1500000000):
+        path = os.path.join(self.root, path)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(content)
+        os.utime(path, (mtime, mtime))
+
+    def setUp(self):
+        TmpDirTestCase.setUp(self)
+        self.root = self.get_tmp_path("root")
+        self.manifest_path = self.get_tmp_path("manifest/root.json")
+        self.write_file("a.txt")
+        self.write_file("sub/b.txt")
+        self.db = import_db_from_dir(self.root, manifest_path=self.manifest_path)
+
+
 class describe_get_unique_cat_name(UnitTestCase):
 
     def test_different_dir_names_keeps_cat_names(self):
@@ -157,6 +157,30 @@ END:VEVENT
 END:VCALENDAR
 """
 
+ICS_CONTENT_FOLDED_AND_ESCAPED = """
+BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//hacksw/handcal//NONSGML v1.0//EN
+
+BEGIN:VEVENT
+CATEGORIES:A,B
+CATEGORIES:C
+UID:uid1@example.com
+DTSTART;TZID=Europe/Stockholm:19970714T170000
+DURATION:P1DT1H
+SUMMARY:Meeting\\, with\\; escapes
+DESCRIPTION:Line one\\nLine two folded
+  across lines
+BEGIN:VALARM
+ACTION:DISPLAY
+DESCRIPTION:Alarm description
+TRIGGER:-PT15M
+END:VALARM
+END:VEVENT
+
+END:VCALENDAR
+"""
+
 INVALID_ICS_CONTENT = """
 BEGIN:VCALENDAR
 VERSION:2.0
@@ -234,6 +258,45 @@ class describe_import_vevent_from_ics(describe_import_ics):
         self.assertRaises(TimelineIOError, import_db_from_ics, self.ics_file_path)
 
 
+class describe_import_streamed_ics(describe_import_ics):
+
+    def test_unfolds_and_unescapes_text(self):
+        self.given_ics_file(ICS_CONTENT_FOLDED_AND_ESCAPED)
+        event = self.when_ics_file_imported().get_first_event()
+        self.assertEqual(event.get_text(), "Meeting, with; escapes")
+        self.assertEqual(event.get_description(), "Line one\nLine two folded across lines")
+
+    def test_can_import_categories_from_several_lines(self):
+        self.given_ics_file(ICS_CONTENT_FOLDED_AND_ESCAPED)
+        db = self.when_ics_file_imported()
+        self.assertEqual(
+            sorted(category.get_name() for category in db.get_categories()),
+            ["A", "B", "C"])
+
+    def test_event_gets_first_category(self):
+        self.given_ics_file(ICS_CONTENT_FOLDED_AND_ESCAPED)
+        event = self.when_ics_file_imported().get_first_event()
+        self.assertEqual(event.get_category().get_name(), "A")
+
+    def test_duration_counts_days(self):
+        self.given_ics_file(ICS_CONTENT_FOLDED_AND_ESCAPED)
+        event = self.when_ics_file_imported().get_first_event()
+        self.assertEqual(event.get_time_period().delta(), GregorianDelta(25 * 60 * 60))
+
+    def test_imports_many_events_in_one_transaction(self):
+        self.given_ics_file(self._many_events_content(500))
+        db = self.when_ics_file_imported()
+        self.assertEqual(len(db.get_all_events()), 500)
+        self.assertEqual(len(db.get_categories()), 2)
+
+    def _many_events_content(self, count):
+        events = []
+        for i in range(count):
+            events.append("BEGIN:VEVENT\nCATEGORIES:MEETING %d\nDTSTART:19970714T170000Z\n"
+                          "SUMMARY:Event %d\nEND:VEVENT\n" % (i % 2, i))
+        return "BEGIN:VCALENDAR\nVERSION:2.0\n%sEND:VCALENDAR\n" % "".join(events)
+
+
 class describe_import_vtodo_from_ics(describe_import_ics):
 
     def test_can_import_todo_events_from_ics_file(self):
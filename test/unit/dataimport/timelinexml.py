@@ -16,10 +16,54 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import gzip
+
+from timelinelib.canvas.data.db import MemoryDB
 from timelinelib.dataimport.timelinexml import import_db_from_timeline_xml
+from timelinelib.dataimport.timelinexml import Parser
+import timelinelib.dataimport.timelinexml as timelinexml
+from timelinelib.general.lazyvalue import LazyValue
 from timelinelib.test.cases.tmpdir import TmpDirTestCase
 
 
+TIMELINE_WITH_DESCRIPTIONS = """\
+<?xml version="1.0" encoding="utf-8"?>
+<timeline>
+  <version>2.0.0</version>
+  <timetype>gregoriantime</timetype>
+  <categories>
+    <category>
+      <name>work</name>
+      <color>255,0,0</color>
+    </category>
+  </categories>
+  <events>
+    <event>
+      <start>2017-01-01 00:00:00</start>
+      <end>2017-01-02 00:00:00</end>
+      <text>first</text>
+      <fuzzy>True</fuzzy>
+      <category>work</category>
+      <description>a &lt;b&gt; &amp; c\r\nd</description>
+      <hyperlink>http://example.com/?a=1&amp;b=2</hyperlink>
+    </event>
+    <event>
+      <start>2017-02-01 00:00:00</start>
+      <end>2017-02-01 00:00:00</end>
+      <text>second &#228;</text>
+      <description></description>
+      <milestone>True</milestone>
+    </event>
+  </events>
+  <view>
+    <hidden_categories>
+      <name>work</name>
+    </hidden_categories>
+  </view>
+</timeline>
+"""
+
+
 class describe_import_timeline_xml(TmpDirTestCase):
 
     def test_can_import_empty_file(self):
@@ -57,8 +101,104 @@ class describe_import_timeline_xml(TmpDirTestCase):
         subevents = [e.text for e in all_events if e.is_subevent()]
         self.assertEqual((containers, subevents), (["con"], ["sub1"]))
 
+    def test_can_import_compressed_file(self):
+        path = self.get_tmp_path("tmp.timeline.gz")
+        with gzip.open(path, "wb") as f:
+            f.write("""
+            <timeline>
+                <version>0.0.0</version>
+                <categories />
+                <events>
+                    <event>
+                        <start>2017-01-01 00:00:00</start>
+                        <end>2017-01-01 00:00:00</end>
+                        <text>compressed</text>
+                    </event>
+                </events>
+                <view />
+            </timeline>
+            """.strip())
+        db = import_db_from_timeline_xml(path)
+        self.assertEqual(
+            [event.get_text() for event in db.get_all_events()],
+            ["compressed"]
+        )
+
+    def test_mapped_file_gives_same_events(self):
+        path = self.write_file_with_content(TIMELINE_WITH_DESCRIPTIONS)
+        self.assertEqual(
+            self.parse(path, mapped=True).get_all_events(),
+            self.parse(path, mapped=False).get_all_events()
+        )
+
+    def test_mapped_file_has_lazy_descriptions(self):
+        path = self.write_file_with_content(TIMELINE_WITH_DESCRIPTIONS)
+        db = self.parse(path, mapped=True)
+        self.assertTrue(isinstance(self.get_first_record(db).description, LazyValue))
+
+    def test_mapped_file_has_lazy_hyperlinks(self):
+        path = self.write_file_with_content(TIMELINE_WITH_DESCRIPTIONS)
+        record = self.get_first_record(self.parse(path, mapped=True))
+        self.assertTrue(isinstance(record.hyperlink, LazyValue))
+        self.assertEqual(record.hyperlink.get(), u"http://example.com/?a=1&b=2")
+
+    def test_long_descriptions_are_compressed(self):
+        description = u"long \xe4 " * timelinexml.COMPRESSED_DESCRIPTION_MIN_LENGTH
+        path = self.write_file_with_content(TIMELINE_WITH_DESCRIPTIONS.replace(
+            "a &lt;b&gt; &amp; c\r\nd", description.encode("utf-8")
+        ))
+        db = self.parse(path, mapped=False)
+        record = self.get_first_record(db)
+        self.assertTrue(isinstance(record.description, LazyValue))
+        self.assertEqual(record.description.get(), description)
+
+    def test_short_descriptions_are_not_compressed(self):
+        path = self.write_file_with_content(TIMELINE_WITH_DESCRIPTIONS)
+        db = self.parse(path, mapped=False)
+        self.assertEqual(self.get_first_record(db).description, u"a <b> & c\nd")
+
+    def test_large_files_are_mapped(self):
+        timelinexml.MAPPED_PARSE_MIN_SIZE = 0
+        path = self.write_file_with_content(TIMELINE_WITH_DESCRIPTIONS)
+        db = import_db_from_timeline_xml(path)
+        self.assertTrue(isinstance(self.get_first_record(db).description, LazyValue))
+
+    def test_falls_back_to_sax_parser_for_unsupported_xml(self):
+        timelinexml.MAPPED_PARSE_MIN_SIZE = 0
+        path = self.write_file_with_content(TIMELINE_WITH_DESCRIPTIONS.replace(
+            "<view>", "<!-- comment --><view>"
+        ))
+        db = import_db_from_timeline_xml(path)
+        self.assertEqual(
+            self.get_first_record(db).description,
+            u"a <b> & c\nd"
+        )
+
+    def get_first_record(self, db):
+        [event] = [event for event in db.get_all_events() if event.get_text() == "first"]
+        return db._get_immutable_db().events.get(event.id)
+
+    def parse(self, path, mapped):
+        db = MemoryDB()
+        Parser(db, path, mapped).parse()
+        return db
+
+    def write_file_with_content(self, content):
+        path = self.get_tmp_path("tmp.timeline")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
     def import_file_with_content(self, content):
         path = self.get_tmp_path("tmp.timeline")
         with open(path, "w") as f:
             f.write(content)
         return import_db_from_timeline_xml(path)
+
+    def setUp(self):
+        TmpDirTestCase.setUp(self)
+        self.mapped_parse_min_size = timelinexml.MAPPED_PARSE_MIN_SIZE
+
+    def tearDown(self):
+        timelinexml.MAPPED_PARSE_MIN_SIZE = self.mapped_parse_min_size
+        TmpDirTestCase.tearDown(self)
@@ -38,6 +38,10 @@ class describe_container_strategy_interface(UnitTestCase):
         self.given_strategy_with_none_container()
         self.assertRaises(NotImplementedError, self.strategy.update, None)
 
+    def test_sort_order_changed_NotImplemented(self):
+        self.given_strategy_with_none_container()
+        self.assertRaises(NotImplementedError, self.strategy.sort_order_changed, None)
+
     def test_allow_ends_today_NotImplemented(self):
         self.given_strategy_with_none_container()
         self.assertRaises(NotImplementedError, self.strategy.allow_ends_today_on_subevents)
@@ -274,6 +274,16 @@ class describe_default_container_startegy_(UnitTestCase):
         self.given_event_overlapping_point_event2()
         self.assert_start_equals_end(self.subevent1, self.subevent2)
 
+    def test_changed_sort_order_is_used_when_next_event_is_registered(self):
+        self.given_container_with_two_events_with_nonoverlapping_periods()
+        self.subevent1.sort_order = 2
+        self.subevent2.sort_order = 1
+        self.strategy.sort_order_changed(self.subevent1)
+        self.given_subevent1()
+        self.strategy.register_subevent(self.subevent1)
+        self.assertEqual(3, len(self.container.subevents))
+        self.assertEqual([1, 2, None], [subevent.sort_order for subevent in self.container.subevents])
+
     def given_container_with_two_events_with_nonoverlapping_periods(self):
         self.given_strategy_with_container()
         self.given_two_events_with_nonoverlapping_periods()
@@ -0,0 +1,123 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from timelinelib.canvas.data.subevent import Subevent
+from timelinelib.db.subeventindex import SubeventIndex
+from timelinelib.test.cases.unit import UnitTestCase
+from timelinelib.test.utils import gregorian_period
+from timelinelib.test.utils import human_time_to_gregorian
+
+
+class describe_subevent_index(UnitTestCase):
+
+    def test_orders_subevents_by_sort_order_with_unsorted_last(self):
+        first = self.a_subevent(sort_order=1)
+        second = self.a_subevent(sort_order=2)
+        unsorted = self.a_subevent(sort_order=None)
+        self.index.add(unsorted)
+        self.index.add(second)
+        self.index.add(first)
+        self.assertEqual([first, second, unsorted], self.subevents)
+
+    def test_keeps_subevents_with_equal_sort_order_in_insertion_order(self):
+        subevents = [self.a_subevent(sort_order=1) for _ in range(3)]
+        for subevent in subevents:
+            self.index.add(subevent)
+        self.assertEqual(subevents, self.subevents)
+
+    def test_sorts_existing_list_when_created(self):
+        first = self.a_subevent(sort_order=1)
+        second = self.a_subevent(sort_order=2)
+        subevents = [second, first]
+        SubeventIndex(subevents)
+        self.assertEqual([first, second], subevents)
+
+    def test_knows_which_subevents_it_contains(self):
+        subevent = self.a_subevent()
+        self.index.add(subevent)
+        self.assertTrue(subevent in self.index)
+        self.assertFalse(self.a_subevent() in self.index)
+
+    def test_removes_subevents_by_identity(self):
+        subevent = self.a_subevent()
+        equal_subevent = self.a_subevent()
+        self.index.add(subevent)
+        self.index.add(equal_subevent)
+        self.index.remove(equal_subevent)
+        self.assertTrue(self.subevents[0] is subevent)
+        self.assertEqual(1, len(self.index))
+
+    def test_sorts_again_when_sort_order_changed(self):
+        first = self.a_subevent(sort_order=1)
+        second = self.a_subevent(sort_order=2)
+        self.index.add(first)
+        self.index.add(second)
+        first.sort_order = 3
+        self.index.sort_order_changed()
+        third = self.a_subevent(sort_order=4)
+        self.index.add(third)
+        self.assertEqual([second, first, third], self.subevents)
+
+    def test_finds_subevents_by_start_time(self):
+        early = self.a_subevent(period=("1 Jan 2000", "2 Jan 2000"))
+        late = self.a_subevent(period=("1 Feb 2000", "2 Feb 2000"))
+        self.index.add(late)
+        self.index.add(early)
+        self.assertEqual(
+            [early],
+            self.index.starting_at_or_before(human_time_to_gregorian("1 Jan 2000"))
+        )
+        self.assertEqual(
+            [late],
+            self.index.starting_at_or_after(human_time_to_gregorian("2 Jan 2000"))
+        )
+
+    def test_finds_subevents_possibly_overlapping_a_period(self):
+        long_event = self.a_subevent(period=("1 Jan 2000", "1 Mar 2000"), sort_order=2)
+        inside = self.a_subevent(period=("10 Feb 2000", "11 Feb 2000"), sort_order=1)
+        far_away = self.a_subevent(period=("1 Jan 2010", "2 Jan 2010"), sort_order=0)
+        for subevent in [long_event, inside, far_away]:
+            self.index.add(subevent)
+        self.assertEqual(
+            [inside, long_event],
+            self.index.possibly_overlapping(gregorian_period("15 Feb 2000", "20 Feb 2000"))
+        )
+
+    def test_reindexes_subevents_that_have_moved(self):
+        subevent = self.a_subevent(period=("1 Jan 2000", "2 Jan 2000"))
+        self.index.add(subevent)
+        subevent.set_time_period(gregorian_period("1 Jan 2010", "2 Jan 2010"))
+        self.index.start_times_changed([subevent])
+        self.assertEqual(
+            [],
+            self.index.starting_at_or_before(human_time_to_gregorian("1 Jan 2000"))
+        )
+        self.assertEqual(
+            [subevent],
+            self.index.starting_at_or_after(human_time_to_gregorian("1 Jan 2010"))
+        )
+
+    def a_subevent(self, period=("1 Jan 2000", "2 Jan 2000"), sort_order=None):
+        subevent = Subevent().set_time_period(gregorian_period(*period))
+        subevent.sort_order = sort_order
+        return subevent
+
+    def setUp(self):
+        UnitTestCase.setUp(self)
+        self.subevents = []
+        self.index = SubeventIndex(self.subevents)
@@ -18,6 +18,11 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import gzip
+
+from timelinelib.db.utils import open_for_reading
+from timelinelib.db.utils import safe_write
+from timelinelib.test.cases.tmpdir import TmpDirTestCase
 from timelinelib.test.cases.unit import UnitTestCase
 from timelinelib.general.encodings import to_unicode
 
@@ -36,3 +41,34 @@ class describe_raise_error_message_assembly(UnitTestCase):
             u"⟪Unable to save timeline data to 'foobar'. File left unmodified.⟫\n\nspecific_msg_\xe9\n\ncause_exception",
             message
         )
+
+
+class describe_safe_write(TmpDirTestCase):
+
+    def test_writes_encoded_data(self):
+        path = self.get_tmp_path("file.timeline")
+        safe_write(path, "utf-8", lambda dbfile: dbfile.write(u"\xe9"))
+        self.assertEqual(self.read("file.timeline"), "\xc3\xa9")
+
+    def test_compresses_data_if_path_ends_with_gz(self):
+        path = self.get_tmp_path("file.timeline.gz")
+        safe_write(path, "utf-8", lambda dbfile: dbfile.write(u"\xe9"))
+        with gzip.open(path, "rb") as f:
+            self.assertEqual(f.read(), "\xc3\xa9")
+
+
+class describe_open_for_reading(TmpDirTestCase):
+
+    def test_reads_plain_file(self):
+        path = self.get_tmp_path("file.timeline")
+        with open(path, "wb") as f:
+            f.write("data")
+        with open_for_reading(path) as f:
+            self.assertEqual(f.read(), "data")
+
+    def test_decompresses_file_if_path_ends_with_gz(self):
+        path = self.get_tmp_path("file.timeline.gz")
+        with gzip.open(path, "wb") as f:
+            f.write("data")
+        with open_for_reading(path) as f:
+            self.assertEqual(f.read(), "data")
@@ -0,0 +1,85 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from timelinelib.general.deltastore import DeltaStore
+from timelinelib.test.cases.unit import UnitTestCase
+
+
+class describe_delta_store(UnitTestCase):
+
+    def test_recreates_stored_values(self):
+        self.store.push("b", [1, 2], [1, 2, 3])
+        self.store.push("c", [1, 2, 3], [1, 2, 3, 4])
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(self.store.names(), ["b", "c"])
+        self.assertEqual(self.store.get_value(0, [1, 2, 3, 4]), [1, 2])
+        self.assertEqual(self.store.get_value(1, [1, 2, 3, 4]), [1, 2, 3])
+
+    def test_only_applies_deltas_after_known_later_value(self):
+        self.store.push("a", [1], [1, 2])
+        self.store.push("b", [1, 2], [1, 2, 3])
+        self.store.push("c", [1, 2, 3], [1, 2, 3, 4])
+        self.assertEqual(self.store.get_value(0, [1, 2, 3, 4], (1, [1, 2])), [1])
+        self.assertEqual(self.applied_deltas, 1)
+
+    def test_drops_oldest_entries_when_full(self):
+        for n in range(5):
+            dropped = self.store.push(str(n), range(n), range(n + 1))
+        self.assertEqual(dropped, 1)
+        self.assertEqual(self.store.names(), ["2", "3", "4"])
+        self.assertEqual(self.store.get_value(0, range(5)), [0, 1])
+
+    def test_can_be_truncated(self):
+        self.store.push("a", [1], [1, 2])
+        self.store.push("b", [1, 2], [1, 2, 3])
+        self.store.truncate(1)
+        self.assertEqual(self.store.names(), ["a"])
+        self.assertEqual(self.store.get_value(0, [1, 2]), [1])
+
+    def test_keeps_objects_that_are_not_from_timeline_in_memory(self):
+        foreign = Foreign()
+        self.store.push("a", [foreign], [])
+        self.assertTrue(self.store.get_value(0, [])[0] is foreign)
+
+    def test_uses_no_bytes_when_empty(self):
+        self.store.push("a", [1], [1, 2])
+        self.assertTrue(self.store.size_in_bytes() > 0)
+        self.store.clear()
+        self.assertEqual(self.store.size_in_bytes(), 0)
+
+    def setUp(self):
+        UnitTestCase.setUp(self)
+        self.store = DeltaStore(
+            lambda newer, older: older[len(newer):] if len(older) > len(newer) else len(newer) - len(older),
+            self.apply_delta,
+            max_size=3
+        )
+        self.applied_deltas = 0
+
+    def apply_delta(self, newer, delta):
+        self.applied_deltas += 1
+        if isinstance(delta, list):
+            return newer + delta
+        return newer[:len(newer) - delta]
+
+
+class Foreign(object):
+    pass
+
+
+Foreign.__module__ = "foreign"
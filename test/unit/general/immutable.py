@@ -16,8 +16,11 @@
 # along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import pickle
+
 from timelinelib.general.immutable import Field
 from timelinelib.general.immutable import ImmutableDict
+from timelinelib.general.immutable import ImmutableDictBuilder
 from timelinelib.general.immutable import ImmutableRecord
 from timelinelib.test.cases.unit import UnitTestCase
 
@@ -68,6 +71,39 @@ class describe_immutable_dict(UnitTestCase):
         self.assertEqual(len(ImmutableDict(item=5, foo=9)), 2)
 
 
+class describe_immutable_dict_builder(UnitTestCase):
+
+    def test_freezes_to_original_if_not_changed(self):
+        immutable = ImmutableDict(a=1)
+        self.assertTrue(ImmutableDictBuilder(immutable).freeze() is immutable)
+
+    def test_changes_do_not_affect_original(self):
+        immutable = ImmutableDict(a=1, b=2)
+        builder = ImmutableDictBuilder(immutable)
+        builder.set("c", 3)
+        builder.remove("a")
+        builder.map(lambda x: x * 10)
+        self.assertEqual(immutable, ImmutableDict(a=1, b=2))
+        self.assertEqual(builder.freeze(), ImmutableDict(b=20, c=30))
+
+    def test_changes_after_freeze_do_not_affect_frozen(self):
+        builder = ImmutableDictBuilder(ImmutableDict(a=1))
+        builder.set("b", 2)
+        frozen = builder.freeze()
+        builder.set("c", 3)
+        self.assertEqual(frozen, ImmutableDict(a=1, b=2))
+        self.assertEqual(builder.freeze(), ImmutableDict(a=1, b=2, c=3))
+
+    def test_can_be_read_like_immutable_dict(self):
+        builder = ImmutableDictBuilder(ImmutableDict(a=1))
+        builder.set("b", 2)
+        self.assertTrue("b" in builder)
+        self.assertEqual(builder["a"], 1)
+        self.assertEqual(builder.get("c", 3), 3)
+        self.assertEqual(len(builder), 2)
+        self.assertEqual(sorted(builder), [("a", 1), ("b", 2)])
+
+
 class describe_immutable_record(UnitTestCase):
 
     class R(ImmutableRecord):
@@ -91,7 +127,35 @@ class describe_immutable_record(UnitTestCase):
         with self.assertRaises(ValueError):
             r.update(baz=9)
 
+    def test_can_be_read_like_immutable_dict(self):
+        r = self.R(foo=1)
+        self.assertEqual(r["foo"], 1)
+        self.assertEqual(r.get("bar"), 5)
+        self.assertEqual(r.get("baz", 3), 3)
+        self.assertTrue("foo" in r)
+        self.assertFalse("baz" in r)
+        self.assertEqual(len(r), 2)
+        self.assertEqual(sorted(r), [("bar", 5), ("foo", 1)])
+
+    def test_update_does_not_affect_original(self):
+        r = self.R(foo=1)
+        r.update({"foo": 2}, bar=3)
+        self.assertEqual(r, self.R(foo=1))
+        self.assertEqual(r.update({"foo": 2}, bar=3), self.R(foo=2, bar=3))
+
+    def test_has_no_instance_dict(self):
+        self.assertFalse(hasattr(self.R(), "__dict__"))
+
+    def test_can_be_pickled(self):
+        p = Point(x=1, y=2)
+        self.assertEqual(pickle.loads(pickle.dumps(p, 2)), p)
+
     def test_gives_error_if_field_name_is_reserved(self):
         with self.assertRaises(ValueError):
             class R(ImmutableRecord):
                 get = Field(None)
+
+
+class Point(ImmutableRecord):
+    x = Field(0)
+    y = Field(0)
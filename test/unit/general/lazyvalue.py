@@ -0,0 +1,98 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from timelinelib.general.lazyvalue import CompressedText
+from timelinelib.general.lazyvalue import LazyValue
+from timelinelib.general.lazyvalue import resolve
+from timelinelib.general.lazyvalue import TextSource
+import timelinelib.general.lazyvalue as lazyvalue
+from timelinelib.test.cases.unit import UnitTestCase
+
+
+class describe_lazy_value(UnitTestCase):
+
+    def test_does_not_read_text_until_value_is_needed(self):
+        LazyValue(self.source)
+        self.assertEqual(self.source.reads, 0)
+
+    def test_reads_and_parses_text_once(self):
+        value = LazyValue(self.source, len)
+        self.assertEqual(value.get(), 4)
+        self.assertEqual(value.get(), 4)
+        self.assertEqual(self.source.reads, 1)
+
+    def test_reads_text_again_when_value_has_been_dropped(self):
+        value = LazyValue(self.source, len)
+        value.get()
+        lazyvalue.DECODED_VALUES.clear()
+        self.assertEqual(value.get(), 4)
+        self.assertEqual(self.source.reads, 2)
+
+    def test_keeps_only_recently_used_values(self):
+        values = [
+            LazyValue(CompressedText(u"%d" % number))
+            for number
+            in range(lazyvalue.DECODED_VALUES_SIZE + 1)
+        ]
+        for value in values:
+            value.get()
+        self.assertEqual(len(lazyvalue.DECODED_VALUES), lazyvalue.DECODED_VALUES_SIZE)
+        self.assertFalse(values[0] in lazyvalue.DECODED_VALUES)
+
+    def test_text_can_be_read_without_parsing(self):
+        value = LazyValue(self.source, self.fail_to_parse)
+        self.assertEqual(value.get_text(), u"text")
+
+    def test_xml_text_is_read_from_source(self):
+        self.assertEqual(LazyValue(self.source).get_xml_text(), u"&lt;text&gt;")
+        self.assertEqual(LazyValue(CompressedText(u"text")).get_xml_text(), None)
+
+    def test_can_be_parsed_with_other_function(self):
+        value = LazyValue(self.source).parsed_with(len)
+        self.assertEqual(value.get(), 4)
+
+    def test_resolve_returns_values_that_are_not_lazy(self):
+        self.assertEqual(resolve(None), None)
+        self.assertEqual(resolve(LazyValue(self.source)), u"text")
+
+    def fail_to_parse(self, text):
+        self.fail("should not be parsed")
+
+    def setUp(self):
+        lazyvalue.DECODED_VALUES.clear()
+        self.source = CountingSource()
+
+
+class describe_compressed_text(UnitTestCase):
+
+    def test_reads_text_it_was_created_with(self):
+        text = u"\xe4 long text " * 100
+        self.assertEqual(CompressedText(text).read_text(), text)
+
+
+class CountingSource(TextSource):
+
+    def __init__(self):
+        self.reads = 0
+
+    def read_text(self):
+        self.reads += 1
+        return u"text"
+
+    def read_xml_text(self):
+        return u"&lt;text&gt;"
@@ -0,0 +1,55 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from timelinelib.general.lrucache import LruCache
+from timelinelib.test.cases.unit import UnitTestCase
+
+
+class describe_lru_cache(UnitTestCase):
+
+    def test_gives_stored_values(self):
+        self.cache["a"] = 1
+        self.assertEqual(self.cache["a"], 1)
+        self.assertTrue("a" in self.cache)
+
+    def test_raises_key_error_for_missing_values(self):
+        self.assertRaises(KeyError, lambda: self.cache["a"])
+
+    def test_drops_least_recently_used_value_when_full(self):
+        self.cache["a"] = 1
+        self.cache["b"] = 2
+        self.cache["c"] = 3
+        self.cache["a"]
+        self.cache["d"] = 4
+        self.assertEqual(sorted(self.cache.keys()), ["a", "c", "d"])
+
+    def test_replacing_a_value_does_not_drop_others(self):
+        self.cache["a"] = 1
+        self.cache["b"] = 2
+        self.cache["c"] = 3
+        self.cache["a"] = 4
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache["a"], 4)
+
+    def test_can_be_cleared(self):
+        self.cache["a"] = 1
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+    def setUp(self):
+        self.cache = LruCache(3)
@@ -0,0 +1,162 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import sys
+
+from timelinelib.general.lazyvalue import LazyValue
+from timelinelib.general.mappedxmlparser import parse_mapped
+from timelinelib.general.mappedxmlparser import UnsupportedXmlError
+from timelinelib.general.xmlparser import ANY
+from timelinelib.general.xmlparser import OPTIONAL
+from timelinelib.general.xmlparser import parse_fn_store
+from timelinelib.general.xmlparser import SINGLE
+from timelinelib.general.xmlparser import Tag
+from timelinelib.general.xmlparser import ValidationError
+from timelinelib.test.cases.tmpdir import TmpDirTestCase
+
+
+class describe_parse_mapped(TmpDirTestCase):
+
+    def test_calls_parse_functions_with_text_of_tags(self):
+        self.parse("""<?xml version="1.0" encoding="utf-8"?>
+        <db>
+            <person>
+                <name>R&amp;D &#228;</name>
+            </person>
+            <person>
+                <name>James</name>
+                <age>38</age>
+            </person>
+        </db>
+        """)
+        self.assertEqual(self.people, [(u"R&D \xe4", None), (u"James", u"38")])
+
+    def test_reads_empty_tags(self):
+        self.parse("""
+        <db>
+            <person>
+                <name/>
+            </person>
+        </db>
+        """)
+        self.assertEqual(self.people, [(u"", None)])
+
+    def test_gives_lazy_text_for_lazy_tags(self):
+        self.parse("""
+        <db>
+            <person>
+                <name>James</name>
+                <age>3&#56;</age>
+            </person>
+        </db>
+        """, lazy_tag_names=["age"])
+        [(name, age)] = self.people
+        self.assertTrue(isinstance(age, LazyValue))
+        self.assertEqual(age.get(), u"38")
+        self.assertEqual(age.get_xml_text(), u"3&#56;")
+
+    def test_resolves_lazy_text_with_characters_outside_the_bmp(self):
+        content = """
+        <db>
+            <person>
+                <name>James</name>
+                <age>&#128512;</age>
+            </person>
+        </db>
+        """
+        if sys.maxunicode == 0xFFFF:
+            self.assertRaises(UnsupportedXmlError, self.parse, content,
+                              lazy_tag_names=["age"])
+        else:
+            self.parse(content, lazy_tag_names=["age"])
+            [(name, age)] = self.people
+            self.assertEqual(age.get(), u"\U0001F600")
+
+    def test_fails_on_unsupported_references_in_lazy_tags(self):
+        self.assertRaises(UnsupportedXmlError, self.parse, """
+        <db>
+            <person>
+                <name>James</name>
+                <age>&nbsp;</age>
+            </person>
+        </db>
+        """, lazy_tag_names=["age"])
+
+    def test_fails_on_invalid_xml(self):
+        self.assertRaises(ValidationError, self.parse, """
+        <db>
+            <person>
+                <age>38</age>
+            </person>
+        </db>
+        """)
+
+    def test_fails_on_text_between_tags(self):
+        self.assertRaises(ValidationError, self.parse, """
+        <db>
+            text
+        </db>
+        """)
+
+    def test_fails_on_unclosed_tags(self):
+        self.assertRaises(ValidationError, self.parse, """
+        <db>
+            <person>
+                <name>James</name>
+        """)
+
+    def test_does_not_support_comments(self):
+        self.assertRaises(UnsupportedXmlError, self.parse, """
+        <db>
+            <!-- comment -->
+        </db>
+        """)
+
+    def test_does_not_support_attributes(self):
+        self.assertRaises(UnsupportedXmlError, self.parse, """
+        <db id="1">
+        </db>
+        """)
+
+    def test_does_not_support_other_encodings_than_utf8(self):
+        self.assertRaises(UnsupportedXmlError, self.parse, """<?xml version="1.0" encoding="latin-1"?>
+        <db>
+        </db>
+        """)
+
+    def test_does_not_support_empty_files(self):
+        self.assertRaises(UnsupportedXmlError, self.parse, "")
+
+    def parse(self, content, lazy_tag_names=()):
+        path = self.get_tmp_path("file.xml")
+        with open(path, "wb") as f:
+            f.write(content)
+        schema = Tag("db", SINGLE, None, [
+            Tag("person", ANY, self.parse_person, [
+                Tag("name", SINGLE, parse_fn_store("tmp_name")),
+                Tag("age", OPTIONAL, parse_fn_store("tmp_age")),
+            ]),
+        ])
+        parse_mapped(path, schema, {}, lazy_tag_names)
+
+    def parse_person(self, text, tmp_dict):
+        self.people.append((tmp_dict.pop("tmp_name"), tmp_dict.pop("tmp_age", None)))
+
+    def setUp(self):
+        TmpDirTestCase.setUp(self)
+        self.people = []
@@ -67,6 +67,20 @@ class describe_observable(UnitTestCase):
         self.observable._notify()
         self.assertEqual(len(observer.events), 1)
 
+    def test_can_listen_for_changes(self):
+        observer = Observer()
+        self.observable.listen_for_changes(observer.event_triggered)
+        self.observable._notify("apples", changes="one apple")
+        self.observable._notify()
+        self.assertEqual(observer.events, ["one apple", None])
+
+    def test_can_unlisten_for_changes(self):
+        observer = Observer()
+        self.observable.listen_for_changes(observer.event_triggered)
+        self.observable.unlisten(observer.event_triggered)
+        self.observable._notify(changes="one apple")
+        self.assertEqual(observer.events, [])
+
     def setUp(self):
         self.observable = Observable()
 
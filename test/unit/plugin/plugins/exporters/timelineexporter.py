@@ -27,7 +27,10 @@ from timelinelib.plugin.plugins.exporters.timelineexporter import CsvExporter
 from timelinelib.plugin.plugins.exporters.timelineexporter import TimelineExporter
 from timelinelib.test.cases.tmpdir import TmpDirTestCase
 from timelinelib.test.utils import a_category_with
+from timelinelib.test.utils import a_container_with
 from timelinelib.test.utils import an_event_with
+from timelinelib.test.utils import a_subevent_with
+from timelinelib.test.utils import human_time_to_gregorian
 
 
 CSV_FILE = "test.csv"
@@ -81,3 +84,56 @@ class describe_timeline_exporter(TimelineExporterTestCase):
             self.read(CSV_FILE),
             (u"\"⟪Categories⟫\";\n\"%s\";\"%s\";\n\"Cat\"\"1\"\"\";(255, 0, 0);\n" % (_("Name"), _("Color"))).encode("utf-8")
         )
+
+    def test_event_fields_are_written_in_fixed_order(self):
+        self.simulate_dialog_entries(True, [_("Start"), _("Text")], False, [])
+        CsvExporter(
+            self.plugin.timeline,
+            self.get_tmp_path(CSV_FILE),
+            self.dlg
+        ).export()
+        self.assertEqual(
+            self.read(CSV_FILE).splitlines()[-2],
+            "bar\";2014-07-11 10:11:00;"
+        )
+
+    def test_container_and_subevent_csv_data_saved_in_file(self):
+        container = a_container_with(text="con")
+        self.plugin.timeline.save_events([
+            container,
+            a_subevent_with(time="12 Jul 2014 10:11", text="sub", container=container),
+        ])
+        self.simulate_dialog_entries(True, [_("Text"), _("Is Container"), _("Is Subevent")], False, [])
+        CsvExporter(
+            self.plugin.timeline,
+            self.get_tmp_path(CSV_FILE),
+            self.dlg
+        ).export()
+        self.assertEqual(
+            self.read(CSV_FILE).decode("utf-8").splitlines()[2:],
+            [
+                u"\"foo",
+                u"bar\";False;False;",
+                u"\"con\";True;False;",
+                u"\"sub\";False;True;",
+                u"",
+            ]
+        )
+
+    def test_alert_and_colors_saved_in_file(self):
+        event = self.plugin.timeline.get_first_event()
+        event.set_category(self.plugin.timeline.get_categories()[0])
+        event.set_alert((human_time_to_gregorian("10 Jul 2014 09:00"), u"wake up"))
+        event.set_progress(100)
+        self.plugin.timeline.save_event(event)
+        self.simulate_dialog_entries(True, [_("Progress Color"), _("Done Color"), _("Alert")], False, [])
+        CsvExporter(
+            self.plugin.timeline,
+            self.get_tmp_path(CSV_FILE),
+            self.dlg
+        ).export()
+        self.assertEqual(
+            self.read(CSV_FILE).splitlines()[-2],
+            "(255, 153, 153);(255, 153, 153);\"2014-07-10 09:00:00 wake up\";"
+        )
+
@@ -0,0 +1,38 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from timelinelib.plugin.factory import IMPORTER
+from timelinelib.plugin import factory
+from timelinelib.plugin.plugins.importers.csvimporter import CsvImporter
+from timelinelib.test.cases.unit import UnitTestCase
+
+
+class describe_csv_importer(UnitTestCase):
+
+    def test_is_a_plugin(self):
+        self.assertTrue(self.plugin.isplugin())
+
+    def test_is_an_importer(self):
+        self.assertEqual(IMPORTER, self.plugin.service())
+
+    def test_can_be_found_by_factory(self):
+        plugin = factory.get_plugin(IMPORTER, "Import Events from CSV File...")
+        self.assertEqual(self.plugin.display_name(), plugin.display_name())
+
+    def setUp(self):
+        self.plugin = CsvImporter()
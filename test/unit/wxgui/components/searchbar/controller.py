@@ -20,6 +20,7 @@ from mock import Mock
 
 from timelinelib.wxgui.components.searchbar.view import SearchBar
 from timelinelib.wxgui.components.searchbar.controller import SearchBarController
+from timelinelib.wxgui.components.searchbar import livesearch
 from timelinelib.test.cases.unit import UnitTestCase
 
 
@@ -99,10 +100,132 @@ class describe_search_bar(UnitTestCase):
         self.controller.set_timeline_canvas(self.timeline_canvas)
 
 
+class describe_live_search(UnitTestCase):
+
+    def test_displays_number_of_matches_while_typing(self):
+        self.type_text("tra")
+        self.view.UpdateNbrOfMatchesLabel.assert_called_with(' ' * 4 + '2 ' + _('matches found'))
+
+    def test_does_not_navigate_while_typing(self):
+        self.type_text("foot")
+        self.assertFalse(self.timeline_canvas.navigate)
+        self.assertEqual(self.controller._result, [self.football])
+
+    def test_matches_items_a_chunk_at_a_time(self):
+        livesearch.TIME_SLICE_IN_SECONDS = -1
+        self.view.ScheduleLiveSearchStep.side_effect = None
+        self.type_text("tra")
+        self.assertEqual(self.timeline_canvas.started_searches[-1].position, 1)
+        self.assertEqual(self.controller._result, [])
+
+    def test_extended_search_string_refines_previous_result(self):
+        self.type_text("tra")
+        self.type_text("trai")
+        self.type_text("train")
+        self.assertEqual(self.timeline_canvas.searches, ["tra"])
+        self.assertEqual(self.controller._result, [self.football])
+
+    def test_changed_search_string_searches_from_scratch(self):
+        self.type_text("tra")
+        self.type_text("hol")
+        self.assertEqual(self.timeline_canvas.searches, ["tra", "hol"])
+        self.assertEqual(self.controller._result, [self.holiday])
+
+    def test_changed_period_searches_from_scratch(self):
+        self.type_text("tra")
+        self.view.GetPeriod.return_value = "other period"
+        self.type_text("trai")
+        self.assertEqual(self.timeline_canvas.searches, ["tra", "trai"])
+
+    def test_changed_visible_period_searches_from_scratch(self):
+        self.type_text("tra")
+        self.timeline_canvas.search_time_period = "other time period"
+        self.type_text("trai")
+        self.assertEqual(self.timeline_canvas.searches, ["tra", "trai"])
+
+    def test_stale_search_is_cancelled(self):
+        livesearch.TIME_SLICE_IN_SECONDS = -1
+        self.view.ScheduleLiveSearchStep.side_effect = None
+        self.type_text("tra")
+        (step_fn,), _ = self.view.ScheduleLiveSearchStep.call_args
+        livesearch.TIME_SLICE_IN_SECONDS = self.time_slice
+        self.view.ScheduleLiveSearchStep.side_effect = lambda step_fn: step_fn()
+        self.type_text("hol")
+        step_fn()
+        self.assertEqual(self.controller._result, [self.holiday])
+
+    def test_search_after_live_search_navigates_to_first_match(self):
+        self.type_text("tra")
+        self.controller.search()
+        self.assertTrue(self.timeline_canvas.navigate)
+        self.assertEqual(self.controller._result_index, 0)
+
+    def test_second_search_after_live_search_goes_to_next_match(self):
+        self.type_text("tra")
+        self.controller.search()
+        self.controller.search()
+        self.assertEqual(self.controller._result_index, 1)
+
+    def test_empty_search_string_clears_result(self):
+        self.type_text("tra")
+        self.type_text("")
+        self.assertEqual(self.controller._result, [])
+
+    def test_empty_search_string_clears_label(self):
+        self.type_text("tra")
+        self.type_text("")
+        self.view.UpdateNbrOfMatchesLabel.assert_called_with("")
+
+    def setUp(self):
+        self.view = Mock(SearchBar)
+        self.view.GetPeriod.return_value = ""
+        self.view.ScheduleLiveSearchStep.side_effect = lambda step_fn: step_fn()
+        self.football = Event("Football training")
+        self.holiday = Event("Holiday")
+        self.timeline_canvas = TimelineCanvas([
+            self.football,
+            Event("Tractor", "Summer travel"),
+            self.holiday,
+        ])
+        self.controller = SearchBarController(self.view)
+        self.controller.set_timeline_canvas(self.timeline_canvas)
+        self.chunk_size = livesearch.CHUNK_SIZE
+        self.time_slice = livesearch.TIME_SLICE_IN_SECONDS
+        livesearch.CHUNK_SIZE = 1
+
+    def tearDown(self):
+        livesearch.CHUNK_SIZE = self.chunk_size
+        livesearch.TIME_SLICE_IN_SECONDS = self.time_slice
+
+    def type_text(self, text):
+        self.view.GetValue.return_value = text
+        self.controller.live_search()
+
+
 class TimelineCanvas():
 
-    def __init__(self):
+    def __init__(self, events=[]):
         self.navigate = False
+        self.events = events
+        self.searches = []
+        self.started_searches = []
+        self.search_time_period = None
+
+    def StartEventSearch(self, search, period):
+        self.searches.append(search)
+        self.started_searches.append(Search([
+            index
+            for index, event
+            in enumerate(self.events)
+            if event.matches(search)
+        ]))
+        return self.started_searches[-1]
+
+    def GetSearchTimePeriod(self, period):
+        return self.search_time_period
+
+    def GetFilteredEventsWithIds(self, ids, period):
+        return [self.events[index] for index in ids]
 
     def GetFilteredEvents(self, search, period):
         if search == "":
@@ -122,3 +245,41 @@ class TimelineCanvas():
 
     def Navigate(self, fn):
         self.navigate = True
+
+
+class Search(object):
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.position = 0
+
+    def step(self, count):
+        self.position += count
+
+    def done(self):
+        return self.position >= len(self.ids)
+
+    def get_result(self):
+        return self.ids
+
+
+class Event(object):
+
+    def __init__(self, text, description=None):
+        self.text = text
+        self.description = description
+
+    def get_text(self):
+        return self.text
+
+    def get_data(self, name):
+        return getattr(self, name)
+
+    def mean_time(self):
+        return None
+
+    def matches(self, search):
+        return (
+            search.lower() in self.text.lower() or
+            search.lower() in (self.description or "").lower()
+        )
@@ -225,6 +225,23 @@ class describe_event_duplicator(UnitTestCase):
             ]
         )
 
+    def test_duplicate_event_many_times(self):
+        # A benchmark as much as a test: saving every duplicate used to
+        # create a new ImmutableDB, so this took minutes.
+        event = an_event_with(time="1 Jan 2015")
+        self.db.save_event(event)
+        listener = Mock()
+        self.db.listen_for_any(listener)
+        day = GregorianDelta.from_days(1)
+        self.duplicate(event, [
+            event.time_period.move_delta(day * n)
+            for n
+            in range(1, 10001)
+        ])
+        self.assertEqual(len(self.db.get_all_events()), 10001)
+        self.assertEqual(self.db.get_max_sort_order(), 10000)
+        self.assertEqual(listener.call_count, 1)
+
     def duplicate(self, *args, **kwargs):
         index, is_in_transaction, history_before = self.db.transactions_status()
         EventDuplicator().duplicate(*args, **kwargs)
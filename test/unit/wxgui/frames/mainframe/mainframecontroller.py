@@ -43,6 +43,13 @@ class describe_mainframe_controller(UnitTestCase):
         self.controller.open_timeline("foo.timeline")
         self.main_frame.display_timeline.assert_called_with(timeline)
 
+    def test_configures_undo_history_of_opened_timeline(self):
+        timeline = Mock()
+        self.db_open.return_value = timeline
+        self.config.undo_history_kilobytes = 2
+        self.controller.open_timeline("foo.timeline")
+        timeline.configure_undo_history.assert_called_with(10, 2048, 500)
+
     def test_saves_current_timeline_data_when_opening_new_timeline(self):
         self.controller.open_timeline("foo.timeline")
         self.main_frame.save_current_timeline_data.assert_called_with()
@@ -73,5 +80,8 @@ class describe_mainframe_controller(UnitTestCase):
         self.db_open = Mock()
         self.config = Mock(Config)
         self.config.get_date_format.return_value = "yyyy-mm-dd"
+        self.config.undo_history_size = 10
+        self.config.undo_history_kilobytes = 0
+        self.config.undo_history_spill_size = 500
         self.controller = MainFrameController(self.main_frame, self.db_open,
                                               self.config)
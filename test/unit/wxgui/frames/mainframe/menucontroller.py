@@ -76,6 +76,24 @@ class describe_menu_controller(UnitTestCase):
         self.when_menu_state_possibly_has_changed()
         self.menu_item.Enable.assert_called_with(True)
 
+    def test_menu_requiering_refreshable_timeline_is_disabled_when_no_timeline_exists(self):
+        self.given_menu_item_requires_refreshable_timeline()
+        self.given_no_timeline_exists()
+        self.when_menu_state_possibly_has_changed()
+        self.menu_item.Enable.assert_called_with(False)
+
+    def test_menu_requiering_refreshable_timeline_is_disabled_when_timeline_can_not_be_refreshed(self):
+        self.given_menu_item_requires_refreshable_timeline()
+        self.given_timeline_can_be_refreshed(False)
+        self.when_menu_state_possibly_has_changed()
+        self.menu_item.Enable.assert_called_with(False)
+
+    def test_menu_requiering_refreshable_timeline_is_enabled_when_timeline_can_be_refreshed(self):
+        self.given_menu_item_requires_refreshable_timeline()
+        self.given_timeline_can_be_refreshed(True)
+        self.when_menu_state_possibly_has_changed()
+        self.menu_item.Enable.assert_called_with(True)
+
     def setUp(self):
         self.menu_controller = MenuController()
         self.menu_item = Mock(wx.MenuItem)
@@ -92,6 +110,9 @@ class describe_menu_controller(UnitTestCase):
     def given_menu_item_requires_timeline_view(self):
         self.menu_controller.add_menu_requiring_visible_timeline_view(self.menu_item)
 
+    def given_menu_item_requires_refreshable_timeline(self):
+        self.menu_controller.add_menu_requiring_refreshable_timeline(self.menu_item)
+
     def given_no_timeline_exists(self):
         self.menu_controller.on_timeline_change(None)
 
@@ -110,6 +131,9 @@ class describe_menu_controller(UnitTestCase):
     def given_timeline_is_read_only(self):
         self.timeline.is_read_only.return_value = True
 
+    def given_timeline_can_be_refreshed(self, can_refresh):
+        self.timeline.can_refresh.return_value = can_refresh
+
     def given_timeline_panel_is_visible(self):
         self.timeline_panel_visible = True
 
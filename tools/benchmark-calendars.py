@@ -0,0 +1,107 @@
+# Copyright (C) 2009, 2010, 2011, 2012, 2013, 2014, 2015, 2016, 2017, 2018  Rickard Lindberg, Roger Lindberg
+#
+# This file is part of Timeline.
+#
+# Timeline is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Timeline is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Timeline.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+Compare how fast strips are generated and labelled in the calendars that are
+implemented by the shared calendar engine.
+
+For every calendar and strip, the strips covering a period are generated and
+labelled a number of times, like repeated redraws of the same region do. The
+first round runs with empty caches and the following rounds reuse them.
+"""
+
+import os.path
+import sys
+
+from timelinetools.paths import ROOT_DIR
+
+
+REDRAWS = 20
+STRIP_DAYS = [
+    ("century", 200000),
+    ("decade", 20000),
+    ("year", 5000),
+    ("month", 400),
+    ("week", 90),
+    ("weekday", 20),
+    ("day", 20),
+    ("hour", 2),
+    ("minute", 1),
+]
+
+
+def setup():
+    sys.path.insert(0, os.path.join(ROOT_DIR, "source"))
+    import __builtin__
+    __builtin__.__dict__["_"] = lambda message: message
+
+
+def calendars():
+    from timelinelib.calendar.coptic.timetype import CopticTimeType
+    from timelinelib.calendar.gregorian.timetype import GregorianTimeType
+    from timelinelib.calendar.pharaonic.timetype import PharaonicTimeType
+    return [
+        ("gregorian", GregorianTimeType()),
+        ("coptic", CopticTimeType()),
+        ("pharaonic", PharaonicTimeType()),
+    ]
+
+
+def create_strip(calendar, name):
+    from timelinelib.calendar import engine
+    from timelinelib.canvas.appearance import Appearance
+    strip_class = getattr(engine, "Strip" + name.capitalize())
+    if strip_class is engine.StripWeek:
+        return strip_class(calendar, Appearance())
+    return strip_class(calendar)
+
+
+def draw_strips(strip, start_time, end_time):
+    for time in strip.boundaries(start_time, end_time)[:-1]:
+        strip.label(time)
+        strip.label(time, True)
+
+
+def measure(time_type, name, days):
+    from timelinelib.timer import Timer
+    calendar = time_type.calendar
+    start_time = time_type.parse_time("1700-01-01 00:00:00")
+    end_time = start_time + calendar.delta_class.from_days(days)
+    timer = Timer()
+    timer.start()
+    draw_strips(create_strip(calendar, name), start_time, end_time)
+    timer.end()
+    cold = timer.elapsed_ms
+    timer.start()
+    for _ in range(REDRAWS):
+        draw_strips(create_strip(calendar, name), start_time, end_time)
+    timer.end()
+    return cold, timer.elapsed_ms / REDRAWS
+
+
+def main():
+    setup()
+    print("%-10s %-10s %10s %10s" % ("calendar", "strip", "cold ms", "warm ms"))
+    for calendar_name, time_type in calendars():
+        for name, days in STRIP_DAYS:
+            cold, warm = measure(time_type, name, days)
+            print("%-10s %-10s %10.3f %10.3f" % (calendar_name, name, cold, warm))
+
+
+if __name__ == "__main__":
+    main()